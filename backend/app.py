@@ -9,6 +9,7 @@ from flask_cors import CORS
 load_dotenv()
 
 from database import db
+from services.session_tokens import DEV_SECRET_KEY
 
 app = Flask(__name__)
 # Database configuration - use PostgreSQL on Heroku, SQLite locally
@@ -18,9 +19,36 @@ if database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
 app.config["SQLALCHEMY_DATABASE_URI"] = database_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
+# Signs login tokens (services/session_tokens.py). Required when deployed (DATABASE_URL set);
+# local development on SQLite falls back to a public key, accepted in debug mode only
+secret_key = os.environ.get("SECRET_KEY")
+if not secret_key and "DATABASE_URL" in os.environ:
+    raise RuntimeError("SECRET_KEY must be set: it signs login tokens")
+app.config["SECRET_KEY"] = secret_key or DEV_SECRET_KEY
 app.config["UPLOAD_FOLDER"] = os.path.join(os.path.dirname(__file__), "uploads", "profile_pictures")
 app.config["MAX_CONTENT_LENGTH"] = 5 * 1024 * 1024  # 5MB max file size
+# How weekly availability is stored for users without a template: "rows" or "bitmap"
+app.config["AVAILABILITY_STORAGE"] = os.environ.get("AVAILABILITY_STORAGE", "rows")
+# Weeks older than this many weeks are moved to the archive tables (services/archive.py)
+app.config["ARCHIVE_AFTER_WEEKS"] = int(os.environ.get("ARCHIVE_AFTER_WEEKS", "26"))
+# How long authenticated users are served from memory (services/identity_cache.py)
+app.config["AUTH_CACHE_TTL_SECONDS"] = int(os.environ.get("AUTH_CACHE_TTL_SECONDS", "60"))
+# Lifetime of app-issued login tokens (services/session_tokens.py); default one week
+app.config["APP_TOKEN_MAX_AGE_SECONDS"] = int(os.environ.get("APP_TOKEN_MAX_AGE_SECONDS", "604800"))
+# How long Google ID tokens that failed verification are rejected without checking
+app.config["GOOGLE_TOKEN_NEGATIVE_TTL_SECONDS"] = int(
+    os.environ.get("GOOGLE_TOKEN_NEGATIVE_TTL_SECONDS", "300")
+)
+# Read responses kept in memory per process (services/response_cache.py); 0 disables
+app.config["RESPONSE_CACHE_SIZE"] = int(os.environ.get("RESPONSE_CACHE_SIZE", "256"))
+# How long GET /api/changes can patch from a cursor (services/change_log.py)
+app.config["CHANGE_LOG_RETENTION_DAYS"] = int(os.environ.get("CHANGE_LOG_RETENTION_DAYS", "7"))
+# Idle seconds between keepalive comments on event streams (routes/schedule.py)
+app.config["LIVE_UPDATES_KEEPALIVE_SECONDS"] = int(
+    os.environ.get("LIVE_UPDATES_KEEPALIVE_SECONDS", "15")
+)
+# Concurrent event streams; each holds a server thread, so keep it below the thread count
+app.config["LIVE_UPDATES_MAX_STREAMS"] = int(os.environ.get("LIVE_UPDATES_MAX_STREAMS", "4"))
 
 # Create uploads directory if it doesn't exist
 Path(app.config["UPLOAD_FOLDER"]).mkdir(parents=True, exist_ok=True)
@@ -33,7 +61,15 @@ CORS(app, origins=allowed_origins)
 
 # Import models (must be after db is created)
 from models import (
+    ArchivedAssignment,
+    ArchivedAvailabilityBitmap,
+    ArchivedAvailabilityException,
+    ArchivedShiftRequirement,
+    ArchivedUserAvailability,
     Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
+    AvailabilityTemplate,
     DaySchedule,
     GlobalSettings,
     Location,
@@ -49,7 +85,9 @@ from routes import (
     assignments,
     auth,
     availability,
+    changes,
     locations,
+    schedule,
     settings,
     shift_requirements,
     time_slots,
@@ -67,6 +105,8 @@ app.register_blueprint(shift_requirements.bp)
 app.register_blueprint(availability.bp)
 app.register_blueprint(assignments.bp)
 app.register_blueprint(weekly_overrides.bp)
+app.register_blueprint(schedule.bp)
+app.register_blueprint(changes.bp)
 
 
 # Serve uploaded profile pictures (must be before frontend catch-all)
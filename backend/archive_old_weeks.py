@@ -0,0 +1,17 @@
+"""Move weeks older than the archive horizon out of the hot tables
+
+Run periodically (e.g. from cron) from backend/. The horizon comes from
+ARCHIVE_AFTER_WEEKS (default 26); rows move in bounded batches, each committed
+on its own, so the script can be interrupted and rerun safely. Change log
+entries older than CHANGE_LOG_RETENTION_DAYS (default 7) are pruned as well.
+"""
+
+from app import app
+from services import change_log
+from services.archive import archive_cutoff, archive_old_weeks
+
+with app.app_context():
+    before = archive_cutoff()
+    counts = archive_old_weeks(before)
+    print(f"Archived weeks before {before.isoformat()}: {counts}")
+    print(f"Pruned change log entries: {change_log.prune()}")
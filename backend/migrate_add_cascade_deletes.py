@@ -0,0 +1,57 @@
+"""Migration script to add ON DELETE rules to existing foreign keys
+
+Availability, assignments and shift requirements now cascade when their user,
+location or time slot is deleted; assigned_by/created_by are cleared instead.
+New databases get this from db.create_all(). On PostgreSQL the existing
+constraints are recreated with the rules; SQLite cannot alter constraints (and
+runs without foreign key enforcement), so there the application applies the
+cascades itself and this script only removes existing orphans.
+"""
+
+from sqlalchemy import inspect, text
+
+from app import app, db
+from models import Assignment, ShiftRequirement, UserAvailability
+from services.scheduler import cleanup_orphaned_records
+
+MODELS = (UserAvailability, Assignment, ShiftRequirement)
+
+with app.app_context():
+    # Orphans would make the recreated constraints fail validation
+    print(f"Removed orphaned rows: {cleanup_orphaned_records()}")
+
+    if db.engine.dialect.name != "postgresql":
+        print("Foreign key rules are applied by the application on this database")
+    else:
+        conn = db.engine.connect()
+        trans = conn.begin()
+
+        try:
+            inspector = inspect(conn)
+            for model in MODELS:
+                table = model.__tablename__
+                existing = {
+                    tuple(fk["constrained_columns"]): fk["name"]
+                    for fk in inspector.get_foreign_keys(table)
+                }
+                for fk in model.__table__.foreign_keys:
+                    column = fk.parent.name
+                    name = existing.get((column,))
+                    if name:
+                        conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+                            f"FOREIGN KEY ({column}) REFERENCES {fk.column.table.name} (id) "
+                            f"ON DELETE {fk.ondelete}"
+                        )
+                    )
+                    print(f"{table}.{column}: ON DELETE {fk.ondelete}")
+
+            trans.commit()
+            print("Migration complete!")
+        except Exception as e:
+            trans.rollback()
+            print(f"Migration failed: {e}")
+        finally:
+            conn.close()
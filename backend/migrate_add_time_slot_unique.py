@@ -0,0 +1,133 @@
+"""Migration script to make time slots unique per (day_of_week, start_time, end_time)
+
+Older databases can hold several identical TimeSlot rows. Before the unique index
+can be created, references to duplicates are pointed at the lowest id of each group
+and the duplicates removed. Rows that would then collide on their table's unique
+key (including rows on two duplicates of the same slot) are ranked over the key
+they will have after the remap, and only the first is kept: the one already on
+the kept slot, else the lowest id. Everything runs in one transaction, so a
+failure leaves the database as it was. Availability bitmaps get the same treatment
+on their packed bits: a cell already on the kept slot wins over a duplicate's.
+"""
+
+from sqlalchemy import inspect, text
+
+from app import app, db
+from services import availability_bits
+
+# Maps every duplicate slot id to the canonical (lowest) id of its group
+DUPLICATES = """
+    SELECT ts.id AS dup_id, canon.keep_id AS keep_id
+    FROM time_slots ts
+    JOIN (
+        SELECT day_of_week, start_time, end_time, MIN(id) AS keep_id
+        FROM time_slots
+        GROUP BY day_of_week, start_time, end_time
+        HAVING COUNT(*) > 1
+    ) canon
+      ON canon.day_of_week = ts.day_of_week
+     AND canon.start_time = ts.start_time
+     AND canon.end_time = ts.end_time
+    WHERE ts.id <> canon.keep_id
+"""
+
+# Tables referencing slots -> columns that, with time_slot_id, must stay unique.
+# None: duplicates are allowed, the rows are only remapped.
+REFERENCES = {
+    "user_availability": ("user_id", "location_id", "week_start_date"),
+    "availability_exceptions": ("user_id", "location_id", "week_start_date"),
+    "shift_requirements": ("location_id", "week_start_date"),
+    "assignments": None,
+    "user_availability_archive": None,
+    "availability_exceptions_archive": None,
+    "shift_requirements_archive": None,
+    "assignments_archive": None,
+}
+
+# Bitmap tables, whose blobs carry slot ids as bit positions
+BITMAPS = ("availability_bitmaps", "availability_bitmaps_archive")
+
+# Rows of ``table`` beyond the first per post-remap key (PARTITION BY groups NULL
+# locations together, which also covers the "any location" indexes)
+COLLIDING = """
+    SELECT id FROM (
+        SELECT t.id, ROW_NUMBER() OVER (
+            PARTITION BY {keys}, COALESCE(r.keep_id, t.time_slot_id)
+            ORDER BY CASE WHEN r.keep_id IS NULL THEN 0 ELSE 1 END, t.id
+        ) AS n
+        FROM {table} t
+        LEFT JOIN slot_remap r ON r.dup_id = t.time_slot_id
+    ) ranked
+    WHERE n > 1
+"""
+
+
+def remap_bitmaps(conn, table, remap) -> int:
+    """Rewrite the blobs of ``table`` so no bit is set for a duplicate slot."""
+    changed = 0
+    for row_id, data in conn.execute(text(f"SELECT id, data FROM {table}")).all():
+        cells = availability_bits.masks_to_cells(availability_bits.decode(data))
+        if not any(slot_id in remap for _, slot_id in cells):
+            continue
+        merged = {key: level for key, level in cells.items() if key[1] not in remap}
+        for (location_id, slot_id), level in sorted(cells.items(), key=lambda c: c[0][1]):
+            if slot_id in remap:
+                merged.setdefault((location_id, remap[slot_id]), level)
+        blob = availability_bits.encode(availability_bits.cells_to_masks(merged))
+        conn.execute(
+            text(f"UPDATE {table} SET data = :data WHERE id = :id"), {"data": blob, "id": row_id}
+        )
+        changed += 1
+    return changed
+
+
+with app.app_context():
+    conn = db.engine.connect()
+    trans = conn.begin()
+
+    try:
+        conn.execute(text(f"CREATE TEMPORARY TABLE slot_remap AS {DUPLICATES}"))
+        remapped = conn.execute(text("SELECT COUNT(*) FROM slot_remap")).scalar()
+        print(f"Found {remapped} duplicate time slots")
+
+        if remapped:
+            tables = set(inspect(conn).get_table_names())
+            for table, keys in REFERENCES.items():
+                if table not in tables:
+                    continue
+                if keys:
+                    query = COLLIDING.format(table=table, keys=", ".join(f"t.{k}" for k in keys))
+                    dropped = conn.execute(
+                        text(f"DELETE FROM {table} WHERE id IN ({query})")
+                    ).rowcount
+                    print(f"Dropped {dropped} {table} rows that would collide")
+                conn.execute(text(f"""
+                        UPDATE {table}
+                        SET time_slot_id = (
+                            SELECT keep_id FROM slot_remap WHERE dup_id = {table}.time_slot_id
+                        )
+                        WHERE time_slot_id IN (SELECT dup_id FROM slot_remap)
+                        """))
+                print(f"Remapped {table} references")
+            remap = dict(conn.execute(text("SELECT dup_id, keep_id FROM slot_remap")).all())
+            for table in BITMAPS:
+                if table in tables:
+                    changed = remap_bitmaps(conn, table, remap)
+                    print(f"Remapped {changed} {table} rows")
+            conn.execute(text("DELETE FROM time_slots WHERE id IN (SELECT dup_id FROM slot_remap)"))
+
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS unique_time_slot "
+                "ON time_slots (day_of_week, start_time, end_time)"
+            )
+        )
+        print("unique_time_slot index in place")
+
+        trans.commit()
+        print("Migration complete!")
+    except Exception as e:
+        trans.rollback()
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
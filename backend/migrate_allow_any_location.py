@@ -0,0 +1,53 @@
+"""Migration script to allow "any location" availability (location_id NULL)
+
+Availability rows, templates and exceptions may now leave location_id empty to
+mean every location. PostgreSQL drops the NOT NULL constraint in place; SQLite
+cannot alter columns, so there each table is rebuilt from the current model and
+its rows copied across. The partial unique indexes for "any location" rows are
+created either way.
+"""
+
+from sqlalchemy import inspect, text
+
+from app import app, db
+from models import AvailabilityException, AvailabilityTemplate, UserAvailability
+
+MODELS = (UserAvailability, AvailabilityTemplate, AvailabilityException)
+
+with app.app_context():
+    conn = db.engine.connect()
+    trans = conn.begin()
+
+    try:
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        for model in MODELS:
+            table = model.__tablename__
+            if table not in tables:
+                model.__table__.create(conn)
+                print(f"{table}: created")
+                continue
+            columns = {column["name"]: column for column in inspector.get_columns(table)}
+            if columns["location_id"]["nullable"]:
+                print(f"{table}: already allows any location")
+                continue
+
+            if db.engine.dialect.name == "postgresql":
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN location_id DROP NOT NULL"))
+                for index in model.__table__.indexes:
+                    index.create(conn, checkfirst=True)
+            else:
+                names = ", ".join(columns)
+                conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_old"))
+                model.__table__.create(conn)
+                conn.execute(text(f"INSERT INTO {table} ({names}) SELECT {names} FROM {table}_old"))
+                conn.execute(text(f"DROP TABLE {table}_old"))
+            print(f"{table}: location_id may now be empty (any location)")
+
+        trans.commit()
+        print("Migration complete!")
+    except Exception as e:
+        trans.rollback()
+        print(f"Migration failed: {e}")
+    finally:
+        conn.close()
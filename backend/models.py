@@ -29,6 +29,40 @@ class User(db.Model):
         }
 
 
+class RevokedToken(db.Model):
+    """An app token revoked by logging out, kept until it would have expired anyway."""
+
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(32), primary_key=True)  # the token's random id
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class DataVersion(db.Model):
+    """Write counter of a table, or of one week of a table (services/data_versions.py)."""
+
+    __tablename__ = "data_versions"
+
+    key = db.Column(db.String(80), primary_key=True)  # "<table>" or "<table>@<week>"
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ChangeLogEntry(db.Model):
+    """A committed change to a synced table, served by GET /api/changes (services/change_log.py)."""
+
+    __tablename__ = "change_log"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # The clients' sync cursor: drawn at commit time, so it follows commit order (ids don't)
+    seq = db.Column(db.Integer, nullable=False, index=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert, update, delete or bulk
+    row_id = db.Column(db.Integer, nullable=True)  # None for bulk and availability changes
+    user_id = db.Column(db.Integer, nullable=True)  # whose row it is, for per-user filtering
+    week_start_date = db.Column(db.Date, nullable=True, index=True)  # None: every week
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
 class Location(db.Model):
     __tablename__ = "locations"
 
@@ -54,6 +88,11 @@ class TimeSlot(db.Model):
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
 
+    # Unique constraint: one slot per day/start/end (lets slot generation upsert in bulk)
+    __table_args__ = (
+        db.UniqueConstraint("day_of_week", "start_time", "end_time", name="unique_time_slot"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -147,11 +186,17 @@ class ShiftRequirement(db.Model):
     __tablename__ = "shift_requirements"
 
     id = db.Column(db.Integer, primary_key=True)
-    location_id = db.Column(db.Integer, db.ForeignKey("locations.id"), nullable=False)
-    time_slot_id = db.Column(db.Integer, db.ForeignKey("time_slots.id"), nullable=False)
+    location_id = db.Column(
+        db.Integer, db.ForeignKey("locations.id", ondelete="CASCADE"), nullable=False
+    )
+    time_slot_id = db.Column(
+        db.Integer, db.ForeignKey("time_slots.id", ondelete="CASCADE"), nullable=False
+    )
     week_start_date = db.Column(db.Date, nullable=False)
     required_workers = db.Column(db.Integer, nullable=False)
-    created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    created_by = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
 
     location = db.relationship("Location", backref="shift_requirements")
     time_slot = db.relationship("TimeSlot", backref="shift_requirements")
@@ -168,13 +213,25 @@ class ShiftRequirement(db.Model):
         }
 
 
+def _any_location_index(name, *columns):
+    """Unique index over "any location" rows (location_id NULL).
+
+    UNIQUE constraints treat NULLs as distinct, so they don't cover these rows.
+    """
+    where = db.text("location_id IS NULL")
+    return db.Index(name, *columns, unique=True, sqlite_where=where, postgresql_where=where)
+
+
 class UserAvailability(db.Model):
     __tablename__ = "user_availability"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    location_id = db.Column(db.Integer, db.ForeignKey("locations.id"), nullable=False)
-    time_slot_id = db.Column(db.Integer, db.ForeignKey("time_slots.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # NULL means any location: one row instead of one per location
+    location_id = db.Column(db.Integer, db.ForeignKey("locations.id", ondelete="CASCADE"))
+    time_slot_id = db.Column(
+        db.Integer, db.ForeignKey("time_slots.id", ondelete="CASCADE"), nullable=False
+    )
     week_start_date = db.Column(db.Date, nullable=False)
     preference_level = db.Column(
         db.Integer, default=1, nullable=False
@@ -189,6 +246,9 @@ class UserAvailability(db.Model):
         db.UniqueConstraint(
             "user_id", "location_id", "time_slot_id", "week_start_date", name="unique_availability"
         ),
+        _any_location_index(
+            "unique_any_location_availability", "user_id", "time_slot_id", "week_start_date"
+        ),
     )
 
     def to_dict(self):
@@ -202,35 +262,126 @@ class UserAvailability(db.Model):
         }
 
 
+class AvailabilityTemplate(db.Model):
+    """A user's standing weekly availability (location_id NULL = any location).
+
+    Keyed by slot times rather than slot ids so it expands onto whatever grid each
+    week has; per-week changes are stored as AvailabilityException rows.
+    """
+
+    __tablename__ = "availability_templates"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey("locations.id", ondelete="CASCADE"))
+    day_of_week = db.Column(db.Integer, nullable=False)  # 0=Monday, 6=Sunday
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    preference_level = db.Column(db.Integer, default=1, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id",
+            "location_id",
+            "day_of_week",
+            "start_time",
+            "end_time",
+            name="unique_availability_template",
+        ),
+        _any_location_index(
+            "unique_any_location_template", "user_id", "day_of_week", "start_time", "end_time"
+        ),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "location_id": self.location_id,
+            "day_of_week": self.day_of_week,
+            "start_time": self.start_time.strftime("%H:%M:%S"),
+            "end_time": self.end_time.strftime("%H:%M:%S"),
+            "preference_level": self.preference_level,
+        }
+
+
+class AvailabilityException(db.Model):
+    """One week's change to a user's AvailabilityTemplate.
+
+    preference_level 0 means not available that week; 1/2 add or change a cell.
+    """
+
+    __tablename__ = "availability_exceptions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey("locations.id", ondelete="CASCADE"))
+    time_slot_id = db.Column(
+        db.Integer, db.ForeignKey("time_slots.id", ondelete="CASCADE"), nullable=False
+    )
+    week_start_date = db.Column(db.Date, nullable=False)
+    preference_level = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id",
+            "location_id",
+            "time_slot_id",
+            "week_start_date",
+            name="unique_availability_exception",
+        ),
+        _any_location_index(
+            "unique_any_location_exception", "user_id", "time_slot_id", "week_start_date"
+        ),
+    )
+
+
+class AvailabilityBitmap(db.Model):
+    """A user's whole week of availability packed into one row.
+
+    ``data`` holds a bitset per (location, preference level) indexed by TimeSlot id;
+    see services/availability_bits.py for the format.
+    """
+
+    __tablename__ = "availability_bitmaps"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    week_start_date = db.Column(db.Date, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "week_start_date", name="unique_availability_bitmap"),
+    )
+
+
 class Assignment(db.Model):
     __tablename__ = "assignments"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    location_id = db.Column(db.Integer, db.ForeignKey("locations.id"), nullable=False)
-    time_slot_id = db.Column(db.Integer, db.ForeignKey("time_slots.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    location_id = db.Column(
+        db.Integer, db.ForeignKey("locations.id", ondelete="CASCADE"), nullable=False
+    )
+    time_slot_id = db.Column(
+        db.Integer, db.ForeignKey("time_slots.id", ondelete="CASCADE"), nullable=False
+    )
     week_start_date = db.Column(db.Date, nullable=False)
-    assigned_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    assigned_by = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
 
     user = db.relationship("User", foreign_keys=[user_id], backref="assignments")
     location = db.relationship("Location", backref="assignments")
     time_slot = db.relationship("TimeSlot", backref="assignments")
     assigner = db.relationship("User", foreign_keys=[assigned_by])
 
-    def to_dict(self):
-        # Calculate start and end datetime for calendar
-        start_datetime = None
-        end_datetime = None
-
-        if self.time_slot and self.week_start_date:
-            # Calculate the actual date (week_start + day_of_week offset)
-            event_date = datetime.combine(self.week_start_date, datetime.min.time()) + timedelta(
-                days=self.time_slot.day_of_week
-            )
-
-            # Combine date with time slot times
-            start_datetime = datetime.combine(event_date.date(), self.time_slot.start_time)
-            end_datetime = datetime.combine(event_date.date(), self.time_slot.end_time)
+    def to_dict(self, slot_fields=None):
+        """``slot_fields`` may pass in ``assignment_slot_fields`` computed for this
+        assignment's week and slot, so lists don't redo it per assignment."""
+        if slot_fields is None:
+            slot_fields = assignment_slot_fields(self.week_start_date, self.time_slot)
+        time_slot, start, end = slot_fields
 
         return {
             "id": self.id,
@@ -241,8 +392,108 @@ class Assignment(db.Model):
             "assigned_by": self.assigned_by,
             "user_name": self.user.name if self.user else None,
             "location_name": self.location.name if self.location else None,
-            "time_slot": self.time_slot.to_dict() if self.time_slot else None,
-            "start": start_datetime.isoformat() if start_datetime else None,
-            "end": end_datetime.isoformat() if end_datetime else None,
+            "time_slot": time_slot,
+            "start": start,
+            "end": end,
             "title": f"{self.user.name if self.user else 'Unknown'} – {self.location.name if self.location else 'Unknown'}",
         }
+
+
+def assignment_slot_fields(week_start_date, time_slot):
+    """(time slot dict, start, end) of an assignment to ``time_slot`` in a week.
+
+    start/end are the calendar datetimes (ISO format) of the slot in that week.
+    """
+    if not time_slot or not week_start_date:
+        return (time_slot.to_dict() if time_slot else None), None, None
+
+    # Calculate the actual date (week_start + day_of_week offset)
+    event_date = datetime.combine(week_start_date, datetime.min.time()) + timedelta(
+        days=time_slot.day_of_week
+    )
+
+    # Combine date with time slot times
+    start_datetime = datetime.combine(event_date.date(), time_slot.start_time)
+    end_datetime = datetime.combine(event_date.date(), time_slot.end_time)
+    return time_slot.to_dict(), start_datetime.isoformat(), end_datetime.isoformat()
+
+
+# Archive tables: rows of weeks older than the archive horizon, moved out of the
+# hot tables by services/archive.py. Same columns and ids as the originals (no
+# unique constraints, since rows only ever arrive from a table that had them) and
+# the same to_dict, so week reads can return either transparently. They have no
+# foreign keys: deleting or regenerating slots, users or locations must never
+# delete history, so archived rows may refer to rows that no longer exist.
+
+
+class ArchivedShiftRequirement(db.Model):
+    __tablename__ = "shift_requirements_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    location_id = db.Column(db.Integer, nullable=False)
+    time_slot_id = db.Column(db.Integer, nullable=False)
+    week_start_date = db.Column(db.Date, nullable=False, index=True)
+    required_workers = db.Column(db.Integer, nullable=False)
+    created_by = db.Column(db.Integer, nullable=True)
+
+    to_dict = ShiftRequirement.to_dict
+
+
+class ArchivedUserAvailability(db.Model):
+    __tablename__ = "user_availability_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    location_id = db.Column(db.Integer)
+    time_slot_id = db.Column(db.Integer, nullable=False)
+    week_start_date = db.Column(db.Date, nullable=False, index=True)
+    preference_level = db.Column(db.Integer, default=1, nullable=False)
+
+    to_dict = UserAvailability.to_dict
+
+
+class ArchivedAvailabilityException(db.Model):
+    __tablename__ = "availability_exceptions_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    location_id = db.Column(db.Integer)
+    time_slot_id = db.Column(db.Integer, nullable=False)
+    week_start_date = db.Column(db.Date, nullable=False, index=True)
+    preference_level = db.Column(db.Integer, nullable=False)
+
+
+class ArchivedAvailabilityBitmap(db.Model):
+    __tablename__ = "availability_bitmaps_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    week_start_date = db.Column(db.Date, nullable=False, index=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+
+class ArchivedAssignment(db.Model):
+    __tablename__ = "assignments_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    location_id = db.Column(db.Integer, nullable=False)
+    time_slot_id = db.Column(db.Integer, nullable=False)
+    week_start_date = db.Column(db.Date, nullable=False, index=True)
+    assigned_by = db.Column(db.Integer, nullable=True)
+
+    user = db.relationship(
+        "User", primaryjoin="foreign(ArchivedAssignment.user_id) == User.id", viewonly=True
+    )
+    location = db.relationship(
+        "Location",
+        primaryjoin="foreign(ArchivedAssignment.location_id) == Location.id",
+        viewonly=True,
+    )
+    time_slot = db.relationship(
+        "TimeSlot",
+        primaryjoin="foreign(ArchivedAssignment.time_slot_id) == TimeSlot.id",
+        viewonly=True,
+    )
+
+    to_dict = Assignment.to_dict
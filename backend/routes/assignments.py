@@ -3,14 +3,44 @@ from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
 
 from database import db
-from models import Assignment, GlobalSettings, Location, TimeSlot, User, UserAvailability
+from models import (
+    Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
+    AvailabilityTemplate,
+    DaySchedule,
+    GlobalSettings,
+    Location,
+    ShiftRequirement,
+    TimeSlot,
+    User,
+    UserAvailability,
+    WeeklyScheduleOverride,
+)
 from routes.auth import get_current_user
+from routes.http_cache import conditional
+from services import live_updates, serializers
+from services.archive import ARCHIVED_WEEK, is_archived, week_rows
+from services.assignment_batch import OperationError, apply_operations
+from services.availability import get_week_availability
+from services.candidates import week_candidates
+from services.capacity import get_week_capacity
+from services.reference_data import get_reference_data
 from services.scheduler import run_auto_scheduler
 
 bp = Blueprint("assignments", __name__, url_prefix="/api/assignments")
 
 
 @bp.route("", methods=["GET"])
+@conditional(
+    Assignment,
+    User,
+    Location,
+    TimeSlot,
+    week_scoped=(Assignment,),
+    coalesce=True,
+    shared_by_admins=True,
+)
 def get_assignments():
     user = get_current_user(request)
     if not user:
@@ -22,22 +52,25 @@ def get_assignments():
 
     week_start_date = datetime.fromisoformat(week_start).date()
 
-    query = Assignment.query.filter_by(week_start_date=week_start_date)
+    filters = {}
 
     # If user is not admin, only show their assignments
     if user.role != "admin":
-        query = query.filter_by(user_id=user.id)
+        filters["user_id"] = user.id
     else:
         # Admin can filter by user_id or location_id
         user_id = request.args.get("user_id")
         location_id = request.args.get("location_id")
         if user_id:
-            query = query.filter_by(user_id=user_id)
+            filters["user_id"] = user_id
         if location_id:
-            query = query.filter_by(location_id=location_id)
+            filters["location_id"] = location_id
 
-    assignments = query.all()
-    return jsonify([a.to_dict() for a in assignments])
+    # Past weeks may have been moved to the archive
+    assignments = week_rows(
+        Assignment, week_start_date, query=serializers.assignments.query, **filters
+    )
+    return jsonify(serializers.assignments.dump(assignments))
 
 
 @bp.route("", methods=["POST"])
@@ -56,45 +89,15 @@ def create_assignment():
             return jsonify({"error": f"{field} is required"}), 400
 
     week_start_date = datetime.fromisoformat(data.get("week_start_date")).date()
+    if is_archived(week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
 
-    # Validate max workers per shift
-    settings = GlobalSettings.query.first()
-    max_workers = settings.max_workers_per_shift if settings else 3
-
-    current_count = Assignment.query.filter(
-        Assignment.location_id == data["location_id"],
-        Assignment.time_slot_id == data["time_slot_id"],
-        Assignment.week_start_date == week_start_date,
-    ).count()
-
-    if current_count >= max_workers:
-        return (
-            jsonify(
-                {
-                    "error": "OVER_MAX_WORKERS",
-                    "message": f"Maximum {max_workers} workers already scheduled in that slot",
-                }
-            ),
-            400,
-        )
-
-    # Check for overlapping shifts for the user
-    overlapping = Assignment.query.filter(
-        Assignment.user_id == data["user_id"],
-        Assignment.week_start_date == week_start_date,
-        Assignment.time_slot_id == data["time_slot_id"],
-    ).first()
-
-    if overlapping:
-        return (
-            jsonify(
-                {
-                    "error": "OVERLAP_FOR_USER",
-                    "message": "This worker is already scheduled at that time",
-                }
-            ),
-            400,
-        )
+    # Validate capacity (honors shift requirement overrides) and overlapping shifts
+    problem = get_week_capacity(week_start_date).check(
+        data["user_id"], data["location_id"], data["time_slot_id"]
+    )
+    if problem:
+        return jsonify(problem), 400
 
     # Create assignment
     assignment = Assignment(
@@ -125,9 +128,12 @@ def run_scheduler():
         week_start_date = datetime.fromisoformat(data.get("week_start_date")).date()
     except (ValueError, TypeError) as e:  # pragma: no cover
         return jsonify({"error": f"Invalid week_start_date format: {str(e)}"}), 400
+    if is_archived(week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
 
     try:
         result = run_auto_scheduler(week_start_date)
+        live_updates.scheduler_finished(week_start_date, result["scheduled"])
         return jsonify(result)
     except Exception as e:  # pragma: no cover
         import traceback
@@ -136,6 +142,21 @@ def run_scheduler():
         return jsonify({"error": f"Scheduler failed: {str(e)}"}), 500
 
 
+@bp.route("/bulk", methods=["POST"])
+def bulk_assignments():
+    """Apply a list of create/update/move/delete/clear_week operations, all or nothing"""
+    user = get_current_user(request)
+    if not user or user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json() or {}
+    try:
+        result = apply_operations(data.get("operations"), user.id)
+    except OperationError as e:
+        return jsonify(e.payload), e.status
+    return jsonify(result)
+
+
 @bp.route("/<int:assignment_id>", methods=["PUT"])
 def update_assignment(assignment_id):
     user = get_current_user(request)
@@ -143,8 +164,12 @@ def update_assignment(assignment_id):
         return jsonify({"error": "Forbidden"}), 403
 
     assignment = Assignment.query.get_or_404(assignment_id)
+    if is_archived(assignment.week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
     data = request.get_json()
 
+    current = (assignment.user_id, assignment.location_id, assignment.time_slot_id)
+
     # Update assigned user
     if "user_id" in data:
         assignment.user_id = data["user_id"]
@@ -156,54 +181,23 @@ def update_assignment(assignment_id):
         new_time_slot_id = data.get("time_slot_id", assignment.time_slot_id)
 
         # Validate location and time slot exist
-        new_location = Location.query.get(new_location_id)
-        new_time_slot = TimeSlot.query.get(new_time_slot_id)
-        if not new_location or not new_time_slot:
+        reference = get_reference_data()
+        if (
+            int(new_location_id) not in reference.locations
+            or int(new_time_slot_id) not in reference.time_slots
+        ):
             return jsonify({"error": "Location or time slot not found"}), 404
 
-        # Validate overlapping shift for the same user (exclude current assignment)
-        overlapping = Assignment.query.filter(
-            Assignment.user_id == assignment.user_id,
-            Assignment.id != assignment.id,
-            Assignment.week_start_date == assignment.week_start_date,
-            Assignment.time_slot_id == new_time_slot_id,
-        ).first()
-        if overlapping:
-            return (
-                jsonify(
-                    {
-                        "error": "OVERLAP_FOR_USER",
-                        "message": "This worker is already scheduled at that time",
-                    }
-                ),
-                400,
-            )
-
-        # Validate max workers per shift (exclude current assignment)
-        settings = GlobalSettings.query.first()
-        max_workers = settings.max_workers_per_shift if settings else 3
-        current_count = Assignment.query.filter(
-            Assignment.location_id == new_location_id,
-            Assignment.time_slot_id == new_time_slot_id,
-            Assignment.week_start_date == assignment.week_start_date,
-            Assignment.id != assignment.id,
-        ).count()
-
-        if current_count >= max_workers:
-            return (
-                jsonify(
-                    {
-                        "error": "OVER_MAX_WORKERS",
-                        "message": f"Maximum {max_workers} workers already scheduled in that slot",
-                    }
-                ),
-                400,
-            )
+        # Validate overlap and capacity, excluding the assignment's current placement
+        problem = get_week_capacity(assignment.week_start_date).check(
+            assignment.user_id, new_location_id, new_time_slot_id, current=current
+        )
+        if problem:
+            return jsonify(problem), 400
 
+        # Relationships reload from the new ids after the commit
         assignment.location_id = new_location_id
-        assignment.location = new_location  # keep relationship in sync
         assignment.time_slot_id = new_time_slot_id
-        assignment.time_slot = new_time_slot  # keep relationship in sync
         assignment.assigned_by = user.id
 
     db.session.commit()
@@ -214,7 +208,8 @@ def update_assignment(assignment_id):
 def move_assignment(assignment_id):
     """
     Move an assignment to a new time slot/location with validation.
-    Validates max workers per shift and no overlapping shifts for the user.
+    Validates slot capacity (shift requirement override or max workers per shift)
+    and no overlapping shifts for the user.
     """
     user = get_current_user(request)
     if not user or user.role != "admin":
@@ -240,78 +235,44 @@ def move_assignment(assignment_id):
         return jsonify({"error": "Invalid datetime format"}), 400
 
     # Find the time slot that matches the new datetime
+    reference = get_reference_data()
     if new_time_slot_id:
-        new_time_slot = TimeSlot.query.get(new_time_slot_id)
-        if not new_time_slot:
+        if int(new_time_slot_id) not in reference.time_slots:
             return jsonify({"error": "Time slot not found"}), 404
     else:
         # Try to find matching time slot from datetime
         day_of_week = new_start.weekday()  # 0 = Monday
-        new_time_slot = TimeSlot.query.filter_by(
-            day_of_week=day_of_week, start_time=new_start.time(), end_time=new_end.time()
-        ).first()
+        new_time_slot = reference.slot_by_time.get((day_of_week, new_start.time(), new_end.time()))
 
         if not new_time_slot:  # pragma: no branch
             # Find closest matching time slot by day and time range
-            new_time_slot = TimeSlot.query.filter_by(day_of_week=day_of_week).first()
+            new_time_slot = reference.first_slot_of_day(day_of_week)
             if not new_time_slot:  # pragma: no cover
                 return jsonify({"error": "No matching time slot found"}), 404
-            new_time_slot_id = new_time_slot.id
+        new_time_slot_id = new_time_slot.id
 
     # Validate the new location exists
-    new_location = Location.query.get(new_location_id)
-    if not new_location:
+    if int(new_location_id) not in reference.locations:
         return jsonify({"error": "Location not found"}), 404
 
     # Calculate new week_start_date (Monday of the week containing new_start)
     new_week_start = new_start.date() - timedelta(days=new_start.weekday())
+    if is_archived(assignment.week_start_date, new_week_start):
+        return jsonify(ARCHIVED_WEEK), 409
+
+    # Validate overlap and capacity in the target week (excluding the assignment itself)
+    current = None
+    if assignment.week_start_date == new_week_start:
+        current = (assignment.user_id, assignment.location_id, assignment.time_slot_id)
+    problem = get_week_capacity(new_week_start).check(
+        assignment.user_id, new_location_id, new_time_slot_id, current=current
+    )
+    if problem:
+        return jsonify(problem), 400
 
-    # Validate: Check for overlapping shifts for this user (excluding current assignment)
-    overlapping = Assignment.query.filter(
-        Assignment.user_id == assignment.user_id,
-        Assignment.id != assignment.id,
-        Assignment.week_start_date == new_week_start,
-        Assignment.time_slot_id == new_time_slot_id,
-    ).first()
-
-    if overlapping:
-        return (
-            jsonify(
-                {
-                    "error": "OVERLAP_FOR_USER",
-                    "message": "This worker is already scheduled at that time",
-                }
-            ),
-            400,
-        )
-
-    # Validate: Check max workers per shift
-    settings = GlobalSettings.query.first()
-    max_workers = settings.max_workers_per_shift if settings else 3
-
-    current_count = Assignment.query.filter(
-        Assignment.location_id == new_location_id,
-        Assignment.time_slot_id == new_time_slot_id,
-        Assignment.week_start_date == new_week_start,
-        Assignment.id != assignment.id,  # Exclude current assignment
-    ).count()
-
-    if current_count >= max_workers:
-        return (
-            jsonify(
-                {
-                    "error": "OVER_MAX_WORKERS",
-                    "message": f"Maximum {max_workers} workers already scheduled in that slot",
-                }
-            ),
-            400,
-        )
-
-    # Update assignment
+    # Update assignment (relationships reload from the new ids after the commit)
     assignment.time_slot_id = new_time_slot_id
-    assignment.time_slot = new_time_slot  # keep relationship in sync
     assignment.location_id = new_location_id
-    assignment.location = new_location  # keep relationship in sync
     assignment.week_start_date = new_week_start
     assignment.assigned_by = user.id
 
@@ -326,12 +287,72 @@ def delete_assignment(assignment_id):
         return jsonify({"error": "Forbidden"}), 403
 
     assignment = Assignment.query.get_or_404(assignment_id)
+    if is_archived(assignment.week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
     db.session.delete(assignment)
     db.session.commit()
     return jsonify({"message": "Assignment deleted"})
 
 
+@bp.route("/available-workers/week", methods=["GET"])
+@conditional(
+    UserAvailability,
+    AvailabilityException,
+    AvailabilityBitmap,
+    AvailabilityTemplate,
+    TimeSlot,
+    DaySchedule,
+    WeeklyScheduleOverride,
+    Assignment,
+    ShiftRequirement,
+    Location,
+    GlobalSettings,
+    User,
+    week_scoped=(
+        UserAvailability,
+        AvailabilityException,
+        AvailabilityBitmap,
+        WeeklyScheduleOverride,
+        Assignment,
+        ShiftRequirement,
+    ),
+)
+def get_week_available_workers():
+    """Eligible workers of every shift in a week (or of the requested locations/slots)"""
+    user = get_current_user(request)
+    if not user or user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    week_start = request.args.get("week_start")
+    if not week_start:
+        return jsonify({"error": "week_start is required"}), 400
+
+    week_start_date = datetime.fromisoformat(week_start).date()
+    location_ids = request.args.getlist("location_id", type=int) or None
+    time_slot_ids = request.args.getlist("time_slot_id", type=int) or None
+
+    return jsonify(week_candidates(week_start_date, location_ids, time_slot_ids))
+
+
 @bp.route("/available-workers", methods=["GET"])
+@conditional(
+    UserAvailability,
+    AvailabilityException,
+    AvailabilityBitmap,
+    AvailabilityTemplate,
+    TimeSlot,
+    DaySchedule,
+    WeeklyScheduleOverride,
+    Assignment,
+    User,
+    week_scoped=(
+        UserAvailability,
+        AvailabilityException,
+        AvailabilityBitmap,
+        WeeklyScheduleOverride,
+        Assignment,
+    ),
+)
 def get_available_workers():
     """Get workers available for a specific location, time slot, and week"""
     user = get_current_user(request)
@@ -347,18 +368,15 @@ def get_available_workers():
 
     week_start_date = datetime.fromisoformat(week_start).date()
 
-    # Get users who marked themselves as available
-    availabilities = UserAvailability.query.filter_by(
-        location_id=location_id, time_slot_id=time_slot_id, week_start_date=week_start_date
-    ).all()
+    # Get users who marked themselves as available (including standing templates)
+    available = get_week_availability(week_start_date).for_slot(location_id, time_slot_id)
 
     # Get the time slot to check for overlaps
-    time_slot = TimeSlot.query.get(time_slot_id)
-    if not time_slot:
+    if int(time_slot_id) not in get_reference_data().time_slots:
         return jsonify({"error": "Time slot not found"}), 404
 
     # Filter out users who already have overlapping assignments
-    available_user_ids = [av.user_id for av in availabilities]
+    available_user_ids = list(available)
     overlapping_assignments = Assignment.query.filter(
         Assignment.week_start_date == week_start_date,
         Assignment.user_id.in_(available_user_ids),
@@ -1,13 +1,13 @@
 import os
-import secrets
 
 from flask import Blueprint, jsonify, redirect, request, session
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
+from google.auth import exceptions as google_exceptions
 from google_auth_oauthlib.flow import Flow
+from sqlalchemy.orm import make_transient_to_detached
 
 from database import db
 from models import User
+from services import google_tokens, identity_cache, session_tokens
 
 # Allow HTTP for local development (required for OAuth on localhost)
 os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
@@ -23,8 +23,8 @@ GOOGLE_REDIRECT_URI = os.environ.get(
 FRONTEND_ORIGIN = os.environ.get("FRONTEND_ORIGIN", "http://localhost:5173")
 ALLOW_TEST_TOKENS = os.environ.get("ALLOW_TEST_TOKENS", "true").lower() == "true"
 
-# Simple in-memory token storage for app-issued tokens
-app_tokens = {}  # token -> user_id
+# Where get_current_user keeps its answer for the rest of the request
+_REQUEST_USER_KEY = "mulescheduler.current_user"
 
 
 def _google_flow(state: str | None = None) -> Flow:  # pragma: no cover
@@ -53,10 +53,8 @@ def _google_flow(state: str | None = None) -> Flow:  # pragma: no cover
 def verify_google_token(token: str):
     """Verify a Google ID token and return claims."""
     try:
-        return id_token.verify_oauth2_token(token, google_requests.Request(), GOOGLE_CLIENT_ID)
-    except (
-        Exception
-    ):  # pragma: no cover - external verification failures are not deterministic in tests
+        return google_tokens.verify(token, GOOGLE_CLIENT_ID)
+    except google_exceptions.TransportError:  # Google's certificates are unavailable
         return None
 
 
@@ -138,8 +136,7 @@ def google_callback():
             return redirect(f"{FRONTEND_ORIGIN}/login?error=colby_email_required")
 
         # Issue app token and redirect to frontend with token
-        app_token = secrets.token_urlsafe(32)
-        app_tokens[app_token] = user.id
+        app_token = session_tokens.issue(user)
 
         # Clear the OAuth state from session
         session.pop("oauth_state", None)
@@ -159,42 +156,69 @@ def me():
     if not token:
         return jsonify({"error": "Unauthorized"}), 401
 
-    # First, check app-issued tokens
-    user_id = app_tokens.get(token)
-    if user_id:
-        user = User.query.get(user_id)
-        if user:  # pragma: no branch
-            return jsonify(user.to_dict())
-
-    # Fallback: accept raw Google ID token (rarely used in practice)
-    claims = verify_google_token(token)  # pragma: no cover
-    if not claims:  # pragma: no cover
+    # App-issued token or raw Google ID token, resolved once and cached
+    user = get_current_user(request)
+    if not user:
         return jsonify({"error": "Invalid token"}), 401
 
-    user = ensure_user_from_claims(claims)  # pragma: no cover
-    if not user:  # pragma: no cover
-        return jsonify({"error": "Unauthorized: Must use @colby.edu email"}), 403
+    return jsonify(user.to_dict())
 
-    return jsonify(user.to_dict())  # pragma: no cover
 
+@bp.route("/logout", methods=["POST"])
+def logout():
+    """Revoke the app token used for this request."""
+    token = request.headers.get("Authorization", "").replace("Bearer ", "")
+    if not token or not session_tokens.revoke(token):
+        return jsonify({"error": "Unauthorized"}), 401
 
-def get_current_user(request):
-    """Helper to resolve current user for protected routes."""
+    return jsonify({"message": "Logged out"})
+
+
+def _cached_user(user_id):
+    """The user with ``user_id``, from the identity cache when possible (no query)."""
+    values = identity_cache.get_user_values(user_id)
+    if values is None:
+        user = db.session.get(User, user_id)
+        if user:
+            identity_cache.remember_user(user)
+        return user
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    # Attach without a SELECT; changes made by the route are flushed as usual
+    return db.session.merge(user, load=False)
+
+
+def _resolve_user(request):
     token = request.headers.get("Authorization", "").replace("Bearer ", "")
     if not token:
         return None
 
-    # Check app tokens
-    user_id = app_tokens.get(token)
+    # Check app tokens, then Google ID tokens that were verified recently
+    claims = session_tokens.verify(token)
+    user_id = claims["uid"] if claims else identity_cache.google_token_user_id(token)
     if user_id:
-        return User.query.get(user_id)
+        return _cached_user(user_id)
 
     # Check Google ID token directly (rarely used - app tokens are primary)
-    claims = verify_google_token(token)  # pragma: no cover
-    if not claims:  # pragma: no cover
+    claims = verify_google_token(token)
+    if not claims:
         return None
 
-    return ensure_user_from_claims(claims)  # pragma: no cover
+    user = ensure_user_from_claims(claims)
+    if user:
+        identity_cache.remember_google_token(token, user.id)
+    return user
+
+
+def get_current_user(request):
+    """Helper to resolve current user for protected routes.
+
+    The answer is kept on the request, so repeated calls within one request are free.
+    """
+    if _REQUEST_USER_KEY not in request.environ:
+        request.environ[_REQUEST_USER_KEY] = _resolve_user(request)
+    return request.environ[_REQUEST_USER_KEY]
 
 
 @bp.route("/test-token", methods=["POST"])
@@ -215,6 +239,5 @@ def test_token():
     if not user:
         return jsonify({"error": "Unauthorized: Must use @colby.edu email"}), 403
 
-    token = secrets.token_urlsafe(32)
-    app_tokens[token] = user.id
+    token = session_tokens.issue(user)
     return jsonify({"token": token, "user": user.to_dict()})
@@ -3,27 +3,60 @@ from datetime import datetime
 from flask import Blueprint, jsonify, request
 
 from database import db
-from models import UserAvailability
+from models import (
+    AvailabilityBitmap,
+    AvailabilityException,
+    AvailabilityTemplate,
+    DaySchedule,
+    TimeSlot,
+    UserAvailability,
+    WeeklyScheduleOverride,
+)
 from routes.auth import get_current_user
+from routes.http_cache import conditional
+from services import serializers
+from services.archive import ARCHIVED_WEEK, is_archived
+from services.availability import (
+    copy_week_availability,
+    get_week_availability,
+    replace_template,
+    replace_week_availability,
+)
 
 bp = Blueprint("availability", __name__, url_prefix="/api/availability")
 
 
 @bp.route("", methods=["GET"])
+@conditional(
+    UserAvailability,
+    AvailabilityException,
+    AvailabilityBitmap,
+    AvailabilityTemplate,
+    TimeSlot,
+    DaySchedule,
+    WeeklyScheduleOverride,
+    week_scoped=(
+        UserAvailability,
+        AvailabilityException,
+        AvailabilityBitmap,
+        WeeklyScheduleOverride,
+    ),
+)
 def get_availability():
     user = get_current_user(request)
     if not user:
         return jsonify({"error": "Unauthorized"}), 401
 
     week_start = request.args.get("week_start")
-    query = UserAvailability.query.filter_by(user_id=user.id)
-
     if week_start:
+        # Effective entries for the week: template, exceptions and explicit rows
         week_start_date = datetime.fromisoformat(week_start).date()
-        query = query.filter_by(week_start_date=week_start_date)
+        return jsonify(get_week_availability(week_start_date).for_user(user.id))
 
-    availabilities = query.all()
-    return jsonify([av.to_dict() for av in availabilities])
+    availabilities = (
+        serializers.availability.query(UserAvailability).filter_by(user_id=user.id).all()
+    )
+    return jsonify(serializers.availability.dump(availabilities))
 
 
 @bp.route("", methods=["POST"])
@@ -34,6 +67,8 @@ def create_availability():
 
     data = request.get_json()
     week_start_date = datetime.fromisoformat(data.get("week_start_date")).date()
+    if is_archived(week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
 
     # Check if availability already exists
     existing = UserAvailability.query.filter_by(
@@ -60,6 +95,107 @@ def create_availability():
     return jsonify(availability.to_dict()), 201
 
 
+@bp.route("", methods=["PUT"])
+def replace_availability():
+    """Replace the user's whole availability for a week (missing cells are removed)"""
+    user = get_current_user(request)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json() or {}
+    if not data.get("week_start_date"):
+        return jsonify({"error": "week_start_date is required"}), 400
+    week_start_date = datetime.fromisoformat(data["week_start_date"]).date()
+    if is_archived(week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
+
+    try:
+        counts = replace_week_availability(user.id, week_start_date, data.get("entries", []))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    db.session.commit()
+    return jsonify({"week_start_date": week_start_date.isoformat(), **counts})
+
+
+@bp.route("/template", methods=["GET"])
+@conditional(AvailabilityTemplate)
+def get_availability_template():
+    user = get_current_user(request)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    templates = (
+        serializers.availability.query(AvailabilityTemplate)
+        .filter_by(user_id=user.id)
+        .order_by(
+            AvailabilityTemplate.location_id,
+            AvailabilityTemplate.day_of_week,
+            AvailabilityTemplate.start_time,
+        )
+        .all()
+    )
+    return jsonify(serializers.availability.dump(templates))
+
+
+@bp.route("/template", methods=["PUT"])
+def replace_availability_template():
+    """Replace the user's standing weekly availability.
+
+    Every week without its own changes uses the template; saving a week afterwards
+    stores only its differences from it.
+    """
+    user = get_current_user(request)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json() or {}
+    try:
+        counts = replace_template(user.id, data.get("entries", []))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    db.session.commit()
+    return jsonify(counts)
+
+
+@bp.route("/copy-forward", methods=["POST"])
+def copy_availability_forward():
+    """Copy a week's availability into another week (skipping cells already set).
+
+    Students copy their own; admins may pass user_id, or all_users to copy everyone's.
+    """
+    user = get_current_user(request)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json() or {}
+    if not data.get("source_week_start") or not data.get("target_week_start"):
+        return jsonify({"error": "source_week_start and target_week_start are required"}), 400
+    source_week = datetime.fromisoformat(data["source_week_start"]).date()
+    target_week = datetime.fromisoformat(data["target_week_start"]).date()
+    if source_week == target_week:
+        return jsonify({"error": "Source and target weeks must differ"}), 400
+    if is_archived(target_week):
+        return jsonify(ARCHIVED_WEEK), 409
+
+    target_user_id = user.id
+    if data.get("all_users") or data.get("user_id") is not None:
+        if user.role != "admin":
+            return jsonify({"error": "Forbidden"}), 403
+        target_user_id = None if data.get("all_users") else int(data["user_id"])
+
+    copied = copy_week_availability(source_week, target_week, target_user_id)
+    db.session.commit()
+    return jsonify(
+        {
+            "source_week_start": source_week.isoformat(),
+            "target_week_start": target_week.isoformat(),
+            "copied": copied,
+        }
+    )
+
+
 @bp.route("/batch", methods=["POST"])
 def create_availability_batch():
     """Create/update multiple availability entries at once"""
@@ -69,6 +205,8 @@ def create_availability_batch():
 
     data = request.get_json()
     week_start_date = datetime.fromisoformat(data.get("week_start_date")).date()
+    if is_archived(week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
     entries = data.get("entries", [])
 
     results = []
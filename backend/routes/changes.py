@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from routes.auth import get_current_user
+from services.change_log import changes_since, current_cursor
+
+bp = Blueprint("changes", __name__, url_prefix="/api/changes")
+
+
+@bp.route("", methods=["GET"])
+def get_changes():
+    """Assignment, availability and requirement changes in one week since a cursor.
+
+    Without ``since`` only the current cursor is returned: fetch it before
+    loading the week, then poll with it.
+    """
+    user = get_current_user(request)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    since = request.args.get("since")
+    if since is None:
+        return jsonify({"cursor": current_cursor()})
+
+    week_start = request.args.get("week_start")
+    if not week_start:
+        return jsonify({"error": "week_start parameter is required"}), 400
+    if not since.isdigit():
+        return jsonify({"error": "since must be a cursor returned by this endpoint"}), 400
+
+    week_start_date = datetime.fromisoformat(week_start).date()
+    return jsonify(changes_since(int(since), week_start_date, user))
@@ -0,0 +1,127 @@
+"""
+Conditional GET support for the API's read endpoints.
+
+``conditional`` derives a strong ETag from the data version counters the
+response depends on (services/data_versions.py), the URL and the viewer. The
+counters are read with one query before the view runs, and a request whose
+``If-None-Match`` still matches gets a 304 without the view's queries or
+serialization. Other requests look the body up in services/response_cache.py
+under the same ETag, so a response is queried and serialized once per change
+to its data rather than once per request. Expensive views also coalesce
+concurrent identical requests (services/single_flight.py), so a burst of them
+right after a change still renders the response only once.
+
+Only signed-in requests are revalidated; anonymous ones go straight to the view,
+which rejects them. The ETag is keyed with SECRET_KEY, so it cannot be computed
+offline: a viewer only holds ETags from 200 responses it was given, and a view's
+own role check has already run for every ETag that can match.
+
+The ETag is computed before the view reads anything. So if a write lands in
+between, the client holds (and the cache stores) data newer than its ETag, and
+the next request simply refetches.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from routes.auth import get_current_user
+from services import data_versions, response_cache
+from services.single_flight import SingleFlight
+
+_in_flight = SingleFlight()
+
+
+def _week_start_date():
+    week_start = request.args.get("week_start")
+    return datetime.fromisoformat(week_start).date() if week_start else None
+
+
+def _etag(keys, user, shared_by_admins=False) -> str:
+    if shared_by_admins and user.role == "admin":
+        viewer = ("admin",)
+    else:
+        viewer = (user.id, user.role)
+    counters = data_versions.versions(keys)
+    state = repr(
+        (request.path, sorted(request.args.items(multi=True)), viewer, sorted(counters.items()))
+    )
+    key = hashlib.blake2b(current_app.config["SECRET_KEY"].encode()).digest()
+    return hashlib.blake2b(state.encode(), digest_size=12, key=key).hexdigest()
+
+
+def _render(view, args, kwargs, etag):
+    response = make_response(view(*args, **kwargs))
+    if response.status_code == 200:
+        response_cache.put(etag, response.get_data(), response.mimetype)
+    return response
+
+
+def _render_once(view, args, kwargs, etag):
+    """``_render``, run once for concurrent requests with the same ETag."""
+    own = []
+
+    def compute():
+        own.append(_render(view, args, kwargs, etag))
+        return own[0]
+
+    response = _in_flight.do(etag, compute)
+    if own:
+        return response
+    if response.status_code != 200:
+        # Only successful bodies are shared; anything else is rendered per request
+        return _render(view, args, kwargs, etag)
+    return current_app.response_class(response.get_data(), mimetype=response.mimetype)
+
+
+def conditional(*models, week_scoped=(), coalesce=False, shared_by_admins=False):
+    """Give a GET view an ETag and answer ``If-None-Match`` with 304 when it matches.
+
+    ``models`` are the tables the response is read from. Those also listed in
+    ``week_scoped`` only count writes to the requested ``week_start``, when the
+    request names one.
+
+    ``coalesce`` makes concurrent requests with the same ETag wait for one run
+    of the view and share its body; use it for expensive views. Views whose
+    response is the same for every admin pass ``shared_by_admins`` so admins
+    share ETags, cache entries and in-flight renders.
+    """
+    tables = [model.__tablename__ for model in models]
+    week_tables = {model.__tablename__ for model in week_scoped}
+    render = _render_once if coalesce else _render
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user = get_current_user(request)
+            if user is None:
+                return view(*args, **kwargs)
+            try:
+                week_start_date = _week_start_date()
+            except ValueError:
+                return view(*args, **kwargs)
+
+            etag = _etag(
+                data_versions.read_keys(tables, week_tables, week_start_date),
+                user,
+                shared_by_admins,
+            )
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            elif (cached := response_cache.get(etag)) is not None:
+                body, mimetype = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+            else:
+                response = render(view, args, kwargs, etag)
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # Authenticated data: browsers may keep it, but must revalidate before use
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
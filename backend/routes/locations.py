@@ -3,13 +3,16 @@ from flask import Blueprint, jsonify, request
 from database import db
 from models import Location
 from routes.auth import get_current_user
+from routes.http_cache import conditional
+from services.reference_data import get_reference_data
 
 bp = Blueprint("locations", __name__, url_prefix="/api/locations")
 
 
 @bp.route("", methods=["GET"])
+@conditional(Location)
 def get_locations():
-    locations = Location.query.filter_by(is_active=True).all()
+    locations = get_reference_data().active_locations()
     return jsonify([loc.to_dict() for loc in locations])
 
 
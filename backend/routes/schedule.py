@@ -0,0 +1,138 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from database import db
+from models import (
+    Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
+    AvailabilityTemplate,
+    DaySchedule,
+    GlobalSettings,
+    Location,
+    ShiftRequirement,
+    TimeSlot,
+    User,
+    UserAvailability,
+    WeeklyScheduleOverride,
+)
+from routes.auth import get_current_user
+from routes.http_cache import conditional
+from services import live_updates, pubsub
+from services.coverage import get_week_coverage
+from services.week_schedule import build_week_schedule
+
+bp = Blueprint("schedule", __name__, url_prefix="/api/schedule")
+
+
+@bp.route("/week", methods=["GET"])
+@conditional(
+    Assignment,
+    User,
+    Location,
+    TimeSlot,
+    DaySchedule,
+    WeeklyScheduleOverride,
+    week_scoped=(Assignment, WeeklyScheduleOverride),
+    coalesce=True,
+    shared_by_admins=True,
+)
+def get_schedule_week():
+    """Everything a schedule page shows for one week, in a single normalized payload."""
+    user = get_current_user(request)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    week_start = request.args.get("week_start")
+    if not week_start:
+        return jsonify({"error": "week_start parameter is required"}), 400
+
+    week_start_date = datetime.fromisoformat(week_start).date()
+    payload = build_week_schedule(
+        week_start_date,
+        user,
+        user_id=request.args.get("user_id", type=int),
+        location_id=request.args.get("location_id", type=int),
+    )
+    return jsonify(payload)
+
+
+@bp.route("/week/coverage", methods=["GET"])
+@conditional(
+    UserAvailability,
+    AvailabilityException,
+    AvailabilityBitmap,
+    AvailabilityTemplate,
+    Assignment,
+    ShiftRequirement,
+    GlobalSettings,
+    Location,
+    TimeSlot,
+    DaySchedule,
+    WeeklyScheduleOverride,
+    week_scoped=(
+        UserAvailability,
+        AvailabilityException,
+        AvailabilityBitmap,
+        Assignment,
+        ShiftRequirement,
+        WeeklyScheduleOverride,
+    ),
+)
+def get_week_coverage_heatmap():
+    """Available, preferred and assigned counts, capacity and gap of every shift in a week."""
+    user = get_current_user(request)
+    if not user or user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    week_start = request.args.get("week_start")
+    if not week_start:
+        return jsonify({"error": "week_start parameter is required"}), 400
+
+    return jsonify(list(get_week_coverage(datetime.fromisoformat(week_start).date())))
+
+
+@bp.route("/week/events", methods=["GET"])
+def stream_week_events():
+    """Server-sent events for one week as they happen (services/live_updates.py)."""
+    user = get_current_user(request)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    week_start = request.args.get("week_start")
+    if not week_start:
+        return jsonify({"error": "week_start parameter is required"}), 400
+    week_start_date = datetime.fromisoformat(week_start).date()
+
+    if not live_updates.open_stream(current_app.config["LIVE_UPDATES_MAX_STREAMS"]):
+        response = jsonify({"error": "Too many live update streams, poll the week instead"})
+        # Clients reload the week and try the stream again after this many seconds
+        response.headers["Retry-After"] = "30"
+        return response, 503
+
+    # Plain values: the user row is detached once the session closes
+    viewer = SimpleNamespace(id=user.id, role=user.role)
+    subscription = pubsub.subscribe(live_updates.channel(week_start_date), live_updates.ALL_WEEKS)
+    keepalive = current_app.config["LIVE_UPDATES_KEEPALIVE_SECONDS"]
+    # The stream stays open for as long as the page does: don't hold a connection meanwhile
+    db.session.close()
+
+    def stream():
+        yield "retry: 5000\n\n"
+        while True:
+            event = subscription.get(timeout=keepalive)
+            if event is None:
+                yield ": keepalive\n\n"
+            elif live_updates.visible_to(event, viewer):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    response = Response(stream(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Tell proxies such as nginx not to buffer the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    response.call_on_close(subscription.close)
+    response.call_on_close(live_updates.close_stream)
+    return response
@@ -1,19 +1,25 @@
+from datetime import datetime
+
 from flask import Blueprint, jsonify, request
 
 from database import db
 from models import GlobalSettings
 from routes.auth import get_current_user
+from routes.http_cache import conditional
+from services.archive import archive_cutoff, archive_old_weeks
+from services.reference_data import get_reference_data
 
 bp = Blueprint("settings", __name__, url_prefix="/api/settings")
 
 
 @bp.route("", methods=["GET"])
+@conditional(GlobalSettings)
 def get_settings():
     user = get_current_user(request)
     if not user or user.role != "admin":
         return jsonify({"error": "Forbidden"}), 403
 
-    settings = GlobalSettings.query.first()
+    settings = get_reference_data().settings
     if not settings:
         settings = GlobalSettings(max_workers_per_shift=3, max_hours_per_user_per_week=None)
         db.session.add(settings)
@@ -41,3 +47,23 @@ def update_settings():
 
     db.session.commit()
     return jsonify(settings.to_dict())
+
+
+@bp.route("/archive", methods=["POST"])
+def archive_past_weeks():
+    """Move weeks older than the archive horizon out of the hot tables.
+
+    Optional body: {"before": "YYYY-MM-DD"} to archive every week before that date.
+    Dates past the horizon are capped to it, since later weeks are still writable.
+    """
+    user = get_current_user(request)
+    if not user or user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json(silent=True) or {}
+    before = archive_cutoff()
+    if data.get("before"):
+        before = min(datetime.fromisoformat(data["before"]).date(), before)
+
+    counts = archive_old_weeks(before)
+    return jsonify({"before": before.isoformat(), "moved": counts})
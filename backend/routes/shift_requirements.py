@@ -5,20 +5,26 @@ from flask import Blueprint, jsonify, request
 from database import db
 from models import ShiftRequirement
 from routes.auth import get_current_user
+from routes.http_cache import conditional
+from services import serializers
+from services.archive import ARCHIVED_WEEK, is_archived, week_rows
 
 bp = Blueprint("shift_requirements", __name__, url_prefix="/api/shift-requirements")
 
 
 @bp.route("", methods=["GET"])
+@conditional(ShiftRequirement, week_scoped=(ShiftRequirement,))
 def get_shift_requirements():
     week_start = request.args.get("week_start")
     if week_start:
         week_start_date = datetime.fromisoformat(week_start).date()
-        requirements = ShiftRequirement.query.filter_by(week_start_date=week_start_date).all()
+        requirements = week_rows(
+            ShiftRequirement, week_start_date, query=serializers.shift_requirements.query
+        )
     else:
-        requirements = ShiftRequirement.query.all()
+        requirements = serializers.shift_requirements.query(ShiftRequirement).all()
 
-    return jsonify([req.to_dict() for req in requirements])
+    return jsonify(serializers.shift_requirements.dump(requirements))
 
 
 @bp.route("", methods=["POST"])
@@ -29,6 +35,8 @@ def create_shift_requirement():
 
     data = request.get_json()
     week_start_date = datetime.fromisoformat(data.get("week_start_date")).date()
+    if is_archived(week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
 
     # Check if requirement already exists
     existing = ShiftRequirement.query.filter_by(
@@ -63,6 +71,11 @@ def update_shift_requirement(req_id):
 
     requirement = ShiftRequirement.query.get_or_404(req_id)
     data = request.get_json()
+    weeks = [requirement.week_start_date]
+    if "week_start_date" in data:
+        weeks.append(datetime.fromisoformat(data["week_start_date"]).date())
+    if is_archived(*weeks):
+        return jsonify(ARCHIVED_WEEK), 409
 
     if "required_workers" in data:
         requirement.required_workers = data["required_workers"]
@@ -84,6 +97,8 @@ def delete_shift_requirement(req_id):
         return jsonify({"error": "Forbidden"}), 403
 
     requirement = ShiftRequirement.query.get_or_404(req_id)
+    if is_archived(requirement.week_start_date):
+        return jsonify(ARCHIVED_WEEK), 409
     db.session.delete(requirement)
     db.session.commit()
     return jsonify({"message": "Shift requirement deleted"})
@@ -1,18 +1,34 @@
 from datetime import datetime, time
 
 from flask import Blueprint, jsonify, request
+from sqlalchemy.exc import IntegrityError
 
 from database import db
-from models import DaySchedule, TimeSlot
+from models import DaySchedule, TimeSlot, WeeklyScheduleOverride
 from routes.auth import get_current_user
-from services.slot_generator import count_slots_for_day, generate_slots_for_day, preview_slots
+from routes.http_cache import conditional
+from services.bulk import delete_cascading
+from services.reference_data import get_reference_data
+from services.slot_compaction import compact_slots
+from services.slot_generator import (
+    count_slots_for_day,
+    generate_slots_for_days,
+    preview_slots,
+)
+from services.week_grid import get_week_grid
 
 bp = Blueprint("time_slots", __name__, url_prefix="/api/time-slots")
 
 
 @bp.route("", methods=["GET"])
+@conditional(TimeSlot, DaySchedule, WeeklyScheduleOverride, week_scoped=(WeeklyScheduleOverride,))
 def get_time_slots():
-    slots = TimeSlot.query.all()
+    week_start = request.args.get("week_start")
+    if week_start:
+        # Effective grid for that week (override or active template per day)
+        slots = get_week_grid(datetime.fromisoformat(week_start).date())
+    else:
+        slots = get_reference_data().time_slots.values()
     return jsonify([slot.to_dict() for slot in slots])
 
 
@@ -38,6 +54,13 @@ def create_time_slot():
         else time.fromisoformat(end_time_str + ":00")
     )
 
+    # Slots are unique per day/start/end; creating an existing one is a no-op
+    existing = TimeSlot.query.filter_by(
+        day_of_week=data.get("day_of_week"), start_time=start_time, end_time=end_time
+    ).first()
+    if existing:
+        return jsonify(existing.to_dict())
+
     time_slot = TimeSlot(
         day_of_week=data.get("day_of_week"), start_time=start_time, end_time=end_time
     )
@@ -72,7 +95,11 @@ def update_time_slot(slot_id):
             else time.fromisoformat(end_time_str + ":00")
         )
 
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "A time slot with that day and times already exists"}), 409
     return jsonify(time_slot.to_dict())
 
 
@@ -82,25 +109,44 @@ def delete_time_slot(slot_id):
     if not user or user.role != "admin":
         return jsonify({"error": "Forbidden"}), 403
 
-    time_slot = TimeSlot.query.get_or_404(slot_id)
-    db.session.delete(time_slot)
+    TimeSlot.query.get_or_404(slot_id)
+    # Availabilities, assignments and requirements on the slot go with it
+    delete_cascading(TimeSlot, TimeSlot.id == slot_id)
     db.session.commit()
     return jsonify({"message": "Time slot deleted"})
 
 
+@bp.route("/compact", methods=["POST"])
+def compact_time_slots():
+    """Delete slots no week uses any more (see services/slot_compaction.py)."""
+    user = get_current_user(request)
+    if not user or user.role != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    result = compact_slots()
+    return jsonify(
+        {
+            "message": f'Deleted {result["dead_slots_deleted"]} unused time slots',
+            **result,
+        }
+    )
+
+
 # ============================================================================
 # DAY SCHEDULE ENDPOINTS - Auto-generate time slots from day boundaries
 # ============================================================================
 
 
 @bp.route("/day-schedules", methods=["GET"])
+@conditional(DaySchedule, TimeSlot)
 def get_day_schedules():
     """Get all day schedules with slot counts."""
-    schedules = DaySchedule.query.order_by(DaySchedule.day_of_week).all()
+    reference = get_reference_data()
+    slot_counts = reference.slot_counts
     result = []
-    for schedule in schedules:
+    for schedule in reference.day_schedules:
         data = schedule.to_dict()
-        data["slot_count"] = count_slots_for_day(schedule.day_of_week)
+        data["slot_count"] = slot_counts.get(schedule.day_of_week, 0)
         data["day_name"] = schedule.get_day_name()
         result.append(data)
     return jsonify(result)
@@ -142,11 +188,11 @@ def create_day_schedule():
         existing.end_time = end_time
         existing.slot_duration_minutes = slot_duration
         existing.is_active = True
-        db.session.commit()
 
         # IMPORTANT: Do NOT delete existing TimeSlot rows.
-        # We only ensure that all needed slots exist for this day.
-        generate_slots_for_day(existing)
+        # We only ensure that all needed slots exist for this day (same transaction).
+        generate_slots_for_days([existing], commit=False)
+        db.session.commit()
         slot_count = count_slots_for_day(existing.day_of_week)
 
         response_data = existing.to_dict()
@@ -164,10 +210,10 @@ def create_day_schedule():
         is_active=True,
     )
     db.session.add(schedule)
-    db.session.commit()
 
-    # Generate time slots for this day (only adds missing ones)
-    generate_slots_for_day(schedule)
+    # Generate time slots for this day (only adds missing ones) in the same transaction
+    generate_slots_for_days([schedule], commit=False)
+    db.session.commit()
     slot_count = count_slots_for_day(schedule.day_of_week)
 
     response_data = schedule.to_dict()
@@ -197,15 +243,12 @@ def update_day_schedule(schedule_id):
     if "is_active" in data:
         schedule.is_active = data["is_active"]
 
-    db.session.commit()
-
     # For active schedules, make sure all slots exist without deleting old ones.
+    # When deactivated, we leave existing slots in place so past weeks stay intact.
     if schedule.is_active:
-        generate_slots_for_day(schedule)
-        slot_count = count_slots_for_day(schedule.day_of_week)
-    else:
-        # When deactivated, we leave existing slots in place so past weeks stay intact.
-        slot_count = count_slots_for_day(schedule.day_of_week)
+        generate_slots_for_days([schedule], commit=False)
+    db.session.commit()
+    slot_count = count_slots_for_day(schedule.day_of_week)
 
     response_data = schedule.to_dict()
     response_data["slot_count"] = slot_count
@@ -7,6 +7,8 @@ from werkzeug.utils import secure_filename
 from database import db
 from models import User
 from routes.auth import get_current_user
+from routes.http_cache import conditional
+from services import serializers
 
 bp = Blueprint("users", __name__, url_prefix="/api/users")
 
@@ -18,6 +20,7 @@ def allowed_file(filename):
 
 
 @bp.route("/me", methods=["GET"])
+@conditional(User)
 def get_me():
     user = get_current_user(request)
     if not user:
@@ -109,6 +112,7 @@ def update_me():
 
 
 @bp.route("", methods=["GET"])
+@conditional(User)
 def get_users():
     user = get_current_user(request)
     if not user:
@@ -116,5 +120,5 @@ def get_users():
     if user.role != "admin":
         return jsonify({"error": "Forbidden"}), 403
 
-    users = User.query.all()
-    return jsonify([u.to_dict() for u in users])
+    users = serializers.users.query(User).all()
+    return jsonify(serializers.users.dump(users))
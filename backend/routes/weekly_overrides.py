@@ -3,14 +3,18 @@ from datetime import datetime, time
 from flask import Blueprint, jsonify, request
 
 from database import db
-from models import DaySchedule, WeeklyScheduleOverride
+from models import WeeklyScheduleOverride
 from routes.auth import get_current_user
-from services.slot_generator import generate_slots_for_day
+from routes.http_cache import conditional
+from services import serializers
+from services.reference_data import get_reference_data
+from services.slot_generator import generate_slots_for_days
 
 bp = Blueprint("weekly_overrides", __name__, url_prefix="/api/weekly-overrides")
 
 
 @bp.route("", methods=["GET"])
+@conditional(WeeklyScheduleOverride, week_scoped=(WeeklyScheduleOverride,))
 def get_weekly_overrides():
     """Get weekly overrides for a specific week."""
     user = get_current_user(request)
@@ -23,18 +27,12 @@ def get_weekly_overrides():
 
     week_start_date = datetime.fromisoformat(week_start).date()
     overrides = (
-        WeeklyScheduleOverride.query.filter_by(week_start_date=week_start_date)
+        serializers.weekly_overrides.query(WeeklyScheduleOverride)
+        .filter_by(week_start_date=week_start_date)
         .order_by(WeeklyScheduleOverride.day_of_week)
         .all()
     )
-
-    result = []
-    for override in overrides:
-        data = override.to_dict()
-        data["day_name"] = override.get_day_name()
-        result.append(data)
-
-    return jsonify(result)
+    return jsonify(serializers.weekly_overrides.dump(overrides))
 
 
 @bp.route("", methods=["POST"])
@@ -71,11 +69,11 @@ def create_weekly_override():
         existing.end_time = end_time
         existing.slot_duration_minutes = data.get("slot_duration_minutes", 30)
         existing.is_active = data.get("is_active", True)
-        db.session.commit()
 
         # Generate time slots for this day (only adds missing ones)
         if existing.is_active:
-            generate_slots_for_day(existing)
+            generate_slots_for_days([existing], commit=False)
+        db.session.commit()
 
         result = existing.to_dict()
         result["day_name"] = existing.get_day_name()
@@ -90,11 +88,11 @@ def create_weekly_override():
         is_active=data.get("is_active", True),
     )
     db.session.add(override)
-    db.session.commit()
 
     # Generate time slots for this day (only adds missing ones)
     if override.is_active:
-        generate_slots_for_day(override)
+        generate_slots_for_days([override], commit=False)
+    db.session.commit()
 
     result = override.to_dict()
     result["day_name"] = override.get_day_name()
@@ -130,11 +128,10 @@ def update_weekly_override(override_id):
     if "is_active" in data:
         override.is_active = data["is_active"]
 
-    db.session.commit()
-
     # Regenerate time slots if schedule changed
     if override.is_active:
-        generate_slots_for_day(override)
+        generate_slots_for_days([override], commit=False)
+    db.session.commit()
 
     result = override.to_dict()
     result["day_name"] = override.get_day_name()
@@ -167,16 +164,17 @@ def create_override_from_standard():
     week_start_date = datetime.fromisoformat(data.get("week_start_date")).date()
 
     # Get all standard day schedules
-    standard_schedules = (
-        DaySchedule.query.filter_by(is_active=True).order_by(DaySchedule.day_of_week).all()
-    )
+    standard_schedules = get_reference_data().active_day_schedules()
+
+    # One read for the week's existing overrides instead of one per day
+    existing_by_day = {
+        override.day_of_week: override
+        for override in WeeklyScheduleOverride.query.filter_by(week_start_date=week_start_date)
+    }
 
     created_overrides = []
     for schedule in standard_schedules:
-        # Check if override already exists
-        existing = WeeklyScheduleOverride.query.filter_by(
-            week_start_date=week_start_date, day_of_week=schedule.day_of_week
-        ).first()
+        existing = existing_by_day.get(schedule.day_of_week)
 
         if existing:
             # Update existing
@@ -198,20 +196,11 @@ def create_override_from_standard():
             db.session.add(override)
             created_overrides.append(override)
 
+    # Generate time slots for the whole week in one bulk insert, same transaction
+    generate_slots_for_days([o for o in created_overrides if o.is_active], commit=False)
     db.session.commit()
 
-    # Generate time slots for all created/updated overrides
-    for override in created_overrides:
-        if override.is_active:
-            generate_slots_for_day(override)
-
-    result = []
-    for override in created_overrides:
-        data = override.to_dict()
-        data["day_name"] = override.get_day_name()
-        result.append(data)
-
-    return jsonify(result), 201
+    return jsonify(serializers.weekly_overrides.dump(created_overrides)), 201
 
 
 @bp.route("/delete-week", methods=["DELETE"])
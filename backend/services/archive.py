@@ -0,0 +1,128 @@
+"""
+Archival of past weeks out of the hot week-scoped tables.
+
+Assignments, availability (rows, exceptions and bitmaps) and shift requirements
+of weeks older than the archive horizon (``ARCHIVE_AFTER_WEEKS``) are moved, ids and all, into their
+``*_archive`` tables in bounded batches, so the hot tables and their indexes only
+hold recent and upcoming weeks. Past weeks stay readable: ``week_rows`` reads the
+hot table and, for weeks before the current one, the archive table as well, which
+is correct whether or not (or how far) archival has run.
+
+Weeks before the horizon are read-only. The write routes reject them
+(``is_archived``), so capacity checks and the scheduler, which only read the hot
+tables, never work on a week whose rows were moved. Raising ARCHIVE_AFTER_WEEKS
+does not move archived rows back, so leave it alone once weeks have been archived.
+
+The archive tables have no foreign keys, so deleting time slots, users or
+locations (``bulk.delete_cascading`` included) leaves archived history alone.
+"""
+
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+
+from database import db
+from models import (
+    ArchivedAssignment,
+    ArchivedAvailabilityBitmap,
+    ArchivedAvailabilityException,
+    ArchivedShiftRequirement,
+    ArchivedUserAvailability,
+    Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
+    ShiftRequirement,
+    UserAvailability,
+)
+from services.bulk import CHUNK_SIZE
+
+ARCHIVES = {
+    Assignment: ArchivedAssignment,
+    UserAvailability: ArchivedUserAvailability,
+    AvailabilityException: ArchivedAvailabilityException,
+    AvailabilityBitmap: ArchivedAvailabilityBitmap,
+    ShiftRequirement: ArchivedShiftRequirement,
+}
+
+
+# Response body (sent with HTTP 409) for writes to an archived week
+ARCHIVED_WEEK = {"error": "WEEK_ARCHIVED", "message": "This week is archived and read-only"}
+
+
+def _current_week_start():
+    return date.today() - timedelta(days=date.today().weekday())
+
+
+def archive_cutoff():
+    """First week that stays in the hot tables."""
+    return _current_week_start() - timedelta(weeks=current_app.config["ARCHIVE_AFTER_WEEKS"])
+
+
+def is_archived(*weeks) -> bool:
+    """True if any of ``weeks`` is before the archive horizon, and so read-only."""
+    cutoff = archive_cutoff()
+    return any(week < cutoff for week in weeks)
+
+
+def week_models(model, week_start_date) -> tuple:
+    """Tables holding a week's ``model`` rows: the hot one, plus the archive for past weeks."""
+    if week_start_date < _current_week_start():
+        return (model, ARCHIVES[model])
+    return (model,)
+
+
+def week_rows(model, week_start_date, query=None, **filters) -> list:
+    """``model`` rows of a week matching ``filters``, including archived ones.
+
+    ``query(table)`` builds the base query for each table (default ``table.query``).
+    """
+    query = query or (lambda table: table.query)
+    return [
+        row
+        for table in week_models(model, week_start_date)
+        for row in query(table).filter_by(week_start_date=week_start_date, **filters).all()
+    ]
+
+
+def _move_batch(model, before, batch_size) -> int:
+    ids = db.session.scalars(
+        select(model.id)
+        .where(model.week_start_date < before)
+        .order_by(model.week_start_date, model.id)
+        .limit(batch_size)
+    ).all()
+    if not ids:
+        return 0
+
+    columns = [column.name for column in model.__table__.columns]
+    db.session.execute(
+        insert(ARCHIVES[model].__table__).from_select(
+            columns, select(*model.__table__.columns).where(model.id.in_(ids))
+        )
+    )
+    db.session.execute(
+        delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return len(ids)
+
+
+def archive_old_weeks(before=None, batch_size=CHUNK_SIZE) -> dict:
+    """Move rows of weeks before ``before`` (default: ``archive_cutoff()``) to the archive.
+
+    Each batch of at most ``batch_size`` rows is copied and deleted in its own
+    transaction, oldest weeks first. Returns {table name: rows moved}.
+    """
+    if before is None:
+        before = archive_cutoff()
+    counts = {}
+    for model in ARCHIVES:
+        moved = 0
+        while True:
+            batch = _move_batch(model, before, batch_size)
+            moved += batch
+            if batch < batch_size:
+                break
+        counts[model.__tablename__] = moved
+    return counts
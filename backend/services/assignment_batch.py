@@ -0,0 +1,244 @@
+"""
+All-or-nothing batches of assignment edits (POST /api/assignments/bulk).
+
+Operations are applied in order to private copies of the affected weeks'
+capacity (services/capacity.py), so each is validated against the result of
+the ones before it: clearing a week frees its slots for creates later in the
+batch, and two creates can't both take a slot's last place. Only when every
+operation is valid are the rows changed, and then in one transaction.
+
+Operations (dicts with an ``op`` key):
+
+- ``create``: user_id, location_id, time_slot_id, week_start_date
+- ``update``: id and any of user_id, location_id, time_slot_id (same week)
+- ``move``: id, time_slot_id, and optionally location_id and week_start_date
+- ``delete``: id
+- ``clear_week``: week_start_date, optionally location_id
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+from database import db
+from models import Assignment, User
+from services import serializers
+from services.archive import ARCHIVED_WEEK, is_archived
+from services.capacity import get_week_capacity
+from services.reference_data import get_reference_data
+
+OPERATIONS = ("create", "update", "move", "delete", "clear_week")
+MAX_OPERATIONS = 1000
+
+
+class OperationError(ValueError):
+    """An invalid operation; nothing in the batch was applied."""
+
+    def __init__(self, index, payload, status=400):
+        super().__init__(payload.get("message") or payload["error"])
+        self.index = index
+        self.payload = dict(payload, index=index)
+        self.status = status
+
+
+def _week(value):
+    return datetime.fromisoformat(value).date()
+
+
+class _Batch:
+    def __init__(self, admin_id, assignments, user_ids):
+        self.admin_id = admin_id
+        self.assignments = assignments  # id -> Assignment loaded for the batch
+        self.user_ids = user_ids  # users that exist, of those the batch names
+        self.deleted = set()
+        self.weeks = {}  # week_start_date -> private WeekCapacity
+        self.reference = get_reference_data()
+        self.created, self.updated = [], []
+
+    def apply(self, index, operation):
+        if "user_id" in operation and operation["user_id"] not in self.user_ids:
+            raise OperationError(index, {"error": "User not found"}, status=404)
+        getattr(self, operation["op"])(index, operation)
+
+    def capacity(self, index, week):
+        if is_archived(week):
+            raise OperationError(index, ARCHIVED_WEEK, status=409)
+        if week not in self.weeks:
+            self.weeks[week] = get_week_capacity(week).copy()
+        return self.weeks[week]
+
+    def existing(self, index, operation):
+        assignment = self.assignments.get(operation.get("id"))
+        if assignment is None or assignment.id in self.deleted:
+            raise OperationError(index, {"error": "Assignment not found"}, status=404)
+        return assignment
+
+    def check_references(self, index, location_id, time_slot_id):
+        if (
+            location_id not in self.reference.locations
+            or time_slot_id not in self.reference.time_slots
+        ):
+            raise OperationError(index, {"error": "Location or time slot not found"}, status=404)
+
+    def place(self, index, user_id, location_id, time_slot_id, week):
+        """Book a placement in the week's copy, or raise if it doesn't fit."""
+        self.check_references(index, location_id, time_slot_id)
+        capacity = self.capacity(index, week)
+        problem = capacity.check(user_id, location_id, time_slot_id)
+        if problem:
+            raise OperationError(index, problem)
+        capacity.add(user_id, location_id, time_slot_id)
+
+    def unplace(self, index, assignment):
+        self.capacity(index, assignment.week_start_date).remove(
+            assignment.user_id, assignment.location_id, assignment.time_slot_id
+        )
+
+    def create(self, index, operation):
+        week = _week(operation["week_start_date"])
+        user_id, location_id, time_slot_id = (
+            operation[key] for key in ("user_id", "location_id", "time_slot_id")
+        )
+        self.place(index, user_id, location_id, time_slot_id, week)
+        assignment = Assignment(
+            user_id=user_id,
+            location_id=location_id,
+            time_slot_id=time_slot_id,
+            week_start_date=week,
+            assigned_by=self.admin_id,
+        )
+        db.session.add(assignment)
+        self.created.append(assignment)
+
+    def relocate(self, index, assignment, user_id, location_id, time_slot_id, week):
+        self.unplace(index, assignment)
+        self.place(index, user_id, location_id, time_slot_id, week)
+        assignment.user_id = user_id
+        assignment.location_id = location_id
+        assignment.time_slot_id = time_slot_id
+        assignment.week_start_date = week
+        assignment.assigned_by = self.admin_id
+        if assignment not in self.created and assignment not in self.updated:
+            self.updated.append(assignment)
+
+    def update(self, index, operation):
+        assignment = self.existing(index, operation)
+        self.relocate(
+            index,
+            assignment,
+            operation.get("user_id", assignment.user_id),
+            operation.get("location_id", assignment.location_id),
+            operation.get("time_slot_id", assignment.time_slot_id),
+            assignment.week_start_date,
+        )
+
+    def move(self, index, operation):
+        assignment = self.existing(index, operation)
+        week = operation.get("week_start_date")
+        self.relocate(
+            index,
+            assignment,
+            assignment.user_id,
+            operation.get("location_id", assignment.location_id),
+            operation["time_slot_id"],
+            _week(week) if week else assignment.week_start_date,
+        )
+
+    def delete(self, index, operation):
+        self.remove(index, self.existing(index, operation))
+
+    def remove(self, index, assignment):
+        self.unplace(index, assignment)
+        if assignment in self.created:
+            self.created.remove(assignment)
+            db.session.expunge(assignment)
+            return
+        self.deleted.add(assignment.id)
+        db.session.delete(assignment)
+        if assignment in self.updated:
+            self.updated.remove(assignment)
+
+    def clear_week(self, index, operation):
+        week = _week(operation["week_start_date"])
+        if is_archived(week):
+            raise OperationError(index, ARCHIVED_WEEK, status=409)
+        location_id = operation.get("location_id")
+        query = Assignment.query.filter_by(week_start_date=week)
+        if location_id is not None:
+            query = query.filter_by(location_id=location_id)
+        for assignment in query:
+            self.assignments.setdefault(assignment.id, assignment)
+        # Filter in memory: earlier operations may have moved rows in or out of the week
+        for assignment in list(self.assignments.values()) + list(self.created):
+            if (
+                assignment.week_start_date == week
+                and (location_id is None or assignment.location_id == location_id)
+                and assignment.id not in self.deleted
+            ):
+                self.remove(index, assignment)
+
+
+_REQUIRED = {
+    "create": ("user_id", "location_id", "time_slot_id", "week_start_date"),
+    "update": ("id",),
+    "move": ("id", "time_slot_id"),
+    "delete": ("id",),
+    "clear_week": ("week_start_date",),
+}
+_ID_FIELDS = ("id", "user_id", "location_id", "time_slot_id")
+
+
+def _validate(operations):
+    """Check the batch's shape, so applying it only has to check the schedule."""
+    if not isinstance(operations, list) or not operations:
+        raise OperationError(None, {"error": "operations must be a non-empty list"})
+    if len(operations) > MAX_OPERATIONS:
+        raise OperationError(None, {"error": f"At most {MAX_OPERATIONS} operations per batch"})
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+            raise OperationError(index, {"error": f"op must be one of {', '.join(OPERATIONS)}"})
+        for field in _REQUIRED[operation["op"]]:
+            if operation.get(field) is None:
+                raise OperationError(index, {"error": f"{field} is required"})
+        for field in _ID_FIELDS:
+            value = operation.get(field)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                raise OperationError(index, {"error": f"{field} must be an integer"})
+        if operation.get("week_start_date") is not None:
+            try:
+                _week(operation["week_start_date"])
+            except (TypeError, ValueError):
+                raise OperationError(index, {"error": "week_start_date must be YYYY-MM-DD"})
+
+
+def apply_operations(operations, admin_id) -> dict:
+    """Apply ``operations`` in one transaction, or none of them.
+
+    Raises OperationError (after rolling back) for the first invalid operation.
+    Returns {"created": [...], "updated": [...], "deleted": [ids]}.
+    """
+    _validate(operations)
+    ids = {op["id"] for op in operations if op.get("id") is not None}
+    user_ids = {op["user_id"] for op in operations if op.get("user_id") is not None}
+    assignments = {a.id: a for a in Assignment.query.filter(Assignment.id.in_(ids))}
+    known_users = set(db.session.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+    batch = _Batch(admin_id, assignments, known_users)
+    # Nothing reaches the database until every operation has been checked
+    with db.session.no_autoflush:
+        for index, operation in enumerate(operations):
+            try:
+                batch.apply(index, operation)
+            except OperationError:
+                db.session.rollback()
+                raise
+
+    db.session.commit()
+    changed = [assignment.id for assignment in batch.created + batch.updated]
+    rows = serializers.assignments.query(Assignment).filter(Assignment.id.in_(changed)).all()
+    dumped = dict(zip((row.id for row in rows), serializers.assignments.dump(rows)))
+    return {
+        "created": [dumped[assignment.id] for assignment in batch.created],
+        "updated": [dumped[assignment.id] for assignment in batch.updated],
+        "deleted": sorted(batch.deleted),
+    }
@@ -0,0 +1,530 @@
+"""
+Weekly availability: storage, writes and the per-week effective view.
+
+Availability comes from three places, applied in order for a week:
+
+1. the user's AvailabilityTemplate, expanded onto the week's effective slot grid
+   by slot times;
+2. the week's AvailabilityException rows (preference 0 removes a cell);
+3. explicit per-week entries, which win: an AvailabilityBitmap (one packed row per
+   user-week) and UserAvailability rows.
+
+Bitmaps index their bits by TimeSlot id without a foreign key, and SQLite reuses
+the ids of deleted slots. Deleting slots therefore clears their bits
+(``clear_slot_bits``), and a week only reads the bits of slots in its grid.
+
+Users without a template store full weeks, as UserAvailability rows or, with
+``AVAILABILITY_STORAGE = "bitmap"``, as one AvailabilityBitmap per week. Once a
+user has a template, saving a week only stores its difference from the template.
+Entries with no location_id mean "any location": one row covers every location
+and is expanded in memory when a location/slot is looked up, with a
+location-specific entry for the same slot taking precedence.
+
+Readers (the scheduler, the availability endpoints) use ``get_week_availability``,
+which expands everything once per week and caches it until any of the inputs change.
+
+Writes replace whole sets: one read of the existing rows, an in-memory diff and
+then at most one bulk INSERT, UPDATE and DELETE each. Copying a week forward is a
+single INSERT ... SELECT on the server.
+"""
+
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import Select, delete, exists, insert, literal, select, update
+from sqlalchemy.orm import aliased
+
+from database import db
+from models import (
+    AvailabilityBitmap,
+    AvailabilityException,
+    AvailabilityTemplate,
+    DaySchedule,
+    TimeSlot,
+    UserAvailability,
+    WeeklyScheduleOverride,
+)
+from services import archive, availability_bits, model_events
+from services.bulk import chunked, insert_ignoring_conflicts, on_delete
+from services.week_grid import get_week_grid
+
+_RECORDED = {"changes_recorded": True}
+# Levels a replaced week or template may hold: 1 = neutral, 2 = preferred
+PREFERENCE_LEVELS = (1, 2)
+
+
+class WeekAvailability:
+    """Effective availability of every user for one week."""
+
+    def __init__(self, week_start_date, cells=None, row_ids=None):
+        self.week_start_date = week_start_date
+        # (location_id, time_slot_id) -> {user_id: preference}; location None = any location
+        self.cells = cells or {}
+        self.row_ids = row_ids or {}  # (user_id, location_id, time_slot_id) -> UserAvailability id
+
+    def for_slot(self, location_id, time_slot_id) -> dict:
+        """{user_id: preference_level} of users available for a location/slot.
+
+        Includes "any location" entries for the slot; location-specific ones win.
+        """
+        time_slot_id = int(time_slot_id)
+        specific = self.cells.get((int(location_id), time_slot_id), {})
+        anywhere = self.cells.get((None, time_slot_id))
+        if not anywhere:
+            return specific
+        return {**anywhere, **specific}
+
+    def for_user(self, user_id) -> list:
+        """The user's availability entries for the week, in the UserAvailability shape."""
+        user_id = int(user_id)
+        return [
+            {
+                "id": self.row_ids.get((user_id, location_id, time_slot_id)),
+                "user_id": user_id,
+                "location_id": location_id,
+                "time_slot_id": time_slot_id,
+                "week_start_date": self.week_start_date.isoformat(),
+                "preference_level": users[user_id],
+            }
+            for (location_id, time_slot_id), users in sorted(self.cells.items(), key=_cell_order)
+            if user_id in users
+        ]
+
+
+def _cell_order(item):
+    (location_id, time_slot_id), _ = item
+    return (location_id is not None, location_id or 0, time_slot_id)
+
+
+def _expand_templates(templates, grid) -> dict:
+    """Map template rows onto grid slots: {(user_id, location_id, time_slot_id): preference}."""
+    slot_ids = {(slot.day_of_week, slot.start_time, slot.end_time): slot.id for slot in grid}
+    expanded = {}
+    for user_id, location_id, day, start_time, end_time, preference in templates:
+        slot_id = slot_ids.get((day, start_time, end_time))
+        if slot_id is not None:
+            expanded[(user_id, location_id, slot_id)] = preference
+    return expanded
+
+
+def _template_rows(user_id=None):
+    query = select(
+        AvailabilityTemplate.user_id,
+        AvailabilityTemplate.location_id,
+        AvailabilityTemplate.day_of_week,
+        AvailabilityTemplate.start_time,
+        AvailabilityTemplate.end_time,
+        AvailabilityTemplate.preference_level,
+    )
+    if user_id is not None:
+        query = query.where(AvailabilityTemplate.user_id == user_id)
+    return db.session.execute(query)
+
+
+def load_week_availability(week_start_date) -> WeekAvailability:
+    """Expand templates, exceptions, bitmaps and explicit rows for a week.
+
+    Four queries; past weeks also read archived ones (see services/archive.py).
+    """
+    grid = get_week_grid(week_start_date)
+    prefs = _expand_templates(_template_rows(), grid)
+    grid_mask = availability_bits.mask_of(slot.id for slot in grid)
+
+    for model in archive.week_models(AvailabilityException, week_start_date):
+        for user_id, location_id, time_slot_id, preference in db.session.execute(
+            select(
+                model.user_id, model.location_id, model.time_slot_id, model.preference_level
+            ).where(model.week_start_date == week_start_date)
+        ):
+            if preference:
+                prefs[(user_id, location_id, time_slot_id)] = preference
+            else:
+                prefs.pop((user_id, location_id, time_slot_id), None)
+
+    for model in archive.week_models(AvailabilityBitmap, week_start_date):
+        for user_id, data in db.session.execute(
+            select(model.user_id, model.data).where(model.week_start_date == week_start_date)
+        ):
+            masks = availability_bits.decode(data)
+            cells = availability_bits.masks_to_cells(
+                {key: mask & grid_mask for key, mask in masks.items()}
+            )
+            for (location_id, time_slot_id), preference in cells.items():
+                prefs[(user_id, location_id, time_slot_id)] = preference
+
+    row_ids = {}
+    for model in archive.week_models(UserAvailability, week_start_date):
+        for row_id, user_id, location_id, time_slot_id, preference in db.session.execute(
+            select(
+                model.id,
+                model.user_id,
+                model.location_id,
+                model.time_slot_id,
+                model.preference_level,
+            ).where(model.week_start_date == week_start_date)
+        ):
+            prefs[(user_id, location_id, time_slot_id)] = preference
+            row_ids[(user_id, location_id, time_slot_id)] = row_id
+
+    cells = defaultdict(dict)
+    for (user_id, location_id, time_slot_id), preference in prefs.items():
+        cells[(location_id, time_slot_id)][user_id] = preference
+    return WeekAvailability(week_start_date, dict(cells), row_ids)
+
+
+_cache = model_events.WeekCache(
+    load_week_availability,
+    tables=(
+        UserAvailability.__tablename__,
+        AvailabilityException.__tablename__,
+        AvailabilityBitmap.__tablename__,
+        AvailabilityTemplate.__tablename__,
+        # Templates expand onto the week grid, so grid changes matter too
+        TimeSlot.__tablename__,
+        DaySchedule.__tablename__,
+        WeeklyScheduleOverride.__tablename__,
+    ),
+    week_scoped=(
+        UserAvailability.__tablename__,
+        AvailabilityException.__tablename__,
+        AvailabilityBitmap.__tablename__,
+        WeeklyScheduleOverride.__tablename__,
+    ),
+)
+
+
+def get_week_availability(week_start_date) -> WeekAvailability:
+    """Return the cached effective availability for a week (read-only)."""
+    return _cache.get(week_start_date)
+
+
+def invalidate(week_start_date=None):
+    """Drop one cached week, or every cached week when no week is given."""
+    _cache.invalidate(week_start_date)
+
+
+def _desired_entries(entries) -> dict:
+    """Normalise request entries to {(location_id, time_slot_id): preference_level}.
+
+    A missing or null location_id means any location. Later entries for the same
+    cell win. Raises ValueError for malformed entries or levels other than
+    PREFERENCE_LEVELS (an unavailable cell is left out).
+    """
+    desired = {}
+    for entry in entries:
+        try:
+            location_id = entry.get("location_id")
+            if location_id is not None:
+                location_id = int(location_id)
+            key = (location_id, int(entry["time_slot_id"]))
+            preference = int(entry.get("preference_level", 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Each entry needs an integer time_slot_id (and location_id, if any)")
+        if preference not in PREFERENCE_LEVELS:
+            raise ValueError("preference_level must be 1 (neutral) or 2 (preferred)")
+        desired[key] = preference
+    return desired
+
+
+def _replace_set(model, scope, key_columns, desired) -> dict:
+    """Make the ``model`` rows matching ``scope`` exactly ``desired``.
+
+    ``scope`` maps columns to fixed values (e.g. user and week), ``desired`` maps
+    tuples of ``key_columns`` values to a preference_level. Returns counts of
+    created, updated, deleted and unchanged rows.
+    """
+    columns = [getattr(model, column) for column in key_columns]
+    existing = {
+        tuple(row[:-2]): (row[-2], row[-1])
+        for row in db.session.execute(
+            select(*columns, model.id, model.preference_level).where(
+                *(getattr(model, column) == value for column, value in scope.items())
+            )
+        )
+    }
+
+    to_insert = [
+        {**scope, **dict(zip(key_columns, key)), "preference_level": preference}
+        for key, preference in desired.items()
+        if key not in existing
+    ]
+    to_update = [
+        {"id": existing[key][0], "preference_level": preference}
+        for key, preference in desired.items()
+        if key in existing and existing[key][1] != preference
+    ]
+    to_delete = [row_id for key, (row_id, _) in existing.items() if key not in desired]
+
+    if to_insert:
+        stmt = insert_ignoring_conflicts(model, *scope, *key_columns)
+        db.session.execute(stmt.execution_options(**_RECORDED), to_insert)
+    if to_update:
+        db.session.execute(update(model).execution_options(**_RECORDED), to_update)
+    for chunk in chunked(to_delete):
+        db.session.execute(
+            delete(model)
+            .where(model.id.in_(chunk))
+            .execution_options(synchronize_session=False, **_RECORDED)
+        )
+    if to_insert or to_update or to_delete:
+        model_events.record_bulk(db.session, model.__tablename__, **scope)
+
+    return {
+        "created": len(to_insert),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+        "unchanged": len(desired) - len(to_insert) - len(to_update),
+    }
+
+
+def _replace_bitmap(user_id, week_start_date, desired) -> dict:
+    """Store ``desired`` as the user's AvailabilityBitmap for the week (or remove it).
+
+    Counts are per cell, like ``_replace_set``.
+    """
+    bitmap = db.session.execute(
+        select(AvailabilityBitmap.id, AvailabilityBitmap.data).where(
+            AvailabilityBitmap.user_id == user_id,
+            AvailabilityBitmap.week_start_date == week_start_date,
+        )
+    ).first()
+    old = availability_bits.masks_to_cells(availability_bits.decode(bitmap.data)) if bitmap else {}
+    counts = {
+        "created": sum(1 for key in desired if key not in old),
+        "updated": sum(1 for key in desired if key in old and old[key] != desired[key]),
+        "deleted": sum(1 for key in old if key not in desired),
+        "unchanged": sum(1 for key in desired if old.get(key) == desired[key]),
+    }
+    if old == desired:
+        return counts
+
+    data = availability_bits.encode(availability_bits.cells_to_masks(desired))
+    if not desired:
+        stmt = delete(AvailabilityBitmap).where(AvailabilityBitmap.id == bitmap.id)
+    elif bitmap:
+        stmt = (
+            update(AvailabilityBitmap).where(AvailabilityBitmap.id == bitmap.id).values(data=data)
+        )
+    else:
+        stmt = insert(AvailabilityBitmap).values(
+            user_id=user_id, week_start_date=week_start_date, data=data
+        )
+    db.session.execute(stmt.execution_options(synchronize_session=False, **_RECORDED))
+    model_events.record_bulk(
+        db.session,
+        AvailabilityBitmap.__tablename__,
+        user_id=user_id,
+        week_start_date=week_start_date,
+    )
+    return counts
+
+
+@on_delete(TimeSlot)
+def clear_slot_bits(slot_ids) -> int:
+    """Clear the bits of ``slot_ids`` (ids, or a SELECT of them) from every bitmap.
+
+    Runs before the slots are deleted, so a reused id can't bring old availability
+    back. Bitmaps left empty are deleted. Every bitmap is read, which is fine for
+    rare admin operations. Returns the number of bitmaps changed.
+    """
+    removed = availability_bits.mask_of(
+        db.session.scalars(slot_ids) if isinstance(slot_ids, Select) else slot_ids
+    )
+    if not removed:
+        return 0
+
+    changed = []
+    for row_id, user_id, week_start_date, data in db.session.execute(
+        select(
+            AvailabilityBitmap.id,
+            AvailabilityBitmap.user_id,
+            AvailabilityBitmap.week_start_date,
+            AvailabilityBitmap.data,
+        )
+    ):
+        masks = availability_bits.decode(data)
+        if any(mask & removed for mask in masks.values()):
+            kept = {key: mask & ~removed for key, mask in masks.items()}
+            changed.append((row_id, user_id, week_start_date, kept))
+
+    for row_id, user_id, week_start_date, kept in changed:
+        if any(kept.values()):
+            stmt = (
+                update(AvailabilityBitmap)
+                .where(AvailabilityBitmap.id == row_id)
+                .values(data=availability_bits.encode(kept))
+            )
+        else:
+            stmt = delete(AvailabilityBitmap).where(AvailabilityBitmap.id == row_id)
+        db.session.execute(stmt.execution_options(synchronize_session=False, **_RECORDED))
+        model_events.record_bulk(
+            db.session,
+            AvailabilityBitmap.__tablename__,
+            user_id=user_id,
+            week_start_date=week_start_date,
+        )
+    return len(changed)
+
+
+def has_template(user_id) -> bool:
+    return db.session.query(exists().where(AvailabilityTemplate.user_id == user_id)).scalar()
+
+
+def replace_week_availability(user_id, week_start_date, entries) -> dict:
+    """Make the user's availability for a week exactly ``entries``.
+
+    Users with a template get the week stored as exceptions (the difference from
+    the expanded template); everyone else gets explicit rows or a bitmap, depending
+    on ``AVAILABILITY_STORAGE``. Explicit entries for the week in the other formats
+    are removed. Runs in the caller's transaction (nothing is committed). Returns
+    counts and ``stored_as`` ("rows", "bitmap" or "exceptions").
+    """
+    desired = _desired_entries(entries)
+    scope = {"user_id": user_id, "week_start_date": week_start_date}
+    keys = ("location_id", "time_slot_id")
+
+    if not has_template(user_id):
+        if current_app.config.get("AVAILABILITY_STORAGE") == "bitmap":
+            counts = _replace_bitmap(user_id, week_start_date, desired)
+            _replace_set(UserAvailability, scope, keys, {})
+            return {**counts, "stored_as": "bitmap"}
+        _replace_bitmap(user_id, week_start_date, {})
+        return {**_replace_set(UserAvailability, scope, keys, desired), "stored_as": "rows"}
+
+    expanded = {
+        (location_id, time_slot_id): preference
+        for (_, location_id, time_slot_id), preference in _expand_templates(
+            _template_rows(user_id), get_week_grid(week_start_date)
+        ).items()
+    }
+    delta = {
+        key: preference for key, preference in desired.items() if expanded.get(key) != preference
+    }
+    delta.update({key: 0 for key in expanded if key not in desired})
+
+    counts = _replace_set(AvailabilityException, scope, keys, delta)
+    _replace_set(UserAvailability, scope, keys, {})
+    _replace_bitmap(user_id, week_start_date, {})
+    return {**counts, "stored_as": "exceptions"}
+
+
+def replace_template(user_id, entries) -> dict:
+    """Make the user's standing template exactly ``entries``.
+
+    Entries name cells by time_slot_id like the weekly grid; they are stored by the
+    slot's day and times. Raises ValueError for malformed entries or unknown slots.
+    """
+    desired = _desired_entries(entries)
+    slot_ids = {time_slot_id for _, time_slot_id in desired}
+    slots = {
+        slot_id: (day, start_time, end_time)
+        for slot_id, day, start_time, end_time in db.session.execute(
+            select(TimeSlot.id, TimeSlot.day_of_week, TimeSlot.start_time, TimeSlot.end_time).where(
+                TimeSlot.id.in_(slot_ids)
+            )
+        )
+    }
+    missing = slot_ids - set(slots)
+    if missing:
+        raise ValueError(f"Unknown time slot ids: {sorted(missing)}")
+
+    by_time = {
+        (location_id, *slots[time_slot_id]): preference
+        for (location_id, time_slot_id), preference in desired.items()
+    }
+    return _replace_set(
+        AvailabilityTemplate,
+        {"user_id": user_id},
+        ("location_id", "day_of_week", "start_time", "end_time"),
+        by_time,
+    )
+
+
+def copy_week_availability(source_week, target_week, user_id=None) -> int:
+    """Copy availability from ``source_week`` into ``target_week`` with INSERT ... SELECTs.
+
+    Copies one user's entries, or everyone's when ``user_id`` is None: explicit rows,
+    template exceptions (so a templated user's week-specific changes carry over too)
+    and, for users without a bitmap in the target week, bitmaps. Cells the target
+    week already has are skipped, and slots outside the target week's effective grid
+    are dropped. Runs in the caller's transaction; returns the number of cells copied.
+    """
+    grid_ids = [slot.id for slot in get_week_grid(target_week)]
+    if not grid_ids:
+        return 0
+
+    return (
+        _copy_rows(UserAvailability, source_week, target_week, user_id, grid_ids)
+        + _copy_rows(AvailabilityException, source_week, target_week, user_id, grid_ids)
+        + _copy_bitmaps(source_week, target_week, user_id, grid_ids)
+    )
+
+
+def _copy_rows(model, source_week, target_week, user_id, grid_ids) -> int:
+    """Copy ``model`` rows (UserAvailability or AvailabilityException) the target lacks."""
+    source = aliased(model)
+    taken = exists().where(
+        model.user_id == source.user_id,
+        model.location_id.is_not_distinct_from(source.location_id),
+        model.time_slot_id == source.time_slot_id,
+        model.week_start_date == target_week,
+    )
+    rows = select(
+        source.user_id,
+        source.location_id,
+        source.time_slot_id,
+        literal(target_week, model.week_start_date.type),
+        source.preference_level,
+    ).where(source.week_start_date == source_week, source.time_slot_id.in_(grid_ids), ~taken)
+    if user_id is not None:
+        rows = rows.where(source.user_id == user_id)
+
+    stmt = insert_ignoring_conflicts(
+        model, "user_id", "location_id", "time_slot_id", "week_start_date"
+    ).from_select(
+        ["user_id", "location_id", "time_slot_id", "week_start_date", "preference_level"], rows
+    )
+    result = db.session.execute(stmt.execution_options(**_RECORDED))
+    scope = {"week_start_date": target_week}
+    if user_id is not None:
+        scope["user_id"] = user_id
+    model_events.record_bulk(db.session, model.__tablename__, **scope)
+    return result.rowcount
+
+
+def _copy_bitmaps(source_week, target_week, user_id, grid_ids) -> int:
+    """Copy source-week bitmaps, masked to the target grid, for users without one there."""
+    target = aliased(AvailabilityBitmap)
+    query = select(AvailabilityBitmap.user_id, AvailabilityBitmap.data).where(
+        AvailabilityBitmap.week_start_date == source_week,
+        ~exists().where(
+            target.user_id == AvailabilityBitmap.user_id,
+            target.week_start_date == target_week,
+        ),
+    )
+    if user_id is not None:
+        query = query.where(AvailabilityBitmap.user_id == user_id)
+
+    grid_mask = availability_bits.mask_of(grid_ids)
+    rows, copied = [], 0
+    for bitmap_user_id, data in db.session.execute(query):
+        masks = {key: mask & grid_mask for key, mask in availability_bits.decode(data).items()}
+        cells = sum(mask.bit_count() for mask in masks.values())
+        if cells:
+            rows.append(
+                {
+                    "user_id": bitmap_user_id,
+                    "week_start_date": target_week,
+                    "data": availability_bits.encode(masks),
+                }
+            )
+            copied += cells
+    if not rows:
+        return 0
+
+    db.session.execute(insert(AvailabilityBitmap).execution_options(**_RECORDED), rows)
+    scope = {"week_start_date": target_week}
+    if user_id is not None:
+        scope["user_id"] = user_id
+    model_events.record_bulk(db.session, AvailabilityBitmap.__tablename__, **scope)
+    return copied
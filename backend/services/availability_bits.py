@@ -0,0 +1,104 @@
+"""
+Packed bitset encoding for a user's week of availability.
+
+A week is stored as one blob holding a bitset per (location, preference level).
+Bit ``n`` of a bitset is TimeSlot id ``n``: unlike positions in a week's grid,
+slot ids stay valid when templates or overrides change. Deleted slots' ids can
+be reused, though, so deleting slots clears their bits
+(``availability.clear_slot_bits``). Masks are plain Python ints, so
+availability can be intersected with other slot sets (a week grid, open
+capacity) with ``&`` and ``|``.
+
+Slot ids only grow (every regeneration allocates new ones), so a bitset is
+stored from its lowest set byte: its size follows the span of the week's slot
+ids, not the largest id.
+
+Blob layout (little endian): a version byte, then for each bitset a
+``location_id`` (uint32; 0 for "any location"), ``preference_level`` (uint8),
+the offset of its first byte (uint32), byte length (uint32) and the bitset
+bytes from that offset on. Version 1 blobs (no offset) are still read.
+"""
+
+import struct
+
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<IBII")
+_HEADER_V1 = struct.Struct("<IBI")
+ANY_LOCATION = 0  # location ids start at 1
+
+
+def mask_of(slot_ids) -> int:
+    """Bitmask with the bit of every given slot id set."""
+    mask = 0
+    for slot_id in slot_ids:
+        mask |= 1 << int(slot_id)
+    return mask
+
+
+def slot_ids(mask) -> list:
+    """Slot ids whose bits are set in ``mask``, ascending."""
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def encode(masks) -> bytes:
+    """Pack {(location_id, preference_level): mask} into a blob (empty masks are skipped)."""
+    parts = [bytes([FORMAT_VERSION])]
+    packed = {
+        (ANY_LOCATION if location_id is None else int(location_id), int(preference)): mask
+        for (location_id, preference), mask in masks.items()
+    }
+    for (location_id, preference), mask in sorted(packed.items()):
+        if not mask:
+            continue
+        offset = ((mask & -mask).bit_length() - 1) // 8
+        data = (mask >> (offset * 8)).to_bytes((mask.bit_length() + 7) // 8 - offset, "little")
+        parts.append(_HEADER.pack(location_id, preference, offset, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode(blob) -> dict:
+    """Unpack a blob written by ``encode`` into {(location_id, preference_level): mask}."""
+    if not blob:
+        return {}
+    blob = bytes(blob)
+    if blob[0] not in (1, FORMAT_VERSION):
+        raise ValueError(f"Unsupported availability bitmap version {blob[0]}")
+    masks = {}
+    position = 1
+    while position < len(blob):
+        if blob[0] == 1:
+            location_id, preference, length = _HEADER_V1.unpack_from(blob, position)
+            first_byte = 0
+            position += _HEADER_V1.size
+        else:
+            location_id, preference, first_byte, length = _HEADER.unpack_from(blob, position)
+            position += _HEADER.size
+        location_id = None if location_id == ANY_LOCATION else location_id
+        bits = int.from_bytes(blob[position : position + length], "little")
+        masks[(location_id, preference)] = bits << (first_byte * 8)
+        position += length
+    return masks
+
+
+def cells_to_masks(cells) -> dict:
+    """{(location_id, time_slot_id): preference} -> {(location_id, preference): mask}."""
+    masks = {}
+    for (location_id, time_slot_id), preference in cells.items():
+        key = (None if location_id is None else int(location_id), int(preference))
+        masks[key] = masks.get(key, 0) | (1 << int(time_slot_id))
+    return masks
+
+
+def masks_to_cells(masks) -> dict:
+    """Inverse of ``cells_to_masks``; a higher preference wins if a bit is set twice."""
+    cells = {}
+    for (location_id, preference), mask in sorted(masks.items(), key=lambda item: item[0][1]):
+        for time_slot_id in slot_ids(mask):
+            cells[(location_id, time_slot_id)] = preference
+    return cells
@@ -0,0 +1,159 @@
+"""
+Set-based write helpers shared by services.
+
+Keeps the dialect-specific pieces (``INSERT ... ON CONFLICT DO NOTHING``) in one
+place so callers can write idempotent bulk inserts against SQLite locally and
+PostgreSQL in production.
+
+Deletes follow the ``ondelete`` rules declared on the models' foreign keys. The
+database enforces them on PostgreSQL, but SQLite runs without foreign key
+enforcement and database-side cascades are invisible to ``model_events``, so
+``delete_cascading`` applies them with explicit statements as well. References
+no foreign key can express (slot ids packed into availability bitmaps) are
+cleaned up by functions registered with ``on_delete``.
+"""
+
+from sqlalchemy import delete, exists, insert, or_, select, update
+
+from database import db
+
+# Keeps IN (...) lists and DELETE batches bounded (SQLite's bound-parameter limit)
+CHUNK_SIZE = 500
+
+
+def chunked(values, size=CHUNK_SIZE):
+    """Yield successive lists of at most ``size`` values."""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def _dialect_insert(session=None):
+    """The ON CONFLICT-capable ``insert`` of the session's dialect, or None."""
+    dialect = (session or db.session).get_bind().dialect.name
+    if dialect == "postgresql":  # pragma: no cover - exercised against PostgreSQL only
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:  # pragma: no cover
+        return None
+    return dialect_insert
+
+
+def insert_ignoring_conflicts(model, *conflict_columns):
+    """Return an INSERT for ``model`` that skips rows violating the given unique key.
+
+    Databases without ON CONFLICT support get a plain INSERT, so callers should
+    still diff against existing rows first and treat this as a safety net for
+    concurrent writers.
+    """
+    dialect_insert = _dialect_insert()
+    if dialect_insert is None:  # pragma: no cover
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+
+def insert_or_update(model, conflict_columns, set_, session=None):
+    """Return an INSERT for ``model`` that applies ``set_`` to rows it collides with.
+
+    ``set_`` maps column names to values or expressions over the existing row.
+    Databases without ON CONFLICT support get a plain INSERT.
+    """
+    dialect_insert = _dialect_insert(session)
+    if dialect_insert is None:  # pragma: no cover
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_update(
+        index_elements=list(conflict_columns), set_=set_
+    )
+
+
+# model -> functions delete_cascading runs before deleting rows of the model
+_on_delete = {}
+
+
+def on_delete(model):
+    """Register ``func(parent_ids)`` to run whenever ``delete_cascading`` deletes ``model`` rows.
+
+    ``parent_ids`` is a SELECT of the ids about to be deleted.
+    """
+
+    def register(func):
+        _on_delete.setdefault(model, []).append(func)
+        return func
+
+    return register
+
+
+def _references(model):
+    """Yield (child model, child column, ondelete) for foreign keys pointing at ``model``."""
+    parent = model.__table__
+    for mapper in db.Model.registry.mappers:
+        for fk in mapper.local_table.foreign_keys:
+            if fk.column.table is parent:
+                yield mapper.class_, fk.parent, fk.ondelete
+
+
+def delete_cascading(model, *criteria) -> dict:
+    """Delete ``model`` rows matching ``criteria`` along with the rows that reference them.
+
+    Referencing rows are deleted (ON DELETE CASCADE) or have their foreign key
+    cleared (ON DELETE SET NULL) with one statement per foreign key, selecting the
+    parents with a subquery, so nothing is loaded into Python. Cascades are one
+    level deep, which covers every model in this schema.
+
+    Returns {table name: rows deleted} for the deleted tables.
+    """
+    parent_ids = select(model.id).where(*criteria)
+    for func in _on_delete.get(model, ()):
+        func(parent_ids)
+    counts = {}
+    for child, column, ondelete in _references(model):
+        if ondelete == "CASCADE":
+            result = db.session.execute(
+                delete(child)
+                .where(column.in_(parent_ids))
+                .execution_options(synchronize_session=False)
+            )
+            table = child.__tablename__
+            counts[table] = counts.get(table, 0) + result.rowcount
+        elif ondelete == "SET NULL":
+            db.session.execute(
+                update(child)
+                .where(column.in_(parent_ids))
+                .values({column.key: None})
+                .execution_options(synchronize_session=False)
+            )
+    result = db.session.execute(
+        delete(model).where(*criteria).execution_options(synchronize_session=False)
+    )
+    counts[model.__tablename__] = result.rowcount
+    return counts
+
+
+def delete_orphans(model, batch_size=CHUNK_SIZE) -> int:
+    """Delete ``model`` rows whose CASCADE parent no longer exists, in bounded batches.
+
+    Each batch is a ``DELETE ... WHERE id IN (SELECT id ... WHERE NOT EXISTS ...
+    LIMIT n)`` committed on its own, so large cleanups never hold long locks or
+    load rows into Python. Returns the number of rows deleted.
+    """
+    orphaned = []
+    for fk in model.__table__.foreign_keys:
+        if fk.ondelete != "CASCADE":
+            continue
+        missing = ~exists().where(fk.column == fk.parent)
+        # A nullable reference left NULL (e.g. "any location") is not an orphan
+        orphaned.append(fk.parent.is_not(None) & missing if fk.parent.nullable else missing)
+    if not orphaned:  # pragma: no cover - every caller has cascading references
+        return 0
+
+    batch = select(model.id).where(or_(*orphaned)).limit(batch_size)
+    deleted = 0
+    while True:
+        result = db.session.execute(
+            delete(model).where(model.id.in_(batch)).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -0,0 +1,103 @@
+"""
+Candidate workers for every shift of a week at once.
+
+GET /api/assignments/available-workers answers one (location, time slot) with
+a few queries per call. ``week_candidates`` answers a whole week from the
+cached week snapshots instead: effective availability
+(services/availability.py), capacity and bookings (services/capacity.py), and
+the week's grid (services/week_grid.py). Only the query checking that the
+candidates still exist reaches the database. Per shift, the candidates are the
+users available for it minus the users already working that time slot,
+computed as set differences, minus the users the shift would push past
+GlobalSettings.max_hours_per_user_per_week (the same rule the auto-scheduler
+applies).
+"""
+
+from sqlalchemy import select
+
+from database import db
+from models import User
+from services.availability import get_week_availability
+from services.capacity import get_week_capacity
+from services.reference_data import get_reference_data
+from services.scheduler import calculate_hours
+from services.week_grid import get_week_grid
+
+
+def _assigned_hours(capacity, time_slots) -> dict:
+    """{user_id: hours booked in the week}; bookings of deleted slots count as 0."""
+    return {
+        user_id: sum(
+            calculate_hours(time_slots[slot_id]) * count
+            for slot_id, count in slots.items()
+            if slot_id in time_slots
+        )
+        for user_id, slots in capacity.user_slots.items()
+    }
+
+
+def week_candidates(week_start_date, location_ids=None, time_slot_ids=None) -> list:
+    """Eligible workers of every (active location, grid slot) of ``week_start_date``.
+
+    ``location_ids`` / ``time_slot_ids`` restrict the shifts returned. Each shift
+    is {"location_id", "time_slot_id", "remaining_capacity", "candidates"}, with
+    candidates {"user_id", "preference_level", "remaining_hours"} ordered by
+    preference, then fewest hours booked; users the shift would take over the
+    weekly hour limit are left out. ``remaining_hours`` is None when
+    GlobalSettings sets no weekly limit.
+    """
+    reference = get_reference_data()
+    availability = get_week_availability(week_start_date)
+    capacity = get_week_capacity(week_start_date)
+
+    locations = [
+        location.id
+        for location in reference.active_locations()
+        if location_ids is None or location.id in location_ids
+    ]
+    slots = [
+        slot.id
+        for slot in get_week_grid(week_start_date)
+        if time_slot_ids is None or slot.id in time_slot_ids
+    ]
+
+    busy = capacity.users_by_slot()
+    shifts = []
+    for location_id in locations:
+        for slot_id in slots:
+            available = availability.for_slot(location_id, slot_id)
+            shifts.append((location_id, slot_id, available, available.keys() - busy[slot_id]))
+
+    named = set().union(*(eligible for *_, eligible in shifts))
+    users = set(db.session.scalars(select(User.id).where(User.id.in_(named)))) if named else set()
+    hours = _assigned_hours(capacity, reference.time_slots)
+    limit = reference.settings.max_hours_per_user_per_week if reference.settings else None
+
+    def within_limit(user_id, slot_id):
+        if not limit or slot_id not in reference.time_slots:
+            return True
+        return hours.get(user_id, 0) + calculate_hours(reference.time_slots[slot_id]) <= limit
+
+    def candidate(user_id, preference_level):
+        booked = hours.get(user_id, 0)
+        return {
+            "user_id": user_id,
+            "preference_level": preference_level,
+            "remaining_hours": limit - booked if limit else None,
+        }
+
+    return [
+        {
+            "location_id": location_id,
+            "time_slot_id": slot_id,
+            "remaining_capacity": capacity.remaining(location_id, slot_id),
+            "candidates": [
+                candidate(user_id, available[user_id])
+                for user_id in sorted(
+                    (user_id for user_id in eligible & users if within_limit(user_id, slot_id)),
+                    key=lambda user_id: (-available[user_id], hours.get(user_id, 0), user_id),
+                )
+            ],
+        }
+        for location_id, slot_id, available, eligible in shifts
+    ]
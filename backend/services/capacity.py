@@ -0,0 +1,213 @@
+"""
+Week capacity/occupancy oracle shared by the assignment routes and the auto-scheduler.
+
+The capacity of a (location, time slot) is the week's ShiftRequirement override when
+one exists, otherwise GlobalSettings.max_workers_per_shift. A week is loaded with a
+fixed number of queries and kept in memory; committed Assignment writes are applied
+to cached weeks incrementally, while requirement and settings changes drop the
+affected weeks so they are reloaded on next use.
+
+Cached weeks are shared between threads and never change once published: a
+commit replaces the week with an updated copy, so readers can iterate one freely.
+"""
+
+from collections import Counter, defaultdict
+
+from database import db
+from models import Assignment, GlobalSettings, ShiftRequirement
+from services import model_events
+from services.reference_data import get_reference_data
+
+
+class WeekCapacity:
+    """Capacities, per-slot head counts and per-user bookings for one week."""
+
+    def __init__(self, week_start_date, default_max, overrides=None, assignments=()):
+        self.week_start_date = week_start_date
+        self.default_max = default_max
+        self.overrides = dict(overrides or {})  # (location_id, time_slot_id) -> capacity
+        self.counts = Counter()  # (location_id, time_slot_id) -> assigned workers
+        self.user_slots = defaultdict(Counter)  # user_id -> time_slot_id -> assignments
+        for user_id, location_id, time_slot_id in assignments:
+            self.add(user_id, location_id, time_slot_id)
+
+    def capacity(self, location_id, time_slot_id):
+        return self.overrides.get((int(location_id), int(time_slot_id)), self.default_max)
+
+    def occupancy(self, location_id, time_slot_id):
+        return self.counts[(int(location_id), int(time_slot_id))]
+
+    def remaining(self, location_id, time_slot_id):
+        return self.capacity(location_id, time_slot_id) - self.occupancy(location_id, time_slot_id)
+
+    def is_user_busy(self, user_id, time_slot_id):
+        """True if the user already works this time slot at any location."""
+        return self._booked(user_id, time_slot_id) > 0
+
+    def _booked(self, user_id, time_slot_id):
+        # Reads must not insert into the defaultdict: cached weeks are shared
+        return self.user_slots.get(int(user_id), {}).get(int(time_slot_id), 0)
+
+    def check(self, user_id, location_id, time_slot_id, current=None):
+        """Return an error dict if the placement is not allowed, else None.
+
+        ``current`` is the (user_id, location_id, time_slot_id) of an assignment in this
+        week that is being moved or edited; it is excluded from the counts.
+        """
+        user_id, location_id, time_slot_id = int(user_id), int(location_id), int(time_slot_id)
+        cur_user, cur_location, cur_slot = (int(v) for v in current) if current else (None,) * 3
+
+        booked = self._booked(user_id, time_slot_id)
+        if cur_user == user_id and cur_slot == time_slot_id:
+            booked -= 1
+        if booked > 0:
+            return {
+                "error": "OVERLAP_FOR_USER",
+                "message": "This worker is already scheduled at that time",
+            }
+
+        max_workers = self.capacity(location_id, time_slot_id)
+        count = self.occupancy(location_id, time_slot_id)
+        if (cur_location, cur_slot) == (location_id, time_slot_id):
+            count -= 1
+        if count >= max_workers:
+            return {
+                "error": "OVER_MAX_WORKERS",
+                "message": f"Maximum {max_workers} workers already scheduled in that slot",
+            }
+        return None
+
+    def users_by_slot(self) -> dict:
+        """{time_slot_id: set of users working it at any location}."""
+        busy = defaultdict(set)
+        for user_id, slots in self.user_slots.items():
+            for time_slot_id in slots:
+                busy[time_slot_id].add(user_id)
+        return busy
+
+    def add(self, user_id, location_id, time_slot_id):
+        self.counts[(int(location_id), int(time_slot_id))] += 1
+        self.user_slots[int(user_id)][int(time_slot_id)] += 1
+
+    def remove(self, user_id, location_id, time_slot_id):
+        key = (int(location_id), int(time_slot_id))
+        self.counts[key] -= 1
+        if self.counts[key] <= 0:
+            del self.counts[key]
+        slots = self.user_slots[int(user_id)]
+        slots[int(time_slot_id)] -= 1
+        if slots[int(time_slot_id)] <= 0:
+            del slots[int(time_slot_id)]
+        if not slots:
+            del self.user_slots[int(user_id)]
+
+    def copy(self):
+        """Private working copy (e.g. for planning a scheduler run before commit)."""
+        clone = WeekCapacity(self.week_start_date, self.default_max, self.overrides)
+        clone.counts = Counter(self.counts)
+        for user_id, slots in self.user_slots.items():
+            clone.user_slots[user_id] = Counter(slots)
+        return clone
+
+
+def load_week_capacity(week_start_date):
+    """Build a WeekCapacity straight from the database (three queries, no caching)."""
+    with db.session.no_autoflush:
+        return _load_week_capacity(week_start_date)
+
+
+def _load_week_capacity(week_start_date):
+    default_max = get_reference_data().max_workers_per_shift
+
+    overrides = {
+        (location_id, time_slot_id): required
+        for location_id, time_slot_id, required in db.session.query(
+            ShiftRequirement.location_id,
+            ShiftRequirement.time_slot_id,
+            ShiftRequirement.required_workers,
+        ).filter(ShiftRequirement.week_start_date == week_start_date)
+    }
+
+    assignments = db.session.query(
+        Assignment.user_id, Assignment.location_id, Assignment.time_slot_id
+    ).filter(Assignment.week_start_date == week_start_date)
+
+    return WeekCapacity(week_start_date, default_max, overrides, assignments)
+
+
+_ASSIGNMENT_KEYS = ("user_id", "location_id", "time_slot_id", "week_start_date")
+
+
+def _placement(values):
+    if values is None or any(values.get(key) is None for key in _ASSIGNMENT_KEYS):
+        return None
+    return tuple(values[key] for key in _ASSIGNMENT_KEYS)
+
+
+class _CapacityCache(model_events.WeekCache):
+    """Applies committed Assignment writes to cached weeks instead of reloading them.
+
+    Copy-on-write, since readers may be iterating a published week: the first change
+    to a week in a commit copies it, later ones reuse that copy, and the copies are
+    published together once the commit has been applied.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._working = {}  # week_start_date -> private copy for the commit being applied
+
+    def _week(self, week_start_date):
+        if week_start_date not in self._working:
+            self._working[week_start_date] = self.values[week_start_date].copy()
+        return self._working[week_start_date]
+
+    def apply_change(self, change):
+        if change.table != Assignment.__tablename__:
+            super().apply_change(change)
+            return
+
+        old, new = _placement(change.old), _placement(change.new)
+        if (
+            change.op == "bulk"
+            or (change.op != "insert" and old is None)
+            or (change.op != "delete" and new is None)
+        ):
+            # Scope unknown: drop the weeks we can name, or everything.
+            self.drop(change.weeks)
+            return
+
+        if old is not None and old[3] in self.values:
+            self._week(old[3]).remove(*old[:3])
+        if new is not None and new[3] in self.values:
+            self._week(new[3]).add(*new[:3])
+
+    def finish_commit(self):
+        # Weeks dropped after being copied stay dropped
+        for week_start_date, week in self._working.items():
+            if week_start_date in self.values:
+                self.values[week_start_date] = week
+        self._working = {}
+
+
+_cache = _CapacityCache(
+    _load_week_capacity,
+    tables=(
+        Assignment.__tablename__,
+        ShiftRequirement.__tablename__,
+        GlobalSettings.__tablename__,
+    ),
+    week_scoped=(ShiftRequirement.__tablename__,),
+)
+
+
+def get_week_capacity(week_start_date):
+    """Return the shared, cached WeekCapacity for a week (loading it on first use).
+
+    Treat the result as read-only; use ``copy()`` for speculative changes.
+    """
+    return _cache.get(week_start_date)
+
+
+def invalidate(week_start_date=None):
+    """Drop one cached week, or every cached week when no week is given."""
+    _cache.invalidate(week_start_date)
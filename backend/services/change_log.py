@@ -0,0 +1,258 @@
+"""
+Log of committed changes to the data clients keep in sync.
+
+Every commit that touches assignments, shift requirements or availability
+appends entries to ``change_log`` in the same transaction. No route has to
+remember to log: the scheduler, the bulk availability services and the
+routes all get it. The entries of a commit share a cursor (``seq``):
+``changes_since`` returns what changed in one week after a cursor, so a client
+that loaded the week can patch its copy instead of downloading the week again.
+
+Cursors are not entry ids. PostgreSQL hands ids out when rows are inserted, so
+a transaction holding lower ids can commit after one holding higher ids, and a
+client that had already moved past the higher ids would never see it. A cursor
+is drawn from a counter row in data_versions during the commit instead. The row
+stays locked until the transaction ends, so cursors are taken in commit order.
+A reader who sees cursor N also sees every entry up to N.
+
+- Assignments and shift requirements are logged per row. The response carries
+  the row as it is now, or a delete when it is gone or no longer belongs to the
+  week or the viewer.
+- Availability is logged per user and week, because a week's effective
+  entries combine rows, bitmaps, exceptions and templates. The response
+  carries the user's entries for the week as they are now.
+- A set-based write whose rows are unknown is logged as ``bulk``. Clients
+  reload that table for the week.
+
+Entries older than ``CHANGE_LOG_RETENTION_DAYS`` are pruned by
+archive_old_weeks.py. A cursor older than the oldest remaining entry gets a
+full reload.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models import Assignment, ChangeLogEntry, DataVersion, ShiftRequirement
+from services import model_events, serializers
+from services.availability import get_week_availability
+from services.bulk import insert_or_update
+
+AVAILABILITY = "availability"
+ROW_TABLES = {
+    Assignment.__tablename__: (Assignment, serializers.assignments),
+    ShiftRequirement.__tablename__: (ShiftRequirement, serializers.shift_requirements),
+}
+AVAILABILITY_TABLES = frozenset(
+    {
+        "user_availability",
+        "availability_exceptions",
+        "availability_bitmaps",
+        "availability_templates",
+    }
+)
+SYNCED = (*ROW_TABLES, AVAILABILITY)
+# data_versions counter the cursors are drawn from
+CURSOR_KEY = "change_log:cursor"
+DEFAULT_RETENTION_DAYS = 7
+
+
+def _scope(values, fallback=None):
+    fallback = fallback or {}
+    return (
+        values.get("user_id", fallback.get("user_id")),
+        values.get("week_start_date", fallback.get("week_start_date")),
+    )
+
+
+def entries_for(change) -> list:
+    """``change_log`` rows (as dicts) recording ``change``."""
+    if change.table in ROW_TABLES:
+        table = change.table
+    elif change.table in AVAILABILITY_TABLES:
+        table = AVAILABILITY
+    else:
+        return []
+
+    def entry(op, values, fallback=None):
+        user_id, week = _scope(values or {}, fallback)
+        if table == AVAILABILITY:
+            # Logged per user: only a write to unknown users stays a bulk entry
+            op, row_id = ("bulk" if user_id is None else "update"), None
+        else:
+            row_id = None if op == "bulk" else values["id"]
+        return {
+            "table_name": table,
+            "op": op,
+            "row_id": row_id,
+            "user_id": user_id,
+            "week_start_date": week,
+        }
+
+    if change.op == "insert":
+        return [entry("insert", change.new)]
+    if change.op == "delete":
+        return [entry("delete", change.old)]
+    if change.op == "bulk":
+        return [entry("bulk", change.new)]
+    entries = [entry("update", change.new)]
+    if _scope(change.old, change.new) != _scope(change.new):
+        # Moved to another week or user: the old one no longer has it
+        entries.insert(0, entry("delete", change.old, change.new))
+    return entries
+
+
+def _next_cursor(session) -> int:
+    """Bump the cursor counter, locking its row until the transaction ends."""
+    statement = insert_or_update(
+        DataVersion, ["key"], {"version": DataVersion.version + 1}, session=session
+    )
+    return session.execute(
+        statement.values(key=CURSOR_KEY, version=1).returning(DataVersion.version),
+        execution_options={"changes_recorded": True},
+    ).scalar_one()
+
+
+@event.listens_for(Session, "before_commit")
+def _log(session):
+    # Flush first so the changes the commit would flush are logged too
+    session.flush()
+    now = datetime.utcnow()
+    rows = {}
+    for change in model_events.pending_changes(session):
+        for row in entries_for(change):
+            rows.setdefault(tuple(row.values()), dict(row, created_at=now))
+    if rows:
+        seq = _next_cursor(session)
+        session.execute(
+            insert(ChangeLogEntry),
+            [dict(row, seq=seq) for row in rows.values()],
+            execution_options={"changes_recorded": True},
+        )
+
+
+def current_cursor() -> int:
+    """Cursor of the latest change (0 before any)."""
+    return db.session.execute(select(func.max(ChangeLogEntry.seq))).scalar() or 0
+
+
+def changes_since(cursor, week_start_date, viewer) -> dict:
+    """What changed in ``week_start_date`` after ``cursor``, as ``viewer`` may see it.
+
+    Returns {"cursor", "reload", "changes"}. ``reload`` lists the tables to load
+    again in full; ``changes`` patches the others. Pass the returned cursor next time.
+    """
+    latest = current_cursor()
+    oldest = db.session.execute(select(func.min(ChangeLogEntry.seq))).scalar()
+    if cursor > latest or (oldest is not None and cursor < oldest - 1):
+        return {"cursor": latest, "reload": list(SYNCED), "changes": []}
+
+    query = select(ChangeLogEntry).where(
+        ChangeLogEntry.seq > cursor,
+        ChangeLogEntry.seq <= latest,
+        or_(
+            ChangeLogEntry.week_start_date == week_start_date,
+            ChangeLogEntry.week_start_date.is_(None),
+        ),
+    )
+    if viewer.role != "admin":
+        query = query.where(
+            or_(
+                ChangeLogEntry.table_name == ShiftRequirement.__tablename__,
+                ChangeLogEntry.user_id == viewer.id,
+                ChangeLogEntry.user_id.is_(None),
+            )
+        )
+    entries = (
+        db.session.execute(query.order_by(ChangeLogEntry.seq, ChangeLogEntry.id)).scalars().all()
+    )
+
+    reload = sorted(
+        {
+            entry.table_name
+            for entry in entries
+            if entry.op == "bulk" and (entry.table_name != AVAILABILITY or viewer.role == "admin")
+        }
+    )
+    changes = []
+    for table, (model, serializer) in ROW_TABLES.items():
+        if table not in reload:
+            changes += _row_changes(entries, table, model, serializer, week_start_date, viewer)
+    if AVAILABILITY not in reload:
+        changes += _availability_changes(entries, week_start_date, viewer)
+    return {"cursor": latest, "reload": reload, "changes": changes}
+
+
+def _row_changes(entries, table, model, serializer, week_start_date, viewer) -> list:
+    first_ops = {}
+    for entry in entries:
+        if entry.table_name == table:
+            first_ops.setdefault(entry.row_id, entry.op)
+    if not first_ops:
+        return []
+
+    rows = serializer.query(model).filter(model.id.in_(first_ops)).all()
+    current = {
+        row.id: row
+        for row in rows
+        if row.week_start_date == week_start_date
+        and (
+            viewer.role == "admin" or table != Assignment.__tablename__ or row.user_id == viewer.id
+        )
+    }
+    dumped = dict(zip(current, serializer.dump(current.values())))
+    changes = []
+    for row_id, first_op in first_ops.items():
+        if row_id in dumped:
+            op = "insert" if first_op == "insert" else "update"
+            changes.append({"table": table, "op": op, "id": row_id, "row": dumped[row_id]})
+        else:
+            changes.append({"table": table, "op": "delete", "id": row_id})
+    return changes
+
+
+def _availability_changes(entries, week_start_date, viewer) -> list:
+    user_ids = []
+    for entry in entries:
+        if entry.table_name != AVAILABILITY:
+            continue
+        # An entry without a user (a bulk write to every user) only reaches here for non-admins
+        user_id = entry.user_id or viewer.id
+        if user_id not in user_ids:
+            user_ids.append(user_id)
+    if not user_ids:
+        return []
+
+    week = get_week_availability(week_start_date)
+    return [
+        {
+            "table": AVAILABILITY,
+            "op": "update",
+            "user_id": user_id,
+            "entries": week.for_user(user_id),
+        }
+        for user_id in user_ids
+    ]
+
+
+def prune(now=None) -> int:
+    """Delete entries older than CHANGE_LOG_RETENTION_DAYS, always keeping the latest commit's.
+
+    The latest entries stay so the oldest remaining cursor still tells which cursors
+    are too old to patch from. Returns the number of entries deleted.
+    """
+    now = now or datetime.utcnow()
+    days = current_app.config.get("CHANGE_LOG_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+    result = db.session.execute(
+        delete(ChangeLogEntry)
+        .where(
+            ChangeLogEntry.created_at < now - timedelta(days=days),
+            ChangeLogEntry.seq < current_cursor(),
+        )
+        .execution_options(changes_recorded=True)
+    )
+    db.session.commit()
+    return result.rowcount
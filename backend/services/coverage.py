@@ -0,0 +1,97 @@
+"""
+Per-shift coverage of a week: who could work each shift against what it needs.
+
+For every active location and grid slot of a week, ``get_week_coverage``
+reports how many users are available (and how many of them prefer the shift),
+how many are assigned, the shift's effective capacity, and the gap: the places
+left open even if every available user still free at that time were assigned.
+
+The counts come from the per-week snapshots the scheduler uses, not from
+grouping availability rows in SQL. A week's effective availability merges
+templates, exceptions, bitmaps and "any location" rows (services/availability.py),
+which rows alone don't give. The result is cached per week until an input changes.
+"""
+
+from models import (
+    Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
+    AvailabilityTemplate,
+    DaySchedule,
+    GlobalSettings,
+    Location,
+    ShiftRequirement,
+    TimeSlot,
+    UserAvailability,
+    WeeklyScheduleOverride,
+)
+from services import model_events
+from services.availability import get_week_availability
+from services.capacity import get_week_capacity
+from services.reference_data import get_reference_data
+from services.week_grid import get_week_grid
+
+PREFERRED = 2
+
+
+def load_week_coverage(week_start_date) -> tuple:
+    """Coverage of every (active location, grid slot) of a week (no caching)."""
+    availability = get_week_availability(week_start_date)
+    # One snapshot for every count: a shared week never changes once handed out
+    # (commits publish an updated copy), so iterating it needs no lock
+    capacity = get_week_capacity(week_start_date)
+    busy = capacity.users_by_slot()
+
+    shifts = []
+    for location in get_reference_data().active_locations():
+        for slot in get_week_grid(week_start_date):
+            available = availability.for_slot(location.id, slot.id)
+            free = len(available.keys() - busy[slot.id])
+            shifts.append(
+                {
+                    "location_id": location.id,
+                    "time_slot_id": slot.id,
+                    "available": len(available),
+                    "preferred": sum(1 for level in available.values() if level >= PREFERRED),
+                    "assigned": capacity.occupancy(location.id, slot.id),
+                    "capacity": capacity.capacity(location.id, slot.id),
+                    "gap": max(capacity.remaining(location.id, slot.id) - free, 0),
+                }
+            )
+    return tuple(shifts)
+
+
+_cache = model_events.WeekCache(
+    load_week_coverage,
+    tables=(
+        UserAvailability.__tablename__,
+        AvailabilityException.__tablename__,
+        AvailabilityBitmap.__tablename__,
+        AvailabilityTemplate.__tablename__,
+        Assignment.__tablename__,
+        ShiftRequirement.__tablename__,
+        GlobalSettings.__tablename__,
+        Location.__tablename__,
+        TimeSlot.__tablename__,
+        DaySchedule.__tablename__,
+        WeeklyScheduleOverride.__tablename__,
+    ),
+    week_scoped=(
+        UserAvailability.__tablename__,
+        AvailabilityException.__tablename__,
+        AvailabilityBitmap.__tablename__,
+        Assignment.__tablename__,
+        ShiftRequirement.__tablename__,
+        WeeklyScheduleOverride.__tablename__,
+    ),
+)
+
+
+def get_week_coverage(week_start_date) -> tuple:
+    """Return the cached coverage of a week (read-only)."""
+    return _cache.get(week_start_date)
+
+
+def invalidate(week_start_date=None):
+    """Drop one cached week, or every cached week when no week is given."""
+    _cache.invalidate(week_start_date)
@@ -0,0 +1,90 @@
+"""
+Write counters per table and per week, kept in the database.
+
+Every commit bumps, in the same transaction, one counter per table it wrote
+(``<table>``). For tables with a week_start_date it also bumps one counter per
+week the write touched (``<table>@<week>``). When a write's week is unknown (a
+bulk statement without a recorded scope), ``<table>@?`` is bumped instead. A
+reader of one week therefore only needs ``<table>@<week>`` and ``<table>@?``,
+and a reader of the whole table needs ``<table>``.
+
+The counters live in the database, so every worker sees every other worker's
+writes. ``versions`` reads any number of them with one query, which is what
+lets routes/http_cache.py answer conditional GETs without running the view.
+"""
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models import DataVersion
+from services import model_events
+from services.bulk import insert_or_update
+
+UNKNOWN_WEEK = "?"
+
+
+def key(table, week_start_date=None) -> str:
+    """Counter key of a table, or of one week (a date, or UNKNOWN_WEEK) of it."""
+    if week_start_date is None:
+        return table
+    week = week_start_date if week_start_date == UNKNOWN_WEEK else week_start_date.isoformat()
+    return f"{table}@{week}"
+
+
+def read_keys(tables=(), week_scoped=(), week_start_date=None) -> list:
+    """Counter keys a read of ``tables`` depends on.
+
+    Tables listed in ``week_scoped`` only depend on the given week (when there is one).
+    """
+    keys = []
+    for table in tables:
+        if table in week_scoped and week_start_date is not None:
+            keys += [key(table, week_start_date), key(table, UNKNOWN_WEEK)]
+        else:
+            keys.append(key(table))
+    return keys
+
+
+def versions(keys) -> dict:
+    """{key: version} for ``keys``; counters never bumped are 0."""
+    found = dict(
+        db.session.execute(
+            select(DataVersion.key, DataVersion.version).where(DataVersion.key.in_(keys))
+        ).all()
+    )
+    return {name: found.get(name, 0) for name in keys}
+
+
+def _has_weeks(table) -> bool:
+    columns = db.metadata.tables[table].c if table in db.metadata.tables else ()
+    return "week_start_date" in columns
+
+
+def written_keys(changes) -> set:
+    """Counter keys bumped by ``changes``."""
+    keys = set()
+    for change in changes:
+        if change.table == DataVersion.__tablename__:
+            continue
+        keys.add(key(change.table))
+        if _has_weeks(change.table):
+            weeks = change.weeks or {UNKNOWN_WEEK}
+            keys.update(key(change.table, week) for week in weeks)
+    return keys
+
+
+@event.listens_for(Session, "before_commit")
+def _bump(session):
+    # Flush first so the changes the commit would flush are counted too
+    session.flush()
+    keys = written_keys(model_events.pending_changes(session))
+    if not keys:
+        return
+    statement = insert_or_update(
+        DataVersion, ["key"], {"version": DataVersion.version + 1}, session=session
+    )
+    session.execute(
+        statement.values([{"key": name, "version": 1} for name in sorted(keys)]),
+        execution_options={"changes_recorded": True},
+    )
@@ -0,0 +1,117 @@
+"""
+Local verification of Google ID tokens.
+
+``google.oauth2.id_token`` downloads Google's signing certificates on every call.
+Here the certificates are kept for as long as the certs endpoint allows
+(``Cache-Control: max-age``), and refetched early only when a token names a key
+id we have not seen yet (Google rotated its keys). Signatures and claims are then
+checked locally. Tokens that fail verification are remembered for
+``GOOGLE_TOKEN_NEGATIVE_TTL_SECONDS`` in a bounded cache, so a client that keeps
+sending a stale token is turned away without any work. The certificate endpoint
+is ``GOOGLE_CERTS_URL``, which tests point at a local key server.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from google.auth import exceptions, jwt
+from google.auth.transport import requests as google_requests
+
+from services import model_events
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+DEFAULT_CERTS_TTL_SECONDS = 300  # when the certs response has no max-age
+MIN_REFETCH_SECONDS = 60  # unknown key ids refetch the certs at most this often
+DEFAULT_NEGATIVE_TTL_SECONDS = 300
+NEGATIVE_CACHE_SIZE = 1024
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+_lock = threading.Lock()
+_certs = None  # (fetched_at, expires_at, {key id: PEM certificate})
+_rejected = OrderedDict()  # token -> expires_at, least recently rejected first
+
+
+def _fetch_certs():
+    """(lifetime in seconds, {key id: certificate}) from the certs endpoint."""
+    url = current_app.config.get("GOOGLE_CERTS_URL", GOOGLE_CERTS_URL)
+    response = google_requests.Request()(url, method="GET")
+    if response.status != 200:
+        raise exceptions.TransportError(f"Could not fetch certificates at {url}")
+
+    match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+    ttl = int(match.group(1)) if match else DEFAULT_CERTS_TTL_SECONDS
+    return ttl, json.loads(response.data.decode("utf-8"))
+
+
+def get_certs(key_id=None) -> dict:
+    """Google's certificates, from the cache unless expired or missing ``key_id``."""
+    global _certs
+    now = time.monotonic()
+    with _lock:
+        cached = _certs
+    if cached is not None and now < cached[1]:
+        fetched_at, _expires_at, certs = cached
+        if key_id is None or key_id in certs or now - fetched_at < MIN_REFETCH_SECONDS:
+            return certs
+
+    ttl, certs = _fetch_certs()
+    with _lock:
+        _certs = (now, now + ttl, certs)
+    return certs
+
+
+def _is_rejected(token) -> bool:
+    with _lock:
+        expires_at = _rejected.get(token)
+        if expires_at is None:
+            return False
+        if expires_at > time.monotonic():
+            return True
+        del _rejected[token]
+        return False
+
+
+def _reject(token):
+    ttl = current_app.config.get("GOOGLE_TOKEN_NEGATIVE_TTL_SECONDS", DEFAULT_NEGATIVE_TTL_SECONDS)
+    with _lock:
+        _rejected[token] = time.monotonic() + ttl
+        _rejected.move_to_end(token)
+        while len(_rejected) > NEGATIVE_CACHE_SIZE:
+            _rejected.popitem(last=False)
+
+
+def verify(token, audience):
+    """Claims of a valid Google ID token issued for ``audience``, or None.
+
+    Raises google.auth.exceptions.TransportError when the certificates cannot be
+    fetched; the token is not remembered as rejected in that case.
+    """
+    if _is_rejected(token):
+        return None
+    try:
+        key_id = jwt.decode_header(token).get("kid")
+        claims = jwt.decode(token, certs=get_certs(key_id), audience=audience)
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {claims.get('iss')}")
+    except ValueError:  # malformed, badly signed, expired or for another audience
+        _reject(token)
+        return None
+    return claims
+
+
+def invalidate():
+    """Forget the cached certificates and rejected tokens."""
+    global _certs
+    with _lock:
+        _certs = None
+        _rejected.clear()
+
+
+model_events.register_cache(invalidate)
@@ -0,0 +1,91 @@
+"""
+Short-lived, process-level cache of authenticated users.
+
+Every protected request resolves its bearer token to a User. Within the TTL
+(``AUTH_CACHE_TTL_SECONDS``) this cache answers that from memory: users are kept
+as plain column values keyed by id, and Google ID tokens that were already
+verified are mapped straight to their user id. Committed writes to the users
+table drop the affected users (through ``model_events``), so role and profile
+changes apply on the next request; the TTL bounds staleness from writes made by
+other processes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from models import User
+from services import model_events
+
+DEFAULT_TTL_SECONDS = 60
+GOOGLE_TOKEN_CACHE_SIZE = 1024
+
+_lock = threading.Lock()
+_users = {}  # user_id -> (expires_at, {column: value})
+_google_tokens = OrderedDict()  # Google ID token -> (expires_at, user_id), oldest first
+
+
+def _ttl():
+    return current_app.config.get("AUTH_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+
+
+def _fresh(entry):
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return entry[1]
+
+
+def get_user_values(user_id):
+    """Cached column values of a user, or None if unknown or expired."""
+    with _lock:
+        return _fresh(_users.get(user_id))
+
+
+def remember_user(user):
+    """Cache a loaded user's column values."""
+    values = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+    with _lock:
+        _users[user.id] = (time.monotonic() + _ttl(), values)
+
+
+def google_token_user_id(token):
+    """User id a verified Google ID token resolved to, or None."""
+    with _lock:
+        return _fresh(_google_tokens.get(token))
+
+
+def remember_google_token(token, user_id):
+    with _lock:
+        _google_tokens[token] = (time.monotonic() + _ttl(), user_id)
+        _google_tokens.move_to_end(token)
+        # Tokens are per sign-in, so distinct ones keep arriving: bound the cache
+        while len(_google_tokens) > GOOGLE_TOKEN_CACHE_SIZE:
+            _google_tokens.popitem(last=False)
+
+
+def invalidate(user_id=None):
+    """Forget one user, or every cached user and token when no id is given."""
+    with _lock:
+        if user_id is None:
+            _users.clear()
+            _google_tokens.clear()
+        else:
+            _users.pop(user_id, None)
+
+
+@model_events.subscribe
+def _on_commit(changes):
+    for change in changes:
+        if change.table != User.__tablename__:
+            continue
+        ids = {values.get("id") for values in (change.old, change.new) if values}
+        if change.op == "bulk" or None in ids or not ids:
+            invalidate()
+            return
+        for user_id in ids:
+            invalidate(user_id)
+
+
+model_events.register_cache(invalidate)
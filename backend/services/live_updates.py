@@ -0,0 +1,96 @@
+"""
+Live schedule events, published per week through services/pubsub.py.
+
+Committed assignment changes are turned into events on the channel of their
+week (via model_events, so routes and the scheduler alike publish them):
+
+- ``{"type": "assignment", "op": "created" | "updated" | "deleted", "id", "user_id"}``.
+  An assignment moved to another week or user is "deleted" for the old one and
+  "created" for the new one.
+- ``{"type": "reload"}`` for set-based writes whose rows are unknown.
+- ``{"type": "scheduler_run", "scheduled"}`` when an auto-scheduler run
+  finishes (``scheduler_finished``).
+
+Events carry ids only; clients fetch what they need (e.g. GET /api/changes).
+
+Each open stream holds a server thread, so ``open_stream`` caps how many are
+open at once. The route answers 503 past the cap and the client polls instead.
+"""
+
+import threading
+
+from services import model_events, pubsub
+from services.model_events import Change
+
+ALL_WEEKS = "week:*"
+
+_lock = threading.Lock()
+_open_streams = 0
+
+
+def channel(week_start_date) -> str:
+    """Channel of one week's events."""
+    return f"week:{week_start_date.isoformat()}"
+
+
+def _scope(values, fallback):
+    return (
+        values.get("week_start_date", fallback["week_start_date"]),
+        values.get("user_id", fallback["user_id"]),
+    )
+
+
+def events_for(change: Change) -> list:
+    """``(channel, event)`` pairs announcing a committed assignment change."""
+    if change.op == "bulk":
+        week = (change.new or {}).get("week_start_date")
+        return [(channel(week) if week else ALL_WEEKS, {"type": "reload"})]
+
+    def event(op, values):
+        return (
+            channel(values["week_start_date"]),
+            {"type": "assignment", "op": op, "id": values["id"], "user_id": values["user_id"]},
+        )
+
+    if change.op == "insert":
+        return [event("created", change.new)]
+    if change.op == "delete":
+        return [event("deleted", change.old)]
+    old = dict(change.new, **change.old)
+    if _scope(change.old, change.new) != _scope(change.new, change.new):
+        return [event("deleted", old), event("created", change.new)]
+    return [event("updated", change.new)]
+
+
+@model_events.subscribe
+def _publish(changes):
+    for change in changes:
+        if change.table == "assignments":
+            for name, event in events_for(change):
+                pubsub.publish(name, event)
+
+
+def scheduler_finished(week_start_date, scheduled):
+    pubsub.publish(channel(week_start_date), {"type": "scheduler_run", "scheduled": scheduled})
+
+
+def visible_to(event, viewer) -> bool:
+    """Whether ``viewer`` may receive ``event``: students only hear about their own shifts."""
+    return viewer.role == "admin" or event.get("user_id", viewer.id) == viewer.id
+
+
+def open_stream(limit) -> bool:
+    """Claim one of ``limit`` concurrent streams; False when all are taken."""
+    global _open_streams
+    with _lock:
+        if _open_streams >= limit:
+            return False
+        _open_streams += 1
+        return True
+
+
+def close_stream():
+    """Release a stream claimed with ``open_stream``."""
+    global _open_streams
+    with _lock:
+        _open_streams -= 1
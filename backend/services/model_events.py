@@ -0,0 +1,232 @@
+"""
+Commit-time change notifications for in-process caches.
+
+Services that keep week-scoped data in memory subscribe here instead of every
+write route having to remember which caches to poke. SQLAlchemy session events
+collect the rows touched by each flush (with their old and new column values)
+and hand them to subscribers once the transaction commits; work that is rolled
+back is discarded.
+
+Set-based statements (``Query.update``/``delete``, bulk ``insert``) do not go
+through the unit of work, so they are reported as coarse ``"bulk"`` changes
+for their table. Code that runs a bulk statement and knows its scope can call
+``record_bulk`` and pass ``execution_options={"changes_recorded": True}`` so
+subscribers only drop what actually changed.
+
+``WeekCache`` packages the common case: a per-week value loaded on demand and
+dropped when one of a few tables commits a change.
+"""
+
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from database import db
+
+_PENDING_KEY = "model_events.pending"
+
+_subscribers = []
+_caches = []
+
+
+class Change(namedtuple("Change", ["table", "op", "old", "new"])):
+    """A committed row change.
+
+    ``op`` is ``"insert"``, ``"update"``, ``"delete"`` or ``"bulk"``. ``old`` and
+    ``new`` are dicts of column values; keys whose value is not known are left out,
+    and bulk changes only carry the columns that describe their scope (if any).
+    """
+
+    __slots__ = ()
+
+    @property
+    def weeks(self):
+        """Distinct week_start_date values touched by this change (may be empty)."""
+        weeks = set()
+        for values in (self.old, self.new):
+            if values and values.get("week_start_date") is not None:
+                weeks.add(values["week_start_date"])
+        return weeks
+
+
+def subscribe(callback):
+    """Register ``callback(changes)`` to run after every commit that changed rows."""
+    _subscribers.append(callback)
+    return callback
+
+
+def register_cache(clear):
+    """Register a cache's ``clear`` function so it can be reset with ``clear_caches``."""
+    _caches.append(clear)
+    return clear
+
+
+def clear_caches():
+    """Drop every registered in-process cache (used after schema resets and in tests)."""
+    for clear in _caches:
+        clear()
+
+
+def record_bulk(session, table, **scope):
+    """Report a set-based write on ``table`` limited to ``scope`` (e.g. week_start_date)."""
+    _pending(session).append(Change(table, "bulk", None, dict(scope) or None))
+
+
+def has_pending(session):
+    """True if the session has flushed or recorded changes that are not committed yet."""
+    return bool(session.info.get(_PENDING_KEY))
+
+
+def pending_changes(session) -> list:
+    """Changes flushed or recorded in the session's current transaction so far."""
+    return list(session.info.get(_PENDING_KEY, ()))
+
+
+class WeekCache:
+    """Thread-safe ``week_start_date -> value`` cache invalidated by committed changes.
+
+    A commit touching one of ``tables`` drops the weeks it names when the table is
+    listed in ``week_scoped`` (and the change carries week_start_date), otherwise
+    every cached week. Subclasses can override ``apply_change`` to update cached
+    values in place instead, and ``finish_commit`` to publish what a whole commit
+    changed at once; both are called with the lock held.
+    """
+
+    def __init__(self, loader, tables, week_scoped=()):
+        self._loader = loader
+        self.tables = frozenset(tables)
+        self.week_scoped = frozenset(week_scoped)
+        self.values = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped on every relevant commit; guards against stale loads
+        subscribe(self._on_commit)
+        register_cache(self.invalidate)
+
+    def get(self, week_start_date):
+        """Return the cached value for a week, loading it on first use."""
+        with self._lock:
+            value = self.values.get(week_start_date)
+            generation = self._generation
+        if value is not None:
+            return value
+
+        with db.session.no_autoflush:
+            value = self._loader(week_start_date)
+        if has_pending(db.session):
+            # The transaction already holds flushed writes; they are applied on commit,
+            # so don't cache a snapshot that includes them.
+            return value
+        with self._lock:
+            if generation != self._generation:
+                # Another commit landed while we were loading; serve but don't cache.
+                return value
+            return self.values.setdefault(week_start_date, value)
+
+    def invalidate(self, week_start_date=None):
+        """Drop one cached week, or every cached week when no week is given."""
+        with self._lock:
+            if week_start_date is None:
+                self.values.clear()
+            else:
+                self.values.pop(week_start_date, None)
+
+    def drop(self, weeks):
+        """Drop the given weeks, or everything if the scope is unknown (lock held)."""
+        if weeks:
+            for week in weeks:
+                self.values.pop(week, None)
+        else:
+            self.values.clear()
+
+    def apply_change(self, change):
+        if change.table in self.week_scoped:
+            self.drop(change.weeks)
+        else:
+            self.values.clear()
+
+    def finish_commit(self):
+        """Called once after a commit's changes have been applied (lock held)."""
+
+    def _on_commit(self, changes):
+        relevant = [change for change in changes if change.table in self.tables]
+        if not relevant:
+            return
+        with self._lock:
+            self._generation += 1
+            for change in relevant:
+                if not self.values:
+                    break
+                self.apply_change(change)
+            self.finish_commit()
+
+
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, [])
+
+
+def _loaded_values(state):
+    """Column values currently loaded on an instance, without triggering lazy loads."""
+    loaded = state.dict
+    return {attr.key: loaded[attr.key] for attr in state.mapper.column_attrs if attr.key in loaded}
+
+
+def _old_values(state):
+    """Pre-flush column values of a dirty instance; unknown values are omitted."""
+    old = {}
+    for attr in state.mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        if history.deleted:
+            old[attr.key] = history.deleted[0]
+        elif history.unchanged:
+            old[attr.key] = history.unchanged[0]
+    return old
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flush(session, flush_context):
+    pending = _pending(session)
+    for obj in session.new:
+        state = inspect(obj)
+        pending.append(Change(state.mapper.local_table.name, "insert", None, _loaded_values(state)))
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        state = inspect(obj)
+        pending.append(
+            Change(
+                state.mapper.local_table.name, "update", _old_values(state), _loaded_values(state)
+            )
+        )
+    for obj in session.deleted:
+        state = inspect(obj)
+        pending.append(Change(state.mapper.local_table.name, "delete", _loaded_values(state), None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        return
+    if orm_execute_state.execution_options.get("changes_recorded"):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:  # pragma: no cover - textual statements have no table to report
+        return
+    record_bulk(orm_execute_state.session, mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    for callback in _subscribers:
+        callback(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_PENDING_KEY, None)
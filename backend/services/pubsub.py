@@ -0,0 +1,108 @@
+"""
+Publish/subscribe of small JSON-able messages between requests.
+
+``publish(channel, message)`` hands a message to every current subscriber of
+the channel; ``subscribe(*channels)`` returns a ``Subscription`` to read them
+from. Nothing is stored: a subscriber only sees messages published while it is
+subscribed.
+
+The default ``InProcessBroker`` delivers within one process through
+thread-safe queues, which covers gthread workers and, with gevent's
+monkey-patching, gevent workers. Deployments with several processes install a
+shared broker with ``set_broker``. An adapter over e.g. Redis pub/sub only has
+to provide the same ``publish`` and ``subscribe`` methods, with subscriptions
+offering ``get(timeout)`` and ``close()``.
+"""
+
+import queue
+import threading
+
+QUEUE_SIZE = 100
+# Sent instead of the messages a slow subscriber missed
+OVERFLOW = {"type": "reload"}
+
+
+class Subscription:
+    """Messages published to its channels since subscribing, oldest first."""
+
+    def __init__(self, broker, channels):
+        self._broker = broker
+        self.channels = channels
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._overflowed = False
+
+    def deliver(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self._overflowed = True
+
+    def get(self, timeout=None):
+        """The next message, or None if none arrives within ``timeout`` seconds."""
+        if self._overflowed:
+            self._overflowed = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return OVERFLOW
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Broker delivering to the subscribers of this process."""
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    def subscribe(self, *channels):
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self._subscriptions.pop(channel, None)
+
+    def subscriber_count(self, channel) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(channel, ()))
+
+
+_broker = InProcessBroker()
+
+
+def set_broker(broker):
+    """Use ``broker`` for every later publish and subscribe (None restores the default)."""
+    global _broker
+    _broker = broker or InProcessBroker()
+
+
+def broker():
+    return _broker
+
+
+def publish(channel, message):
+    _broker.publish(channel, message)
+
+
+def subscribe(*channels):
+    """A ``Subscription`` to every message later published to any of ``channels``."""
+    return _broker.subscribe(*channels)
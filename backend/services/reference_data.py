@@ -0,0 +1,154 @@
+"""
+In-process cache of the admin-edited reference tables.
+
+Locations, time slots, day schedules and global settings are read on almost every
+request but only change when an admin edits them. ``get_reference_data`` returns
+one consistent, read-only snapshot of all four, loaded with four queries and kept
+until a commit touches any of the tables (through ``model_events``, so the write
+endpoints in routes/locations.py, routes/time_slots.py, routes/settings.py and
+routes/weekly_overrides.py invalidate it without extra calls). Every snapshot has
+a new ``version``, which callers can use to tell whether anything changed.
+"""
+
+import itertools
+from collections import Counter, namedtuple
+
+from models import DaySchedule, GlobalSettings, Location, TimeSlot
+from services import model_events
+from services.week_grid import GridSlot
+
+DEFAULT_MAX_WORKERS = 3
+
+
+class LocationRef(namedtuple("LocationRef", ["id", "name", "description", "is_active"])):
+    """Detached, read-only view of a Location."""
+
+    __slots__ = ()
+
+    to_dict = Location.to_dict
+
+
+class DayScheduleRef(
+    namedtuple(
+        "DayScheduleRef",
+        ["id", "day_of_week", "start_time", "end_time", "slot_duration_minutes", "is_active"],
+    )
+):
+    """Detached, read-only view of a DaySchedule."""
+
+    __slots__ = ()
+
+    to_dict = DaySchedule.to_dict
+    get_day_name = DaySchedule.get_day_name
+
+
+class SettingsRef(
+    namedtuple("SettingsRef", ["id", "max_workers_per_shift", "max_hours_per_user_per_week"])
+):
+    """Detached, read-only view of the GlobalSettings row."""
+
+    __slots__ = ()
+
+    to_dict = GlobalSettings.to_dict
+
+
+class ReferenceData:
+    """Snapshot of locations, time slots, day schedules and settings (read-only)."""
+
+    def __init__(self, version, locations, time_slots, day_schedules, settings):
+        self.version = version
+        self.locations = {location.id: location for location in locations}
+        self.time_slots = {slot.id: slot for slot in time_slots}
+        self.day_schedules = tuple(day_schedules)  # ordered by day_of_week
+        self.settings = settings  # None until the settings row is created
+
+        # (day_of_week, start_time, end_time) -> slot; ids ascending, so the lowest wins
+        self.slot_by_time = {}
+        for slot in self.time_slots.values():
+            self.slot_by_time.setdefault((slot.day_of_week, slot.start_time, slot.end_time), slot)
+        self.slot_counts = Counter(slot.day_of_week for slot in self.time_slots.values())
+
+    def active_locations(self) -> list:
+        return [location for location in self.locations.values() if location.is_active]
+
+    def active_day_schedules(self) -> list:
+        return [schedule for schedule in self.day_schedules if schedule.is_active]
+
+    def first_slot_of_day(self, day_of_week):
+        """Lowest-id slot of a day, or None."""
+        return next(
+            (slot for slot in self.time_slots.values() if slot.day_of_week == day_of_week), None
+        )
+
+    @property
+    def max_workers_per_shift(self):
+        return self.settings.max_workers_per_shift if self.settings else DEFAULT_MAX_WORKERS
+
+
+_versions = itertools.count(1)
+
+
+def load_reference_data() -> ReferenceData:
+    """Read all reference tables straight from the database (four queries, no caching)."""
+    locations = [
+        LocationRef(*row)
+        for row in Location.query.with_entities(
+            Location.id, Location.name, Location.description, Location.is_active
+        ).order_by(Location.id)
+    ]
+    time_slots = [
+        GridSlot(*row)
+        for row in TimeSlot.query.with_entities(
+            TimeSlot.id, TimeSlot.day_of_week, TimeSlot.start_time, TimeSlot.end_time
+        ).order_by(TimeSlot.id)
+    ]
+    day_schedules = [
+        DayScheduleRef(*row)
+        for row in DaySchedule.query.with_entities(
+            DaySchedule.id,
+            DaySchedule.day_of_week,
+            DaySchedule.start_time,
+            DaySchedule.end_time,
+            DaySchedule.slot_duration_minutes,
+            DaySchedule.is_active,
+        ).order_by(DaySchedule.day_of_week)
+    ]
+    settings = (
+        GlobalSettings.query.with_entities(
+            GlobalSettings.id,
+            GlobalSettings.max_workers_per_shift,
+            GlobalSettings.max_hours_per_user_per_week,
+        )
+        .order_by(GlobalSettings.id)
+        .first()
+    )
+    return ReferenceData(
+        next(_versions),
+        locations,
+        time_slots,
+        day_schedules,
+        SettingsRef(*settings) if settings else None,
+    )
+
+
+# A WeekCache with a single entry: every change to these tables drops the snapshot
+_KEY = "reference"
+_cache = model_events.WeekCache(
+    lambda _key: load_reference_data(),
+    tables=(
+        Location.__tablename__,
+        TimeSlot.__tablename__,
+        DaySchedule.__tablename__,
+        GlobalSettings.__tablename__,
+    ),
+)
+
+
+def get_reference_data() -> ReferenceData:
+    """Return the cached reference data snapshot, loading it on first use."""
+    return _cache.get(_KEY)
+
+
+def invalidate():
+    """Drop the cached snapshot."""
+    _cache.invalidate()
@@ -0,0 +1,90 @@
+"""
+Cache of serialized read responses.
+
+routes/http_cache.py stores each 200 response of a ``conditional`` view under
+its ETag. The ETag already covers the URL, the viewer and the write counters
+the response depends on (services/data_versions.py). A write changes the ETag
+of exactly the responses it affects, so entries are never invalidated by hand:
+stale ones are simply no longer asked for and age out.
+
+The backend is pluggable. By default every process keeps its own LRU of
+``RESPONSE_CACHE_SIZE`` entries (0 disables caching). A deployment with several
+workers can install a shared store with ``set_backend``, e.g. a thin wrapper
+around a Redis client. Any object with ``get(key)``, ``set(key, value)`` and
+``clear()`` works.
+"""
+
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from services import model_events
+
+DEFAULT_SIZE = 256
+
+
+class MemoryBackend:
+    """Thread-safe in-process LRU of at most ``size`` entries."""
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_backend = None
+
+
+def set_backend(backend):
+    """Use ``backend`` for every later lookup (None restores the default LRU)."""
+    global _backend
+    _backend = backend
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        _backend = MemoryBackend(current_app.config.get("RESPONSE_CACHE_SIZE", DEFAULT_SIZE))
+    return _backend
+
+
+def get(key):
+    """The cached ``(body, mimetype)`` for ``key``, or None."""
+    return backend().get(key)
+
+
+def put(key, body, mimetype):
+    backend().set(key, (body, mimetype))
+
+
+def invalidate():
+    """Drop every cached response."""
+    if _backend is not None:
+        _backend.clear()
+
+
+model_events.register_cache(invalidate)
@@ -1,13 +1,18 @@
 from database import db
 from models import (
     Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
     GlobalSettings,
-    Location,
     ShiftRequirement,
-    TimeSlot,
     User,
     UserAvailability,
 )
+from services.availability import get_week_availability
+from services.bulk import delete_orphans
+from services.capacity import get_week_capacity
+from services.reference_data import get_reference_data
+from services.week_grid import get_week_grid
 
 
 def calculate_hours(time_slot):
@@ -61,40 +66,39 @@ def get_current_assignment_count(time_slot_id, location_id, week_start_date):
 
 
 def cleanup_orphaned_records():
-    """Clean up UserAvailability and Assignment records that reference deleted time slots"""
-    # Get all valid time slot IDs
-    valid_slot_ids = [ts.id for ts in TimeSlot.query.all()]
-
-    if not valid_slot_ids:
-        # No time slots exist, delete all availabilities and assignments
-        UserAvailability.query.delete()
-        Assignment.query.delete()
-        db.session.commit()
-        return
-
-    # Delete orphaned availabilities
-    orphaned_avails = UserAvailability.query.filter(
-        ~UserAvailability.time_slot_id.in_(valid_slot_ids)
-    ).all()
-    for av in orphaned_avails:
-        db.session.delete(av)
-
-    # Delete orphaned assignments
-    orphaned_assigns = Assignment.query.filter(~Assignment.time_slot_id.in_(valid_slot_ids)).all()
-    for a in orphaned_assigns:
-        db.session.delete(a)
+    """Delete availabilities (rows, exceptions and bitmaps), assignments and shift
+    requirements whose time slot, location or user no longer exists.
 
-    if orphaned_avails or orphaned_assigns:
-        db.session.commit()
+    Runs as batched DELETE ... WHERE NOT EXISTS statements; nothing is loaded into
+    Python. Returns {table name: rows deleted}.
+    """
+    counts = {
+        model.__tablename__: delete_orphans(model)
+        for model in (
+            UserAvailability,
+            AvailabilityException,
+            AvailabilityBitmap,
+            Assignment,
+            ShiftRequirement,
+        )
+    }
+    if any(counts.values()):
         print(
-            f"Cleaned up {len(orphaned_avails)} orphaned availabilities and {len(orphaned_assigns)} orphaned assignments"
+            f"Cleaned up {counts['user_availability']} orphaned availabilities, "
+            f"{counts['availability_exceptions']} orphaned availability exceptions, "
+            f"{counts['availability_bitmaps']} orphaned availability bitmaps, "
+            f"{counts['assignments']} orphaned assignments and "
+            f"{counts['shift_requirements']} orphaned shift requirements"
         )
+    return counts
 
 
 def run_auto_scheduler(week_start_date):
     """
     Capacity-based auto-scheduler:
     - Uses max_workers_per_shift as the default capacity for ALL slots
+    - Capacity and overlap rules come from services.capacity, the same oracle the
+      assignment routes validate against
     - Fills slots based on who's actually available (up to capacity)
     - ShiftRequirement entries are optional overrides (for exceptions only)
 
@@ -107,17 +111,16 @@ def run_auto_scheduler(week_start_date):
     # NOTE: We intentionally do NOT auto-delete availabilities/assignments here.
     # That cleanup utility is only for one-off maintenance, not regular runs.
     # Get global settings
-    settings = GlobalSettings.query.first()
+    reference = get_reference_data()
+    settings = reference.settings
     if not settings:
         settings = GlobalSettings(max_workers_per_shift=3, max_hours_per_user_per_week=None)
         db.session.add(settings)
         db.session.commit()
 
-    default_max = settings.max_workers_per_shift
-
-    # Get all time slots and active locations
-    time_slots = TimeSlot.query.all()
-    locations = Location.query.filter_by(is_active=True).all()
+    # Only the slots this week's day schedules/overrides actually define
+    time_slots = get_week_grid(week_start_date)
+    locations = reference.active_locations()
 
     if not time_slots:
         return {"message": "No time slots configured", "scheduled": 0, "assignments": []}
@@ -125,11 +128,11 @@ def run_auto_scheduler(week_start_date):
     if not locations:
         return {"message": "No active locations configured", "scheduled": 0, "assignments": []}
 
-    # Build a map of explicit capacity overrides (optional)
-    requirements = ShiftRequirement.query.filter_by(week_start_date=week_start_date).all()
-    override_map = {}  # key: (location_id, time_slot_id) -> max_workers
-    for req in requirements:
-        override_map[(req.location_id, req.time_slot_id)] = req.required_workers
+    # Capacities (global default or ShiftRequirement override) and current head counts,
+    # shared with the assignment routes. Work on a private copy until we commit.
+    capacity = get_week_capacity(week_start_date).copy()
+    # Everyone's effective availability (templates, exceptions and explicit rows)
+    availability = get_week_availability(week_start_date)
 
     scheduled_count = 0
     assignment_details = []
@@ -137,36 +140,29 @@ def run_auto_scheduler(week_start_date):
 
     for location in locations:
         for time_slot in time_slots:
-            # Get max capacity: use override if exists, otherwise global default
-            max_capacity = override_map.get((location.id, time_slot.id), default_max)
+            max_capacity = capacity.capacity(location.id, time_slot.id)
 
             if max_capacity == 0:
                 skipped_slots += 1
                 continue  # Explicitly blocked slot
 
-            # Check how many are already assigned to this slot
-            current_count = get_current_assignment_count(time_slot.id, location.id, week_start_date)
-
             # Calculate remaining capacity
-            remaining_capacity = max_capacity - current_count
+            remaining_capacity = capacity.remaining(location.id, time_slot.id)
             if remaining_capacity <= 0:
                 continue  # Slot already at capacity
 
             # Get available users for this location/time slot
-            availabilities = UserAvailability.query.filter_by(
-                location_id=location.id, time_slot_id=time_slot.id, week_start_date=week_start_date
-            ).all()
+            available = availability.for_slot(location.id, time_slot.id)
 
-            if not availabilities:
+            if not available:
                 continue
 
             # Filter and score candidates
             candidates = []
-            for avail in availabilities:
-                user_id = avail.user_id
+            for user_id, preference_level in available.items():
 
-                # Skip if already assigned to this exact shift
-                if has_overlapping_assignment(user_id, time_slot.id, location.id, week_start_date):
+                # Skip if already working this time slot (at any location)
+                if capacity.is_user_busy(user_id, time_slot.id):
                     continue
 
                 # Check max hours constraint
@@ -183,14 +179,13 @@ def run_auto_scheduler(week_start_date):
                 # - Prefer workers with fewer hours (load balancing)
                 # - Prefer "preferred" slots (preference_level = 2) over "available" (= 1)
                 # Lower score = higher priority
-                priority = (current_hours * 100) - (avail.preference_level * 10)
+                priority = (current_hours * 100) - (preference_level * 10)
 
                 candidates.append(
                     {
                         "user_id": user_id,
-                        "availability": avail,
                         "current_hours": current_hours,
-                        "preference": avail.preference_level,
+                        "preference": preference_level,
                         "priority": priority,
                     }
                 )
@@ -205,10 +200,6 @@ def run_auto_scheduler(week_start_date):
                 candidate = candidates[i]
                 user_id = candidate["user_id"]
 
-                # Double-check no overlap (race condition protection)
-                if has_overlapping_assignment(user_id, time_slot.id, location.id, week_start_date):
-                    continue
-
                 assignment = Assignment(
                     user_id=user_id,
                     location_id=location.id,
@@ -217,6 +208,7 @@ def run_auto_scheduler(week_start_date):
                     assigned_by=None,  # System assignment
                 )
                 db.session.add(assignment)
+                capacity.add(user_id, location.id, time_slot.id)
                 scheduled_count += 1
 
                 # Get user name for details
@@ -0,0 +1,56 @@
+"""
+Serializers for the list endpoints.
+
+Each serializer declares the relationships its dicts read. ``query(model)``
+eager-loads them (``joinedload``: they are all many-to-one, so the rows come
+back in the same single query), so serializing a list costs one query no matter
+how long it is. ``dump`` turns loaded rows into dicts and does per-row work
+shared by many rows once, e.g. an assignment's slot dict and start/end
+datetimes are computed once per (week, slot) rather than once per assignment.
+
+Endpoints that return a week's rows pass ``query`` to ``archive.week_rows``:
+archive models declare the same relationships as the hot ones.
+"""
+
+from sqlalchemy.orm import joinedload
+
+from models import assignment_slot_fields
+
+
+class Serializer:
+    """Serializer for rows whose dicts only read their own columns."""
+
+    relationships = ()
+
+    def query(self, model):
+        """``model.query`` with the declared relationships eager-loaded."""
+        return model.query.options(*(joinedload(getattr(model, rel)) for rel in self.relationships))
+
+    def dump(self, rows) -> list:
+        return [row.to_dict() for row in rows]
+
+
+class AssignmentSerializer(Serializer):
+    relationships = ("user", "location", "time_slot")
+
+    def dump(self, rows) -> list:
+        slot_fields = {}  # (week_start_date, time_slot_id) -> assignment_slot_fields(...)
+        result = []
+        for row in rows:
+            key = (row.week_start_date, row.time_slot_id)
+            if key not in slot_fields:
+                slot_fields[key] = assignment_slot_fields(row.week_start_date, row.time_slot)
+            result.append(row.to_dict(slot_fields=slot_fields[key]))
+        return result
+
+
+class WeeklyOverrideSerializer(Serializer):
+    def dump(self, rows) -> list:
+        return [dict(row.to_dict(), day_name=row.get_day_name()) for row in rows]
+
+
+assignments = AssignmentSerializer()
+availability = Serializer()
+shift_requirements = Serializer()
+weekly_overrides = WeeklyOverrideSerializer()
+users = Serializer()
@@ -0,0 +1,120 @@
+"""
+Signed, self-describing app tokens.
+
+The token issued after login carries the user id, role and a random token id
+(``jti``), timestamped and signed with ``SECRET_KEY``, so any worker or process
+sharing that key can verify it without shared state. Tokens expire after
+``APP_TOKEN_MAX_AGE_SECONDS``. Logging out revokes a token by storing its id in
+``revoked_tokens`` until it would have expired anyway. Each process caches the
+set of revoked ids; it is reloaded after a revocation in this process, and every
+``AUTH_CACHE_TTL_SECONDS`` to pick up revocations made by other processes.
+
+Anyone who knows the key can sign tokens for any user and role. The public
+``DEV_SECRET_KEY`` local development falls back to is therefore refused outside
+debug mode and tests: tokens are neither issued nor accepted with it.
+"""
+
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from database import db
+from models import RevokedToken
+from services import identity_cache, model_events
+
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+_SALT = "mulescheduler.app-token"
+# SECRET_KEY of local development when none is set (app.py); public, so never trusted elsewhere
+DEV_SECRET_KEY = "dev-secret-key-change-in-production"
+
+_lock = threading.Lock()
+_revoked = None  # (expires_at, frozenset of revoked token ids)
+
+
+def _serializer():
+    key = current_app.config.get("SECRET_KEY")
+    if not key or (key == DEV_SECRET_KEY and not (current_app.debug or current_app.testing)):
+        raise RuntimeError("SECRET_KEY must be set to sign login tokens")
+    return URLSafeTimedSerializer(key, salt=_SALT)
+
+
+def _max_age():
+    return current_app.config.get("APP_TOKEN_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS)
+
+
+def issue(user) -> str:
+    """Sign a new token for ``user``."""
+    return _serializer().dumps(
+        {"uid": user.id, "role": user.role, "jti": secrets.token_urlsafe(12)}
+    )
+
+
+def _load(token):
+    """(claims, issued_at) of a signed, unexpired and unrevoked token, or None."""
+    try:
+        claims, issued_at = _serializer().loads(token, max_age=_max_age(), return_timestamp=True)
+    except BadSignature:  # includes SignatureExpired
+        return None
+    if claims["jti"] in _revoked_ids():
+        return None
+    return claims, issued_at
+
+
+def verify(token):
+    """Claims ({"uid", "role", "jti"}) of a valid token, or None."""
+    loaded = _load(token)
+    return loaded[0] if loaded else None
+
+
+def revoke(token) -> bool:
+    """Revoke a valid token; returns False if it was not valid to begin with."""
+    loaded = _load(token)
+    if loaded is None:
+        return False
+    claims, issued_at = loaded
+
+    now = datetime.utcnow()
+    expires_at = issued_at.replace(tzinfo=None) + timedelta(seconds=_max_age())
+    # Tokens that have expired no longer need to be remembered
+    RevokedToken.query.filter(RevokedToken.expires_at <= now).delete()
+    db.session.merge(RevokedToken(jti=claims["jti"], expires_at=expires_at))
+    db.session.commit()
+    return True
+
+
+def _revoked_ids():
+    global _revoked
+    with _lock:
+        if _revoked is not None and _revoked[0] > time.monotonic():
+            return _revoked[1]
+
+    ids = frozenset(
+        db.session.scalars(
+            db.select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+        )
+    )
+    ttl = current_app.config.get("AUTH_CACHE_TTL_SECONDS", identity_cache.DEFAULT_TTL_SECONDS)
+    with _lock:
+        _revoked = (time.monotonic() + ttl, ids)
+    return ids
+
+
+def invalidate():
+    """Forget the cached revocation list."""
+    global _revoked
+    with _lock:
+        _revoked = None
+
+
+@model_events.subscribe
+def _on_commit(changes):
+    if any(change.table == RevokedToken.__tablename__ for change in changes):
+        invalidate()
+
+
+model_events.register_cache(invalidate)
@@ -0,0 +1,56 @@
+"""
+Coalescing of identical concurrent computations.
+
+``SingleFlight.do(key, func)`` runs ``func`` once for all threads that ask for
+the same key at the same time: the first caller computes, later callers wait
+for it and get the same result. Nothing is remembered once the computation
+finishes (services/response_cache.py keeps results); this only stops N
+identical requests that arrive together from doing the work N times.
+
+If the computation raises, the waiting callers run ``func`` themselves, so an
+error is never handed to a request that did not cause it.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.failed = False
+        self.result = None
+
+
+class SingleFlight:
+    """Per-key coalescing of concurrent calls within one process."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """``func()``, shared with every concurrent caller using the same ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.waiters += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            return func() if call.failed else call.result
+
+        try:
+            call.result = func()
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,124 @@
+"""
+Compaction of the global TimeSlot table.
+
+Template and override changes leave slots behind that no week uses any more.
+Compaction deletes slots that are neither part of a current grid nor referenced
+by any row (archived ones included) or availability bitmap bit. Duplicate slots
+can't exist (TimeSlot is unique on day/start/end), so there is nothing to merge.
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import delete, exists, func, select
+
+from database import db
+from models import (
+    ArchivedAssignment,
+    ArchivedAvailabilityBitmap,
+    ArchivedAvailabilityException,
+    ArchivedShiftRequirement,
+    ArchivedUserAvailability,
+    Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
+    DaySchedule,
+    ShiftRequirement,
+    TimeSlot,
+    UserAvailability,
+    WeeklyScheduleOverride,
+)
+from services import availability_bits
+from services.bulk import chunked
+from services.slot_generator import slot_bounds
+
+_ARCHIVE_MODELS = (
+    ArchivedAssignment,
+    ArchivedUserAvailability,
+    ArchivedAvailabilityException,
+    ArchivedShiftRequirement,
+)
+_REFERENCING_MODELS = (
+    Assignment,
+    UserAvailability,
+    AvailabilityException,
+    ShiftRequirement,
+    *_ARCHIVE_MODELS,
+)
+
+
+def _unreferenced():
+    return [~exists().where(model.time_slot_id == TimeSlot.id) for model in _REFERENCING_MODELS]
+
+
+def _bitmap_slot_ids() -> set:
+    """Slot ids set in any availability bitmap, archived ones included (bits can't be
+    checked in SQL)."""
+    mask = 0
+    for model in (AvailabilityBitmap, ArchivedAvailabilityBitmap):
+        for (data,) in db.session.execute(select(model.data)):
+            for bits in availability_bits.decode(data).values():
+                mask |= bits
+    return set(availability_bits.slot_ids(mask))
+
+
+def _live_bounds(since):
+    """Return (days with a template, {day: {(start, end), ...}} still in use)."""
+    live = {}
+    templated = set()
+    for schedule in DaySchedule.query.all():
+        templated.add(schedule.day_of_week)
+        if schedule.is_active:
+            live.setdefault(schedule.day_of_week, set()).update(slot_bounds(schedule))
+    overrides = WeeklyScheduleOverride.query.filter(
+        WeeklyScheduleOverride.week_start_date >= since,
+        WeeklyScheduleOverride.is_active.is_(True),
+    )
+    for override in overrides:
+        live.setdefault(override.day_of_week, set()).update(slot_bounds(override))
+    return templated, live
+
+
+def find_dead_slots(since=None) -> list:
+    """Ids of unreferenced slots that no template or current/future override defines.
+
+    Slots set in an availability bitmap count as referenced.
+
+    Days without a DaySchedule keep all their slots, matching the week grid.
+    ``since`` defaults to the start of the current week.
+    """
+    if since is None:
+        since = date.today() - timedelta(days=date.today().weekday())
+    templated, live = _live_bounds(since)
+    candidates = db.session.execute(
+        select(TimeSlot.id, TimeSlot.day_of_week, TimeSlot.start_time, TimeSlot.end_time).where(
+            TimeSlot.day_of_week.in_(templated), *_unreferenced()
+        )
+    )
+    in_bitmaps = _bitmap_slot_ids()
+    return [
+        slot_id
+        for slot_id, day, start_time, end_time in candidates
+        if (start_time, end_time) not in live.get(day, ()) and slot_id not in in_bitmaps
+    ]
+
+
+def _delete_slots(slot_ids) -> int:
+    deleted = 0
+    for chunk in chunked(slot_ids):
+        # Re-checked in the statement itself in case a reference appeared meanwhile
+        stmt = delete(TimeSlot).where(TimeSlot.id.in_(chunk), *_unreferenced())
+        result = db.session.execute(stmt.execution_options(synchronize_session=False))
+        deleted += result.rowcount
+    return deleted
+
+
+def compact_slots(since=None, commit: bool = True) -> dict:
+    """Delete dead slots and report what changed.
+
+    Returns {"dead_slots_deleted", "slots_remaining"}.
+    """
+    report = {"dead_slots_deleted": _delete_slots(find_dead_slots(since))}
+    if commit:
+        db.session.commit()
+    report["slots_remaining"] = db.session.scalar(select(func.count(TimeSlot.id)))
+    return report
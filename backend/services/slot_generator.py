@@ -5,23 +5,19 @@ Converts admin-defined day boundaries (e.g., 9am-5pm) into 30-minute interval sl
 
 from datetime import datetime, timedelta
 
+from sqlalchemy import func
+
 from database import db
 from models import DaySchedule, TimeSlot
+from services.bulk import delete_cascading, insert_ignoring_conflicts
 
 
-def generate_slots_for_day(day_schedule) -> list:
+def slot_bounds(day_schedule) -> list:
     """
-    Generate TimeSlot records from a DaySchedule or WeeklyScheduleOverride.
+    Return the (start_time, end_time) pairs a DaySchedule or WeeklyScheduleOverride defines.
     Both have: day_of_week, start_time, end_time, slot_duration_minutes
-
-    Example: DaySchedule(Monday, 9:00, 17:00, 30min) generates:
-    - 9:00-9:30, 9:30-10:00, 10:00-10:30, ..., 16:30-17:00
-
-    Returns list of created TimeSlot objects.
     """
-    created_slots = []
-
-    # Convert times to datetime for easier manipulation
+    bounds = []
     base_date = datetime.today().date()
     start = datetime.combine(base_date, day_schedule.start_time)
     end = datetime.combine(base_date, day_schedule.end_time)
@@ -30,37 +26,71 @@ def generate_slots_for_day(day_schedule) -> list:
     current = start
     while current + duration <= end:
         slot_end = current + duration
+        bounds.append((current.time(), slot_end.time()))
+        current = slot_end
+    return bounds
 
-        # Check if slot already exists for this day/time combination
-        existing = TimeSlot.query.filter_by(
-            day_of_week=day_schedule.day_of_week,
-            start_time=current.time(),
-            end_time=slot_end.time(),
-        ).first()
-
-        if not existing:
-            new_slot = TimeSlot(
-                day_of_week=day_schedule.day_of_week,
-                start_time=current.time(),
-                end_time=slot_end.time(),
-            )
-            db.session.add(new_slot)
-            created_slots.append(new_slot)
 
-        current = slot_end
+def generate_slots_for_days(day_schedules, commit: bool = True) -> list:
+    """
+    Ensure TimeSlot rows exist for every given DaySchedule/WeeklyScheduleOverride.
 
-    db.session.commit()
+    Existing slots for the affected days are read with one query and diffed in memory;
+    the missing ones are inserted with a single INSERT ... ON CONFLICT DO NOTHING, so
+    concurrent generators cannot create duplicates. Pass commit=False to fold the
+    insert into the caller's transaction.
+
+    Returns list of created TimeSlot objects.
+    """
+    wanted = {}  # (day_of_week, start_time, end_time) -> None, in generation order
+    for schedule in day_schedules:
+        for start_time, end_time in slot_bounds(schedule):
+            wanted[(schedule.day_of_week, start_time, end_time)] = None
+
+    created_slots = []
+    if wanted:
+        days = {day for day, _, _ in wanted}
+        existing = set(
+            db.session.query(TimeSlot.day_of_week, TimeSlot.start_time, TimeSlot.end_time).filter(
+                TimeSlot.day_of_week.in_(days)
+            )
+        )
+        missing = [
+            {"day_of_week": day, "start_time": start_time, "end_time": end_time}
+            for day, start_time, end_time in wanted
+            if (day, start_time, end_time) not in existing
+        ]
+        if missing:
+            stmt = insert_ignoring_conflicts(TimeSlot, "day_of_week", "start_time", "end_time")
+            created_slots = list(db.session.scalars(stmt.returning(TimeSlot), missing))
+
+    if commit:
+        db.session.commit()
     return created_slots
 
 
+def generate_slots_for_day(day_schedule) -> list:
+    """
+    Generate TimeSlot records from a DaySchedule or WeeklyScheduleOverride.
+    Both have: day_of_week, start_time, end_time, slot_duration_minutes
+
+    Example: DaySchedule(Monday, 9:00, 17:00, 30min) generates:
+    - 9:00-9:30, 9:30-10:00, 10:00-10:30, ..., 16:30-17:00
+
+    Returns list of created TimeSlot objects.
+    """
+    return generate_slots_for_days([day_schedule])
+
+
 def delete_slots_for_day(day_of_week: int) -> int:
     """
-    Delete all TimeSlot records for a specific day.
+    Delete all TimeSlot records for a specific day, with the availabilities,
+    assignments and shift requirements that reference them.
     Returns count of deleted slots.
     """
-    count = TimeSlot.query.filter_by(day_of_week=day_of_week).delete()
+    counts = delete_cascading(TimeSlot, TimeSlot.day_of_week == day_of_week)
     db.session.commit()
-    return count
+    return counts[TimeSlot.__tablename__]
 
 
 def regenerate_slots_for_day(day_schedule) -> list:
@@ -81,22 +111,18 @@ def regenerate_all_slots() -> dict:
     Clear all existing time slots and regenerate from all active DaySchedules.
     Returns summary of operations.
     """
-    # Delete all existing time slots
-    deleted_count = TimeSlot.query.delete()
-    db.session.commit()
+    # Delete all existing time slots (and everything that references them)
+    deleted_count = delete_cascading(TimeSlot)[TimeSlot.__tablename__]
 
-    # Generate new slots from each active day schedule
+    # Generate new slots from every active day schedule in one insert, one commit
     schedules = DaySchedule.query.filter_by(is_active=True).all()
-    total_created = 0
-    slots_by_day = {}
+    created = generate_slots_for_days(schedules)
 
-    for schedule in schedules:
-        slots = generate_slots_for_day(schedule)
-        day_name = schedule.get_day_name()
-        slots_by_day[day_name] = len(slots)
-        total_created += len(slots)
+    slots_by_day = {schedule.get_day_name(): 0 for schedule in schedules}
+    for slot in created:
+        slots_by_day[slot.get_day_name()] += 1
 
-    return {"deleted": deleted_count, "created": total_created, "by_day": slots_by_day}
+    return {"deleted": deleted_count, "created": len(created), "by_day": slots_by_day}
 
 
 def count_slots_for_day(day_of_week: int) -> int:
@@ -104,6 +130,16 @@ def count_slots_for_day(day_of_week: int) -> int:
     return TimeSlot.query.filter_by(day_of_week=day_of_week).count()
 
 
+def count_slots_by_day() -> dict:
+    """Count time slots for every day in one grouped query: {day_of_week: count}."""
+    rows = (
+        db.session.query(TimeSlot.day_of_week, func.count(TimeSlot.id))
+        .group_by(TimeSlot.day_of_week)
+        .all()
+    )
+    return dict(rows)
+
+
 def preview_slots(start_time_str: str, end_time_str: str, duration_minutes: int = 30) -> list:
     """
     Preview what slots would be generated without actually creating them.
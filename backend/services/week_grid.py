@@ -0,0 +1,78 @@
+"""
+Effective time-slot grid for a given week.
+
+TimeSlot rows are global and accumulate over time: every template change and every
+week's WeeklyScheduleOverride generates slots that stay around for the weeks that
+used them. For one week, a day's real slots are the ones its override defines if
+the week has one, otherwise the ones its active DaySchedule defines; an inactive
+override or template closes the day. Days with neither keep every slot that exists
+for them, so manually created slots keep working.
+
+Grids are cached per week until day schedules, overrides or time slots change.
+"""
+
+from collections import defaultdict, namedtuple
+
+from models import DaySchedule, TimeSlot, WeeklyScheduleOverride
+from services import model_events
+from services.slot_generator import slot_bounds
+
+
+class GridSlot(namedtuple("GridSlot", ["id", "day_of_week", "start_time", "end_time"])):
+    """Detached, read-only view of a TimeSlot that can be shared across requests."""
+
+    __slots__ = ()
+
+    # Same JSON shape and helpers as the model
+    to_dict = TimeSlot.to_dict
+    get_day_name = TimeSlot.get_day_name
+
+
+def load_week_grid(week_start_date) -> tuple:
+    """Resolve the effective slots of a week straight from the database (three queries)."""
+    templates = {schedule.day_of_week: schedule for schedule in DaySchedule.query.all()}
+    overrides = {
+        override.day_of_week: override
+        for override in WeeklyScheduleOverride.query.filter_by(week_start_date=week_start_date)
+    }
+
+    slots_by_day = defaultdict(list)
+    for slot in TimeSlot.query.order_by(
+        TimeSlot.day_of_week, TimeSlot.start_time, TimeSlot.end_time, TimeSlot.id
+    ):
+        slots_by_day[slot.day_of_week].append(
+            GridSlot(slot.id, slot.day_of_week, slot.start_time, slot.end_time)
+        )
+
+    grid = []
+    for day in sorted(slots_by_day):
+        schedule = overrides.get(day) or templates.get(day)
+        if schedule is None:
+            grid.extend(slots_by_day[day])
+        elif schedule.is_active:
+            bounds = set(slot_bounds(schedule))
+            grid.extend(
+                slot for slot in slots_by_day[day] if (slot.start_time, slot.end_time) in bounds
+            )
+    return tuple(grid)
+
+
+_cache = model_events.WeekCache(
+    load_week_grid,
+    tables=(
+        DaySchedule.__tablename__,
+        WeeklyScheduleOverride.__tablename__,
+        TimeSlot.__tablename__,
+    ),
+    week_scoped=(WeeklyScheduleOverride.__tablename__,),
+)
+
+
+def get_week_grid(week_start_date) -> tuple:
+    """Return the cached effective GridSlots of a week, ordered by day and start time."""
+    return _cache.get(week_start_date)
+
+
+def invalidate(week_start_date=None):
+    """Drop one cached week, or every cached week when no week is given."""
+    _cache.invalidate(week_start_date)
@@ -0,0 +1,72 @@
+"""
+One normalized payload per schedule week.
+
+The schedule pages used to load a week with separate assignments, users,
+locations and time-slots requests, and every assignment embedded its user name,
+location name and time slot. ``build_week_schedule`` returns all of it at once:
+assignments refer to users, locations and time slots by id, and each of those is
+listed once. Locations and slots come from the in-process reference-data and
+week-grid caches, so a payload costs the assignments query (two for past weeks,
+which may be archived) plus, for admins, one users query.
+
+Admins get every user and active location, so they can assign anyone anywhere;
+other users only get their own assignments and the rows those refer to.
+"""
+
+from models import Assignment, User
+from services.archive import week_models
+from services.reference_data import get_reference_data
+from services.week_grid import get_week_grid
+
+_ADMIN_FIELDS = ("id", "user_id", "location_id", "time_slot_id", "assigned_by")
+_USER_FIELDS = _ADMIN_FIELDS[:-1]
+
+
+def _assignments(week_start_date, fields, filters) -> list:
+    return [
+        dict(zip(fields, row))
+        for model in week_models(Assignment, week_start_date)
+        for row in model.query.with_entities(*(getattr(model, field) for field in fields))
+        .filter_by(week_start_date=week_start_date, **filters)
+        .order_by(model.id)
+    ]
+
+
+def build_week_schedule(week_start_date, viewer, user_id=None, location_id=None) -> dict:
+    """Assignments of a week with the users, locations and time slots they refer to.
+
+    ``user_id`` and ``location_id`` filter the assignments for admins; other
+    viewers always get only their own.
+    """
+    is_admin = viewer.role == "admin"
+    if is_admin:
+        filters = {"user_id": user_id, "location_id": location_id}
+        filters = {key: value for key, value in filters.items() if value is not None}
+        assignments = _assignments(week_start_date, _ADMIN_FIELDS, filters)
+    else:
+        assignments = _assignments(week_start_date, _USER_FIELDS, {"user_id": viewer.id})
+
+    reference = get_reference_data()
+    slots = {slot.id: slot for slot in get_week_grid(week_start_date)}
+    location_ids = {assignment["location_id"] for assignment in assignments}
+    if is_admin:
+        location_ids.update(location.id for location in reference.active_locations())
+    for assignment in assignments:
+        # Slots outside this week's grid (e.g. from an older template) still resolve
+        slot_id = assignment["time_slot_id"]
+        if slot_id not in slots and slot_id in reference.time_slots:
+            slots[slot_id] = reference.time_slots[slot_id]
+
+    users = User.query.order_by(User.id).all() if is_admin else [viewer]
+
+    return {
+        "week_start": week_start_date.isoformat(),
+        "time_slots": [slot.to_dict() for slot in slots.values()],
+        "locations": [
+            reference.locations[location_id].to_dict()
+            for location_id in sorted(location_ids)
+            if location_id in reference.locations
+        ],
+        "users": [user.to_dict() for user in users],
+        "assignments": assignments,
+    }
@@ -20,6 +20,7 @@ from datetime import time
 # Now we can import from backend modules normally
 from app import app, db
 from models import GlobalSettings, Location, TimeSlot, User
+from services.model_events import clear_caches
 
 
 @pytest.fixture
@@ -29,9 +30,12 @@ def test_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = "test-secret-key"
+    # Tests use fixed dates; keep them writable (archive tests set their own horizon)
+    app.config["ARCHIVE_AFTER_WEEKS"] = 5200
 
     with app.app_context():
         db.create_all()
+        clear_caches()
         if GlobalSettings.query.first() is None:
             default_settings = GlobalSettings(
                 max_workers_per_shift=3, max_hours_per_user_per_week=None
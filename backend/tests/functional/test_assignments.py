@@ -6,7 +6,15 @@ from datetime import date, time, timedelta
 
 import pytest
 
-from models import Assignment, GlobalSettings, Location, TimeSlot, User, UserAvailability
+from models import (
+    Assignment,
+    GlobalSettings,
+    Location,
+    ShiftRequirement,
+    TimeSlot,
+    User,
+    UserAvailability,
+)
 
 
 class TestRunSchedulerEndpoint:
@@ -680,6 +688,65 @@ class TestAvailableWorkersEndpoint:
         assert len(data) >= 1
 
 
+class TestWeekAvailableWorkersEndpoint:
+    """Test GET /api/assignments/available-workers/week endpoint."""
+
+    WEEK = date(2024, 3, 4)
+
+    def _get(self, client, token, query=""):
+        return client.get(
+            f"/api/assignments/available-workers/week?week_start={self.WEEK.isoformat()}{query}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def test_requires_admin(self, client, auth_token):
+        assert self._get(client, auth_token).status_code == 403
+
+    def test_requires_week_start(self, client, admin_token):
+        response = client.get(
+            "/api/assignments/available-workers/week",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 400
+
+    def test_every_shift_with_candidates(
+        self, client, admin_token, test_app, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            from database import db
+
+            slot = TimeSlot(day_of_week=0, start_time=time(17, 0), end_time=time(19, 0))
+            db.session.add_all(
+                [
+                    slot,
+                    UserAvailability(
+                        user_id=test_user["id"],
+                        location_id=test_location["id"],
+                        time_slot_id=test_time_slot["id"],
+                        week_start_date=self.WEEK,
+                        preference_level=2,
+                    ),
+                ]
+            )
+            db.session.commit()
+            second_slot = slot.id
+
+        response = self._get(client, admin_token)
+        assert response.status_code == 200
+        shifts = {(s["location_id"], s["time_slot_id"]): s for s in response.get_json()}
+        assert set(shifts) == {
+            (test_location["id"], test_time_slot["id"]),
+            (test_location["id"], second_slot),
+        }
+        assert shifts[(test_location["id"], test_time_slot["id"])]["candidates"] == [
+            {"user_id": test_user["id"], "preference_level": 2, "remaining_hours": None}
+        ]
+        assert shifts[(test_location["id"], second_slot)]["candidates"] == []
+
+        response = self._get(client, admin_token, f"&time_slot_id={second_slot}")
+        assert [s["time_slot_id"] for s in response.get_json()] == [second_slot]
+
+
 class TestUpdateAssignmentBranches:
     """Additional tests for update assignment edge cases."""
 
@@ -883,3 +950,436 @@ class TestMoveAssignmentBranches:
             json={"new_start": new_start, "new_end": new_end},
         )
         assert response.status_code in [200, 404]
+
+
+class TestAssignmentCapacityOverrides:
+    """Routes validate against the same capacity rules as the scheduler."""
+
+    def _fill_slot(self, location_id, time_slot_id, week_start, workers):
+        from database import db
+
+        users = [
+            User(name=f"Filler {i}", email=f"filler{i}@colby.edu", role="user")
+            for i in range(workers)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        db.session.add_all(
+            [
+                Assignment(
+                    user_id=u.id,
+                    location_id=location_id,
+                    time_slot_id=time_slot_id,
+                    week_start_date=week_start,
+                )
+                for u in users
+            ]
+        )
+        db.session.commit()
+
+    def test_create_assignment_allows_requirement_above_global_max(
+        self, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        """A ShiftRequirement override raises the slot's capacity for the routes too."""
+        week_start = date.today() - timedelta(days=date.today().weekday())
+        with client.application.app_context():
+            from database import db
+
+            db.session.add(
+                ShiftRequirement(
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week_start,
+                    required_workers=4,
+                )
+            )
+            db.session.commit()
+            self._fill_slot(test_location["id"], test_time_slot["id"], week_start, 3)
+
+        response = client.post(
+            "/api/assignments",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={
+                "user_id": test_user["id"],
+                "location_id": test_location["id"],
+                "time_slot_id": test_time_slot["id"],
+                "week_start_date": week_start.isoformat(),
+            },
+        )
+        assert response.status_code == 201
+
+    def test_update_assignment_respects_requirement_below_global_max(
+        self, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        """Moving into a slot whose override is already met is rejected."""
+        week_start = date.today() - timedelta(days=date.today().weekday())
+        with client.application.app_context():
+            from database import db
+
+            loc2 = Location(name="Override Location", description="Test")
+            db.session.add(loc2)
+            db.session.commit()
+            loc2_id = loc2.id
+            db.session.add(
+                ShiftRequirement(
+                    location_id=loc2_id,
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week_start,
+                    required_workers=1,
+                )
+            )
+            db.session.commit()
+            self._fill_slot(loc2_id, test_time_slot["id"], week_start, 1)
+
+            assignment = Assignment(
+                user_id=test_user["id"],
+                location_id=test_location["id"],
+                time_slot_id=test_time_slot["id"],
+                week_start_date=week_start,
+            )
+            db.session.add(assignment)
+            db.session.commit()
+            assignment_id = assignment.id
+
+        response = client.put(
+            f"/api/assignments/{assignment_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"location_id": loc2_id},
+        )
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "OVER_MAX_WORKERS"
+
+    def test_update_assignment_overlap_and_success(
+        self, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        """Update validates overlaps and keeps the cached counts in step with commits."""
+        week_start = date.today() - timedelta(days=date.today().weekday())
+        with client.application.app_context():
+            from database import db
+
+            slot2 = TimeSlot(day_of_week=1, start_time=time(9, 0), end_time=time(17, 0))
+            db.session.add(slot2)
+            db.session.commit()
+            slot2_id = slot2.id
+            first = Assignment(
+                user_id=test_user["id"],
+                location_id=test_location["id"],
+                time_slot_id=test_time_slot["id"],
+                week_start_date=week_start,
+            )
+            second = Assignment(
+                user_id=test_user["id"],
+                location_id=test_location["id"],
+                time_slot_id=slot2_id,
+                week_start_date=week_start,
+            )
+            db.session.add_all([first, second])
+            db.session.commit()
+            first_id, second_id = first.id, second.id
+
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = client.put(
+            f"/api/assignments/{second_id}",
+            headers=headers,
+            json={"time_slot_id": test_time_slot["id"]},
+        )
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "OVERLAP_FOR_USER"
+
+        client.delete(f"/api/assignments/{first_id}", headers=headers)
+        response = client.put(
+            f"/api/assignments/{second_id}",
+            headers=headers,
+            json={"time_slot_id": test_time_slot["id"]},
+        )
+        assert response.status_code == 200
+        assert response.get_json()["time_slot_id"] == test_time_slot["id"]
+
+
+class TestBulkAssignmentsEndpoint:
+    """Test POST /api/assignments/bulk."""
+
+    WEEK = date(2024, 3, 4)
+
+    @pytest.fixture
+    def setup(self, test_app, test_location, test_time_slot):
+        """Three workers, a second slot, and room for two workers per shift."""
+        from database import db
+
+        with test_app.app_context():
+            GlobalSettings.query.first().max_workers_per_shift = 2
+            workers = [User(name=f"Worker {n}", email=f"w{n}@colby.edu") for n in range(3)]
+            slot = TimeSlot(day_of_week=1, start_time=time(9, 0), end_time=time(17, 0))
+            db.session.add_all([*workers, slot])
+            db.session.commit()
+            return {
+                "workers": [worker.id for worker in workers],
+                "location": test_location["id"],
+                "slots": [test_time_slot["id"], slot.id],
+            }
+
+    def _create(self, setup, worker, slot=0, week=None):
+        return {
+            "op": "create",
+            "user_id": setup["workers"][worker],
+            "location_id": setup["location"],
+            "time_slot_id": setup["slots"][slot],
+            "week_start_date": (week or self.WEEK).isoformat(),
+        }
+
+    def _post(self, client, token, operations):
+        return client.post(
+            "/api/assignments/bulk",
+            json={"operations": operations},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def _stored(self, test_app):
+        with test_app.app_context():
+            return sorted(
+                (a.user_id, a.time_slot_id, a.week_start_date) for a in Assignment.query.all()
+            )
+
+    def test_requires_admin(self, client, auth_token):
+        assert self._post(client, auth_token, []).status_code == 403
+
+    def test_applies_every_operation(self, test_app, client, admin_token, setup):
+        created = self._post(
+            client, admin_token, [self._create(setup, 0), self._create(setup, 1)]
+        ).get_json()["created"]
+        first, second = (a["id"] for a in created)
+
+        response = self._post(
+            client,
+            admin_token,
+            [
+                {"op": "update", "id": first, "user_id": setup["workers"][2]},
+                {"op": "move", "id": second, "time_slot_id": setup["slots"][1]},
+                self._create(setup, 0),
+            ],
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [a["id"] for a in data["updated"]] == [first, second]
+        assert data["updated"][1]["time_slot_id"] == setup["slots"][1]
+        assert data["created"][0]["user_id"] == setup["workers"][0]
+        assert data["deleted"] == []
+
+        response = self._post(client, admin_token, [{"op": "delete", "id": first}])
+        assert response.get_json()["deleted"] == [first]
+        assert len(self._stored(test_app)) == 2
+
+    def test_all_or_nothing(self, test_app, client, admin_token, setup):
+        response = self._post(
+            client,
+            admin_token,
+            [self._create(setup, 0), self._create(setup, 1), self._create(setup, 2)],
+        )
+        assert response.status_code == 400
+        assert response.get_json() == {
+            "error": "OVER_MAX_WORKERS",
+            "message": "Maximum 2 workers already scheduled in that slot",
+            "index": 2,
+        }
+        assert self._stored(test_app) == []
+
+    def test_overlap_within_the_batch(self, client, admin_token, setup):
+        same_time = self._create(setup, 0)
+        response = self._post(client, admin_token, [self._create(setup, 0), same_time])
+        assert response.get_json()["error"] == "OVERLAP_FOR_USER"
+
+    def test_clear_week_frees_its_slots(self, test_app, client, admin_token, setup):
+        self._post(client, admin_token, [self._create(setup, 0), self._create(setup, 1)])
+        self._post(client, admin_token, [self._create(setup, 0, week=self.WEEK + timedelta(7))])
+
+        response = self._post(
+            client,
+            admin_token,
+            [
+                {"op": "clear_week", "week_start_date": self.WEEK.isoformat()},
+                self._create(setup, 1),
+                self._create(setup, 2),
+            ],
+        )
+        assert response.status_code == 200
+        assert len(response.get_json()["deleted"]) == 2
+        assert [(user, week) for user, _, week in self._stored(test_app)] == [
+            (setup["workers"][0], self.WEEK + timedelta(7)),
+            (setup["workers"][1], self.WEEK),
+            (setup["workers"][2], self.WEEK),
+        ]
+
+    def test_clear_week_includes_rows_created_or_moved_earlier(
+        self, test_app, client, admin_token, setup
+    ):
+        (existing,) = self._post(
+            client, admin_token, [self._create(setup, 0, week=self.WEEK + timedelta(7))]
+        ).get_json()["created"]
+
+        response = self._post(
+            client,
+            admin_token,
+            [
+                self._create(setup, 1),
+                {
+                    "op": "move",
+                    "id": existing["id"],
+                    "time_slot_id": setup["slots"][0],
+                    "week_start_date": self.WEEK.isoformat(),
+                },
+                {
+                    "op": "clear_week",
+                    "week_start_date": self.WEEK.isoformat(),
+                    "location_id": setup["location"],
+                },
+            ],
+        )
+        data = response.get_json()
+        assert (data["created"], data["updated"], data["deleted"]) == ([], [], [existing["id"]])
+        assert self._stored(test_app) == []
+
+    def test_operations_on_deleted_or_unknown_rows(self, client, admin_token, setup):
+        (created,) = self._post(client, admin_token, [self._create(setup, 0)]).get_json()["created"]
+        response = self._post(
+            client,
+            admin_token,
+            [{"op": "delete", "id": created["id"]}, {"op": "update", "id": created["id"]}],
+        )
+        assert response.status_code == 404
+        assert response.get_json() == {"error": "Assignment not found", "index": 1}
+
+    @pytest.mark.parametrize(
+        "operations, status, error",
+        [
+            (None, 400, "operations must be a non-empty list"),
+            (
+                [{"op": "explode"}],
+                400,
+                "op must be one of create, update, move, delete, clear_week",
+            ),
+            ([{"op": "delete"}], 400, "id is required"),
+            ([{"op": "delete", "id": "1"}], 400, "id must be an integer"),
+            (
+                [{"op": "clear_week", "week_start_date": "soon"}],
+                400,
+                "week_start_date must be YYYY-MM-DD",
+            ),
+            ([{"op": "update", "id": 1, "user_id": 999}], 404, "User not found"),
+        ],
+    )
+    def test_validation(self, client, admin_token, setup, operations, status, error):
+        response = self._post(client, admin_token, operations)
+        assert response.status_code == status
+        assert response.get_json()["error"] == error
+
+    def test_unknown_location(self, client, admin_token, setup):
+        operation = dict(self._create(setup, 0), location_id=999)
+        response = self._post(client, admin_token, [operation])
+        assert response.status_code == 404
+        assert response.get_json()["error"] == "Location or time slot not found"
+
+    def test_batch_size_limit(self, client, admin_token, setup):
+        from services import assignment_batch
+
+        operations = [{"op": "delete", "id": 1}] * (assignment_batch.MAX_OPERATIONS + 1)
+        response = self._post(client, admin_token, operations)
+        assert response.get_json()["error"].startswith("At most")
+
+
+class TestArchivedWeeks:
+    """Weeks before the archive horizon are read-only."""
+
+    THIS_WEEK = date.today() - timedelta(days=date.today().weekday())
+    ARCHIVED = THIS_WEEK - timedelta(weeks=30)
+
+    @pytest.fixture
+    def setup(self, test_app, test_user, test_location, test_time_slot, monkeypatch):
+        """A 26-week horizon and one assignment each in an archived and the current week."""
+        from database import db
+
+        monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+        with test_app.app_context():
+            ids = {
+                week: Assignment(
+                    user_id=test_user["id"],
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week,
+                )
+                for week in (self.ARCHIVED, self.THIS_WEEK)
+            }
+            db.session.add_all(ids.values())
+            db.session.commit()
+            return {
+                "user": test_user["id"],
+                "location": test_location["id"],
+                "slot": test_time_slot["id"],
+                "archived": ids[self.ARCHIVED].id,
+                "current": ids[self.THIS_WEEK].id,
+            }
+
+    def _assert_rejected(self, test_app, response):
+        assert response.status_code == 409
+        assert response.get_json()["error"] == "WEEK_ARCHIVED"
+        with test_app.app_context():
+            assert Assignment.query.count() == 2
+
+    def test_create_and_run_scheduler(self, test_app, client, admin_token, setup):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        week = {"week_start_date": self.ARCHIVED.isoformat()}
+        response = client.post(
+            "/api/assignments",
+            headers=headers,
+            json={
+                "user_id": setup["user"],
+                "location_id": setup["location"],
+                "time_slot_id": setup["slot"],
+                **week,
+            },
+        )
+        self._assert_rejected(test_app, response)
+        response = client.post("/api/assignments/run-scheduler", headers=headers, json=week)
+        self._assert_rejected(test_app, response)
+
+    def test_update_and_delete(self, test_app, client, admin_token, setup):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/api/assignments/{setup['archived']}"
+        self._assert_rejected(test_app, client.put(url, headers=headers, json={}))
+        self._assert_rejected(test_app, client.delete(url, headers=headers))
+
+    @pytest.mark.parametrize("source, target", [("archived", "THIS_WEEK"), ("current", "ARCHIVED")])
+    def test_move_from_or_into_an_archived_week(
+        self, test_app, client, admin_token, setup, source, target
+    ):
+        day = getattr(self, target)
+        response = client.put(
+            f"/api/assignments/{setup[source]}/move",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={
+                "new_start": f"{day}T10:00:00",
+                "new_end": f"{day}T11:00:00",
+                "new_time_slot_id": setup["slot"],
+            },
+        )
+        self._assert_rejected(test_app, response)
+
+    @pytest.mark.parametrize("op", ["delete", "move", "clear_week"])
+    def test_bulk(self, test_app, client, admin_token, setup, op):
+        archived = self.ARCHIVED.isoformat()
+        operation = {
+            "delete": {"op": "delete", "id": setup["archived"]},
+            "move": {
+                "op": "move",
+                "id": setup["current"],
+                "time_slot_id": setup["slot"],
+                "week_start_date": archived,
+            },
+            "clear_week": {"op": "clear_week", "week_start_date": archived},
+        }[op]
+        response = client.post(
+            "/api/assignments/bulk",
+            json={"operations": [{"op": "update", "id": setup["current"]}, operation]},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        self._assert_rejected(test_app, response)
+        assert response.get_json()["index"] == 1
@@ -247,7 +247,7 @@ class TestVerifyGoogleToken:
         result = verify_google_token("invalid-token")
         assert result is None
 
-    @patch("routes.auth.id_token.verify_oauth2_token")
+    @patch("routes.auth.google_tokens.verify")
     def test_verify_valid_token(self, mock_verify, client):
         """Test that valid Google token returns claims."""
         from routes.auth import verify_google_token
@@ -257,6 +257,16 @@ class TestVerifyGoogleToken:
         assert result is not None
         assert result["email"] == "test@colby.edu"
 
+    @patch("routes.auth.google_tokens.verify")
+    def test_verify_without_certificates(self, mock_verify, client):
+        """Test that a token is rejected while Google's certificates are unavailable."""
+        from google.auth.exceptions import TransportError
+
+        from routes.auth import verify_google_token
+
+        mock_verify.side_effect = TransportError("unavailable")
+        assert verify_google_token("valid-token") is None
+
 
 class TestGetCurrentUserHelper:
     """Test get_current_user helper function edge cases."""
@@ -265,3 +275,76 @@ class TestGetCurrentUserHelper:
         """Test get_current_user with empty Bearer token."""
         response = client.get("/api/users/me", headers={"Authorization": "Bearer "})
         assert response.status_code == 401
+
+
+class TestCurrentUserCache:
+    """Test caching of the resolved user across requests."""
+
+    @patch("routes.auth.verify_google_token")
+    def test_google_token_verified_once(self, mock_verify, client):
+        """A Google ID token is verified on first use and then served from the cache."""
+        mock_verify.return_value = {"email": "cached@colby.edu", "name": "Cached User"}
+        headers = {"Authorization": "Bearer google-id-token"}
+
+        first = client.get("/api/auth/me", headers=headers)
+        second = client.get("/api/auth/me", headers=headers)
+
+        assert first.status_code == 200
+        assert second.get_json() == first.get_json()
+        assert mock_verify.call_count == 1
+
+    def test_role_change_applies_on_next_request(self, test_app, client, auth_token, test_user):
+        """Committed changes to a user are not hidden by the cache."""
+        from database import db
+        from models import User
+
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        assert client.get("/api/auth/me", headers=headers).get_json()["role"] == "user"
+
+        with test_app.app_context():
+            db.session.get(User, test_user["id"]).role = "admin"
+            db.session.commit()
+
+        assert client.get("/api/auth/me", headers=headers).get_json()["role"] == "admin"
+
+    def test_cached_user_is_writable(self, test_app, client, auth_token, test_user):
+        """Updates to a user served from the cache are saved."""
+        from database import db
+        from models import User
+
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        client.get("/api/auth/me", headers=headers)
+        response = client.put("/api/users/me", json={"bio": "Hello"}, headers=headers)
+        assert response.status_code == 200
+
+        with test_app.app_context():
+            assert db.session.get(User, test_user["id"]).bio == "Hello"
+
+
+class TestLogout:
+    """Test /api/auth/logout endpoint."""
+
+    def test_logout_revokes_token(self, client, auth_token):
+        """A token stops working after logging out with it."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+        response = client.post("/api/auth/logout", headers=headers)
+        assert response.status_code == 200
+
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+        assert client.post("/api/auth/logout", headers=headers).status_code == 401
+
+    def test_logout_keeps_other_tokens(self, client, test_user, auth_token):
+        """Logging out one session leaves the user's other sessions signed in."""
+        other = client.post("/api/auth/test-token", json={"email": test_user["email"]})
+        other_token = other.get_json()["token"]
+
+        client.post("/api/auth/logout", headers={"Authorization": f"Bearer {auth_token}"})
+
+        response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {other_token}"})
+        assert response.status_code == 200
+
+    def test_logout_without_token(self, client):
+        """Test logging out without a token returns 401."""
+        assert client.post("/api/auth/logout").status_code == 401
@@ -1,6 +1,6 @@
 """
 Comprehensive tests for availability routes.
-Tests GET, POST /api/availability and POST /api/availability/batch endpoints.
+Tests GET, POST, PUT /api/availability and the batch and copy-forward endpoints.
 """
 
 from datetime import date, time
@@ -8,7 +8,7 @@ from datetime import date, time
 import pytest
 
 from app import app, db
-from models import Location, TimeSlot, User, UserAvailability
+from models import DaySchedule, Location, TimeSlot, User, UserAvailability, WeeklyScheduleOverride
 
 
 @pytest.fixture
@@ -226,3 +226,340 @@ class TestCreateAvailabilityBatch:
         )
         assert response.status_code == 201
         assert response.get_json() == []
+
+
+class TestReplaceAvailability:
+    """Tests for PUT /api/availability endpoint."""
+
+    def _put(self, client, token, entries, week="2024-08-05"):
+        return client.put(
+            "/api/availability",
+            json={"week_start_date": week, "entries": entries},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def test_replace_creates_updates_and_deletes(
+        self, test_app, auth_token, test_availability_setup
+    ):
+        """The stored week becomes exactly the submitted entries."""
+        location_id = test_availability_setup["location"]["id"]
+        with test_app.app_context():
+            slots = [
+                TimeSlot(day_of_week=2, start_time=time(hour, 0), end_time=time(hour + 1, 0))
+                for hour in (9, 10, 11)
+            ]
+            db.session.add_all(slots)
+            db.session.commit()
+            keep, change, drop = (slot.id for slot in slots)
+
+        client = test_app.test_client()
+        entries = [
+            {"location_id": location_id, "time_slot_id": keep, "preference_level": 1},
+            {"location_id": location_id, "time_slot_id": change, "preference_level": 1},
+            {"location_id": location_id, "time_slot_id": drop},
+        ]
+        response = self._put(client, auth_token, entries)
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "week_start_date": "2024-08-05",
+            "created": 3,
+            "updated": 0,
+            "deleted": 0,
+            "unchanged": 0,
+            "stored_as": "rows",
+        }
+
+        new_slot = test_availability_setup["time_slot"]["id"]
+        entries = [
+            {"location_id": location_id, "time_slot_id": keep, "preference_level": 1},
+            {"location_id": location_id, "time_slot_id": change, "preference_level": 2},
+            {"location_id": location_id, "time_slot_id": new_slot, "preference_level": 2},
+        ]
+        response = self._put(client, auth_token, entries)
+        data = response.get_json()
+        assert (data["created"], data["updated"], data["deleted"], data["unchanged"]) == (
+            1,
+            1,
+            1,
+            1,
+        )
+
+        with test_app.app_context():
+            stored = {
+                av.time_slot_id: av.preference_level
+                for av in UserAvailability.query.filter_by(
+                    user_id=test_availability_setup["user"]["id"]
+                )
+            }
+        assert stored == {keep: 1, change: 2, new_slot: 2}
+
+    def test_replace_with_empty_entries_clears_week(
+        self, test_app, auth_token, test_availability_setup
+    ):
+        """Submitting no entries removes the week's availability only."""
+        entry = {
+            "location_id": test_availability_setup["location"]["id"],
+            "time_slot_id": test_availability_setup["time_slot"]["id"],
+        }
+        client = test_app.test_client()
+        self._put(client, auth_token, [entry], week="2024-08-05")
+        self._put(client, auth_token, [entry], week="2024-08-12")
+
+        response = self._put(client, auth_token, [], week="2024-08-05")
+        assert response.get_json()["deleted"] == 1
+        with test_app.app_context():
+            weeks = [av.week_start_date for av in UserAvailability.query.all()]
+        assert weeks == [date(2024, 8, 12)]
+
+    def test_replace_with_any_location(
+        self, test_app, auth_token, admin_token, test_availability_setup
+    ):
+        """An entry without a location makes the user available at every location."""
+        slot_id = test_availability_setup["time_slot"]["id"]
+        client = test_app.test_client()
+        response = self._put(client, auth_token, [{"location_id": None, "time_slot_id": slot_id}])
+        assert response.get_json()["created"] == 1
+
+        with test_app.app_context():
+            other = Location(name="Other Desk")
+            db.session.add(other)
+            db.session.commit()
+            location_ids = [test_availability_setup["location"]["id"], other.id]
+
+        for location_id in location_ids:
+            response = client.get(
+                "/api/assignments/available-workers",
+                query_string={
+                    "location_id": location_id,
+                    "time_slot_id": slot_id,
+                    "week_start": "2024-08-05",
+                },
+                headers={"Authorization": f"Bearer {admin_token}"},
+            )
+            assert [worker["id"] for worker in response.get_json()] == [
+                test_availability_setup["user"]["id"]
+            ]
+
+    def test_replace_invalid_entry(self, client, auth_token):
+        """Entries without integer ids are rejected."""
+        response = self._put(client, auth_token, [{"location_id": "x", "time_slot_id": 1}])
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("storage", ["rows", "bitmap"])
+    @pytest.mark.parametrize("level", [0, 3, 256, -1])
+    def test_replace_invalid_preference_level(
+        self, test_app, client, auth_token, test_availability_setup, monkeypatch, storage, level
+    ):
+        """Only neutral (1) and preferred (2) can be stored."""
+        monkeypatch.setitem(test_app.config, "AVAILABILITY_STORAGE", storage)
+        entry = {
+            "location_id": test_availability_setup["location"]["id"],
+            "time_slot_id": test_availability_setup["time_slot"]["id"],
+            "preference_level": level,
+        }
+        response = self._put(client, auth_token, [entry])
+        assert response.status_code == 400
+        assert (
+            response.get_json()["error"] == "preference_level must be 1 (neutral) or 2 (preferred)"
+        )
+
+    def test_replace_requires_week(self, client, auth_token):
+        """week_start_date is required."""
+        response = client.put(
+            "/api/availability", json={}, headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 400
+
+    def test_replace_unauthorized(self, client):
+        """Unauthenticated request returns 401."""
+        response = client.put("/api/availability", json={"week_start_date": "2024-08-05"})
+        assert response.status_code == 401
+
+
+class TestCopyAvailabilityForward:
+    """Tests for POST /api/availability/copy-forward endpoint."""
+
+    SOURCE, TARGET = date(2024, 9, 2), date(2024, 9, 9)
+
+    @pytest.fixture
+    def source_week(self, test_app, test_user, test_admin, test_location, test_time_slot):
+        """Source-week rows for both users, including one on a slot the grid no longer has."""
+        with test_app.app_context():
+            # Tuesday is templated 9-10, so an old 14-15 slot is outside the target grid
+            db.session.add(
+                DaySchedule(
+                    day_of_week=1,
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    slot_duration_minutes=60,
+                )
+            )
+            stale = TimeSlot(day_of_week=1, start_time=time(14, 0), end_time=time(15, 0))
+            db.session.add(stale)
+            db.session.commit()
+            for user_id, slot_id in (
+                (test_user["id"], test_time_slot["id"]),
+                (test_user["id"], stale.id),
+                (test_admin["id"], test_time_slot["id"]),
+            ):
+                db.session.add(
+                    UserAvailability(
+                        user_id=user_id,
+                        location_id=test_location["id"],
+                        time_slot_id=slot_id,
+                        week_start_date=self.SOURCE,
+                        preference_level=2,
+                    )
+                )
+            db.session.commit()
+
+    def _copy(self, client, token, **extra):
+        return client.post(
+            "/api/availability/copy-forward",
+            json={"source_week_start": "2024-09-02", "target_week_start": "2024-09-09", **extra},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def test_archived_target_week(self, test_app, auth_token, source_week, monkeypatch):
+        """Copying into a week before the archive horizon is rejected."""
+        monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+        response = self._copy(test_app.test_client(), auth_token)
+        assert response.status_code == 409
+        assert response.get_json()["error"] == "WEEK_ARCHIVED"
+
+    def test_copy_own_week(self, test_app, auth_token, test_user, source_week):
+        """Students copy only their own rows, and only slots in the target grid."""
+        response = self._copy(test_app.test_client(), auth_token)
+        assert response.status_code == 200
+        assert response.get_json()["copied"] == 1
+
+        with test_app.app_context():
+            copied = UserAvailability.query.filter_by(week_start_date=self.TARGET).all()
+            assert [(av.user_id, av.preference_level) for av in copied] == [(test_user["id"], 2)]
+
+        # Copying again skips the cell that is already set
+        assert self._copy(test_app.test_client(), auth_token).get_json()["copied"] == 0
+
+    def test_admin_copies_all_users(self, test_app, admin_token, source_week):
+        """Admins can copy everyone's availability at once."""
+        response = self._copy(test_app.test_client(), admin_token, all_users=True)
+        assert response.get_json()["copied"] == 2
+
+    def test_admin_copies_one_user(self, test_app, admin_token, test_user, source_week):
+        """Admins can copy a single user's availability."""
+        response = self._copy(test_app.test_client(), admin_token, user_id=test_user["id"])
+        assert response.get_json()["copied"] == 1
+
+    def test_student_cannot_copy_others(self, client, auth_token, test_admin):
+        """Only admins may copy for other users."""
+        response = self._copy(client, auth_token, user_id=test_admin["id"])
+        assert response.status_code == 403
+
+    def test_copy_into_empty_grid(self, test_app, auth_token, source_week):
+        """Nothing is copied when the target week has no slots at all."""
+        with test_app.app_context():
+            db.session.add_all(
+                WeeklyScheduleOverride(
+                    week_start_date=self.TARGET,
+                    day_of_week=day,
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    is_active=False,
+                )
+                for day in range(7)
+            )
+            db.session.commit()
+        assert self._copy(test_app.test_client(), auth_token).get_json()["copied"] == 0
+
+    def test_copy_validation(self, client, auth_token):
+        """Both weeks are required and must differ."""
+        response = client.post(
+            "/api/availability/copy-forward",
+            json={"source_week_start": "2024-09-02"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+        assert response.status_code == 400
+        response = client.post(
+            "/api/availability/copy-forward",
+            json={"source_week_start": "2024-09-02", "target_week_start": "2024-09-02"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+        assert response.status_code == 400
+
+    def test_copy_unauthorized(self, client):
+        """Unauthenticated request returns 401."""
+        response = client.post("/api/availability/copy-forward", json={})
+        assert response.status_code == 401
+
+
+class TestAvailabilityTemplate:
+    """Tests for GET/PUT /api/availability/template endpoints."""
+
+    def test_put_and_get_template(self, test_app, auth_token, test_availability_setup):
+        """A saved template is returned and expands into every week."""
+        entry = {
+            "location_id": test_availability_setup["location"]["id"],
+            "time_slot_id": test_availability_setup["time_slot"]["id"],
+            "preference_level": 2,
+        }
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        client = test_app.test_client()
+
+        response = client.put(
+            "/api/availability/template", json={"entries": [entry]}, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.get_json()["created"] == 1
+
+        template = client.get("/api/availability/template", headers=headers).get_json()
+        assert [(t["day_of_week"], t["start_time"]) for t in template] == [(0, "09:00:00")]
+
+        week = client.get("/api/availability?week_start=2024-10-07", headers=headers).get_json()
+        assert [(av["time_slot_id"], av["preference_level"]) for av in week] == [
+            (entry["time_slot_id"], 2)
+        ]
+
+    def test_put_template_invalid(self, client, auth_token):
+        """Unknown slots are rejected."""
+        response = client.put(
+            "/api/availability/template",
+            json={"entries": [{"location_id": 1, "time_slot_id": 99999}]},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+        assert response.status_code == 400
+
+    def test_template_unauthorized(self, client):
+        """Unauthenticated requests return 401."""
+        assert client.get("/api/availability/template").status_code == 401
+        assert client.put("/api/availability/template", json={}).status_code == 401
+
+
+class TestArchivedWeeks:
+    """Availability of weeks before the archive horizon is read-only."""
+
+    @pytest.mark.parametrize(
+        "method, url",
+        [
+            ("post", "/api/availability"),
+            ("put", "/api/availability"),
+            ("post", "/api/availability/batch"),
+        ],
+    )
+    def test_writes_are_rejected(
+        self, test_app, client, auth_token, test_availability_setup, monkeypatch, method, url
+    ):
+        monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+        entry = {
+            "location_id": test_availability_setup["location"]["id"],
+            "time_slot_id": test_availability_setup["time_slot"]["id"],
+            "preference_level": 1,
+        }
+        response = getattr(client, method)(
+            url,
+            json={"week_start_date": "2024-02-05", "entries": [entry], **entry},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+        assert response.status_code == 409
+        assert response.get_json()["error"] == "WEEK_ARCHIVED"
+        with test_app.app_context():
+            assert UserAvailability.query.count() == 0
@@ -0,0 +1,182 @@
+"""
+Functional tests for the delta sync endpoint.
+"""
+
+from datetime import date, timedelta
+
+from database import db
+from models import Assignment, ShiftRequirement
+
+WEEK = date(2024, 1, 1)
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _cursor(client, token):
+    return client.get("/api/changes", headers=_auth(token)).get_json()["cursor"]
+
+
+def _changes(client, token, since, week=WEEK):
+    response = client.get(
+        "/api/changes",
+        query_string={"since": since, "week_start": week.isoformat()},
+        headers=_auth(token),
+    )
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _create_assignment(client, admin_token, user_id, location_id, time_slot_id, week=WEEK):
+    response = client.post(
+        "/api/assignments",
+        json={
+            "user_id": user_id,
+            "location_id": location_id,
+            "time_slot_id": time_slot_id,
+            "week_start_date": week.isoformat(),
+        },
+        headers=_auth(admin_token),
+    )
+    assert response.status_code == 201
+    return response.get_json()
+
+
+class TestChanges:
+    """Test GET /api/changes."""
+
+    def test_requires_auth(self, client):
+        assert client.get("/api/changes").status_code == 401
+
+    def test_validation(self, client, auth_token):
+        assert client.get("/api/changes?since=0", headers=_auth(auth_token)).status_code == 400
+        response = client.get(
+            "/api/changes?since=abc&week_start=2024-01-01", headers=_auth(auth_token)
+        )
+        assert response.status_code == 400
+
+    def test_nothing_changed(self, client, auth_token):
+        cursor = _cursor(client, auth_token)
+        assert _changes(client, auth_token, cursor) == {
+            "cursor": cursor,
+            "reload": [],
+            "changes": [],
+        }
+
+    def test_assignment_insert_and_delete(
+        self, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        cursor = _cursor(client, admin_token)
+        created = _create_assignment(
+            client, admin_token, test_user["id"], test_location["id"], test_time_slot["id"]
+        )
+
+        data = _changes(client, admin_token, cursor)
+        assert data["cursor"] > cursor
+        assert data["changes"] == [
+            {"table": "assignments", "op": "insert", "id": created["id"], "row": created}
+        ]
+
+        cursor = data["cursor"]
+        client.delete(f"/api/assignments/{created['id']}", headers=_auth(admin_token))
+        assert _changes(client, admin_token, cursor)["changes"] == [
+            {"table": "assignments", "op": "delete", "id": created["id"]}
+        ]
+
+    def test_other_weeks_are_left_out(
+        self, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        cursor = _cursor(client, admin_token)
+        _create_assignment(
+            client,
+            admin_token,
+            test_user["id"],
+            test_location["id"],
+            test_time_slot["id"],
+            week=WEEK + timedelta(weeks=1),
+        )
+        assert _changes(client, admin_token, cursor)["changes"] == []
+
+    def test_move_to_another_week_is_a_delete(
+        self, test_app, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        created = _create_assignment(
+            client, admin_token, test_user["id"], test_location["id"], test_time_slot["id"]
+        )
+        cursor = _cursor(client, admin_token)
+        with test_app.app_context():
+            db.session.get(Assignment, created["id"]).week_start_date = WEEK + timedelta(weeks=1)
+            db.session.commit()
+
+        assert _changes(client, admin_token, cursor)["changes"] == [
+            {"table": "assignments", "op": "delete", "id": created["id"]}
+        ]
+        moved = _changes(client, admin_token, cursor, week=WEEK + timedelta(weeks=1))
+        assert [(c["op"], c["id"]) for c in moved["changes"]] == [("update", created["id"])]
+
+    def test_students_only_see_their_own_rows(
+        self, client, admin_token, auth_token, test_admin, test_user, test_location, test_time_slot
+    ):
+        cursor = _cursor(client, auth_token)
+        own = _create_assignment(
+            client, admin_token, test_user["id"], test_location["id"], test_time_slot["id"]
+        )
+        _create_assignment(
+            client, admin_token, test_admin["id"], test_location["id"], test_time_slot["id"]
+        )
+
+        data = _changes(client, auth_token, cursor)
+        assert [(c["table"], c["id"]) for c in data["changes"]] == [("assignments", own["id"])]
+
+    def test_availability_changes_carry_the_users_week(
+        self, client, auth_token, test_user, test_location, test_time_slot
+    ):
+        cursor = _cursor(client, auth_token)
+        entry = {
+            "location_id": test_location["id"],
+            "time_slot_id": test_time_slot["id"],
+            "preference_level": 2,
+        }
+        client.put(
+            "/api/availability",
+            json={"week_start_date": WEEK.isoformat(), "entries": [entry]},
+            headers=_auth(auth_token),
+        )
+
+        (change,) = _changes(client, auth_token, cursor)["changes"]
+        week = client.get(
+            f"/api/availability?week_start={WEEK.isoformat()}", headers=_auth(auth_token)
+        ).get_json()
+        assert change == {
+            "table": "availability",
+            "op": "update",
+            "user_id": test_user["id"],
+            "entries": week,
+        }
+
+    def test_bulk_write_asks_for_a_reload(
+        self, test_app, client, admin_token, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            db.session.add(
+                ShiftRequirement(
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=WEEK,
+                    required_workers=2,
+                )
+            )
+            db.session.commit()
+        cursor = _cursor(client, admin_token)
+        with test_app.app_context():
+            ShiftRequirement.query.update({"required_workers": 4})
+            db.session.commit()
+
+        data = _changes(client, admin_token, cursor)
+        assert data["reload"] == ["shift_requirements"]
+        assert data["changes"] == []
+
+    def test_unknown_cursor_asks_for_a_full_reload(self, client, auth_token):
+        data = _changes(client, auth_token, _cursor(client, auth_token) + 10)
+        assert data["reload"] == ["assignments", "shift_requirements", "availability"]
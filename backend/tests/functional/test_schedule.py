@@ -0,0 +1,510 @@
+"""
+Functional tests for the aggregated schedule week endpoint.
+"""
+
+import json
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from database import db
+from models import Assignment, Location, TimeSlot, User
+from routes import http_cache
+from services import live_updates, pubsub, response_cache
+from services.archive import archive_old_weeks
+
+WEEK = date.today() - timedelta(days=date.today().weekday())
+
+
+def _assign(user_id, location_id, time_slot_id, week=WEEK, assigned_by=None):
+    assignment = Assignment(
+        user_id=user_id,
+        location_id=location_id,
+        time_slot_id=time_slot_id,
+        week_start_date=week,
+        assigned_by=assigned_by,
+    )
+    db.session.add(assignment)
+    db.session.commit()
+    return assignment.id
+
+
+def _get(client, token, **params):
+    params.setdefault("week_start", WEEK.isoformat())
+    return client.get(
+        "/api/schedule/week", query_string=params, headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+class TestScheduleWeek:
+    """Test GET /api/schedule/week."""
+
+    def test_requires_auth(self, client):
+        assert client.get(f"/api/schedule/week?week_start={WEEK}").status_code == 401
+
+    def test_requires_week_start(self, client, auth_token):
+        response = client.get(
+            "/api/schedule/week", headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 400
+
+    def test_admin_payload(
+        self, test_app, client, admin_token, test_admin, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            assignment_id = _assign(
+                test_user["id"], test_location["id"], test_time_slot["id"], assigned_by=1
+            )
+
+        response = _get(client, admin_token)
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert data["week_start"] == WEEK.isoformat()
+        assert data["time_slots"] == [test_time_slot]
+        assert data["locations"] == [test_location]
+        assert {user["id"] for user in data["users"]} == {test_admin["id"], test_user["id"]}
+        assert data["assignments"] == [
+            {
+                "id": assignment_id,
+                "user_id": test_user["id"],
+                "location_id": test_location["id"],
+                "time_slot_id": test_time_slot["id"],
+                "assigned_by": 1,
+            }
+        ]
+
+    def test_admin_filters(
+        self, test_app, client, admin_token, test_admin, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            other = Location(name="Other", is_active=True)
+            db.session.add(other)
+            db.session.commit()
+            kept = _assign(test_user["id"], test_location["id"], test_time_slot["id"])
+            _assign(test_admin["id"], other.id, test_time_slot["id"])
+
+        data = _get(client, admin_token, user_id=test_user["id"]).get_json()
+        assert [a["id"] for a in data["assignments"]] == [kept]
+        assert len(data["locations"]) == 2  # every active location, for reassigning
+
+        data = _get(client, admin_token, location_id=test_location["id"]).get_json()
+        assert [a["id"] for a in data["assignments"]] == [kept]
+
+    def test_user_payload_is_trimmed(
+        self, test_app, client, auth_token, test_admin, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            unused = Location(name="Unused", is_active=True)
+            db.session.add(unused)
+            db.session.commit()
+            own = _assign(test_user["id"], test_location["id"], test_time_slot["id"])
+            _assign(test_admin["id"], unused.id, test_time_slot["id"])
+
+        data = _get(client, auth_token, user_id=test_admin["id"]).get_json()
+
+        assert data["assignments"] == [
+            {
+                "id": own,
+                "user_id": test_user["id"],
+                "location_id": test_location["id"],
+                "time_slot_id": test_time_slot["id"],
+            }
+        ]
+        assert [user["id"] for user in data["users"]] == [test_user["id"]]
+        assert data["locations"] == [test_location]
+
+    def test_referenced_rows_outside_the_defaults(
+        self, test_app, client, admin_token, test_user, test_location
+    ):
+        """Inactive locations and slots outside the week's grid still resolve."""
+        with test_app.app_context():
+            from models import DaySchedule
+
+            closed = Location(name="Closed", is_active=False)
+            old_slot = TimeSlot(day_of_week=1, start_time=time(8, 0), end_time=time(9, 0))
+            # Tuesday's template only yields 10:00-11:00, so 08:00 is off the grid
+            db.session.add_all(
+                [
+                    closed,
+                    old_slot,
+                    TimeSlot(day_of_week=1, start_time=time(10, 0), end_time=time(11, 0)),
+                    DaySchedule(
+                        day_of_week=1,
+                        start_time=time(10, 0),
+                        end_time=time(11, 0),
+                        slot_duration_minutes=60,
+                    ),
+                ]
+            )
+            db.session.commit()
+            _assign(test_user["id"], closed.id, old_slot.id)
+            closed_id, old_slot_id = closed.id, old_slot.id
+
+        data = _get(client, admin_token).get_json()
+
+        assert {loc["id"] for loc in data["locations"]} == {test_location["id"], closed_id}
+        assert old_slot_id in {slot["id"] for slot in data["time_slots"]}
+
+    def test_archived_week(
+        self, test_app, client, admin_token, test_user, test_location, test_time_slot, monkeypatch
+    ):
+        monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+        past = WEEK - timedelta(weeks=40)
+        with test_app.app_context():
+            assignment_id = _assign(
+                test_user["id"], test_location["id"], test_time_slot["id"], week=past
+            )
+            archive_old_weeks()
+
+        data = _get(client, admin_token, week_start=past.isoformat()).get_json()
+        assert [a["id"] for a in data["assignments"]] == [assignment_id]
+
+    def test_query_count_does_not_grow_with_assignments(
+        self, test_app, client, admin_token, test_location, test_time_slot
+    ):
+        def count_queries():
+            statements = []
+
+            def record(*args):
+                statements.append(args[2])
+
+            with test_app.app_context():
+                event.listen(db.engine, "before_cursor_execute", record)
+                try:
+                    assert _get(client, admin_token).status_code == 200
+                finally:
+                    event.remove(db.engine, "before_cursor_execute", record)
+            return len(statements)
+
+        with test_app.app_context():
+            user = User(name="Worker", email="worker@colby.edu")
+            db.session.add(user)
+            db.session.commit()
+            _assign(user.id, test_location["id"], test_time_slot["id"])
+        _get(client, admin_token)  # warm the caches
+        few = count_queries()
+
+        with test_app.app_context():
+            for index in range(5):
+                user = User(name=f"Worker {index}", email=f"worker{index}@colby.edu")
+                db.session.add(user)
+                db.session.commit()
+                _assign(user.id, test_location["id"], test_time_slot["id"])
+        _get(client, admin_token)
+        assert count_queries() == few
+
+
+class TestConditionalGet:
+    """Test ETags and If-None-Match on the week endpoint."""
+
+    def _revalidate(self, client, token, etag, **params):
+        params.setdefault("week_start", WEEK.isoformat())
+        return client.get(
+            "/api/schedule/week",
+            query_string=params,
+            headers={"Authorization": f"Bearer {token}", "If-None-Match": f'"{etag}"'},
+        )
+
+    def test_etag_and_not_modified(self, client, admin_token, test_location, test_time_slot):
+        response = _get(client, admin_token)
+        etag = response.get_etag()[0]
+        assert etag
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+        revalidated = self._revalidate(client, admin_token, etag)
+        assert revalidated.status_code == 304
+        assert revalidated.data == b""
+        assert revalidated.get_etag()[0] == etag
+
+    def test_not_modified_skips_the_view(self, test_app, client, admin_token, test_time_slot):
+        etag = _get(client, admin_token).get_etag()[0]
+
+        statements = []
+
+        def record(*args):
+            statements.append(args[2])
+
+        with test_app.app_context():
+            event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                assert self._revalidate(client, admin_token, etag).status_code == 304
+            finally:
+                event.remove(db.engine, "before_cursor_execute", record)
+        assert [s for s in statements if "data_versions" not in s] == []
+
+    def test_write_to_the_week_changes_etag(
+        self, test_app, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        etag = _get(client, admin_token).get_etag()[0]
+        with test_app.app_context():
+            _assign(test_user["id"], test_location["id"], test_time_slot["id"])
+
+        response = self._revalidate(client, admin_token, etag)
+        assert response.status_code == 200
+        assert response.get_etag()[0] != etag
+
+    def test_write_to_another_week_keeps_etag(
+        self, test_app, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        etag = _get(client, admin_token).get_etag()[0]
+        with test_app.app_context():
+            _assign(
+                test_user["id"],
+                test_location["id"],
+                test_time_slot["id"],
+                week=WEEK + timedelta(weeks=1),
+            )
+
+        assert self._revalidate(client, admin_token, etag).status_code == 304
+
+    def test_etag_depends_on_viewer(self, client, admin_token, auth_token):
+        etag = _get(client, admin_token).get_etag()[0]
+        assert _get(client, auth_token).get_etag()[0] != etag
+        assert self._revalidate(client, auth_token, etag).status_code == 200
+
+    def test_anonymous_request_is_not_revalidated(self, client):
+        with patch("routes.http_cache._etag", return_value="guessed"):
+            assert self._revalidate(client, "bad-token", "guessed").status_code == 401
+
+    def test_etag_is_keyed_by_secret_key(self, test_app, monkeypatch):
+        viewer = User(id=1, name="Viewer", email="viewer@colby.edu", role="user")
+        with test_app.test_request_context("/api/schedule/week"):
+            etag = http_cache._etag([], viewer)
+            assert http_cache._etag([], viewer) == etag
+            monkeypatch.setitem(test_app.config, "SECRET_KEY", "another-secret")
+            assert http_cache._etag([], viewer) != etag
+
+    def test_errors_have_no_etag(self, client):
+        assert _get(client, "bad-token").get_etag() == (None, None)
+
+    def test_invalid_week_is_left_to_the_view(self, client, auth_token):
+        with pytest.raises(ValueError):
+            _get(client, auth_token, week_start="not-a-date")
+
+
+class TestResponseCache:
+    """Test that repeated reads are served from the response cache."""
+
+    def _queries(self, test_app, func):
+        statements = []
+
+        def record(*args):
+            statements.append(args[2])
+
+        with test_app.app_context():
+            event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                result = func()
+            finally:
+                event.remove(db.engine, "before_cursor_execute", record)
+        return result, [s for s in statements if "data_versions" not in s]
+
+    def test_repeat_read_skips_the_view(
+        self, test_app, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            _assign(test_user["id"], test_location["id"], test_time_slot["id"])
+        first = _get(client, admin_token)
+
+        second, queries = self._queries(test_app, lambda: _get(client, admin_token))
+
+        assert queries == []
+        assert second.status_code == 200
+        assert second.get_json() == first.get_json()
+        assert second.get_etag() == first.get_etag()
+
+    def test_write_is_visible_immediately(
+        self, test_app, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        assert _get(client, admin_token).get_json()["assignments"] == []
+        with test_app.app_context():
+            assignment_id = _assign(test_user["id"], test_location["id"], test_time_slot["id"])
+
+        data = _get(client, admin_token).get_json()
+        assert [a["id"] for a in data["assignments"]] == [assignment_id]
+
+    def test_errors_are_not_cached(self, client, auth_token):
+        client.get("/api/schedule/week", headers={"Authorization": f"Bearer {auth_token}"})
+        assert len(response_cache.backend()) == 0
+
+
+class TestCoalescing:
+    """Test sharing of renders between identical requests."""
+
+    def _second_admin_token(self, test_app, client):
+        with test_app.app_context():
+            db.session.add(User(name="Other Admin", email="admin2@colby.edu", role="admin"))
+            db.session.commit()
+        response = client.post("/api/auth/test-token", json={"email": "admin2@colby.edu"})
+        return response.get_json()["token"]
+
+    def test_admins_share_responses(self, test_app, client, admin_token, test_time_slot):
+        other_token = self._second_admin_token(test_app, client)
+        first = _get(client, admin_token)
+
+        second = _get(client, other_token)
+        assert second.get_etag() == first.get_etag()
+        assert second.get_json() == first.get_json()
+
+    def test_users_do_not_share_responses(self, client, auth_token, admin_token):
+        assert _get(client, auth_token).get_etag() != _get(client, admin_token).get_etag()
+
+    def test_waiting_request_gets_the_shared_body(
+        self, test_app, client, admin_token, test_time_slot
+    ):
+        leader = _get(client, admin_token)
+        response_cache.invalidate()
+
+        # As if another thread had rendered the response while this one waited
+        with patch("routes.http_cache._in_flight.do", lambda key, func: leader):
+            with patch("routes.schedule.build_week_schedule", side_effect=AssertionError):
+                shared = _get(client, admin_token)
+
+        assert shared.status_code == 200
+        assert shared.get_json() == leader.get_json()
+        assert shared.get_etag() == leader.get_etag()
+
+    def test_waiting_request_renders_its_own_error(self, test_app, client, auth_token):
+        failed = test_app.response_class(status=500)
+        with patch("routes.http_cache._in_flight.do", lambda key, func: failed):
+            response = client.get(
+                "/api/schedule/week", headers={"Authorization": f"Bearer {auth_token}"}
+            )
+        assert response.status_code == 400
+
+
+class TestWeekEvents:
+    """Test GET /api/schedule/week/events."""
+
+    def _open(self, client, token, week=WEEK):
+        response = client.get(
+            "/api/schedule/week/events",
+            query_string={"week_start": week.isoformat()},
+            headers={"Authorization": f"Bearer {token}"},
+            buffered=False,
+        )
+        assert response.status_code == 200
+        chunks = response.response
+        assert next(chunks) == b"retry: 5000\n\n"
+        return response, chunks
+
+    def test_requires_auth_and_week(self, client, auth_token):
+        assert client.get(f"/api/schedule/week/events?week_start={WEEK}").status_code == 401
+        response = client.get(
+            "/api/schedule/week/events", headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 400
+
+    def test_streams_assignment_events(
+        self, client, admin_token, test_user, test_location, test_time_slot
+    ):
+        response, chunks = self._open(client, admin_token)
+        assert response.mimetype == "text/event-stream"
+
+        created = client.post(
+            "/api/assignments",
+            json={
+                "user_id": test_user["id"],
+                "location_id": test_location["id"],
+                "time_slot_id": test_time_slot["id"],
+                "week_start_date": WEEK.isoformat(),
+            },
+            headers={"Authorization": f"Bearer {admin_token}"},
+        ).get_json()
+
+        event = next(chunks).decode()
+        assert event.startswith("event: assignment\ndata: ")
+        assert json.loads(event.split("data: ", 1)[1]) == {
+            "type": "assignment",
+            "op": "created",
+            "id": created["id"],
+            "user_id": test_user["id"],
+        }
+        response.close()
+
+    def test_scheduler_run_event(self, client, admin_token):
+        response, chunks = self._open(client, admin_token)
+        client.post(
+            "/api/assignments/run-scheduler",
+            json={"week_start_date": WEEK.isoformat()},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert next(chunks).startswith(b"event: scheduler_run\n")
+        response.close()
+
+    def test_students_only_hear_about_their_shifts(
+        self, test_app, client, auth_token, test_admin, test_user, test_location, test_time_slot
+    ):
+        response, chunks = self._open(client, auth_token)
+        with test_app.app_context():
+            _assign(test_admin["id"], test_location["id"], test_time_slot["id"])
+            own = _assign(test_user["id"], test_location["id"], test_time_slot["id"])
+
+        event = json.loads(next(chunks).decode().split("data: ", 1)[1])
+        assert event["id"] == own
+        response.close()
+
+    def test_keepalive_and_close(self, test_app, client, auth_token):
+        with patch.dict(test_app.config, {"LIVE_UPDATES_KEEPALIVE_SECONDS": 0}):
+            response, chunks = self._open(client, auth_token)
+            assert next(chunks) == b": keepalive\n\n"
+
+        channel = live_updates.channel(WEEK)
+        assert pubsub.broker().subscriber_count(channel) == 1
+        response.close()
+        assert pubsub.broker().subscriber_count(channel) == 0
+
+    def test_streams_are_capped(self, test_app, client, auth_token, monkeypatch):
+        monkeypatch.setitem(test_app.config, "LIVE_UPDATES_MAX_STREAMS", 1)
+        response, _ = self._open(client, auth_token)
+
+        full = client.get(
+            "/api/schedule/week/events",
+            query_string={"week_start": WEEK.isoformat()},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+        assert full.status_code == 503
+        assert full.headers["Retry-After"] == "30"
+
+        # Closing a stream frees its place
+        response.close()
+        response, _ = self._open(client, auth_token)
+        response.close()
+
+
+class TestWeekCoverage:
+    """Test GET /api/schedule/week/coverage."""
+
+    def _get(self, client, token, **params):
+        return client.get(
+            "/api/schedule/week/coverage",
+            query_string=params,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def test_requires_admin_and_week(self, client, auth_token, admin_token):
+        assert self._get(client, auth_token, week_start=WEEK.isoformat()).status_code == 403
+        assert self._get(client, admin_token).status_code == 400
+
+    def test_coverage_of_every_shift(
+        self, client, test_app, admin_token, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            _assign(test_user["id"], test_location["id"], test_time_slot["id"])
+
+        response = self._get(client, admin_token, week_start=WEEK.isoformat())
+        assert response.status_code == 200
+        assert response.get_json() == [
+            {
+                "location_id": test_location["id"],
+                "time_slot_id": test_time_slot["id"],
+                "available": 0,
+                "preferred": 0,
+                "assigned": 1,
+                "capacity": 3,
+                "gap": 2,
+            }
+        ]
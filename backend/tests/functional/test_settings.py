@@ -1,12 +1,15 @@
 """
 Comprehensive tests for settings routes.
-Tests GET and PUT /api/settings endpoints.
+Tests GET and PUT /api/settings and POST /api/settings/archive endpoints.
 """
 
+from datetime import date
+
 import pytest
 
 from app import app, db
-from models import GlobalSettings, User
+from models import Assignment, GlobalSettings, User
+from services.archive import archive_cutoff
 
 
 class TestGetSettings:
@@ -121,3 +124,73 @@ class TestUpdateSettings:
         assert response.status_code == 200
         data = response.get_json()
         assert data["max_hours_per_user_per_week"] is None
+
+
+class TestArchivePastWeeks:
+    """Tests for POST /api/settings/archive endpoint."""
+
+    def test_archive_and_read_back(
+        self, test_app, admin_token, test_user, test_location, test_time_slot, monkeypatch
+    ):
+        """Archived weeks are still returned by GET /api/assignments."""
+        monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+        week = date(2020, 1, 6)
+        with test_app.app_context():
+            db.session.add(
+                Assignment(
+                    user_id=test_user["id"],
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week,
+                )
+            )
+            db.session.commit()
+
+        client = test_app.test_client()
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = client.post(
+            "/api/settings/archive", json={"before": "2021-01-04"}, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "before": "2021-01-04",
+            "moved": {
+                "assignments": 1,
+                "user_availability": 0,
+                "availability_exceptions": 0,
+                "availability_bitmaps": 0,
+                "shift_requirements": 0,
+            },
+        }
+
+        response = client.get("/api/assignments?week_start=2020-01-06", headers=headers)
+        assert [a["user_id"] for a in response.get_json()] == [test_user["id"]]
+        with test_app.app_context():
+            assert Assignment.query.count() == 0
+
+    def test_archive_defaults_to_horizon(self, client, admin_token):
+        """Without a date, weeks older than ARCHIVE_AFTER_WEEKS are archived."""
+        response = client.post(
+            "/api/settings/archive", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        before = date.fromisoformat(response.get_json()["before"])
+        assert before.weekday() == 0 and before < date.today()
+
+    def test_archive_is_capped_to_horizon(self, test_app, client, admin_token, monkeypatch):
+        """Weeks after the horizon stay writable, so they are never archived."""
+        monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+        response = client.post(
+            "/api/settings/archive",
+            json={"before": date.today().isoformat()},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        with test_app.app_context():
+            assert response.get_json()["before"] == archive_cutoff().isoformat()
+
+    def test_archive_as_user_forbidden(self, client, auth_token):
+        """Non-admin users cannot archive."""
+        response = client.post(
+            "/api/settings/archive", headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 403
@@ -379,3 +379,71 @@ class TestUpdateShiftRequirementBranches:
         assert response.status_code == 200
         data = response.get_json()
         assert data["time_slot_id"] == new_slot_id
+
+
+class TestArchivedWeeks:
+    """Shift requirements of weeks before the archive horizon are read-only."""
+
+    @pytest.fixture
+    def archived(self, test_app, test_location, test_time_slot, monkeypatch):
+        """A 26-week horizon and a requirement in an archived week."""
+        monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+        with test_app.app_context():
+            req = ShiftRequirement(
+                location_id=test_location["id"],
+                time_slot_id=test_time_slot["id"],
+                week_start_date=date(2024, 5, 6),
+                required_workers=2,
+            )
+            db.session.add(req)
+            db.session.commit()
+            return req.id
+
+    def _assert_rejected(self, test_app, response):
+        assert response.status_code == 409
+        assert response.get_json()["error"] == "WEEK_ARCHIVED"
+        with test_app.app_context():
+            assert [r.required_workers for r in ShiftRequirement.query.all()] == [2]
+
+    def test_create(self, test_app, client, admin_token, test_location, test_time_slot, archived):
+        response = client.post(
+            "/api/shift-requirements",
+            json={
+                "location_id": test_location["id"],
+                "time_slot_id": test_time_slot["id"],
+                "week_start_date": "2024-05-13",
+                "required_workers": 1,
+            },
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        self._assert_rejected(test_app, response)
+
+    def test_update_and_delete(self, test_app, client, admin_token, archived):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        url = f"/api/shift-requirements/{archived}"
+        self._assert_rejected(
+            test_app, client.put(url, json={"required_workers": 1}, headers=headers)
+        )
+        self._assert_rejected(test_app, client.delete(url, headers=headers))
+
+    def test_move_into_an_archived_week(
+        self, test_app, client, admin_token, test_location, test_time_slot, archived
+    ):
+        with test_app.app_context():
+            current = ShiftRequirement(
+                location_id=test_location["id"],
+                time_slot_id=test_time_slot["id"],
+                week_start_date=date.today(),
+                required_workers=3,
+            )
+            db.session.add(current)
+            db.session.commit()
+            current_id = current.id
+        response = client.put(
+            f"/api/shift-requirements/{current_id}",
+            json={"week_start_date": "2024-05-13"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 409
+        with test_app.app_context():
+            assert db.session.get(ShiftRequirement, current_id).week_start_date == date.today()
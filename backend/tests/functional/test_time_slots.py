@@ -3,12 +3,12 @@ Comprehensive tests for time slots routes.
 Tests CRUD operations and day schedule management.
 """
 
-from datetime import time
+from datetime import date, time
 
 import pytest
 
 from app import app, db
-from models import DaySchedule, TimeSlot
+from models import Assignment, DaySchedule, TimeSlot, UserAvailability
 
 
 class TestGetTimeSlots:
@@ -20,6 +20,27 @@ class TestGetTimeSlots:
         assert response.status_code == 200
         assert isinstance(response.get_json(), list)
 
+    def test_get_time_slots_for_week_uses_effective_grid(self, test_app, test_time_slot):
+        """With week_start, only the slots that week's schedules define are returned."""
+        with test_app.app_context():
+            db.session.add(
+                DaySchedule(
+                    day_of_week=0,
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    slot_duration_minutes=60,
+                )
+            )
+            db.session.add(TimeSlot(day_of_week=0, start_time=time(9, 0), end_time=time(10, 0)))
+            db.session.commit()
+
+        client = test_app.test_client()
+        all_slots = client.get("/api/time-slots").get_json()
+        week_slots = client.get("/api/time-slots?week_start=2024-01-01").get_json()
+
+        assert len(all_slots) == 2
+        assert [(s["start_time"], s["end_time"]) for s in week_slots] == [("09:00:00", "10:00:00")]
+
 
 class TestCreateTimeSlot:
     """Tests for POST /api/time-slots endpoint."""
@@ -60,6 +81,16 @@ class TestCreateTimeSlot:
         )
         assert response.status_code == 201
 
+    def test_create_existing_time_slot_returns_it(self, client, admin_token, test_time_slot):
+        """Creating a slot that already exists returns the existing row."""
+        response = client.post(
+            "/api/time-slots",
+            json={"day_of_week": 0, "start_time": "09:00", "end_time": "17:00"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+        assert response.get_json()["id"] == test_time_slot["id"]
+
 
 class TestUpdateTimeSlot:
     """Tests for PUT /api/time-slots/<id> endpoint."""
@@ -102,6 +133,22 @@ class TestUpdateTimeSlot:
         )
         assert response.status_code == 403
 
+    def test_update_time_slot_into_duplicate_conflicts(self, test_app, admin_token, test_time_slot):
+        """Updating a slot so it duplicates another returns 409."""
+        with test_app.app_context():
+            slot = TimeSlot(day_of_week=0, start_time=time(8, 0), end_time=time(17, 0))
+            db.session.add(slot)
+            db.session.commit()
+            slot_id = slot.id
+
+        client = test_app.test_client()
+        response = client.put(
+            f"/api/time-slots/{slot_id}",
+            json={"start_time": "09:00"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 409
+
     def test_update_nonexistent_time_slot(self, client, admin_token):
         """Updating nonexistent slot returns 404."""
         response = client.put(
@@ -130,6 +177,39 @@ class TestDeleteTimeSlot:
         assert response.status_code == 200
         assert "deleted" in response.get_json()["message"].lower()
 
+    def test_delete_time_slot_removes_references(
+        self, test_app, admin_token, test_user, test_location, test_time_slot
+    ):
+        """Deleting a slot removes the availability and assignments on it."""
+        with test_app.app_context():
+            db.session.add_all(
+                [
+                    UserAvailability(
+                        user_id=test_user["id"],
+                        location_id=test_location["id"],
+                        time_slot_id=test_time_slot["id"],
+                        week_start_date=date(2024, 1, 1),
+                    ),
+                    Assignment(
+                        user_id=test_user["id"],
+                        location_id=test_location["id"],
+                        time_slot_id=test_time_slot["id"],
+                        week_start_date=date(2024, 1, 1),
+                    ),
+                ]
+            )
+            db.session.commit()
+
+        client = test_app.test_client()
+        response = client.delete(
+            f"/api/time-slots/{test_time_slot['id']}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+        with test_app.app_context():
+            assert UserAvailability.query.count() == 0
+            assert Assignment.query.count() == 0
+
     def test_delete_time_slot_as_user_forbidden(self, client, auth_token, test_time_slot):
         """Regular user cannot delete time slot."""
         response = client.delete(
@@ -146,6 +226,41 @@ class TestDeleteTimeSlot:
         assert response.status_code == 404
 
 
+class TestCompactTimeSlots:
+    """Tests for POST /api/time-slots/compact endpoint."""
+
+    def test_compact_as_admin(self, test_app, admin_token, test_time_slot):
+        """Admin compaction deletes unused slots left over from an old template."""
+        with test_app.app_context():
+            db.session.add(
+                DaySchedule(
+                    day_of_week=0,
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    slot_duration_minutes=60,
+                )
+            )
+            db.session.add(TimeSlot(day_of_week=0, start_time=time(9, 0), end_time=time(10, 0)))
+            db.session.commit()
+
+        client = test_app.test_client()
+        response = client.post(
+            "/api/time-slots/compact", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["dead_slots_deleted"] == 1
+        assert data["slots_remaining"] == 1
+        assert "message" in data
+
+    def test_compact_as_user_forbidden(self, client, auth_token):
+        """Regular user cannot compact time slots."""
+        response = client.post(
+            "/api/time-slots/compact", headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 403
+
+
 class TestDaySchedules:
     """Tests for day schedule endpoints."""
 
@@ -378,7 +493,7 @@ class TestDayScheduleUpdateBranches:
     def test_update_day_schedule_deactivate(self, client, admin_token):
         """Test deactivating a day schedule."""
         with client.application.app_context():
-            from datetime import time
+            from datetime import date, time
 
             from database import db
             from models import DaySchedule
@@ -406,7 +521,7 @@ class TestDayScheduleUpdateBranches:
     def test_update_day_schedule_slot_duration(self, client, admin_token):
         """Test updating slot_duration_minutes."""
         with client.application.app_context():
-            from datetime import time
+            from datetime import date, time
 
             from database import db
             from models import DaySchedule
@@ -434,7 +549,7 @@ class TestDayScheduleUpdateBranches:
     def test_update_day_schedule_end_time(self, client, admin_token):
         """Test updating just end_time."""
         with client.application.app_context():
-            from datetime import time
+            from datetime import date, time
 
             from database import db
             from models import DaySchedule
@@ -289,6 +289,35 @@ class TestCreateFromStandard:
         data = response.get_json()
         assert isinstance(data, list)
 
+    def test_create_from_standard_generates_slots_for_every_day(self, test_app, admin_token):
+        """All active days get their overrides and slots in one request."""
+        from models import TimeSlot
+
+        with test_app.app_context():
+            for day in range(3):
+                db.session.add(
+                    DaySchedule(
+                        day_of_week=day,
+                        start_time=time(9, 0),
+                        end_time=time(10, 0),
+                        slot_duration_minutes=30,
+                        is_active=True,
+                    )
+                )
+            db.session.commit()
+
+        client = test_app.test_client()
+        response = client.post(
+            "/api/weekly-overrides/create-from-standard",
+            json={"week_start_date": "2024-07-15"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 201
+        assert len(response.get_json()) == 3
+        with test_app.app_context():
+            for day in range(3):
+                assert TimeSlot.query.filter_by(day_of_week=day).count() == 2
+
     def test_create_from_standard_as_user_forbidden(self, client, auth_token):
         """Regular user cannot create from standard."""
         response = client.post(
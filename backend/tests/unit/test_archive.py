@@ -0,0 +1,168 @@
+"""
+Unit tests for archiving past weeks.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from database import db
+from models import (
+    ArchivedAssignment,
+    ArchivedAvailabilityBitmap,
+    ArchivedAvailabilityException,
+    ArchivedUserAvailability,
+    Assignment,
+    AvailabilityBitmap,
+    AvailabilityException,
+    ShiftRequirement,
+    TimeSlot,
+    UserAvailability,
+)
+from services import availability_bits
+from services.archive import archive_cutoff, archive_old_weeks, week_models, week_rows
+from services.availability import get_week_availability
+from services.bulk import delete_cascading
+
+
+@pytest.fixture(autouse=True)
+def horizon(test_app, monkeypatch):
+    monkeypatch.setitem(test_app.config, "ARCHIVE_AFTER_WEEKS", 26)
+
+
+def _week_start(weeks_ago=0):
+    today = date.today()
+    return today - timedelta(days=today.weekday(), weeks=weeks_ago)
+
+
+def _assignment(user_id, location_id, time_slot_id, week):
+    return Assignment(
+        user_id=user_id, location_id=location_id, time_slot_id=time_slot_id, week_start_date=week
+    )
+
+
+class TestArchiveOldWeeks:
+    """Test moving old weeks into the archive tables."""
+
+    def test_moves_old_weeks_in_batches(self, test_app, test_user, test_location, test_time_slot):
+        with test_app.app_context():
+            ids = test_user["id"], test_location["id"], test_time_slot["id"]
+            old_weeks = [_week_start(52), _week_start(40), _week_start(30)]
+            db.session.add_all(_assignment(*ids, week) for week in old_weeks)
+            db.session.add(_assignment(*ids, _week_start()))
+            db.session.add(
+                UserAvailability(
+                    user_id=ids[0],
+                    location_id=ids[1],
+                    time_slot_id=ids[2],
+                    week_start_date=old_weeks[0],
+                )
+            )
+            db.session.commit()
+            old_ids = sorted(
+                a.id for a in Assignment.query.filter(Assignment.week_start_date < archive_cutoff())
+            )
+
+            counts = archive_old_weeks(batch_size=2)
+
+            assert counts == {
+                "assignments": 3,
+                "user_availability": 1,
+                "availability_exceptions": 0,
+                "availability_bitmaps": 0,
+                "shift_requirements": 0,
+            }
+            assert Assignment.query.one().week_start_date == _week_start()
+            assert sorted(a.id for a in ArchivedAssignment.query) == old_ids
+            assert ArchivedUserAvailability.query.count() == 1
+            assert set(archive_old_weeks().values()) == {0}
+
+    def test_past_weeks_stay_readable(self, test_app, test_user, test_location, test_time_slot):
+        with test_app.app_context():
+            ids = test_user["id"], test_location["id"], test_time_slot["id"]
+            week = _week_start(60)
+            db.session.add_all(
+                [
+                    _assignment(*ids, week),
+                    UserAvailability(
+                        user_id=ids[0],
+                        location_id=ids[1],
+                        time_slot_id=ids[2],
+                        week_start_date=week,
+                    ),
+                ]
+            )
+            db.session.commit()
+            archive_old_weeks()
+            # Added after archiving: both tables are read
+            db.session.add(
+                ShiftRequirement(
+                    location_id=ids[1],
+                    time_slot_id=ids[2],
+                    week_start_date=week,
+                    required_workers=1,
+                )
+            )
+            db.session.commit()
+
+            assignments = week_rows(Assignment, week, user_id=ids[0])
+            assert [a.to_dict()["location_name"] for a in assignments] == ["Test Location"]
+            assert len(week_rows(ShiftRequirement, week)) == 1
+            assert get_week_availability(week).for_slot(ids[1], ids[2]) == {ids[0]: 1}
+
+    def test_exceptions_and_bitmaps_are_archived(
+        self, test_app, test_user, test_admin, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            location_id, slot_id = test_location["id"], test_time_slot["id"]
+            week = _week_start(60)
+            bits = availability_bits.cells_to_masks({(location_id, slot_id): 1})
+            db.session.add_all(
+                [
+                    AvailabilityException(
+                        user_id=test_user["id"],
+                        location_id=location_id,
+                        time_slot_id=slot_id,
+                        week_start_date=week,
+                        preference_level=2,
+                    ),
+                    AvailabilityBitmap(
+                        user_id=test_admin["id"],
+                        week_start_date=week,
+                        data=availability_bits.encode(bits),
+                    ),
+                ]
+            )
+            db.session.commit()
+
+            counts = archive_old_weeks()
+            assert (counts["availability_exceptions"], counts["availability_bitmaps"]) == (1, 1)
+            assert AvailabilityException.query.count() == AvailabilityBitmap.query.count() == 0
+            assert ArchivedAvailabilityException.query.count() == 1
+            assert ArchivedAvailabilityBitmap.query.count() == 1
+            assert get_week_availability(week).for_slot(location_id, slot_id) == {
+                test_user["id"]: 2,
+                test_admin["id"]: 1,
+            }
+
+    def test_deleting_slots_keeps_archived_history(
+        self, test_app, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            ids = test_user["id"], test_location["id"], test_time_slot["id"]
+            db.session.add(_assignment(*ids, _week_start(60)))
+            db.session.commit()
+            archive_old_weeks()
+
+            counts = delete_cascading(TimeSlot)
+            db.session.commit()
+
+            assert not any(table.endswith("_archive") for table in counts)
+            (archived,) = ArchivedAssignment.query.all()
+            assert archived.time_slot_id == ids[2]
+            assert archived.to_dict()["time_slot"] is None
+
+    def test_current_weeks_only_read_hot_tables(self, test_app):
+        with test_app.app_context():
+            assert week_models(Assignment, _week_start()) == (Assignment,)
+            assert week_models(Assignment, _week_start(1)) == (Assignment, ArchivedAssignment)
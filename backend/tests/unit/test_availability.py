@@ -0,0 +1,427 @@
+"""
+Unit tests for availability templates, exceptions and the per-week view.
+"""
+
+from datetime import date, time, timedelta
+
+import pytest
+
+from database import db
+from models import (
+    AvailabilityBitmap,
+    AvailabilityException,
+    AvailabilityTemplate,
+    TimeSlot,
+    UserAvailability,
+)
+from services import availability, availability_bits
+from services.availability import (
+    clear_slot_bits,
+    copy_week_availability,
+    get_week_availability,
+    load_week_availability,
+    replace_template,
+    replace_week_availability,
+)
+from services.bulk import delete_cascading
+from services.scheduler import run_auto_scheduler
+
+WEEK = date(2024, 3, 4)
+
+
+@pytest.fixture
+def slots(test_app):
+    """Two Monday slots (no day schedule, so both are in every week's grid)."""
+    with test_app.app_context():
+        rows = [
+            TimeSlot(day_of_week=0, start_time=time(hour, 0), end_time=time(hour + 1, 0))
+            for hour in (9, 10)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.id for row in rows]
+
+
+@pytest.fixture
+def bitmap_storage(test_app):
+    test_app.config["AVAILABILITY_STORAGE"] = "bitmap"
+    yield
+    test_app.config["AVAILABILITY_STORAGE"] = "rows"
+
+
+def _template(user_id, location_id, hour, preference=1):
+    return AvailabilityTemplate(
+        user_id=user_id,
+        location_id=location_id,
+        day_of_week=0,
+        start_time=time(hour, 0),
+        end_time=time(hour + 1, 0),
+        preference_level=preference,
+    )
+
+
+class TestLoadWeekAvailability:
+    """Test how templates, exceptions and explicit rows combine."""
+
+    def test_template_expands_onto_week_grid(self, test_app, test_user, test_location, slots):
+        with test_app.app_context():
+            db.session.add_all(
+                [
+                    _template(test_user["id"], test_location["id"], 9, preference=2),
+                    # No 14:00 slot exists, so this cell is not part of any week
+                    _template(test_user["id"], test_location["id"], 14),
+                ]
+            )
+            db.session.commit()
+
+            week = load_week_availability(WEEK)
+            assert week.for_slot(test_location["id"], slots[0]) == {test_user["id"]: 2}
+            assert week.for_slot(test_location["id"], slots[1]) == {}
+            assert week.for_user(test_user["id"]) == [
+                {
+                    "id": None,
+                    "user_id": test_user["id"],
+                    "location_id": test_location["id"],
+                    "time_slot_id": slots[0],
+                    "week_start_date": "2024-03-04",
+                    "preference_level": 2,
+                }
+            ]
+
+    def test_exceptions_and_rows_override_template(self, test_app, test_user, test_location, slots):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            db.session.add_all(
+                [
+                    _template(user_id, location_id, 9),
+                    _template(user_id, location_id, 10),
+                    # Not available at 9 this week
+                    AvailabilityException(
+                        user_id=user_id,
+                        location_id=location_id,
+                        time_slot_id=slots[0],
+                        week_start_date=WEEK,
+                        preference_level=0,
+                    ),
+                    # An explicit row for 10 wins over the template
+                    UserAvailability(
+                        user_id=user_id,
+                        location_id=location_id,
+                        time_slot_id=slots[1],
+                        week_start_date=WEEK,
+                        preference_level=2,
+                    ),
+                ]
+            )
+            db.session.commit()
+
+            week = load_week_availability(WEEK)
+            assert week.for_slot(location_id, slots[0]) == {}
+            assert week.for_slot(location_id, slots[1]) == {user_id: 2}
+            assert week.for_user(user_id)[0]["id"] is not None
+
+            # Other weeks only see the template
+            assert load_week_availability(WEEK + timedelta(days=7)).for_slot(
+                location_id, slots[0]
+            ) == {user_id: 1}
+
+
+class TestAnyLocation:
+    """Test entries without a location, which cover every location."""
+
+    def test_any_location_entry_covers_every_location(
+        self, test_app, test_user, test_location, slots
+    ):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            replace_week_availability(
+                user_id,
+                WEEK,
+                [
+                    {"location_id": None, "time_slot_id": slots[0]},
+                    {"time_slot_id": slots[1]},
+                    # A location-specific entry wins over the wildcard
+                    {"location_id": location_id, "time_slot_id": slots[1], "preference_level": 2},
+                ],
+            )
+            db.session.commit()
+
+            assert UserAvailability.query.count() == 3
+            week = get_week_availability(WEEK)
+            assert week.for_slot(location_id, slots[0]) == {user_id: 1}
+            assert week.for_slot(location_id + 1, slots[0]) == {user_id: 1}
+            assert week.for_slot(location_id, slots[1]) == {user_id: 2}
+            assert [
+                (entry["location_id"], entry["time_slot_id"]) for entry in week.for_user(user_id)
+            ] == [(None, slots[0]), (None, slots[1]), (location_id, slots[1])]
+
+    def test_scheduler_assigns_any_location_users(self, test_app, test_user, test_location, slots):
+        with test_app.app_context():
+            db.session.add(_template(test_user["id"], None, 9))
+            db.session.commit()
+
+            result = run_auto_scheduler(WEEK)
+
+            assert result["scheduled"] == 1
+            assert result["assignments"][0]["location_id"] == test_location["id"]
+
+    def test_any_location_bitmap(self, test_app, test_user, test_location, slots, bitmap_storage):
+        with test_app.app_context():
+            replace_week_availability(test_user["id"], WEEK, [{"time_slot_id": slots[0]}])
+            db.session.commit()
+
+            assert AvailabilityBitmap.query.count() == 1
+            assert get_week_availability(WEEK).for_slot(test_location["id"], slots[0]) == {
+                test_user["id"]: 1
+            }
+
+
+class TestAvailabilityWrites:
+    """Test template and week writes."""
+
+    def test_replace_template_stores_slot_times(self, test_app, test_user, test_location, slots):
+        with test_app.app_context():
+            counts = replace_template(
+                test_user["id"],
+                [{"location_id": test_location["id"], "time_slot_id": slots[1]}],
+            )
+            db.session.commit()
+
+            assert counts["created"] == 1
+            template = AvailabilityTemplate.query.one()
+            assert (template.day_of_week, template.start_time) == (0, time(10, 0))
+            assert template.to_dict()["end_time"] == "11:00:00"
+
+    def test_replace_template_rejects_unknown_slots(self, test_app, test_user, test_location):
+        with test_app.app_context():
+            with pytest.raises(ValueError, match="Unknown time slot"):
+                replace_template(
+                    test_user["id"], [{"location_id": test_location["id"], "time_slot_id": 99999}]
+                )
+
+    def test_week_of_templated_user_is_stored_as_delta(
+        self, test_app, test_user, test_location, slots
+    ):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            db.session.add_all(
+                [
+                    _template(user_id, location_id, 9),
+                    UserAvailability(
+                        user_id=user_id,
+                        location_id=location_id,
+                        time_slot_id=slots[0],
+                        week_start_date=WEEK,
+                    ),
+                ]
+            )
+            db.session.commit()
+
+            # Drop 9:00 and add 10:00 for this week only
+            counts = replace_week_availability(
+                user_id, WEEK, [{"location_id": location_id, "time_slot_id": slots[1]}]
+            )
+            db.session.commit()
+
+            assert counts["stored_as"] == "exceptions"
+            assert UserAvailability.query.count() == 0
+            exceptions = {
+                e.time_slot_id: e.preference_level for e in AvailabilityException.query.all()
+            }
+            assert exceptions == {slots[0]: 0, slots[1]: 1}
+            entries = get_week_availability(WEEK).for_user(user_id)
+            assert [entry["time_slot_id"] for entry in entries] == [slots[1]]
+
+            # Saving exactly the template again leaves nothing stored for the week
+            replace_week_availability(
+                user_id, WEEK, [{"location_id": location_id, "time_slot_id": slots[0]}]
+            )
+            db.session.commit()
+            assert AvailabilityException.query.count() == 0
+
+    def test_copy_forward_copies_template_exceptions(
+        self, test_app, test_user, test_location, slots
+    ):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            db.session.add(_template(user_id, location_id, 9))
+            db.session.commit()
+            # Not available at 9 this week, but available at 10
+            replace_week_availability(
+                user_id, WEEK, [{"location_id": location_id, "time_slot_id": slots[1]}]
+            )
+            db.session.commit()
+            assert AvailabilityException.query.count() == 2
+            next_week = WEEK + timedelta(days=7)
+
+            assert copy_week_availability(WEEK, next_week) == 2
+            db.session.commit()
+            entries = get_week_availability(next_week).for_user(user_id)
+            assert [entry["time_slot_id"] for entry in entries] == [slots[1]]
+            assert copy_week_availability(WEEK, next_week, user_id=user_id) == 0
+
+
+class TestBitmapStorage:
+    """Test weeks stored as one AvailabilityBitmap row."""
+
+    def test_week_is_stored_as_one_bitmap(
+        self, test_app, test_user, test_location, slots, bitmap_storage
+    ):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            db.session.add(
+                UserAvailability(
+                    user_id=user_id,
+                    location_id=location_id,
+                    time_slot_id=slots[0],
+                    week_start_date=WEEK,
+                )
+            )
+            db.session.commit()
+
+            entries = [
+                {"location_id": location_id, "time_slot_id": slots[0]},
+                {"location_id": location_id, "time_slot_id": slots[1], "preference_level": 2},
+            ]
+            counts = replace_week_availability(user_id, WEEK, entries)
+            db.session.commit()
+
+            assert counts == {
+                "created": 2,
+                "updated": 0,
+                "deleted": 0,
+                "unchanged": 0,
+                "stored_as": "bitmap",
+            }
+            assert UserAvailability.query.count() == 0
+            assert AvailabilityBitmap.query.count() == 1
+            week = get_week_availability(WEEK)
+            assert week.for_slot(location_id, slots[0]) == {user_id: 1}
+            assert week.for_slot(location_id, slots[1]) == {user_id: 2}
+
+            counts = replace_week_availability(user_id, WEEK, entries[1:])
+            db.session.commit()
+            assert (counts["deleted"], counts["unchanged"]) == (1, 1)
+            assert get_week_availability(WEEK).for_slot(location_id, slots[0]) == {}
+
+            # Saving the same week again writes nothing; an empty week removes the row
+            assert replace_week_availability(user_id, WEEK, entries[1:])["unchanged"] == 1
+            replace_week_availability(user_id, WEEK, [])
+            db.session.commit()
+            assert AvailabilityBitmap.query.count() == 0
+
+    def test_saving_rows_replaces_bitmap(
+        self, test_app, test_user, test_location, slots, bitmap_storage
+    ):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            replace_week_availability(
+                user_id, WEEK, [{"location_id": location_id, "time_slot_id": slots[0]}]
+            )
+            db.session.commit()
+
+            test_app.config["AVAILABILITY_STORAGE"] = "rows"
+            counts = replace_week_availability(
+                user_id, WEEK, [{"location_id": location_id, "time_slot_id": slots[1]}]
+            )
+            db.session.commit()
+
+            assert counts["stored_as"] == "rows"
+            assert AvailabilityBitmap.query.count() == 0
+            entries = get_week_availability(WEEK).for_user(user_id)
+            assert [entry["time_slot_id"] for entry in entries] == [slots[1]]
+
+    def test_copy_forward_copies_bitmaps(
+        self, test_app, test_user, test_location, slots, bitmap_storage
+    ):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            replace_week_availability(
+                user_id,
+                WEEK,
+                [{"location_id": location_id, "time_slot_id": slot_id} for slot_id in slots],
+            )
+            db.session.commit()
+            next_week = WEEK + timedelta(days=7)
+
+            assert copy_week_availability(WEEK, next_week) == 2
+            db.session.commit()
+            assert get_week_availability(next_week).for_slot(location_id, slots[1]) == {user_id: 1}
+
+            # The target week already has a bitmap, so nothing is copied again
+            assert copy_week_availability(WEEK, next_week, user_id=user_id) == 0
+
+    def test_deleting_a_slot_clears_its_bits(
+        self, test_app, test_user, test_location, slots, bitmap_storage
+    ):
+        with test_app.app_context():
+            user_id, location_id = test_user["id"], test_location["id"]
+            replace_week_availability(
+                user_id,
+                WEEK,
+                [{"location_id": location_id, "time_slot_id": slot_id} for slot_id in slots],
+            )
+            db.session.commit()
+
+            delete_cascading(TimeSlot, TimeSlot.id == slots[0])
+            db.session.commit()
+            bitmap = AvailabilityBitmap.query.one()
+            cells = availability_bits.masks_to_cells(availability_bits.decode(bitmap.data))
+            assert cells == {(location_id, slots[1]): 1}
+
+            assert clear_slot_bits([slots[1]]) == 1
+            assert clear_slot_bits([]) == 0
+            db.session.commit()
+            assert AvailabilityBitmap.query.count() == 0
+
+    def test_bits_outside_the_week_grid_are_ignored(
+        self, test_app, test_user, test_location, slots
+    ):
+        with test_app.app_context():
+            location_id = test_location["id"]
+            masks = availability_bits.cells_to_masks(
+                {(location_id, slots[0]): 1, (location_id, 999): 1}
+            )
+            db.session.add(
+                AvailabilityBitmap(
+                    user_id=test_user["id"],
+                    week_start_date=WEEK,
+                    data=availability_bits.encode(masks),
+                )
+            )
+            db.session.commit()
+            entries = load_week_availability(WEEK).for_user(test_user["id"])
+            assert [entry["time_slot_id"] for entry in entries] == [slots[0]]
+
+
+class TestWeekAvailabilityCache:
+    """Test caching of the expanded week."""
+
+    def test_cached_until_template_changes(self, test_app, test_user, test_location, slots):
+        with test_app.app_context():
+            week = get_week_availability(WEEK)
+            assert get_week_availability(WEEK) is week
+
+            replace_template(
+                test_user["id"], [{"location_id": test_location["id"], "time_slot_id": slots[0]}]
+            )
+            db.session.commit()
+
+            assert get_week_availability(WEEK) is not week
+            assert get_week_availability(WEEK).for_slot(test_location["id"], slots[0])
+
+    def test_invalidate(self, test_app):
+        with test_app.app_context():
+            week = get_week_availability(WEEK)
+            availability.invalidate(WEEK)
+            assert get_week_availability(WEEK) is not week
+
+    def test_scheduler_uses_templates(self, test_app, test_user, test_location, slots):
+        with test_app.app_context():
+            db.session.add(_template(test_user["id"], test_location["id"], 9))
+            db.session.commit()
+
+            result = run_auto_scheduler(WEEK)
+
+            assert result["scheduled"] == 1
+            assert result["assignments"][0]["time_slot_id"] == slots[0]
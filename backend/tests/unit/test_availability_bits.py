@@ -0,0 +1,62 @@
+"""
+Unit tests for the packed availability bitmap encoding.
+"""
+
+import pytest
+
+from services.availability_bits import (
+    cells_to_masks,
+    decode,
+    encode,
+    mask_of,
+    masks_to_cells,
+    slot_ids,
+)
+
+
+class TestMasks:
+    """Test conversion between slot ids and masks."""
+
+    def test_mask_round_trip(self):
+        assert mask_of([1, 3, 64]) == (1 << 1) | (1 << 3) | (1 << 64)
+        assert slot_ids(mask_of([64, 3, 1])) == [1, 3, 64]
+        assert slot_ids(0) == []
+
+    def test_cells_round_trip(self):
+        cells = {(1, 5): 1, (1, 6): 2, (2, 5): 1}
+        assert cells_to_masks(cells) == {(1, 1): 1 << 5, (1, 2): 1 << 6, (2, 1): 1 << 5}
+        assert masks_to_cells(cells_to_masks(cells)) == cells
+
+    def test_higher_preference_wins(self):
+        assert masks_to_cells({(1, 2): 1 << 5, (1, 1): 1 << 5}) == {(1, 5): 2}
+
+
+class TestEncoding:
+    """Test the blob format."""
+
+    def test_encode_decode_round_trip(self):
+        masks = {(1, 1): mask_of([2, 300]), (7, 2): mask_of([4])}
+        assert decode(encode(masks)) == masks
+
+    def test_any_location_round_trip(self):
+        masks = {(None, 1): mask_of([2]), (3, 1): mask_of([2])}
+        assert decode(encode(masks)) == masks
+
+    def test_empty_masks_are_skipped(self):
+        assert decode(encode({(1, 1): 0})) == {}
+        assert decode(b"") == {}
+
+    def test_size_follows_the_span_of_slot_ids(self):
+        low = encode({(1, 1): mask_of([3, 10, 20])})
+        high = encode({(1, 1): mask_of([1_000_003, 1_000_010, 1_000_020])})
+        assert len(high) <= len(low) + 1
+        assert decode(high) == {(1, 1): mask_of([1_000_003, 1_000_010, 1_000_020])}
+
+    def test_version_1_blobs_are_read(self):
+        # location 7, preference 2, 1 byte: slots 1 and 3
+        blob = b"\x01" + (7).to_bytes(4, "little") + b"\x02" + (1).to_bytes(4, "little") + b"\x0a"
+        assert decode(blob) == {(7, 2): mask_of([1, 3])}
+
+    def test_unknown_version_is_rejected(self):
+        with pytest.raises(ValueError, match="version"):
+            decode(b"\x09")
@@ -0,0 +1,138 @@
+"""
+Unit tests for the set-based write helpers.
+"""
+
+from datetime import date, time, timedelta
+
+from database import db
+from models import Assignment, ShiftRequirement, TimeSlot, User, UserAvailability
+from services.bulk import chunked, delete_cascading, delete_orphans
+
+
+def _week_start():
+    return date.today() - timedelta(days=date.today().weekday())
+
+
+class TestChunked:
+    """Test chunked()."""
+
+    def test_chunked_splits_into_bounded_lists(self):
+        assert list(chunked(range(5), size=2)) == [[0, 1], [2, 3], [4]]
+        assert list(chunked([], size=2)) == []
+
+
+class TestDeleteCascading:
+    """Test application-side ON DELETE rules."""
+
+    def test_deleting_slot_removes_referencing_rows(
+        self, test_app, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            slot_id = test_time_slot["id"]
+            other_slot = TimeSlot(day_of_week=1, start_time=time(9, 0), end_time=time(10, 0))
+            db.session.add(other_slot)
+            db.session.commit()
+            for time_slot_id in (slot_id, other_slot.id):
+                db.session.add_all(
+                    [
+                        UserAvailability(
+                            user_id=test_user["id"],
+                            location_id=test_location["id"],
+                            time_slot_id=time_slot_id,
+                            week_start_date=_week_start(),
+                        ),
+                        Assignment(
+                            user_id=test_user["id"],
+                            location_id=test_location["id"],
+                            time_slot_id=time_slot_id,
+                            week_start_date=_week_start(),
+                        ),
+                    ]
+                )
+            db.session.commit()
+
+            counts = delete_cascading(TimeSlot, TimeSlot.id == slot_id)
+            db.session.commit()
+
+            assert counts == {
+                "time_slots": 1,
+                "user_availability": 1,
+                "availability_exceptions": 0,
+                "assignments": 1,
+                "shift_requirements": 0,
+            }
+            assert UserAvailability.query.one().time_slot_id == other_slot.id
+            assert Assignment.query.one().time_slot_id == other_slot.id
+
+    def test_deleting_user_clears_nullable_references(
+        self, test_app, test_user, test_admin, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            db.session.add_all(
+                [
+                    Assignment(
+                        user_id=test_user["id"],
+                        location_id=test_location["id"],
+                        time_slot_id=test_time_slot["id"],
+                        week_start_date=_week_start(),
+                        assigned_by=test_admin["id"],
+                    ),
+                    ShiftRequirement(
+                        location_id=test_location["id"],
+                        time_slot_id=test_time_slot["id"],
+                        week_start_date=_week_start(),
+                        required_workers=2,
+                        created_by=test_admin["id"],
+                    ),
+                ]
+            )
+            db.session.commit()
+
+            delete_cascading(User, User.id == test_admin["id"])
+            db.session.commit()
+
+            assert Assignment.query.one().assigned_by is None
+            assert ShiftRequirement.query.one().created_by is None
+
+
+class TestDeleteOrphans:
+    """Test batched orphan deletion."""
+
+    def test_deletes_orphans_in_batches(self, test_app, test_user, test_location, test_time_slot):
+        with test_app.app_context():
+            # Three orphans (missing slot, location or user) and one valid row
+            rows = [
+                (test_user["id"], test_location["id"], 99999),
+                (test_user["id"], 99999, test_time_slot["id"]),
+                (99999, test_location["id"], test_time_slot["id"]),
+                (test_user["id"], test_location["id"], test_time_slot["id"]),
+            ]
+            db.session.add_all(
+                Assignment(
+                    user_id=user_id,
+                    location_id=location_id,
+                    time_slot_id=time_slot_id,
+                    week_start_date=_week_start(),
+                )
+                for user_id, location_id, time_slot_id in rows
+            )
+            db.session.commit()
+
+            assert delete_orphans(Assignment, batch_size=2) == 3
+            assert Assignment.query.one().time_slot_id == test_time_slot["id"]
+            assert delete_orphans(Assignment, batch_size=2) == 0
+
+    def test_null_references_are_not_orphans(self, test_app, test_user, test_time_slot):
+        with test_app.app_context():
+            # location_id NULL is an "any location" entry
+            db.session.add(
+                UserAvailability(
+                    user_id=test_user["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=_week_start(),
+                )
+            )
+            db.session.commit()
+
+            assert delete_orphans(UserAvailability) == 0
+            assert UserAvailability.query.count() == 1
@@ -0,0 +1,181 @@
+"""
+Unit tests for the week-wide candidate lookup.
+"""
+
+from datetime import date, time
+
+import pytest
+
+from database import db
+from models import (
+    Assignment,
+    GlobalSettings,
+    Location,
+    ShiftRequirement,
+    TimeSlot,
+    User,
+    UserAvailability,
+)
+from services.candidates import week_candidates
+
+WEEK = date(2024, 3, 4)
+
+
+@pytest.fixture
+def week(test_app):
+    """Two locations, a 4h and a 2h slot on Monday, three workers."""
+    with test_app.app_context():
+        locations = [Location(name=f"Desk {n}", is_active=True) for n in range(2)]
+        slots = [
+            TimeSlot(day_of_week=0, start_time=time(9, 0), end_time=time(13, 0)),
+            TimeSlot(day_of_week=0, start_time=time(13, 0), end_time=time(15, 0)),
+        ]
+        workers = [User(name=f"Worker {n}", email=f"cand{n}@colby.edu") for n in range(3)]
+        db.session.add_all([*locations, *slots, *workers])
+        db.session.commit()
+        yield {
+            "locations": [location.id for location in locations],
+            "slots": [slot.id for slot in slots],
+            "workers": [worker.id for worker in workers],
+        }
+
+
+def _available(user_id, location_id, time_slot_id, preference_level=1):
+    db.session.add(
+        UserAvailability(
+            user_id=user_id,
+            location_id=location_id,
+            time_slot_id=time_slot_id,
+            week_start_date=WEEK,
+            preference_level=preference_level,
+        )
+    )
+
+
+def _shift(shifts, location_id, time_slot_id):
+    return next(
+        shift
+        for shift in shifts
+        if (shift["location_id"], shift["time_slot_id"]) == (location_id, time_slot_id)
+    )
+
+
+class TestWeekCandidates:
+    """Test week_candidates."""
+
+    def test_every_shift_of_the_week(self, week):
+        shifts = week_candidates(WEEK)
+        assert {(shift["location_id"], shift["time_slot_id"]) for shift in shifts} == {
+            (location_id, slot_id) for location_id in week["locations"] for slot_id in week["slots"]
+        }
+        assert all(shift["candidates"] == [] for shift in shifts)
+
+    def test_requested_subset(self, week):
+        shifts = week_candidates(WEEK, [week["locations"][1]], [week["slots"][0]])
+        assert [(shift["location_id"], shift["time_slot_id"]) for shift in shifts] == [
+            (week["locations"][1], week["slots"][0])
+        ]
+
+    def test_inactive_locations_are_skipped(self, week):
+        db.session.get(Location, week["locations"][1]).is_active = False
+        db.session.commit()
+        shifts = week_candidates(WEEK)
+        assert {shift["location_id"] for shift in shifts} == {week["locations"][0]}
+
+    def test_candidates_are_available_and_not_busy(self, week):
+        desk, other_desk = week["locations"]
+        morning, afternoon = week["slots"]
+        first, second, third = week["workers"]
+        _available(first, desk, morning, 2)
+        _available(second, desk, morning)
+        _available(third, None, morning)  # any location
+        _available(first, desk, afternoon)
+        # Working the morning at the other desk rules the second worker out of it
+        db.session.add(
+            Assignment(
+                user_id=second, location_id=other_desk, time_slot_id=morning, week_start_date=WEEK
+            )
+        )
+        db.session.commit()
+
+        shifts = week_candidates(WEEK)
+        candidates = _shift(shifts, desk, morning)["candidates"]
+        assert [c["user_id"] for c in candidates] == [first, third]
+        assert [c["preference_level"] for c in candidates] == [2, 1]
+        assert [c["user_id"] for c in _shift(shifts, other_desk, morning)["candidates"]] == [third]
+        assert [c["user_id"] for c in _shift(shifts, desk, afternoon)["candidates"]] == [first]
+
+    def test_fewest_hours_first_and_remaining_hours(self, week):
+        desk, other_desk = week["locations"]
+        morning, afternoon = week["slots"]
+        first, second, _ = week["workers"]
+        GlobalSettings.query.first().max_hours_per_user_per_week = 10
+        _available(first, desk, afternoon)
+        _available(second, desk, afternoon)
+        db.session.add(
+            Assignment(
+                user_id=first, location_id=other_desk, time_slot_id=morning, week_start_date=WEEK
+            )
+        )
+        db.session.commit()
+
+        candidates = _shift(week_candidates(WEEK), desk, afternoon)["candidates"]
+        assert [(c["user_id"], c["remaining_hours"]) for c in candidates] == [
+            (second, 10),
+            (first, 6),
+        ]
+
+    @pytest.mark.parametrize("limit, included", [(6, True), (5, False)])
+    def test_hour_limit_excludes_users(self, week, limit, included):
+        desk, other_desk = week["locations"]
+        morning, afternoon = week["slots"]
+        first = week["workers"][0]
+        GlobalSettings.query.first().max_hours_per_user_per_week = limit
+        _available(first, desk, afternoon)
+        db.session.add(
+            Assignment(
+                user_id=first, location_id=other_desk, time_slot_id=morning, week_start_date=WEEK
+            )
+        )
+        db.session.commit()
+
+        # 4h booked + the 2h afternoon shift, as in run_auto_scheduler
+        candidates = _shift(week_candidates(WEEK), desk, afternoon)["candidates"]
+        assert [c["user_id"] for c in candidates] == ([first] if included else [])
+
+    def test_no_hour_limit(self, week):
+        _available(week["workers"][0], week["locations"][0], week["slots"][0])
+        db.session.commit()
+        shift = _shift(week_candidates(WEEK), week["locations"][0], week["slots"][0])
+        assert shift["candidates"][0]["remaining_hours"] is None
+
+    def test_remaining_capacity(self, week):
+        desk = week["locations"][0]
+        morning, afternoon = week["slots"]
+        GlobalSettings.query.first().max_workers_per_shift = 3
+        db.session.add_all(
+            [
+                ShiftRequirement(
+                    location_id=desk,
+                    time_slot_id=afternoon,
+                    week_start_date=WEEK,
+                    required_workers=1,
+                ),
+                Assignment(
+                    user_id=week["workers"][0],
+                    location_id=desk,
+                    time_slot_id=morning,
+                    week_start_date=WEEK,
+                ),
+            ]
+        )
+        db.session.commit()
+        shifts = week_candidates(WEEK)
+        assert _shift(shifts, desk, morning)["remaining_capacity"] == 2
+        assert _shift(shifts, desk, afternoon)["remaining_capacity"] == 1
+
+    def test_deleted_users_are_dropped(self, week):
+        _available(9999, week["locations"][0], week["slots"][0])  # orphaned availability
+        db.session.commit()
+        shift = _shift(week_candidates(WEEK), week["locations"][0], week["slots"][0])
+        assert shift["candidates"] == []
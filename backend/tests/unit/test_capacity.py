@@ -0,0 +1,309 @@
+"""
+Unit tests for the week capacity oracle.
+"""
+
+from datetime import date, time, timedelta
+
+import pytest
+
+from database import db
+from models import Assignment, GlobalSettings, ShiftRequirement, TimeSlot, User
+from services import capacity, reference_data
+from services.capacity import WeekCapacity, get_week_capacity, load_week_capacity
+
+
+def _week_start():
+    return date.today() - timedelta(days=date.today().weekday())
+
+
+def _make_users(count):
+    users = [User(name=f"Worker {i}", email=f"cap{i}@colby.edu", role="user") for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+class TestWeekCapacity:
+    """Test the in-memory WeekCapacity rules."""
+
+    def test_capacity_uses_override_or_default(self):
+        week = WeekCapacity(_week_start(), 3, overrides={(1, 10): 5})
+        assert week.capacity(1, 10) == 5
+        assert week.capacity(1, 11) == 3
+        assert week.capacity("1", "10") == 5
+
+    def test_check_over_max_workers(self):
+        week = WeekCapacity(_week_start(), 2, assignments=[(1, 1, 10), (2, 1, 10)])
+        problem = week.check(3, 1, 10)
+        assert problem["error"] == "OVER_MAX_WORKERS"
+        assert "Maximum 2 workers" in problem["message"]
+
+    def test_check_overlap_at_any_location(self):
+        week = WeekCapacity(_week_start(), 3, assignments=[(1, 1, 10)])
+        assert week.check(1, 2, 10)["error"] == "OVERLAP_FOR_USER"
+        assert week.check(1, 2, 11) is None
+
+    def test_check_excludes_current_placement(self):
+        week = WeekCapacity(_week_start(), 1, assignments=[(1, 1, 10)])
+        # Re-validating the same placement (e.g. editing another field) is allowed
+        assert week.check(1, 1, 10, current=(1, 1, 10)) is None
+        # A different user taking over the same placement is allowed too
+        assert week.check(2, 1, 10, current=(1, 1, 10)) is None
+
+    def test_blocked_slot_rejects_everyone(self):
+        week = WeekCapacity(_week_start(), 3, overrides={(1, 10): 0})
+        assert week.check(1, 1, 10)["error"] == "OVER_MAX_WORKERS"
+
+    def test_add_remove_and_copy(self):
+        week = WeekCapacity(_week_start(), 3)
+        week.add(1, 1, 10)
+        clone = week.copy()
+        clone.add(2, 1, 10)
+        assert week.occupancy(1, 10) == 1
+        assert clone.occupancy(1, 10) == 2
+
+        week.remove(1, 1, 10)
+        assert week.occupancy(1, 10) == 0
+        assert week.remaining(1, 10) == 3
+        assert not week.is_user_busy(1, 10)
+        assert clone.is_user_busy(1, 10)
+
+    def test_reads_do_not_insert(self):
+        week = WeekCapacity(_week_start(), 3, assignments=[(1, 1, 10)])
+        assert not week.is_user_busy(2, 10)
+        assert week.check(3, 1, 11) is None
+        assert list(week.user_slots) == [1]
+
+
+class TestWeekCapacityCache:
+    """Test loading, caching and write-through of cached weeks."""
+
+    def test_load_week_capacity_reads_settings_overrides_and_counts(
+        self, test_app, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            week_start = _week_start()
+            (user,) = _make_users(1)
+            db.session.add_all(
+                [
+                    Assignment(
+                        user_id=user.id,
+                        location_id=test_location["id"],
+                        time_slot_id=test_time_slot["id"],
+                        week_start_date=week_start,
+                    ),
+                    ShiftRequirement(
+                        location_id=test_location["id"],
+                        time_slot_id=test_time_slot["id"],
+                        week_start_date=week_start,
+                        required_workers=7,
+                    ),
+                ]
+            )
+            db.session.commit()
+
+            week = load_week_capacity(week_start)
+            assert week.default_max == 3
+            assert week.capacity(test_location["id"], test_time_slot["id"]) == 7
+            assert week.occupancy(test_location["id"], test_time_slot["id"]) == 1
+            assert week.is_user_busy(user.id, test_time_slot["id"])
+
+    def test_load_without_settings_uses_default(self, test_app):
+        with test_app.app_context():
+            GlobalSettings.query.delete()
+            db.session.commit()
+            assert (
+                load_week_capacity(_week_start()).default_max == reference_data.DEFAULT_MAX_WORKERS
+            )
+
+    def test_get_week_capacity_is_cached(self, test_app):
+        with test_app.app_context():
+            week_start = _week_start()
+            assert get_week_capacity(week_start) is get_week_capacity(week_start)
+
+    def test_committed_assignment_writes_update_cache(
+        self, test_app, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            week_start = _week_start()
+            user1, user2 = _make_users(2)
+            first = get_week_capacity(week_start)
+
+            assignment = Assignment(
+                user_id=user1.id,
+                location_id=test_location["id"],
+                time_slot_id=test_time_slot["id"],
+                week_start_date=week_start,
+            )
+            db.session.add(assignment)
+            db.session.commit()
+            week = get_week_capacity(week_start)
+            assert week.occupancy(test_location["id"], test_time_slot["id"]) == 1
+            assert week.is_user_busy(user1.id, test_time_slot["id"])
+            # Applied to a copy: the week other threads may be reading is unchanged
+            assert week is not first
+            assert first.occupancy(test_location["id"], test_time_slot["id"]) == 0
+
+            # Loaded instance (as in the routes): old values are known, applied without reloading
+            assignment = db.session.get(Assignment, assignment.id)
+            assignment.user_id = user2.id
+            db.session.commit()
+            week = get_week_capacity(week_start)
+            assert not week.is_user_busy(user1.id, test_time_slot["id"])
+            assert week.is_user_busy(user2.id, test_time_slot["id"])
+
+            assignment = db.session.get(Assignment, assignment.id)
+            db.session.delete(assignment)
+            db.session.commit()
+            week = get_week_capacity(week_start)
+            assert week.occupancy(test_location["id"], test_time_slot["id"]) == 0
+            assert dict(week.user_slots) == {}
+
+    def test_many_writes_in_one_commit_copy_week_once(
+        self, test_app, test_location, test_time_slot, monkeypatch
+    ):
+        with test_app.app_context():
+            week_start = _week_start()
+            users = _make_users(4)
+            first = get_week_capacity(week_start)
+            copies = []
+            original_copy = WeekCapacity.copy
+
+            def counting_copy(week):
+                copies.append(week)
+                return original_copy(week)
+
+            monkeypatch.setattr(WeekCapacity, "copy", counting_copy)
+            db.session.add_all(
+                Assignment(
+                    user_id=user.id,
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week_start,
+                )
+                for user in users
+            )
+            db.session.commit()
+
+            assert copies == [first]
+            week = get_week_capacity(week_start)
+            assert week.occupancy(test_location["id"], test_time_slot["id"]) == 4
+            assert first.occupancy(test_location["id"], test_time_slot["id"]) == 0
+
+    def test_update_with_unknown_old_values_drops_week(
+        self, test_app, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            week_start = _week_start()
+            user1, user2 = _make_users(2)
+            assignment = Assignment(
+                user_id=user1.id,
+                location_id=test_location["id"],
+                time_slot_id=test_time_slot["id"],
+                week_start_date=week_start,
+            )
+            db.session.add(assignment)
+            db.session.commit()
+            week = get_week_capacity(week_start)
+
+            # Expired after commit, so the previous user_id is unknown at flush time
+            assignment.user_id = user2.id
+            db.session.commit()
+
+            reloaded = get_week_capacity(week_start)
+            assert reloaded is not week
+            assert reloaded.is_user_busy(user2.id, test_time_slot["id"])
+            assert not reloaded.is_user_busy(user1.id, test_time_slot["id"])
+
+    def test_rolled_back_writes_do_not_touch_cache(self, test_app, test_location, test_time_slot):
+        with test_app.app_context():
+            week_start = _week_start()
+            (user,) = _make_users(1)
+            week = get_week_capacity(week_start)
+
+            db.session.add(
+                Assignment(
+                    user_id=user.id,
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week_start,
+                )
+            )
+            db.session.flush()
+            db.session.rollback()
+
+            assert week.occupancy(test_location["id"], test_time_slot["id"]) == 0
+
+    def test_requirement_change_drops_week(self, test_app, test_location, test_time_slot):
+        with test_app.app_context():
+            week_start = _week_start()
+            week = get_week_capacity(week_start)
+
+            db.session.add(
+                ShiftRequirement(
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week_start,
+                    required_workers=1,
+                )
+            )
+            db.session.commit()
+
+            reloaded = get_week_capacity(week_start)
+            assert reloaded is not week
+            assert reloaded.capacity(test_location["id"], test_time_slot["id"]) == 1
+
+    def test_settings_change_drops_all_weeks(self, test_app):
+        with test_app.app_context():
+            week_start = _week_start()
+            week = get_week_capacity(week_start)
+
+            settings = GlobalSettings.query.first()
+            settings.max_workers_per_shift = 9
+            db.session.commit()
+
+            assert get_week_capacity(week_start).default_max == 9
+            assert get_week_capacity(week_start) is not week
+
+    def test_bulk_delete_drops_cached_weeks(self, test_app, test_location, test_time_slot):
+        with test_app.app_context():
+            week_start = _week_start()
+            (user,) = _make_users(1)
+            db.session.add(
+                Assignment(
+                    user_id=user.id,
+                    location_id=test_location["id"],
+                    time_slot_id=test_time_slot["id"],
+                    week_start_date=week_start,
+                )
+            )
+            db.session.commit()
+            week = get_week_capacity(week_start)
+
+            Assignment.query.delete()
+            db.session.commit()
+
+            assert get_week_capacity(week_start) is not week
+            assert (
+                get_week_capacity(week_start).occupancy(test_location["id"], test_time_slot["id"])
+                == 0
+            )
+
+    def test_load_inside_dirty_transaction_is_not_cached(self, test_app, test_time_slot):
+        with test_app.app_context():
+            week_start = _week_start()
+            slot = db.session.get(TimeSlot, test_time_slot["id"])
+            slot.end_time = time(18, 0)
+            db.session.flush()
+
+            week = get_week_capacity(week_start)
+            assert get_week_capacity(week_start) is not week
+            db.session.commit()
+
+    @pytest.mark.parametrize("week_given", [True, False])
+    def test_invalidate(self, test_app, week_given):
+        with test_app.app_context():
+            week_start = _week_start()
+            week = get_week_capacity(week_start)
+            capacity.invalidate(week_start if week_given else None)
+            assert get_week_capacity(week_start) is not week
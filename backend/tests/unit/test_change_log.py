@@ -0,0 +1,159 @@
+"""
+Unit tests for the sync change log.
+"""
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from database import db
+from models import Assignment, ChangeLogEntry
+from services import change_log, data_versions
+from services.model_events import Change
+
+WEEK = date(2024, 1, 1)
+NEXT_WEEK = date(2024, 1, 8)
+
+
+def _log(seq, **values):
+    db.session.add(ChangeLogEntry(seq=seq, created_at=datetime.utcnow(), **values))
+    db.session.commit()
+    return seq
+
+
+class TestEntriesFor:
+    """Test which log entries a change produces."""
+
+    def test_row_insert(self):
+        change = Change(
+            "assignments", "insert", None, {"id": 4, "user_id": 2, "week_start_date": WEEK}
+        )
+        assert change_log.entries_for(change) == [
+            {
+                "table_name": "assignments",
+                "op": "insert",
+                "row_id": 4,
+                "user_id": 2,
+                "week_start_date": WEEK,
+            }
+        ]
+
+    def test_untracked_table(self):
+        assert change_log.entries_for(Change("locations", "insert", None, {"id": 1})) == []
+
+    def test_move_logs_a_delete_in_the_old_week(self):
+        change = Change(
+            "assignments",
+            "update",
+            {"id": 4, "user_id": 2, "week_start_date": WEEK},
+            {"id": 4, "user_id": 2, "week_start_date": NEXT_WEEK},
+        )
+        entries = change_log.entries_for(change)
+        assert [(e["op"], e["week_start_date"]) for e in entries] == [
+            ("delete", WEEK),
+            ("update", NEXT_WEEK),
+        ]
+
+    def test_update_in_place(self):
+        values = {"id": 4, "user_id": 2, "week_start_date": WEEK}
+        change = Change("shift_requirements", "update", {"id": 4}, values)
+        assert [e["op"] for e in change_log.entries_for(change)] == ["update"]
+
+    def test_availability_is_logged_per_user(self):
+        row = Change("availability_exceptions", "delete", {"id": 9, "user_id": 2}, None)
+        bulk = Change("user_availability", "bulk", None, {"week_start_date": WEEK})
+        assert change_log.entries_for(row)[0] == {
+            "table_name": "availability",
+            "op": "update",
+            "row_id": None,
+            "user_id": 2,
+            "week_start_date": None,
+        }
+        assert change_log.entries_for(bulk)[0]["op"] == "bulk"
+
+    def test_empty_commit_logs_nothing(self, test_app, test_user):
+        with test_app.app_context():
+            db.session.commit()
+            assert change_log.current_cursor() == 0
+
+
+class TestChangesSince:
+    """Test reloads decided from the log alone."""
+
+    def test_admin_reloads_after_bulk_availability(self, test_app, test_admin):
+        with test_app.app_context():
+            cursor = _log(1, table_name="assignments", op="delete", row_id=1, week_start_date=WEEK)
+            _log(2, table_name="availability", op="bulk", week_start_date=WEEK)
+            admin = SimpleNamespace(id=test_admin["id"], role="admin")
+
+            data = change_log.changes_since(cursor, WEEK, admin)
+            assert data["reload"] == ["availability"]
+
+    def test_student_gets_own_week_after_bulk_availability(self, test_app, test_user):
+        with test_app.app_context():
+            cursor = _log(1, table_name="assignments", op="delete", row_id=1, week_start_date=WEEK)
+            _log(2, table_name="availability", op="bulk", week_start_date=WEEK)
+            student = SimpleNamespace(id=test_user["id"], role="user")
+
+            data = change_log.changes_since(cursor, WEEK, student)
+            assert data["reload"] == []
+            assert data["changes"] == [
+                {"table": "availability", "op": "update", "user_id": test_user["id"], "entries": []}
+            ]
+
+    def test_cursor_follows_commit_order_not_ids(self, test_app, test_admin):
+        with test_app.app_context():
+            # On PostgreSQL a commit can hold lower ids than the one committed before it
+            db.session.add_all(
+                [
+                    ChangeLogEntry(id=50, seq=1, table_name="assignments", op="delete", row_id=1),
+                    ChangeLogEntry(id=10, seq=2, table_name="assignments", op="delete", row_id=2),
+                ]
+            )
+            db.session.commit()
+            admin = SimpleNamespace(id=test_admin["id"], role="admin")
+
+            data = change_log.changes_since(1, WEEK, admin)
+            assert data["cursor"] == 2
+            assert data["changes"] == [{"table": "assignments", "op": "delete", "id": 2}]
+
+    def test_commits_draw_consecutive_cursors(
+        self, test_app, test_user, test_location, test_time_slot
+    ):
+        with test_app.app_context():
+            ids = test_user["id"], test_location["id"], test_time_slot["id"]
+            for weeks in ([WEEK, NEXT_WEEK], [WEEK + timedelta(weeks=2)]):
+                db.session.add_all(
+                    Assignment(
+                        user_id=ids[0],
+                        location_id=ids[1],
+                        time_slot_id=ids[2],
+                        week_start_date=week,
+                    )
+                    for week in weeks
+                )
+                db.session.commit()
+
+            assert [e.seq for e in ChangeLogEntry.query.order_by(ChangeLogEntry.id)] == [1, 1, 2]
+            assert change_log.current_cursor() == 2
+            assert data_versions.versions([change_log.CURSOR_KEY]) == {change_log.CURSOR_KEY: 2}
+
+
+class TestPrune:
+    """Test retention of log entries."""
+
+    def test_prunes_old_entries_but_keeps_the_latest(self, test_app, test_admin):
+        with test_app.app_context():
+            first = _log(1, table_name="assignments", op="delete", row_id=1, week_start_date=WEEK)
+            second = _log(2, table_name="assignments", op="delete", row_id=2, week_start_date=WEEK)
+
+            with patch.dict(test_app.config, {"CHANGE_LOG_RETENTION_DAYS": 1}):
+                assert change_log.prune(now=datetime.utcnow() + timedelta(days=2)) == 1
+            assert [e.seq for e in ChangeLogEntry.query] == [second]
+
+            # A cursor from before the pruned entry can no longer be patched
+            admin = SimpleNamespace(id=test_admin["id"], role="admin")
+            assert change_log.changes_since(first - 1, WEEK, admin)["reload"] == list(
+                change_log.SYNCED
+            )
+            assert change_log.changes_since(first, WEEK, admin)["reload"] == []
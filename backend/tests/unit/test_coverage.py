@@ -0,0 +1,169 @@
+"""
+Unit tests for the per-shift week coverage.
+"""
+
+from datetime import date, time
+
+import pytest
+
+from database import db
+from models import (
+    Assignment,
+    AvailabilityException,
+    AvailabilityTemplate,
+    GlobalSettings,
+    Location,
+    ShiftRequirement,
+    TimeSlot,
+    User,
+    UserAvailability,
+)
+from services import capacity, coverage
+from services.coverage import get_week_coverage, load_week_coverage
+
+WEEK = date(2024, 3, 4)
+
+
+@pytest.fixture
+def week(test_app):
+    """Two desks, one Monday slot, three workers and two places per shift."""
+    with test_app.app_context():
+        GlobalSettings.query.first().max_workers_per_shift = 2
+        desks = [Location(name=f"Desk {n}", is_active=True) for n in range(2)]
+        slot = TimeSlot(day_of_week=0, start_time=time(9, 0), end_time=time(11, 0))
+        workers = [User(name=f"Worker {n}", email=f"cov{n}@colby.edu") for n in range(3)]
+        db.session.add_all([*desks, slot, *workers])
+        db.session.commit()
+        yield {
+            "desks": [desk.id for desk in desks],
+            "slot": slot.id,
+            "workers": [worker.id for worker in workers],
+        }
+
+
+def _available(user_id, location_id, time_slot_id, preference_level=1):
+    db.session.add(
+        UserAvailability(
+            user_id=user_id,
+            location_id=location_id,
+            time_slot_id=time_slot_id,
+            week_start_date=WEEK,
+            preference_level=preference_level,
+        )
+    )
+
+
+def _shift(shifts, location_id):
+    return next(shift for shift in shifts if shift["location_id"] == location_id)
+
+
+class TestWeekCoverage:
+    """Test load_week_coverage and its cache."""
+
+    def test_empty_week(self, week):
+        assert list(load_week_coverage(WEEK)) == [
+            {
+                "location_id": desk,
+                "time_slot_id": week["slot"],
+                "available": 0,
+                "preferred": 0,
+                "assigned": 0,
+                "capacity": 2,
+                "gap": 2,
+            }
+            for desk in week["desks"]
+        ]
+
+    def test_counts_and_gap(self, week):
+        desk, other_desk = week["desks"]
+        slot = week["slot"]
+        first, second, _ = week["workers"]
+        _available(first, desk, slot, 2)
+        _available(second, None, slot)  # any location
+        # Assigned at the other desk, so no longer free for this one
+        db.session.add(
+            Assignment(
+                user_id=second, location_id=other_desk, time_slot_id=slot, week_start_date=WEEK
+            )
+        )
+        db.session.add(
+            ShiftRequirement(
+                location_id=other_desk, time_slot_id=slot, week_start_date=WEEK, required_workers=3
+            )
+        )
+        db.session.commit()
+
+        shifts = load_week_coverage(WEEK)
+        assert _shift(shifts, desk) == {
+            "location_id": desk,
+            "time_slot_id": slot,
+            "available": 2,
+            "preferred": 1,
+            "assigned": 0,
+            "capacity": 2,
+            "gap": 1,
+        }
+        other = _shift(shifts, other_desk)
+        assert [other[key] for key in ("available", "assigned", "capacity", "gap")] == [1, 1, 3, 2]
+
+    def test_templates_and_exceptions_count(self, week):
+        desk = week["desks"][0]
+        first, second, _ = week["workers"]
+        db.session.add_all(
+            [
+                AvailabilityTemplate(
+                    user_id=user_id,
+                    location_id=desk,
+                    day_of_week=0,
+                    start_time=time(9, 0),
+                    end_time=time(11, 0),
+                    preference_level=1,
+                )
+                for user_id in (first, second)
+            ]
+        )
+        # The second worker is away this week
+        db.session.add(
+            AvailabilityException(
+                user_id=second,
+                location_id=desk,
+                time_slot_id=week["slot"],
+                week_start_date=WEEK,
+                preference_level=0,
+            )
+        )
+        db.session.commit()
+        assert _shift(load_week_coverage(WEEK), desk)["available"] == 1
+
+    def test_cached_until_an_input_changes(self, week):
+        desk = week["desks"][0]
+        assert get_week_coverage(WEEK) is get_week_coverage(WEEK)
+
+        _available(week["workers"][0], desk, week["slot"])
+        db.session.commit()
+        assert _shift(get_week_coverage(WEEK), desk)["available"] == 1
+
+        coverage.invalidate()
+        assert _shift(get_week_coverage(WEEK), desk)["available"] == 1
+
+    def test_counts_from_one_capacity_snapshot(self, week):
+        desk = week["desks"][0]
+        _available(week["workers"][0], desk, week["slot"])
+        db.session.commit()
+        snapshot = capacity.get_week_capacity(WEEK)
+        before = _shift(load_week_coverage(WEEK), desk)
+
+        # A commit while a reader holds the snapshot publishes a new week instead
+        db.session.add(
+            Assignment(
+                user_id=week["workers"][0],
+                location_id=desk,
+                time_slot_id=week["slot"],
+                week_start_date=WEEK,
+            )
+        )
+        db.session.commit()
+        assert snapshot.users_by_slot() == {}
+        assert before["gap"] == 1
+        after = _shift(get_week_coverage(WEEK), desk)
+        assert (after["assigned"], after["gap"]) == (1, 1)
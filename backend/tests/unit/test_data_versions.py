@@ -0,0 +1,104 @@
+"""
+Unit tests for the per-table and per-week data version counters.
+"""
+
+from datetime import date, time
+
+from database import db
+from models import Assignment, DataVersion, Location, TimeSlot, User
+from services import data_versions, model_events
+
+WEEK = date(2024, 1, 1)
+OTHER_WEEK = date(2024, 1, 8)
+
+
+def _assignment(week=WEEK, hour=9):
+    user = User(name="Worker", email=f"worker-{week}-{hour}@colby.edu")
+    location = Location(name=f"Desk {week} {hour}")
+    slot = TimeSlot(day_of_week=0, start_time=time(hour), end_time=time(hour + 1))
+    db.session.add_all([user, location, slot])
+    db.session.flush()
+    return Assignment(
+        user_id=user.id, location_id=location.id, time_slot_id=slot.id, week_start_date=week
+    )
+
+
+class TestKeys:
+    """Test counter key naming."""
+
+    def test_key(self):
+        assert data_versions.key("assignments") == "assignments"
+        assert data_versions.key("assignments", WEEK) == "assignments@2024-01-01"
+        assert data_versions.key("assignments", "?") == "assignments@?"
+
+    def test_read_keys(self):
+        keys = data_versions.read_keys(["assignments", "users"], {"assignments"}, WEEK)
+        assert keys == ["assignments@2024-01-01", "assignments@?", "users"]
+
+    def test_written_keys(self):
+        changes = [
+            model_events.Change("assignments", "insert", None, {"week_start_date": WEEK}),
+            model_events.Change("assignments", "bulk", None, None),
+            model_events.Change("users", "update", {"id": 1}, {"id": 1}),
+            model_events.Change("data_versions", "insert", None, {"key": "users"}),
+        ]
+        assert data_versions.written_keys(changes) == {
+            "assignments",
+            "assignments@2024-01-01",
+            "assignments@?",
+            "users",
+        }
+
+    def test_read_keys_without_week(self):
+        assert data_versions.read_keys(["assignments"], {"assignments"}) == ["assignments"]
+
+
+class TestCounters:
+    """Test that commits bump the counters they should."""
+
+    def test_unknown_keys_are_zero(self, test_app):
+        with test_app.app_context():
+            assert data_versions.versions(["nothing"]) == {"nothing": 0}
+
+    def test_commit_bumps_table_and_week(self, test_app):
+        with test_app.app_context():
+            db.session.add(_assignment())
+            db.session.commit()
+            keys = ["assignments", "assignments@2024-01-01", "assignments@2024-01-08", "users"]
+            before = data_versions.versions(keys)
+
+            db.session.add(_assignment(hour=10))
+            db.session.commit()
+            after = data_versions.versions(keys)
+
+            assert after["assignments"] == before["assignments"] + 1
+            assert after["assignments@2024-01-01"] == before["assignments@2024-01-01"] + 1
+            assert after["assignments@2024-01-08"] == 0
+            assert after["users"] == before["users"] + 1
+
+    def test_one_bump_per_commit(self, test_app):
+        with test_app.app_context():
+            db.session.add_all([_assignment(WEEK), _assignment(OTHER_WEEK, hour=10)])
+            db.session.commit()
+
+            counters = data_versions.versions(
+                ["assignments", "assignments@2024-01-01", "assignments@2024-01-08"]
+            )
+            assert set(counters.values()) == {1}
+
+    def test_bulk_write_bumps_unknown_week(self, test_app):
+        with test_app.app_context():
+            db.session.add(_assignment())
+            db.session.commit()
+
+            Assignment.query.update({"assigned_by": None})
+            db.session.commit()
+
+            counters = data_versions.versions(["assignments@?", "assignments@2024-01-01"])
+            assert counters == {"assignments@?": 1, "assignments@2024-01-01": 1}
+
+    def test_empty_commit_bumps_nothing(self, test_app):
+        with test_app.app_context():
+            count = DataVersion.query.count()
+            db.session.commit()
+            assert DataVersion.query.count() == count
@@ -0,0 +1,203 @@
+"""
+Unit tests for Google ID token verification, against a local key server.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, exceptions, jwt
+
+from services import google_tokens
+
+AUDIENCE = "test-client-id"
+
+
+def _make_key(key_id):
+    """(signer, PEM certificate) for a fresh RSA key."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, key_id)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    signer = crypt.RSASigner.from_string(private_pem, key_id=key_id)
+    return signer, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class KeyServer:
+    """Stand-in for Google's certs endpoint, serving certificates for local keys."""
+
+    def __init__(self):
+        self.signers = {}
+        self.certs = {}
+        self.status = 200
+        self.cache_control = "public, max-age=3600"
+        self.requests = 0
+        self.add_key("key-1")
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                body = json.dumps(server.certs).encode()
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                if server.cache_control:
+                    self.send_header("Cache-Control", server.cache_control)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/oauth2/v1/certs"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def add_key(self, key_id):
+        self.signers[key_id], self.certs[key_id] = _make_key(key_id)
+
+    def sign(self, key_id="key-1", **overrides):
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": AUDIENCE,
+            "iat": now,
+            "exp": now + 3600,
+            "email": "student@colby.edu",
+            "name": "Student",
+        }
+        claims.update(overrides)
+        return jwt.encode(self.signers[key_id], claims).decode()
+
+
+@pytest.fixture
+def key_server(test_app):
+    server = KeyServer()
+    google_tokens.invalidate()
+    with patch.dict(test_app.config, {"GOOGLE_CERTS_URL": server.url}):
+        with test_app.app_context():
+            yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+    google_tokens.invalidate()
+
+
+class TestVerify:
+    """Test signature and claim checks."""
+
+    def test_valid_token(self, key_server):
+        claims = google_tokens.verify(key_server.sign(), AUDIENCE)
+        assert claims["email"] == "student@colby.edu"
+
+    def test_certs_are_cached(self, key_server):
+        for _ in range(3):
+            assert google_tokens.verify(key_server.sign(), AUDIENCE) is not None
+        assert key_server.requests == 1
+
+    def test_certs_expire_with_max_age(self, key_server):
+        key_server.cache_control = "max-age=0"
+        google_tokens.verify(key_server.sign(), AUDIENCE)
+        google_tokens.verify(key_server.sign(), AUDIENCE)
+        assert key_server.requests == 2
+
+    def test_default_lifetime_without_max_age(self, key_server):
+        key_server.cache_control = None
+        google_tokens.verify(key_server.sign(), AUDIENCE)
+        with patch("services.google_tokens.time.monotonic", return_value=time.monotonic() + 299):
+            google_tokens.verify(key_server.sign(), AUDIENCE)
+        assert key_server.requests == 1
+
+    def test_unknown_key_id_refetches(self, key_server):
+        google_tokens.verify(key_server.sign(), AUDIENCE)
+        key_server.add_key("key-2")
+
+        # Rotated keys are picked up once the last fetch is old enough
+        later = time.monotonic() + google_tokens.MIN_REFETCH_SECONDS
+        with patch("services.google_tokens.time.monotonic", return_value=later):
+            assert google_tokens.verify(key_server.sign("key-2"), AUDIENCE) is not None
+        assert key_server.requests == 2
+
+    def test_unknown_key_id_refetch_is_rate_limited(self, key_server):
+        google_tokens.verify(key_server.sign(), AUDIENCE)
+        key_server.add_key("key-2")
+
+        assert google_tokens.verify(key_server.sign("key-2"), AUDIENCE) is None
+        assert key_server.requests == 1
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"aud": "another-client"},
+            {"iss": "https://evil.example.com"},
+            {"iat": 0, "exp": 1},
+        ],
+    )
+    def test_invalid_claims(self, key_server, overrides):
+        assert google_tokens.verify(key_server.sign(**overrides), AUDIENCE) is None
+
+    def test_wrong_signature(self, key_server):
+        token = key_server.sign()
+        key_server.add_key("key-1")  # same key id, different key
+        google_tokens.invalidate()
+        assert google_tokens.verify(token, AUDIENCE) is None
+
+    def test_malformed_token_needs_no_certs(self, key_server):
+        assert google_tokens.verify("not-a-jwt", AUDIENCE) is None
+        assert key_server.requests == 0
+
+    def test_certs_unavailable(self, key_server):
+        key_server.status = 500
+        token = key_server.sign()
+        with pytest.raises(exceptions.TransportError):
+            google_tokens.verify(token, AUDIENCE)
+
+        # Not remembered as rejected: the token verifies once the certs are back
+        key_server.status = 200
+        assert google_tokens.verify(token, AUDIENCE) is not None
+
+
+class TestNegativeCache:
+    """Test remembering rejected tokens."""
+
+    def test_rejected_token_is_not_checked_again(self, key_server):
+        token = key_server.sign(aud="another-client")
+        with patch("services.google_tokens.jwt.decode", wraps=jwt.decode) as decode:
+            assert google_tokens.verify(token, AUDIENCE) is None
+            assert google_tokens.verify(token, AUDIENCE) is None
+        assert decode.call_count == 1
+
+    def test_rejection_expires(self, key_server, test_app):
+        token = key_server.sign(aud="another-client")
+        with patch.dict(test_app.config, {"GOOGLE_TOKEN_NEGATIVE_TTL_SECONDS": 0}):
+            google_tokens.verify(token, AUDIENCE)
+        assert not google_tokens._is_rejected(token)
+        assert token not in google_tokens._rejected
+
+    def test_cache_is_bounded(self, key_server):
+        with patch.object(google_tokens, "NEGATIVE_CACHE_SIZE", 2):
+            for token in ("a", "b", "c"):
+                google_tokens.verify(token, AUDIENCE)
+            assert list(google_tokens._rejected) == ["b", "c"]
@@ -0,0 +1,68 @@
+"""
+Unit tests for the authenticated user cache.
+"""
+
+from unittest.mock import patch
+
+from database import db
+from models import User
+from services import identity_cache
+
+
+class TestUserCache:
+    """Test caching of user column values."""
+
+    def test_remember_and_get(self, test_app, test_user):
+        with test_app.app_context():
+            identity_cache.remember_user(db.session.get(User, test_user["id"]))
+
+            values = identity_cache.get_user_values(test_user["id"])
+            assert values["email"] == test_user["email"]
+            assert values["role"] == "user"
+
+    def test_expired_entry_is_ignored(self, test_app, test_user):
+        with test_app.app_context():
+            with patch.dict(test_app.config, {"AUTH_CACHE_TTL_SECONDS": 0}):
+                identity_cache.remember_user(db.session.get(User, test_user["id"]))
+            assert identity_cache.get_user_values(test_user["id"]) is None
+
+    def test_commit_to_user_drops_entry(self, test_app, test_user):
+        with test_app.app_context():
+            user = db.session.get(User, test_user["id"])
+            identity_cache.remember_user(user)
+
+            user.role = "admin"
+            db.session.commit()
+
+            assert identity_cache.get_user_values(test_user["id"]) is None
+
+    def test_bulk_user_change_clears_everything(self, test_app, test_user):
+        with test_app.app_context():
+            identity_cache.remember_user(db.session.get(User, test_user["id"]))
+            identity_cache.remember_google_token("google-token", test_user["id"])
+
+            User.query.filter_by(id=test_user["id"]).update({"name": "Renamed"})
+            db.session.commit()
+
+            assert identity_cache.get_user_values(test_user["id"]) is None
+            assert identity_cache.google_token_user_id("google-token") is None
+
+    def test_invalidate(self, test_app, test_user):
+        with test_app.app_context():
+            identity_cache.remember_user(db.session.get(User, test_user["id"]))
+            identity_cache.remember_google_token("google-token", test_user["id"])
+
+            identity_cache.invalidate(test_user["id"])
+            assert identity_cache.get_user_values(test_user["id"]) is None
+            assert identity_cache.google_token_user_id("google-token") == test_user["id"]
+
+            identity_cache.invalidate()
+            assert identity_cache.google_token_user_id("google-token") is None
+
+    def test_google_tokens_are_bounded(self, test_app, test_user):
+        with test_app.app_context(), patch.object(identity_cache, "GOOGLE_TOKEN_CACHE_SIZE", 2):
+            for n in range(3):
+                identity_cache.remember_google_token(f"token-{n}", test_user["id"])
+            assert identity_cache.google_token_user_id("token-0") is None
+            assert identity_cache.google_token_user_id("token-2") == test_user["id"]
+            assert len(identity_cache._google_tokens) == 2
@@ -0,0 +1,100 @@
+"""
+Unit tests for live schedule events.
+"""
+
+from datetime import date, time
+from types import SimpleNamespace
+
+from database import db
+from models import Assignment, Location, TimeSlot, User
+from services import live_updates, pubsub
+from services.model_events import Change
+
+WEEK = date(2024, 1, 1)
+NEXT_WEEK = date(2024, 1, 8)
+
+
+def _values(**extra):
+    return dict({"id": 3, "user_id": 7, "week_start_date": WEEK}, **extra)
+
+
+class TestEventsFor:
+    """Test the events announcing an assignment change."""
+
+    def test_created_and_deleted(self):
+        created = live_updates.events_for(Change("assignments", "insert", None, _values()))
+        deleted = live_updates.events_for(Change("assignments", "delete", _values(), None))
+        event = {"type": "assignment", "op": "created", "id": 3, "user_id": 7}
+        assert created == [("week:2024-01-01", event)]
+        assert deleted == [("week:2024-01-01", dict(event, op="deleted"))]
+
+    def test_updated_in_place(self):
+        change = Change("assignments", "update", {"time_slot_id": 1}, _values(time_slot_id=2))
+        assert [e["op"] for _, e in live_updates.events_for(change)] == ["updated"]
+
+    def test_moved_to_another_user(self):
+        change = Change("assignments", "update", {"user_id": 8}, _values())
+        assert live_updates.events_for(change) == [
+            ("week:2024-01-01", {"type": "assignment", "op": "deleted", "id": 3, "user_id": 8}),
+            ("week:2024-01-01", {"type": "assignment", "op": "created", "id": 3, "user_id": 7}),
+        ]
+
+    def test_bulk(self):
+        scoped = Change("assignments", "bulk", None, {"week_start_date": NEXT_WEEK})
+        unscoped = Change("assignments", "bulk", None, None)
+        assert live_updates.events_for(scoped) == [("week:2024-01-08", {"type": "reload"})]
+        assert live_updates.events_for(unscoped) == [(live_updates.ALL_WEEKS, {"type": "reload"})]
+
+
+class TestPublishing:
+    """Test that commits and scheduler runs publish events."""
+
+    def test_commit_publishes_to_the_week(self, test_app):
+        subscription = pubsub.subscribe(live_updates.channel(WEEK))
+        try:
+            with test_app.app_context():
+                user = User(name="Worker", email="worker@colby.edu")
+                location = Location(name="Desk")
+                slot = TimeSlot(day_of_week=0, start_time=time(9), end_time=time(10))
+                db.session.add_all([user, location, slot])
+                db.session.commit()
+                assert subscription.get(0) is None  # other tables publish nothing
+
+                assignment = Assignment(
+                    user_id=user.id,
+                    location_id=location.id,
+                    time_slot_id=slot.id,
+                    week_start_date=WEEK,
+                )
+                db.session.add(assignment)
+                db.session.commit()
+
+                assert subscription.get(0) == {
+                    "type": "assignment",
+                    "op": "created",
+                    "id": assignment.id,
+                    "user_id": user.id,
+                }
+        finally:
+            subscription.close()
+
+    def test_scheduler_finished(self):
+        subscription = pubsub.subscribe(live_updates.channel(WEEK))
+        live_updates.scheduler_finished(WEEK, 4)
+        assert subscription.get(0) == {"type": "scheduler_run", "scheduled": 4}
+        subscription.close()
+
+
+class TestVisibility:
+    """Test which events students receive."""
+
+    def test_visible_to(self):
+        admin = SimpleNamespace(id=1, role="admin")
+        student = SimpleNamespace(id=7, role="user")
+        own = {"type": "assignment", "user_id": 7}
+        other = {"type": "assignment", "user_id": 8}
+
+        assert live_updates.visible_to(other, admin)
+        assert live_updates.visible_to(own, student)
+        assert not live_updates.visible_to(other, student)
+        assert live_updates.visible_to({"type": "reload"}, student)
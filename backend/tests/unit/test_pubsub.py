@@ -0,0 +1,74 @@
+"""
+Unit tests for the in-process publish/subscribe broker.
+"""
+
+from unittest.mock import patch
+
+from services import pubsub
+from services.pubsub import InProcessBroker
+
+
+class TestInProcessBroker:
+    """Test delivery to subscribers."""
+
+    def test_delivers_to_subscribers_of_the_channel(self):
+        broker = InProcessBroker()
+        first, second = broker.subscribe("a"), broker.subscribe("a")
+        other = broker.subscribe("b")
+
+        broker.publish("a", {"n": 1})
+
+        assert first.get(0) == {"n": 1}
+        assert second.get(0) == {"n": 1}
+        assert other.get(0) is None
+
+    def test_subscription_to_several_channels(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("a", "b")
+        broker.publish("b", 1)
+        broker.publish("a", 2)
+        assert [subscription.get(0), subscription.get(0)] == [1, 2]
+
+    def test_only_messages_after_subscribing(self):
+        broker = InProcessBroker()
+        broker.publish("a", 1)
+        assert broker.subscribe("a").get(0) is None
+
+    def test_close_unsubscribes(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("a", "b")
+        assert broker.subscriber_count("a") == 1
+
+        subscription.close()
+        broker.publish("a", 1)
+
+        assert broker.subscriber_count("a") == 0
+        assert subscription.get(0) is None
+
+    def test_overflow_becomes_a_reload(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("a")
+        with patch.object(pubsub, "QUEUE_SIZE", 2):
+            small = broker.subscribe("a")
+        for n in range(3):
+            broker.publish("a", n)
+
+        assert small.get(0) == pubsub.OVERFLOW
+        assert small.get(0) is None
+        assert [subscription.get(0) for _ in range(3)] == [0, 1, 2]
+
+
+class TestBrokerSelection:
+    """Test installing another broker."""
+
+    def test_set_broker(self):
+        shared = InProcessBroker()
+        pubsub.set_broker(shared)
+        try:
+            subscription = pubsub.subscribe("a")
+            pubsub.publish("a", 1)
+            assert pubsub.broker() is shared
+            assert subscription.get(0) == 1
+        finally:
+            pubsub.set_broker(None)
+        assert pubsub.broker() is not shared
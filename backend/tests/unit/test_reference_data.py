@@ -0,0 +1,80 @@
+"""
+Unit tests for the reference data cache.
+"""
+
+from datetime import time
+
+from database import db
+from models import DaySchedule, GlobalSettings, Location, TimeSlot
+from services import reference_data
+from services.reference_data import get_reference_data, load_reference_data
+
+
+class TestLoadReferenceData:
+    """Test the snapshot contents."""
+
+    def test_snapshot_contents(self, test_app, test_location, test_time_slot):
+        with test_app.app_context():
+            db.session.add_all(
+                [
+                    Location(name="Closed", is_active=False),
+                    DaySchedule(day_of_week=0, start_time=time(9, 0), end_time=time(10, 0)),
+                ]
+            )
+            GlobalSettings.query.one().max_workers_per_shift = 5
+            db.session.commit()
+
+            reference = load_reference_data()
+
+            assert [loc.name for loc in reference.active_locations()] == ["Test Location"]
+            assert len(reference.locations) == 2
+            assert reference.locations[test_location["id"]].to_dict() == test_location
+            slot = reference.time_slots[test_time_slot["id"]]
+            assert slot.to_dict() == test_time_slot
+            assert reference.slot_by_time[(0, time(9, 0), time(17, 0))] == slot
+            assert reference.first_slot_of_day(0) == slot
+            assert reference.first_slot_of_day(6) is None
+            assert reference.slot_counts == {0: 1}
+            assert reference.day_schedules[0].to_dict()["start_time"] == "09:00"
+            assert reference.day_schedules[0].get_day_name() == "Monday"
+            assert reference.max_workers_per_shift == 5
+            assert reference.settings.to_dict()["max_hours_per_user_per_week"] is None
+
+    def test_defaults_without_settings_row(self, test_app):
+        with test_app.app_context():
+            GlobalSettings.query.delete()
+            db.session.commit()
+            reference = load_reference_data()
+            assert reference.settings is None
+            assert reference.max_workers_per_shift == reference_data.DEFAULT_MAX_WORKERS
+
+
+class TestReferenceDataCache:
+    """Test caching and invalidation."""
+
+    def test_cached_until_a_reference_table_changes(self, test_app, test_location):
+        with test_app.app_context():
+            reference = get_reference_data()
+            assert get_reference_data() is reference
+
+            location = db.session.get(Location, test_location["id"])
+            location.name = "Renamed"
+            db.session.commit()
+
+            fresh = get_reference_data()
+            assert fresh.version > reference.version
+            assert fresh.locations[test_location["id"]].name == "Renamed"
+
+    def test_bulk_writes_invalidate(self, test_app, test_time_slot):
+        with test_app.app_context():
+            reference = get_reference_data()
+            db.session.query(TimeSlot).delete()
+            db.session.commit()
+            assert get_reference_data().time_slots == {}
+            assert reference.time_slots
+
+    def test_invalidate(self, test_app):
+        with test_app.app_context():
+            reference = get_reference_data()
+            reference_data.invalidate()
+            assert get_reference_data() is not reference
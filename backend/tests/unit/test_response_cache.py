@@ -0,0 +1,65 @@
+"""
+Unit tests for the read response cache.
+"""
+
+from unittest.mock import patch
+
+from services import response_cache
+from services.response_cache import MemoryBackend
+
+
+class TestMemoryBackend:
+    """Test the in-process LRU."""
+
+    def test_get_and_set(self):
+        backend = MemoryBackend(size=2)
+        assert backend.get("a") is None
+        backend.set("a", 1)
+        assert backend.get("a") == 1
+
+    def test_evicts_least_recently_used(self):
+        backend = MemoryBackend(size=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+
+        assert backend.get("b") is None
+        assert (backend.get("a"), backend.get("c")) == (1, 3)
+        assert len(backend) == 2
+
+    def test_size_zero_disables(self):
+        backend = MemoryBackend(size=0)
+        backend.set("a", 1)
+        assert backend.get("a") is None
+
+    def test_clear(self):
+        backend = MemoryBackend()
+        backend.set("a", 1)
+        backend.clear()
+        assert len(backend) == 0
+
+
+class TestBackendSelection:
+    """Test the default and pluggable backends."""
+
+    def test_default_backend_uses_configured_size(self, test_app):
+        with test_app.app_context():
+            response_cache.set_backend(None)
+            with patch.dict(test_app.config, {"RESPONSE_CACHE_SIZE": 3}):
+                assert response_cache.backend().size == 3
+            response_cache.set_backend(None)
+
+    def test_custom_backend(self, test_app):
+        shared = MemoryBackend()
+        response_cache.set_backend(shared)
+        try:
+            with test_app.app_context():
+                response_cache.put("etag", b"{}", "application/json")
+                assert shared.get("etag") == (b"{}", "application/json")
+                assert response_cache.get("etag") == (b"{}", "application/json")
+
+                response_cache.invalidate()
+                assert response_cache.get("etag") is None
+        finally:
+            response_cache.set_backend(None)
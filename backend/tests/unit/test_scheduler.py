@@ -9,6 +9,7 @@ import pytest
 from database import db
 from models import (
     Assignment,
+    DaySchedule,
     GlobalSettings,
     Location,
     ShiftRequirement,
@@ -374,6 +375,43 @@ class TestRunAutoScheduler:
             assert result["scheduled"] == 0
             assert result["assignments"] == []
 
+    def test_run_auto_scheduler_skips_slots_outside_week_grid(
+        self, test_app, test_location, test_time_slot
+    ):
+        """Test that slots left over from an old template are not scheduled."""
+        with test_app.app_context():
+            week_start = date.today() - timedelta(days=date.today().weekday())
+
+            # Monday is now a 9:00-10:00 template; the 9-17 fixture slot is stale
+            db.session.add(
+                DaySchedule(
+                    day_of_week=0,
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    slot_duration_minutes=60,
+                )
+            )
+            current_slot = TimeSlot(day_of_week=0, start_time=time(9, 0), end_time=time(10, 0))
+            user = User(name="Grid Worker", email="grid@colby.edu", role="user")
+            db.session.add_all([current_slot, user])
+            db.session.commit()
+
+            db.session.add_all(
+                UserAvailability(
+                    user_id=user.id,
+                    location_id=test_location["id"],
+                    time_slot_id=slot_id,
+                    week_start_date=week_start,
+                )
+                for slot_id in (test_time_slot["id"], current_slot.id)
+            )
+            db.session.commit()
+
+            result = run_auto_scheduler(week_start)
+
+            assert result["scheduled"] == 1
+            assert result["assignments"][0]["time_slot_id"] == current_slot.id
+
     def test_run_auto_scheduler_no_locations(self, test_app, test_time_slot):
         """Test scheduler when no active locations exist."""
         with test_app.app_context():
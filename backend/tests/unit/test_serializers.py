@@ -0,0 +1,104 @@
+"""
+Unit tests for the list serializers.
+"""
+
+from datetime import date, time
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from database import db
+from models import Assignment, Location, TimeSlot, User, WeeklyScheduleOverride
+from services import serializers
+
+WEEK = date(2024, 1, 1)
+
+
+def _count_queries(func):
+    statements = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = func()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def _add_assignments(count):
+    location = Location(name="Desk")
+    slots = [
+        TimeSlot(day_of_week=day, start_time=time(9, 0), end_time=time(10, 0)) for day in range(2)
+    ]
+    db.session.add_all([location, *slots])
+    db.session.flush()
+    for index in range(count):
+        user = User(name=f"Worker {index}", email=f"worker{index}@colby.edu")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(
+            Assignment(
+                user_id=user.id,
+                location_id=location.id,
+                time_slot_id=slots[index % 2].id,
+                week_start_date=WEEK,
+            )
+        )
+    db.session.commit()
+    db.session.expunge_all()
+
+
+class TestAssignmentSerializer:
+    """Test eager loading and per-slot precomputation."""
+
+    def test_matches_to_dict(self, test_app):
+        with test_app.app_context():
+            _add_assignments(3)
+            rows = serializers.assignments.query(Assignment).order_by(Assignment.id).all()
+
+            assert serializers.assignments.dump(rows) == [row.to_dict() for row in rows]
+            assert serializers.assignments.dump(rows)[1]["start"] == "2024-01-02T09:00:00"
+
+    def test_single_query(self, test_app):
+        with test_app.app_context():
+            _add_assignments(6)
+
+            def load_and_dump():
+                rows = serializers.assignments.query(Assignment).all()
+                return serializers.assignments.dump(rows)
+
+            result, queries = _count_queries(load_and_dump)
+
+            assert len(result) == 6
+            assert queries == 1
+
+    def test_slot_fields_computed_once_per_slot(self, test_app):
+        with test_app.app_context():
+            _add_assignments(6)
+            rows = serializers.assignments.query(Assignment).all()
+
+            with patch(
+                "services.serializers.assignment_slot_fields",
+                wraps=serializers.assignment_slot_fields,
+            ) as slot_fields:
+                serializers.assignments.dump(rows)
+
+            assert slot_fields.call_count == 2
+
+
+class TestWeeklyOverrideSerializer:
+    """Test the day name added to overrides."""
+
+    def test_adds_day_name(self, test_app):
+        with test_app.app_context():
+            override = WeeklyScheduleOverride(
+                week_start_date=WEEK, day_of_week=2, start_time=time(9), end_time=time(17)
+            )
+            db.session.add(override)
+            db.session.commit()
+
+            (data,) = serializers.weekly_overrides.dump([override])
+            assert data == dict(override.to_dict(), day_name="Wednesday")
@@ -0,0 +1,137 @@
+"""
+Unit tests for signed app tokens.
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from database import db
+from models import RevokedToken, User
+from services import session_tokens
+
+
+class TestIssueAndVerify:
+    """Test token signing and verification."""
+
+    def test_round_trip(self, test_app, test_user):
+        with test_app.app_context():
+            token = session_tokens.issue(db.session.get(User, test_user["id"]))
+
+            claims = session_tokens.verify(token)
+            assert claims["uid"] == test_user["id"]
+            assert claims["role"] == "user"
+
+    def test_tokens_are_unique(self, test_app, test_user):
+        with test_app.app_context():
+            user = db.session.get(User, test_user["id"])
+            assert session_tokens.issue(user) != session_tokens.issue(user)
+
+    def test_tampered_token_is_rejected(self, test_app, test_user):
+        with test_app.app_context():
+            token = session_tokens.issue(db.session.get(User, test_user["id"]))
+            assert session_tokens.verify(token[:-2] + "xx") is None
+            assert session_tokens.verify("not-a-token") is None
+
+    def test_other_secret_key_is_rejected(self, test_app, test_user):
+        with test_app.app_context():
+            token = session_tokens.issue(db.session.get(User, test_user["id"]))
+            with patch.dict(test_app.config, {"SECRET_KEY": "another-key"}):
+                assert session_tokens.verify(token) is None
+
+    def test_expired_token_is_rejected(self, test_app, test_user):
+        with test_app.app_context():
+            token = session_tokens.issue(db.session.get(User, test_user["id"]))
+            with patch.dict(test_app.config, {"APP_TOKEN_MAX_AGE_SECONDS": -1}):
+                assert session_tokens.verify(token) is None
+
+
+class TestSecretKey:
+    """The public development key is only trusted in debug mode and tests."""
+
+    def test_dev_key_is_refused_in_production(self, test_app, test_user):
+        with test_app.app_context():
+            user = db.session.get(User, test_user["id"])
+            token = session_tokens.issue(user)
+            config = {"SECRET_KEY": session_tokens.DEV_SECRET_KEY, "TESTING": False}
+            with patch.dict(test_app.config, config):
+                with pytest.raises(RuntimeError):
+                    session_tokens.issue(user)
+                with pytest.raises(RuntimeError):
+                    session_tokens.verify(token)
+
+    def test_dev_key_works_in_debug_mode(self, test_app, test_user, monkeypatch):
+        monkeypatch.setattr(test_app, "debug", True)
+        config = {"SECRET_KEY": session_tokens.DEV_SECRET_KEY, "TESTING": False}
+        with test_app.app_context(), patch.dict(test_app.config, config):
+            token = session_tokens.issue(db.session.get(User, test_user["id"]))
+            assert session_tokens.verify(token)["uid"] == test_user["id"]
+
+    def test_deployment_without_secret_key_does_not_start(self):
+        env = {k: v for k, v in os.environ.items() if k != "SECRET_KEY"}
+        env["DATABASE_URL"] = "sqlite:///:memory:"
+        result = subprocess.run(
+            [sys.executable, "-c", "import app"],
+            cwd=Path(__file__).resolve().parents[2],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode != 0
+        assert "SECRET_KEY must be set" in result.stderr
+
+
+class TestRevoke:
+    """Test logging tokens out."""
+
+    def test_revoked_token_is_rejected(self, test_app, test_user):
+        with test_app.app_context():
+            user = db.session.get(User, test_user["id"])
+            token, other = session_tokens.issue(user), session_tokens.issue(user)
+
+            assert session_tokens.revoke(token) is True
+
+            assert session_tokens.verify(token) is None
+            assert session_tokens.verify(other) is not None
+            assert RevokedToken.query.count() == 1
+
+    def test_revoke_invalid_token(self, test_app):
+        with test_app.app_context():
+            assert session_tokens.revoke("not-a-token") is False
+            assert RevokedToken.query.count() == 0
+
+    def test_revoke_purges_expired_entries(self, test_app, test_user):
+        with test_app.app_context():
+            db.session.add(
+                RevokedToken(jti="old", expires_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+            db.session.commit()
+
+            session_tokens.revoke(session_tokens.issue(db.session.get(User, test_user["id"])))
+
+            assert db.session.get(RevokedToken, "old") is None
+            assert RevokedToken.query.count() == 1
+
+    def test_revocation_list_is_cached(self, test_app, test_user):
+        with test_app.app_context():
+            token = session_tokens.issue(db.session.get(User, test_user["id"]))
+            assert session_tokens.verify(token) is not None
+
+            # A revocation written by another process is seen once the cache expires
+            jti = session_tokens.verify(token)["jti"]
+            db.session.execute(
+                db.insert(RevokedToken).values(
+                    jti=jti, expires_at=datetime.utcnow() + timedelta(days=1)
+                ),
+                execution_options={"changes_recorded": True},
+            )
+            db.session.commit()
+            assert session_tokens.verify(token) is not None
+
+            session_tokens.invalidate()
+            assert session_tokens.verify(token) is None
@@ -0,0 +1,96 @@
+"""
+Unit tests for single-flight coalescing.
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def _wait_for_waiters(flight, key, count):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters >= count:
+                return
+        time.sleep(0.001)
+    raise AssertionError("callers never joined the flight")
+
+
+def _run_concurrently(flight, func, count=5):
+    results = [None] * count
+
+    def call(index):
+        try:
+            results[index] = flight.do("key", func)
+        except RuntimeError as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class TestSingleFlight:
+    """Test that concurrent calls with one key share one computation."""
+
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return object()
+
+        threads, results = _run_concurrently(flight, compute)
+        _wait_for_waiters(flight, "key", 4)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(calls) == 1
+        assert len({id(result) for result in results}) == 1
+        assert flight._calls == {}
+
+    def test_sequential_calls_each_run(self):
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+
+    def test_waiters_retry_after_failure(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                raise RuntimeError("boom")
+            return "ok"
+
+        threads, results = _run_concurrently(flight, compute, count=3)
+        _wait_for_waiters(flight, "key", 2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(calls) == 3
+        assert sorted(map(str, results)) == ["boom", "ok", "ok"]
+
+    def test_leader_error_propagates(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            flight.do("key", fail)
+        assert flight._calls == {}
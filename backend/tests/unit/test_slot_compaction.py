@@ -0,0 +1,141 @@
+"""
+Unit tests for TimeSlot compaction.
+"""
+
+from datetime import date, time, timedelta
+
+from database import db
+from models import (
+    Assignment,
+    AvailabilityBitmap,
+    DaySchedule,
+    ShiftRequirement,
+    TimeSlot,
+    User,
+    UserAvailability,
+    WeeklyScheduleOverride,
+)
+from services import availability_bits
+from services.slot_compaction import compact_slots, find_dead_slots
+
+
+def _week_start():
+    return date.today() - timedelta(days=date.today().weekday())
+
+
+def _slot(day, start_hour, end_hour):
+    slot = TimeSlot(day_of_week=day, start_time=time(start_hour), end_time=time(end_hour))
+    db.session.add(slot)
+    db.session.commit()
+    return slot
+
+
+def _monday_template(active=True):
+    db.session.add(
+        DaySchedule(
+            day_of_week=0,
+            start_time=time(9, 0),
+            end_time=time(11, 0),
+            slot_duration_minutes=60,
+            is_active=active,
+        )
+    )
+    db.session.commit()
+
+
+class TestFindSlots:
+    """Test detection of dead slots."""
+
+    def test_days_without_template_keep_their_slots(self, test_app, test_time_slot):
+        with test_app.app_context():
+            _slot(1, 8, 9)
+            assert find_dead_slots() == []
+
+    def test_unreferenced_slots_outside_grids_are_dead(self, test_app, test_time_slot):
+        with test_app.app_context():
+            _monday_template()
+            live = [_slot(0, 9, 10), _slot(0, 10, 11)]
+            override_slot = _slot(0, 13, 14)
+            past_override_slot = _slot(0, 15, 16)
+            db.session.add_all(
+                [
+                    WeeklyScheduleOverride(
+                        week_start_date=_week_start() + timedelta(days=7),
+                        day_of_week=0,
+                        start_time=time(13, 0),
+                        end_time=time(14, 0),
+                        slot_duration_minutes=60,
+                    ),
+                    WeeklyScheduleOverride(
+                        week_start_date=_week_start() - timedelta(days=7),
+                        day_of_week=0,
+                        start_time=time(15, 0),
+                        end_time=time(16, 0),
+                        slot_duration_minutes=60,
+                    ),
+                ]
+            )
+            db.session.commit()
+
+            dead = find_dead_slots()
+            assert sorted(dead) == sorted([test_time_slot["id"], past_override_slot.id])
+            assert not set(dead) & {slot.id for slot in live + [override_slot]}
+
+    def test_inactive_template_slots_are_dead(self, test_app):
+        with test_app.app_context():
+            _monday_template(active=False)
+            slot = _slot(0, 9, 10)
+            assert find_dead_slots() == [slot.id]
+
+    def test_referenced_slots_are_never_dead(self, test_app, test_user, test_location):
+        with test_app.app_context():
+            _monday_template()
+            stale = _slot(0, 7, 8)
+            db.session.add(
+                Assignment(
+                    user_id=test_user["id"],
+                    location_id=test_location["id"],
+                    time_slot_id=stale.id,
+                    week_start_date=_week_start() - timedelta(days=28),
+                )
+            )
+            db.session.commit()
+            assert find_dead_slots() == []
+
+    def test_slots_in_availability_bitmaps_are_never_dead(self, test_app, test_user):
+        with test_app.app_context():
+            _monday_template()
+            stale = _slot(0, 7, 8)
+            db.session.add(
+                AvailabilityBitmap(
+                    user_id=test_user["id"],
+                    week_start_date=_week_start() - timedelta(days=28),
+                    data=availability_bits.encode(
+                        {(None, 1): availability_bits.mask_of([stale.id])}
+                    ),
+                )
+            )
+            db.session.commit()
+            assert find_dead_slots() == []
+
+
+class TestCompactSlots:
+    """Test the full compaction run."""
+
+    def test_compact_deletes_dead_slots_and_reports(self, test_app, test_time_slot):
+        with test_app.app_context():
+            _monday_template()
+            _slot(0, 9, 10)
+
+            report = compact_slots()
+
+            assert report["dead_slots_deleted"] == 1
+            assert report["slots_remaining"] == 1
+            assert db.session.get(TimeSlot, test_time_slot["id"]) is None
+
+    def test_compact_without_commit_can_be_rolled_back(self, test_app, test_time_slot):
+        with test_app.app_context():
+            _monday_template()
+            compact_slots(commit=False)
+            db.session.rollback()
+            assert db.session.get(TimeSlot, test_time_slot["id"]) is not None
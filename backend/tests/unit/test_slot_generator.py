@@ -3,16 +3,20 @@ Comprehensive tests for slot generator service.
 Tests all slot generation functions.
 """
 
-from datetime import time
+from datetime import date, time
 
 import pytest
 
 from app import app, db
-from models import DaySchedule, TimeSlot
+from models import AvailabilityBitmap, DaySchedule, TimeSlot
+from services.availability import get_week_availability, replace_week_availability
+from services.scheduler import run_auto_scheduler
 from services.slot_generator import (
+    count_slots_by_day,
     count_slots_for_day,
     delete_slots_for_day,
     generate_slots_for_day,
+    generate_slots_for_days,
     preview_slots,
     regenerate_all_slots,
     regenerate_slots_for_day,
@@ -77,6 +81,74 @@ class TestGenerateSlotsForDay:
             slots = generate_slots_for_day(schedule)
             assert len(slots) == 2
 
+    def test_generate_slots_keeps_existing_overlapping_grid(self, test_app):
+        """Only the missing slots of a day are inserted."""
+        with test_app.app_context():
+            db.session.add(TimeSlot(day_of_week=3, start_time=time(9, 0), end_time=time(9, 30)))
+            db.session.commit()
+            schedule = DaySchedule(
+                day_of_week=3,
+                start_time=time(9, 0),
+                end_time=time(10, 30),
+                slot_duration_minutes=30,
+            )
+
+            slots = generate_slots_for_day(schedule)
+
+            assert [s.start_time for s in slots] == [time(9, 30), time(10, 0)]
+            assert all(s.id is not None for s in slots)
+            assert TimeSlot.query.filter_by(day_of_week=3).count() == 3
+
+
+class TestGenerateSlotsForDays:
+    """Tests for the set-based generate_slots_for_days function."""
+
+    def test_generates_whole_week_in_one_call(self, test_app):
+        """Slots for several days are created together."""
+        with test_app.app_context():
+            schedules = [
+                DaySchedule(
+                    day_of_week=day,
+                    start_time=time(9, 0),
+                    end_time=time(11, 0),
+                    slot_duration_minutes=60,
+                )
+                for day in range(5)
+            ]
+
+            slots = generate_slots_for_days(schedules)
+
+            assert len(slots) == 10
+            assert count_slots_by_day() == {day: 2 for day in range(5)}
+
+    def test_without_commit_joins_callers_transaction(self, test_app):
+        """commit=False leaves the insert to the caller's transaction."""
+        with test_app.app_context():
+            schedule = DaySchedule(
+                day_of_week=6, start_time=time(9, 0), end_time=time(10, 0), slot_duration_minutes=30
+            )
+            generate_slots_for_days([schedule], commit=False)
+            db.session.rollback()
+
+            assert TimeSlot.query.filter_by(day_of_week=6).count() == 0
+
+    def test_empty_schedule_list(self, test_app):
+        """Nothing to generate returns an empty list."""
+        with test_app.app_context():
+            assert generate_slots_for_days([]) == []
+
+    def test_duplicate_time_slots_are_rejected(self, test_app):
+        """The (day, start, end) unique constraint blocks duplicate rows."""
+        from sqlalchemy.exc import IntegrityError
+
+        with test_app.app_context():
+            db.session.add(TimeSlot(day_of_week=2, start_time=time(9, 0), end_time=time(10, 0)))
+            db.session.commit()
+            db.session.add(TimeSlot(day_of_week=2, start_time=time(9, 0), end_time=time(10, 0)))
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+
 
 class TestDeleteSlotsForDay:
     """Tests for delete_slots_for_day function."""
@@ -186,6 +258,39 @@ class TestRegenerateAllSlots:
             # Manual slot should be deleted
             assert TimeSlot.query.filter_by(day_of_week=6).count() == 0
 
+    def test_regenerate_does_not_carry_bitmap_availability_over(
+        self, test_app, test_user, test_location, monkeypatch
+    ):
+        """Bits of deleted slots must not resurface on slots that reuse their ids."""
+        week = date(2024, 3, 4)
+        monkeypatch.setitem(test_app.config, "AVAILABILITY_STORAGE", "bitmap")
+        with test_app.app_context():
+            schedule = DaySchedule(
+                day_of_week=0,
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+                slot_duration_minutes=60,
+                is_active=True,
+            )
+            db.session.add(schedule)
+            db.session.commit()
+            (morning,) = generate_slots_for_day(schedule)
+            replace_week_availability(
+                test_user["id"],
+                week,
+                [{"location_id": test_location["id"], "time_slot_id": morning.id}],
+            )
+            db.session.commit()
+
+            # The day moves to the afternoon; the new slot may get the old id back
+            schedule.start_time, schedule.end_time = time(13, 0), time(14, 0)
+            db.session.commit()
+            regenerate_all_slots()
+
+            assert AvailabilityBitmap.query.count() == 0
+            assert get_week_availability(week).for_user(test_user["id"]) == []
+            assert run_auto_scheduler(week)["scheduled"] == 0
+
 
 class TestCountSlotsForDay:
     """Tests for count_slots_for_day function."""
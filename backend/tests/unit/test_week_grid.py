@@ -0,0 +1,127 @@
+"""
+Unit tests for the week-aware effective slot grid.
+"""
+
+from datetime import date, time, timedelta
+
+from database import db
+from models import DaySchedule, TimeSlot, WeeklyScheduleOverride
+from services import week_grid
+from services.slot_generator import generate_slots_for_days
+from services.week_grid import get_week_grid, load_week_grid
+
+
+def _week_start():
+    return date.today() - timedelta(days=date.today().weekday())
+
+
+def _times(grid, day):
+    return [(slot.start_time, slot.end_time) for slot in grid if slot.day_of_week == day]
+
+
+def _monday_template(start=time(9, 0), end=time(10, 0), active=True):
+    schedule = DaySchedule(
+        day_of_week=0, start_time=start, end_time=end, slot_duration_minutes=30, is_active=active
+    )
+    db.session.add(schedule)
+    generate_slots_for_days([schedule])
+    return schedule
+
+
+class TestLoadWeekGrid:
+    """Test how a week's effective slots are resolved."""
+
+    def test_day_without_schedule_keeps_all_slots(self, test_app, test_time_slot):
+        with test_app.app_context():
+            grid = load_week_grid(_week_start())
+            assert [slot.id for slot in grid] == [test_time_slot["id"]]
+            assert grid[0].to_dict() == db.session.get(TimeSlot, test_time_slot["id"]).to_dict()
+            assert grid[0].get_day_name() == "Monday"
+
+    def test_template_excludes_stale_slots(self, test_app, test_time_slot):
+        with test_app.app_context():
+            _monday_template()
+            grid = load_week_grid(_week_start())
+            # The 9-17 slot from an older grid is not part of the 30-minute template
+            assert _times(grid, 0) == [(time(9, 0), time(9, 30)), (time(9, 30), time(10, 0))]
+
+    def test_inactive_template_closes_day(self, test_app):
+        with test_app.app_context():
+            _monday_template(active=False)
+            assert _times(load_week_grid(_week_start()), 0) == []
+
+    def test_override_replaces_template_for_its_week_only(self, test_app):
+        with test_app.app_context():
+            week_start = _week_start()
+            _monday_template()
+            override = WeeklyScheduleOverride(
+                week_start_date=week_start,
+                day_of_week=0,
+                start_time=time(13, 0),
+                end_time=time(14, 0),
+                slot_duration_minutes=60,
+            )
+            db.session.add(override)
+            generate_slots_for_days([override])
+
+            assert _times(load_week_grid(week_start), 0) == [(time(13, 0), time(14, 0))]
+            next_week = load_week_grid(week_start + timedelta(days=7))
+            assert _times(next_week, 0) == [(time(9, 0), time(9, 30)), (time(9, 30), time(10, 0))]
+
+    def test_inactive_override_closes_day(self, test_app):
+        with test_app.app_context():
+            week_start = _week_start()
+            _monday_template()
+            db.session.add(
+                WeeklyScheduleOverride(
+                    week_start_date=week_start,
+                    day_of_week=0,
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    is_active=False,
+                )
+            )
+            db.session.commit()
+            assert _times(load_week_grid(week_start), 0) == []
+
+
+class TestWeekGridCache:
+    """Test caching and invalidation of week grids."""
+
+    def test_get_week_grid_is_cached(self, test_app, test_time_slot):
+        with test_app.app_context():
+            assert get_week_grid(_week_start()) is get_week_grid(_week_start())
+
+    def test_template_change_drops_cached_grids(self, test_app, test_time_slot):
+        with test_app.app_context():
+            grid = get_week_grid(_week_start())
+            _monday_template()
+            assert get_week_grid(_week_start()) is not grid
+            assert len(get_week_grid(_week_start())) == 2
+
+    def test_override_change_drops_only_its_week(self, test_app, test_time_slot):
+        with test_app.app_context():
+            week_start = _week_start()
+            next_week = week_start + timedelta(days=7)
+            grid, next_grid = get_week_grid(week_start), get_week_grid(next_week)
+
+            db.session.add(
+                WeeklyScheduleOverride(
+                    week_start_date=week_start,
+                    day_of_week=0,
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    is_active=False,
+                )
+            )
+            db.session.commit()
+
+            assert get_week_grid(week_start) is not grid
+            assert get_week_grid(week_start) == ()
+            assert get_week_grid(next_week) is next_grid
+
+    def test_invalidate(self, test_app, test_time_slot):
+        with test_app.app_context():
+            grid = get_week_grid(_week_start())
+            week_grid.invalidate(_week_start())
+            assert get_week_grid(_week_start()) is not grid
@@ -137,6 +137,33 @@ describe('AuthContext', () => {
     expect(screen.getByTestId('token').textContent).toBe('null');
     expect(localStorageMock.removeItem).toHaveBeenCalledWith('token');
   });
+
+  it('logout revokes the token on the server', async () => {
+    localStorageMock.getItem.mockReturnValue('valid-token');
+    (api.get as jest.Mock).mockResolvedValue({
+      data: { id: 1, name: 'Test User', email: 'test@colby.edu', role: 'user' },
+    });
+    (api.post as jest.Mock).mockResolvedValue({ data: { message: 'Logged out' } });
+
+    render(
+      <AuthProvider>
+        <TestConsumer />
+      </AuthProvider>
+    );
+
+    await waitFor(() => {
+      expect(screen.getByTestId('loading').textContent).toBe('false');
+    });
+
+    await act(async () => {
+      screen.getByText('Logout').click();
+    });
+
+    expect(api.post).toHaveBeenCalledWith('/auth/logout', null, {
+      headers: { Authorization: 'Bearer valid-token' },
+    });
+    expect(screen.getByTestId('token').textContent).toBe('null');
+  });
 });
 
 describe('useAuth', () => {
@@ -13,6 +13,27 @@ jest.mock('../services/api', () => ({
   },
 }));
 
+// Capture the live event handler instead of opening a stream
+let onWeekEvent: (() => void) | undefined;
+jest.mock('../services/liveUpdates', () => ({
+  subscribeToWeek: jest.fn((_weekStart: string, onEvent: () => void) => {
+    onWeekEvent = onEvent;
+    return () => {};
+  }),
+}));
+
+// Payload of GET /schedule/week
+const week = (overrides: Record<string, unknown[]> = {}) => ({
+  data: {
+    week_start: '2024-01-01',
+    time_slots: [],
+    locations: [],
+    users: [],
+    assignments: [],
+    ...overrides,
+  },
+});
+
 describe('useScheduleData', () => {
   beforeEach(() => {
     jest.clearAllMocks();
@@ -37,10 +58,16 @@ describe('useScheduleData', () => {
     };
 
     (api.get as jest.Mock).mockImplementation((url: string) => {
-      if (url.includes('/assignments')) return Promise.resolve({ data: mockData.assignments });
-      if (url.includes('/users')) return Promise.resolve({ data: mockData.users });
-      if (url.includes('/locations')) return Promise.resolve({ data: mockData.locations });
-      if (url.includes('/time-slots')) return Promise.resolve({ data: mockData.timeSlots });
+      if (url.startsWith('/schedule/week?week_start=2024-01-01')) {
+        return Promise.resolve(
+          week({
+            users: mockData.users,
+            assignments: mockData.assignments,
+            locations: mockData.locations,
+            time_slots: mockData.timeSlots,
+          })
+        );
+      }
       return Promise.reject(new Error('Unknown URL'));
     });
 
@@ -55,6 +82,32 @@ describe('useScheduleData', () => {
     expect(result.current.data.locations.length).toBe(1);
     expect(result.current.data.timeSlots.length).toBe(1);
     expect(result.current.error).toBeNull();
+    expect(api.get).toHaveBeenCalledTimes(1);
+  });
+
+  it('resolves assignment references', async () => {
+    (api.get as jest.Mock).mockResolvedValue(
+      week({
+        users: [{ id: 1, name: 'Test User', email: 'test@test.com', role: 'user' }],
+        assignments: [{ id: 7, user_id: 1, location_id: 2, time_slot_id: 3 }],
+        locations: [{ id: 2, name: 'Library', is_active: true }],
+        time_slots: [{ id: 3, day_of_week: 2, start_time: '09:00:00', end_time: '10:00:00' }],
+      })
+    );
+
+    const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
+
+    await waitFor(() => {
+      expect(result.current.loading).toBe(false);
+    });
+
+    const assignment = result.current.data.assignments[0];
+    expect(assignment.user_name).toBe('Test User');
+    expect(assignment.location_name).toBe('Library');
+    expect(assignment.time_slot?.id).toBe(3);
+    expect(assignment.week_start_date).toBe('2024-01-01');
+    expect(assignment.start).toBe('2024-01-03T09:00:00');
+    expect(assignment.end).toBe('2024-01-03T10:00:00');
   });
 
   it('handles API error', async () => {
@@ -89,10 +142,7 @@ describe('useScheduleData', () => {
       { id: 2, name: 'Inactive', is_active: false },
     ];
 
-    (api.get as jest.Mock).mockImplementation((url: string) => {
-      if (url.includes('/locations')) return Promise.resolve({ data: mockLocations });
-      return Promise.resolve({ data: [] });
-    });
+    (api.get as jest.Mock).mockResolvedValue(week({ locations: mockLocations }));
 
     const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
 
@@ -110,10 +160,7 @@ describe('useScheduleData', () => {
       { id: 2, name: 'Admin', role: 'admin' },
     ];
 
-    (api.get as jest.Mock).mockImplementation((url: string) => {
-      if (url.includes('/users')) return Promise.resolve({ data: mockUsers });
-      return Promise.resolve({ data: [] });
-    });
+    (api.get as jest.Mock).mockResolvedValue(week({ users: mockUsers }));
 
     const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
 
@@ -126,7 +173,7 @@ describe('useScheduleData', () => {
   });
 
   it('passes location filter to API', async () => {
-    (api.get as jest.Mock).mockResolvedValue({ data: [] });
+    (api.get as jest.Mock).mockResolvedValue(week());
 
     renderHook(() =>
       useScheduleData({
@@ -141,7 +188,7 @@ describe('useScheduleData', () => {
   });
 
   it('passes user filter to API', async () => {
-    (api.get as jest.Mock).mockResolvedValue({ data: [] });
+    (api.get as jest.Mock).mockResolvedValue(week());
 
     renderHook(() =>
       useScheduleData({
@@ -162,12 +209,13 @@ describe('useScheduleData', () => {
       timeSlots: [{ id: 3, day_of_week: 0, start_time: '09:00', end_time: '10:00' }],
     };
 
-    (api.get as jest.Mock).mockImplementation((url: string) => {
-      if (url.includes('/users')) return Promise.resolve({ data: mockData.users });
-      if (url.includes('/locations')) return Promise.resolve({ data: mockData.locations });
-      if (url.includes('/time-slots')) return Promise.resolve({ data: mockData.timeSlots });
-      return Promise.resolve({ data: [] });
-    });
+    (api.get as jest.Mock).mockResolvedValue(
+      week({
+        users: mockData.users,
+        locations: mockData.locations,
+        time_slots: mockData.timeSlots,
+      })
+    );
 
     const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
 
@@ -181,7 +229,7 @@ describe('useScheduleData', () => {
   });
 
   it('refreshData reloads data', async () => {
-    (api.get as jest.Mock).mockResolvedValue({ data: [] });
+    (api.get as jest.Mock).mockResolvedValue(week());
 
     const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
 
@@ -198,15 +246,36 @@ describe('useScheduleData', () => {
     expect((api.get as jest.Mock).mock.calls.length).toBeGreaterThan(initialCallCount);
   });
 
+  it('reloads quietly after a live event', async () => {
+    jest.useFakeTimers();
+    try {
+      (api.get as jest.Mock).mockResolvedValue(week());
+      const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
+      await waitFor(() => {
+        expect(result.current.loading).toBe(false);
+      });
+      const initialCallCount = (api.get as jest.Mock).mock.calls.length;
+
+      await act(async () => {
+        onWeekEvent?.();
+        onWeekEvent?.();
+        jest.advanceTimersByTime(500);
+      });
+
+      expect((api.get as jest.Mock).mock.calls.length).toBe(initialCallCount + 1);
+      expect(result.current.loading).toBe(false);
+    } finally {
+      jest.useRealTimers();
+    }
+  });
+
   it('getAssignmentsForCell returns correct assignments', async () => {
     const mockTimeSlots = [{ id: 1, day_of_week: 0, start_time: '09:00', end_time: '10:00' }];
     const mockAssignments = [{ id: 100, user_id: 1, location_id: 5, time_slot_id: 1 }];
 
-    (api.get as jest.Mock).mockImplementation((url: string) => {
-      if (url.includes('/time-slots')) return Promise.resolve({ data: mockTimeSlots });
-      if (url.includes('/assignments')) return Promise.resolve({ data: mockAssignments });
-      return Promise.resolve({ data: [] });
-    });
+    (api.get as jest.Mock).mockResolvedValue(
+      week({ time_slots: mockTimeSlots, assignments: mockAssignments })
+    );
 
     const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
 
@@ -220,7 +289,7 @@ describe('useScheduleData', () => {
   });
 
   it('getAssignmentsForCell returns empty for nonexistent cell', async () => {
-    (api.get as jest.Mock).mockResolvedValue({ data: [] });
+    (api.get as jest.Mock).mockResolvedValue(week());
 
     const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
 
@@ -233,7 +302,7 @@ describe('useScheduleData', () => {
   });
 
   it('getUnassignedShifts returns empty array', async () => {
-    (api.get as jest.Mock).mockResolvedValue({ data: [] });
+    (api.get as jest.Mock).mockResolvedValue(week());
 
     const { result } = renderHook(() => useScheduleData({ weekStart: '2024-01-01' }));
 
@@ -6,26 +6,10 @@ import interactionPlugin from '@fullcalendar/interaction';
 import bootstrap5Plugin from '@fullcalendar/bootstrap5';
 import { Alert } from 'react-bootstrap';
 import api from '../services/api';
+import { fetchScheduleWeek } from '../services/scheduleWeek';
+import { Assignment, TimeSlot } from '../types/scheduler';
 import '../styles/calendar-overrides.css';
 
-interface Assignment {
-  id: number;
-  user_id: number;
-  user_name: string;
-  location_id: number;
-  location_name: string;
-  time_slot_id: number;
-  week_start_date: string;
-  start?: string;
-  end?: string;
-  title?: string;
-  time_slot?: {
-    day_of_week: number;
-    start_time: string;
-    end_time: string;
-  };
-}
-
 interface WeeklyScheduleCalendarProps {
   role: 'user' | 'admin';
   weekStart: string;
@@ -43,6 +27,8 @@ function WeeklyScheduleCalendar({
 }: WeeklyScheduleCalendarProps) {
   const calendarRef = useRef<FullCalendar>(null);
   const [events, setEvents] = useState<any[]>([]);
+  // Slots of the loaded week, used to map drops onto time slots without refetching
+  const timeSlotsRef = useRef<TimeSlot[]>([]);
   const [, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -57,12 +43,12 @@ function WeeklyScheduleCalendar({
     setError(null);
 
     try {
-      const params: any = { week_start: weekStart };
-      if (locationFilter) params.location_id = locationFilter;
-      if (userFilter) params.user_id = userFilter;
-
-      const response = await api.get('/assignments', { params });
-      const assignments: Assignment[] = response.data;
+      const week = await fetchScheduleWeek(weekStart, {
+        locationId: locationFilter,
+        userId: userFilter,
+      });
+      const assignments: Assignment[] = week.assignments;
+      timeSlotsRef.current = week.timeSlots;
 
       const calendarEvents = assignments
         .map((assignment) => {
@@ -146,9 +132,8 @@ function WeeklyScheduleCalendar({
     const endTime = `${String(newEnd.getHours()).padStart(2, '0')}:${String(newEnd.getMinutes()).padStart(2, '0')}:00`;
 
     try {
-      // First, try to find matching time slot
-      const timeSlotsResponse = await api.get('/time-slots');
-      const timeSlots = timeSlotsResponse.data;
+      // First, try to find matching time slot among the week's slots
+      const timeSlots = timeSlotsRef.current;
 
       let matchingTimeSlot = timeSlots.find(
         (ts: any) =>
@@ -15,6 +15,15 @@ interface AuthContextType {
 
 const AuthContext = createContext<AuthContextType | undefined>(undefined);
 
+// Revoke an app token on the server; the local session ends either way
+async function revokeToken(token: string) {
+  try {
+    await api.post('/auth/logout', null, { headers: { Authorization: `Bearer ${token}` } });
+  } catch (error) {
+    console.error('Failed to revoke token:', error);
+  }
+}
+
 export function AuthProvider({ children }: { children: ReactNode }) {
   const [user, setUser] = useState<User | null>(null);
   const [loading, setLoading] = useState(true);
@@ -64,6 +73,9 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   };
 
   const logout = () => {
+    if (token) {
+      revokeToken(token);
+    }
     setToken(null);
     setUser(null);
     localStorage.removeItem('token');
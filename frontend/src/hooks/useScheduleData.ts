@@ -1,6 +1,7 @@
 import { useState, useEffect, useCallback } from 'react';
-import api from '../services/api';
-import { ScheduleData, Assignment, User, Location, TimeSlot } from '../types/scheduler';
+import { fetchScheduleWeek } from '../services/scheduleWeek';
+import { useWeekEvents } from './useWeekEvents';
+import { ScheduleData, Assignment, User, TimeSlot } from '../types/scheduler';
 
 interface UseScheduleDataOptions {
   weekStart: string;
@@ -20,30 +21,27 @@ export const useScheduleData = (options: UseScheduleDataOptions) => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
-  const loadData = useCallback(async () => {
-    setLoading(true);
+  // `quiet` reloads (after live events) keep showing the current data meanwhile
+  const loadData = useCallback(async (quiet = false) => {
+    if (!quiet) setLoading(true);
     setError(null);
 
     try {
-      const params = new URLSearchParams({ week_start: weekStart });
-      if (locationFilter) params.append('location_id', locationFilter.toString());
-      if (userFilter) params.append('user_id', userFilter.toString());
-
-      const [assignmentsRes, usersRes, locationsRes, timeSlotsRes] = await Promise.all([
-        api.get(`/assignments?${params.toString()}`),
-        api.get('/users'),
-        api.get('/locations'),
-        api.get('/time-slots'),
-      ]);
-
-      // Load all users (not just 'user' role) so assignments can display properly
+      // One request: assignments plus the users, locations and slots they refer to
+      const week = await fetchScheduleWeek(weekStart, {
+        locationId: locationFilter,
+        userId: userFilter,
+      });
+
+      // Keep all users (not just 'user' role) so assignments can display properly
       // Filter to 'user' role only for the workers list display
-      const allUsers = usersRes.data as User[];
+      const allUsers = week.users;
       setData({
-        users: allUsers.filter((u: User) => u.role === 'user') as User[],
-        assignments: assignmentsRes.data as Assignment[],
-        locations: locationsRes.data.filter((l: Location) => l.is_active) as Location[],
-        timeSlots: timeSlotsRes.data as TimeSlot[],
+        users: allUsers.filter((u: User) => u.role === 'user'),
+        assignments: week.assignments,
+        // Inactive locations are only listed when an assignment still refers to them
+        locations: week.locations.filter((l) => l.is_active),
+        timeSlots: week.timeSlots,
         weekStart,
         allUsers, // Store all users for assignment lookups
       });
@@ -51,7 +49,7 @@ export const useScheduleData = (options: UseScheduleDataOptions) => {
       setError(err.response?.data?.error || 'Failed to load schedule data');
       console.error('Failed to load schedule data:', err);
     } finally {
-      setLoading(false);
+      if (!quiet) setLoading(false);
     }
   }, [weekStart, locationFilter, userFilter]);
 
@@ -59,6 +57,9 @@ export const useScheduleData = (options: UseScheduleDataOptions) => {
     loadData();
   }, [loadData]);
 
+  // Other admins' edits and scheduler runs for this week
+  useWeekEvents(weekStart, () => loadData(true));
+
   const refreshData = useCallback(() => {
     loadData();
   }, [loadData]);
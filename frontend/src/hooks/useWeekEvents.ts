@@ -0,0 +1,23 @@
+import { useEffect, useRef } from 'react';
+import { subscribeToWeek } from '../services/liveUpdates';
+
+// Bursts (e.g. a scheduler run creating many assignments) trigger one refresh
+const DEBOUNCE_MS = 300;
+
+/** Call `onChange` shortly after live events arrive for `weekStart`. */
+export const useWeekEvents = (weekStart: string, onChange: () => void) => {
+  const onChangeRef = useRef(onChange);
+  onChangeRef.current = onChange;
+
+  useEffect(() => {
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    const close = subscribeToWeek(weekStart, () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => onChangeRef.current(), DEBOUNCE_MS);
+    });
+    return () => {
+      clearTimeout(timer);
+      close();
+    };
+  }, [weekStart]);
+};
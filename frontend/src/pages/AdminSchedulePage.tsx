@@ -1,6 +1,7 @@
 import { useState } from 'react';
 import { Row, Col, Form, Button, Alert } from 'react-bootstrap';
 import api from '../services/api';
+import { applyAssignmentOperations } from '../services/assignmentBatch';
 import ShiftScheduleGrid from '../components/ShiftScheduleGrid';
 import ShiftDetailsDrawer from '../components/ShiftDetailsDrawer';
 import ActionableInsights from '../components/ActionableInsights';
@@ -82,18 +83,16 @@ function AdminSchedulePage() {
       const assignment = data.assignments.find((a) => a.id === assignmentId);
       if (!assignment) throw new Error('Assignment not found');
 
-      await api.put(`/assignments/${assignmentId}/move`, {
-        new_time_slot_id: target.timeSlotId,
-        new_location_id: target.locationId,
-        new_start: new Date(weekStart).toISOString(),
-        new_end: new Date(weekStart).toISOString(),
-      });
-
-      if (target.userId !== assignment.user_id) {
-        await api.put(`/assignments/${assignmentId}`, {
+      // One request, validated as a whole: the slot, location and worker change together
+      await applyAssignmentOperations([
+        {
+          op: 'update',
+          id: assignmentId,
           user_id: target.userId,
-        });
-      }
+          location_id: target.locationId,
+          time_slot_id: target.timeSlotId,
+        },
+      ]);
 
       showToast('success', 'Shift moved successfully!');
       refreshData();
@@ -117,34 +116,26 @@ function AdminSchedulePage() {
     try {
       let filterChanged = false;
 
-      // Handle user change
-      if (updates.userId !== undefined) {
-        await api.put(`/assignments/${assignmentId}`, { user_id: updates.userId });
-      }
-
-      // Handle location-only change (use simpler PUT endpoint)
-      if (updates.locationId !== undefined && updates.timeSlotId === undefined) {
-        await api.put(`/assignments/${assignmentId}`, { location_id: updates.locationId });
-
-        // Always switch the admin view to the new location so the moved
-        // shift remains visible (grid currently shows a single location).
-        if (locationFilter !== updates.locationId) {
-          setLocationFilter(updates.locationId);
-          filterChanged = true; // useScheduleData will refresh when filter changes
-        }
-      }
-
-      // Handle time slot change (with or without location) - use /move endpoint
-      if (updates.timeSlotId !== undefined) {
-        const assignment = data.assignments.find((a) => a.id === assignmentId);
-        if (assignment) {
-          await api.put(`/assignments/${assignmentId}/move`, {
-            new_time_slot_id: updates.timeSlotId,
-            new_location_id: updates.locationId || assignment.location_id,
-            new_start: new Date(weekStart).toISOString(),
-            new_end: new Date(weekStart).toISOString(),
-          });
-        }
+      // User, location and time slot change in one all-or-nothing request
+      await applyAssignmentOperations([
+        {
+          op: 'update',
+          id: assignmentId,
+          user_id: updates.userId,
+          location_id: updates.locationId,
+          time_slot_id: updates.timeSlotId,
+        },
+      ]);
+
+      // Always switch the admin view to the new location so the moved
+      // shift remains visible (grid currently shows a single location).
+      if (
+        updates.locationId !== undefined &&
+        updates.timeSlotId === undefined &&
+        locationFilter !== updates.locationId
+      ) {
+        setLocationFilter(updates.locationId);
+        filterChanged = true; // useScheduleData will refresh when filter changes
       }
 
       // Optimistically update the selected assignment so the drawer reflects the change immediately
@@ -176,7 +167,8 @@ function AdminSchedulePage() {
         refreshData();
       }
     } catch (err: any) {
-      const errorMsg = err.response?.data?.error || 'Failed to update shift';
+      const errorMsg =
+        err.response?.data?.message || err.response?.data?.error || 'Failed to update shift';
       showToast('danger', errorMsg);
       throw err;
     }
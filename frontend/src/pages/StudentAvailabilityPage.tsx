@@ -76,6 +76,15 @@ const Icons = {
 const DAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
 const ALL_DAYS = [0, 1, 2, 3, 4, 5, 6];
 
+// One entry with no location covers every location
+const ANY_LOCATION = 'any';
+type LocationChoice = number | typeof ANY_LOCATION;
+
+const toLocationId = (choice: LocationChoice): number | null =>
+  choice === ANY_LOCATION ? null : choice;
+const cellKey = (locationId: number | null, slotId: number) =>
+  `${locationId ?? ANY_LOCATION}-${slotId}`;
+
 function StudentAvailabilityPage() {
   const { user } = useAuth();
   const { showToast } = useToast();
@@ -87,7 +96,7 @@ function StudentAvailabilityPage() {
   });
 
   const [locations, setLocations] = useState<Location[]>([]);
-  const [selectedLocationId, setSelectedLocationId] = useState<number | null>(null);
+  const [selectedLocationId, setSelectedLocationId] = useState<LocationChoice | null>(null);
   const [timeSlots, setTimeSlots] = useState<TimeSlot[]>([]);
   const [availabilities, setAvailabilities] = useState<Map<string, UserAvailability>>(new Map());
   const [loading, setLoading] = useState(false);
@@ -130,17 +139,16 @@ function StudentAvailabilityPage() {
       const activeLocations = locationsRes.data.filter((l: Location) => l.is_active);
       setLocations(activeLocations);
 
-      // Auto-select first location if none selected
+      // Default to "any location" when there is more than one to choose from
       if (activeLocations.length > 0 && !selectedLocationId) {
-        setSelectedLocationId(activeLocations[0].id);
+        setSelectedLocationId(activeLocations.length > 1 ? ANY_LOCATION : activeLocations[0].id);
       }
 
       setTimeSlots(timeSlotsRes.data);
 
       const availMap = new Map<string, UserAvailability>();
       availabilityRes.data.forEach((av: UserAvailability) => {
-        const key = `${av.location_id}-${av.time_slot_id}`;
-        availMap.set(key, av);
+        availMap.set(cellKey(av.location_id, av.time_slot_id), av);
       });
       setAvailabilities(availMap);
     } catch (err: any) {
@@ -188,7 +196,7 @@ function StudentAvailabilityPage() {
     const slot = getSlotForDayAndTime(day, startTime, endTime);
     if (!slot) return;
 
-    const key = `${selectedLocationId}-${slot.id}`;
+    const key = cellKey(toLocationId(selectedLocationId), slot.id);
     const newAvailabilities = new Map(availabilities);
     const current = newAvailabilities.get(key);
 
@@ -196,7 +204,7 @@ function StudentAvailabilityPage() {
       // Not available → Available
       newAvailabilities.set(key, {
         user_id: user?.id || 0,
-        location_id: selectedLocationId,
+        location_id: toLocationId(selectedLocationId),
         time_slot_id: slot.id,
         preference_level: 1,
         week_start_date: weekStart,
@@ -219,8 +227,7 @@ function StudentAvailabilityPage() {
     const slot = getSlotForDayAndTime(day, startTime, endTime);
     if (!slot) return 0;
 
-    const key = `${selectedLocationId}-${slot.id}`;
-    const availability = availabilities.get(key);
+    const availability = availabilities.get(cellKey(toLocationId(selectedLocationId), slot.id));
     return availability?.preference_level || 0;
   };
 
@@ -234,7 +241,8 @@ function StudentAvailabilityPage() {
         preference_level: av.preference_level,
       }));
 
-      await api.post('/availability/batch', {
+      // Replaces the whole week, so cleared cells are removed server-side too
+      await api.put('/availability', {
         week_start_date: weekStart,
         entries,
       });
@@ -247,6 +255,22 @@ function StudentAvailabilityPage() {
     }
   };
 
+  const handleSaveAsTemplate = async () => {
+    try {
+      const entries = Array.from(availabilities.values()).map((av) => ({
+        location_id: av.location_id,
+        time_slot_id: av.time_slot_id,
+        preference_level: av.preference_level,
+      }));
+
+      // Standing availability: used for every week you don't change yourself
+      await api.put('/availability/template', { entries });
+      showToast('success', 'Saved as your weekly template');
+    } catch (err: any) {
+      showToast('danger', err.response?.data?.error || 'Failed to save template');
+    }
+  };
+
   const handleClearAll = () => {
     if (!selectedLocationId) return;
 
@@ -267,24 +291,18 @@ function StudentAvailabilityPage() {
       current.setDate(current.getDate() - 7);
       const lastWeekStart = current.toISOString().split('T')[0];
 
-      const lastWeekRes = await api.get(`/availability?week_start=${lastWeekStart}`);
-      const lastWeekAvailabilities = lastWeekRes.data;
+      // Copied server-side in one statement; cells already set this week are kept
+      const res = await api.post('/availability/copy-forward', {
+        source_week_start: lastWeekStart,
+        target_week_start: weekStart,
+      });
 
-      if (lastWeekAvailabilities.length === 0) {
-        showToast('info', 'No availability found for last week');
+      if (res.data.copied === 0) {
+        showToast('info', 'Nothing new to copy from last week');
         return;
       }
 
-      const newAvailabilities = new Map<string, UserAvailability>();
-      lastWeekAvailabilities.forEach((av: UserAvailability) => {
-        const key = `${av.location_id}-${av.time_slot_id}`;
-        newAvailabilities.set(key, {
-          ...av,
-          week_start_date: weekStart,
-        });
-      });
-
-      setAvailabilities(newAvailabilities);
+      await loadData();
       showToast('success', 'Copied from last week');
     } catch (err: any) {
       showToast('danger', err.response?.data?.error || 'Failed to copy from last week');
@@ -323,10 +341,16 @@ function StudentAvailabilityPage() {
 
   // Count availabilities for selected location
   const availableCount = Array.from(availabilities.values()).filter(
-    (a) => a.preference_level === 1 && a.location_id === selectedLocationId
+    (a) =>
+      a.preference_level === 1 &&
+      selectedLocationId !== null &&
+      a.location_id === toLocationId(selectedLocationId)
   ).length;
   const preferredCount = Array.from(availabilities.values()).filter(
-    (a) => a.preference_level === 2 && a.location_id === selectedLocationId
+    (a) =>
+      a.preference_level === 2 &&
+      selectedLocationId !== null &&
+      a.location_id === toLocationId(selectedLocationId)
   ).length;
 
   const timeRanges = getUniqueTimeRanges();
@@ -446,6 +470,9 @@ function StudentAvailabilityPage() {
           <Button className="ms-btn ms-btn-secondary" onClick={handleCopyFromLastWeek}>
             Copy From Last Week
           </Button>
+          <Button className="ms-btn ms-btn-secondary" onClick={handleSaveAsTemplate}>
+            Use Every Week
+          </Button>
           <Button className="ms-btn ms-btn-secondary" onClick={handleClearAll}>
             Clear All
           </Button>
@@ -478,6 +505,23 @@ function StudentAvailabilityPage() {
                   >
                     <Icons.MapPin /> Location:
                   </span>
+                  <button
+                    onClick={() => setSelectedLocationId(ANY_LOCATION)}
+                    className="ms-location-badge"
+                    style={{
+                      cursor: 'pointer',
+                      opacity: selectedLocationId === ANY_LOCATION ? 1 : 0.5,
+                      transform:
+                        selectedLocationId === ANY_LOCATION ? 'scale(1.05)' : 'scale(1)',
+                      transition: 'all 0.2s ease',
+                      border:
+                        selectedLocationId === ANY_LOCATION
+                          ? '2px solid var(--ms-primary)'
+                          : '2px solid transparent',
+                    }}
+                  >
+                    Any location
+                  </button>
                   {locations.map((loc, idx) => (
                     <button
                       key={loc.id}
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Alert, Row, Col } from 'react-bootstrap';
-import api from '../services/api';
+import { fetchScheduleWeek } from '../services/scheduleWeek';
 import { Assignment, TimeSlot } from '../types/scheduler';
 import StatusChip from '../components/StatusChip';
 import IconButton from '../components/IconButton';
@@ -79,12 +79,9 @@ function StudentSchedulePage() {
     setLoading(true);
     setError(null);
     try {
-      const [assignmentsRes, timeSlotsRes] = await Promise.all([
-        api.get(`/assignments?week_start=${weekStart}`),
-        api.get('/time-slots'),
-      ]);
-      setAssignments(assignmentsRes.data);
-      setTimeSlots(timeSlotsRes.data);
+      const week = await fetchScheduleWeek(weekStart);
+      setAssignments(week.assignments);
+      setTimeSlots(week.timeSlots);
     } catch (err: any) {
       setError(err.response?.data?.error || 'Failed to load schedule');
     } finally {
@@ -0,0 +1,29 @@
+import api from './api';
+import { Assignment } from '../types/scheduler';
+
+export type AssignmentOperation =
+  | {
+      op: 'create';
+      user_id: number;
+      location_id: number;
+      time_slot_id: number;
+      week_start_date: string;
+    }
+  | { op: 'update'; id: number; user_id?: number; location_id?: number; time_slot_id?: number }
+  | { op: 'move'; id: number; time_slot_id: number; location_id?: number; week_start_date?: string }
+  | { op: 'delete'; id: number }
+  | { op: 'clear_week'; week_start_date: string; location_id?: number };
+
+export interface AssignmentBatchResult {
+  created: Assignment[];
+  updated: Assignment[];
+  deleted: number[];
+}
+
+// Apply operations in one all-or-nothing request (POST /assignments/bulk)
+export async function applyAssignmentOperations(
+  operations: AssignmentOperation[]
+): Promise<AssignmentBatchResult> {
+  const response = await api.post<AssignmentBatchResult>('/assignments/bulk', { operations });
+  return response.data;
+}
@@ -0,0 +1,84 @@
+import api from './api';
+
+export interface WeekEvent {
+  type: 'assignment' | 'scheduler_run' | 'reload';
+  op?: 'created' | 'updated' | 'deleted';
+  id?: number;
+  user_id?: number;
+  scheduled?: number;
+}
+
+const DEFAULT_RETRY_MS = 5000;
+// While the server has no stream to spare (503), reload this often instead
+const DEFAULT_POLL_MS = 30000;
+
+// Parse one server-sent event block ("field: value" lines) into its data payload
+function parseEvent(block: string): WeekEvent | null {
+  const data = block
+    .split('\n')
+    .filter((line) => line.startsWith('data:'))
+    .map((line) => line.slice(5).trim())
+    .join('\n');
+  return data ? (JSON.parse(data) as WeekEvent) : null;
+}
+
+/**
+ * Follow the live events of one week (GET /schedule/week/events).
+ *
+ * Uses fetch rather than EventSource so the request carries the Authorization
+ * header. Reconnects after the server's retry delay if the stream ends or fails.
+ * When the server has no stream to spare (503), falls back to polling: a
+ * `reload` event every Retry-After seconds until a stream opens.
+ * Returns a function that closes the stream.
+ */
+export function subscribeToWeek(weekStart: string, onEvent: (event: WeekEvent) => void): () => void {
+  const controller = new AbortController();
+  let retryMs = DEFAULT_RETRY_MS;
+
+  const connect = async () => {
+    try {
+      const auth = api.defaults.headers.common['Authorization'];
+      const response = await fetch(
+        `/api/schedule/week/events?week_start=${encodeURIComponent(weekStart)}`,
+        {
+          headers: auth ? { Authorization: String(auth) } : {},
+          signal: controller.signal,
+        }
+      );
+      if (response.status === 503) {
+        const retryAfter = Number(response.headers.get('Retry-After'));
+        onEvent({ type: 'reload' });
+        if (!controller.signal.aborted) {
+          setTimeout(connect, retryAfter > 0 ? retryAfter * 1000 : DEFAULT_POLL_MS);
+        }
+        return;
+      }
+      if (!response.ok || !response.body) throw new Error(`Event stream failed: ${response.status}`);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let end;
+        while ((end = buffer.indexOf('\n\n')) >= 0) {
+          const block = buffer.slice(0, end);
+          buffer = buffer.slice(end + 2);
+          const retry = block.match(/^retry: (\d+)$/m);
+          if (retry) retryMs = Number(retry[1]);
+          const event = parseEvent(block);
+          if (event) onEvent(event);
+        }
+      }
+    } catch (err) {
+      if (controller.signal.aborted) return;
+      console.warn('Live updates disconnected:', err);
+    }
+    if (!controller.signal.aborted) setTimeout(connect, retryMs);
+  };
+
+  connect();
+  return () => controller.abort();
+}
@@ -0,0 +1,75 @@
+import api from './api';
+import { Assignment, Location, ScheduleWeek, TimeSlot, User } from '../types/scheduler';
+
+export interface ScheduleWeekFilters {
+  locationId?: number | null;
+  userId?: number | null;
+}
+
+export interface LoadedScheduleWeek {
+  weekStart: string;
+  timeSlots: TimeSlot[];
+  locations: Location[];
+  users: User[];
+  assignments: Assignment[];
+}
+
+const toDateString = (date: Date): string =>
+  `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(
+    date.getDate()
+  ).padStart(2, '0')}`;
+
+// Resolve the id references of a /schedule/week payload into full assignments
+export function resolveScheduleWeek(week: ScheduleWeek): LoadedScheduleWeek {
+  const usersById = new Map(week.users.map((u) => [u.id, u]));
+  const locationsById = new Map(week.locations.map((l) => [l.id, l]));
+  const timeSlotsById = new Map(week.time_slots.map((ts) => [ts.id, ts]));
+
+  const assignments = week.assignments.map((ref): Assignment => {
+    const timeSlot = timeSlotsById.get(ref.time_slot_id);
+    const userName = usersById.get(ref.user_id)?.name;
+    const locationName = locationsById.get(ref.location_id)?.name;
+
+    let start: string | undefined;
+    let end: string | undefined;
+    if (timeSlot) {
+      const day = new Date(`${week.week_start}T00:00:00`);
+      day.setDate(day.getDate() + timeSlot.day_of_week);
+      start = `${toDateString(day)}T${timeSlot.start_time}`;
+      end = `${toDateString(day)}T${timeSlot.end_time}`;
+    }
+
+    return {
+      ...ref,
+      assigned_by: ref.assigned_by ?? undefined,
+      week_start_date: week.week_start,
+      user_name: userName,
+      location_name: locationName,
+      time_slot: timeSlot,
+      start,
+      end,
+      title: `${userName || 'Unknown'} – ${locationName || 'Unknown'}`,
+    };
+  });
+
+  return {
+    weekStart: week.week_start,
+    timeSlots: week.time_slots,
+    locations: week.locations,
+    users: week.users,
+    assignments,
+  };
+}
+
+// Load everything a schedule page shows for one week in a single request
+export async function fetchScheduleWeek(
+  weekStart: string,
+  filters: ScheduleWeekFilters = {}
+): Promise<LoadedScheduleWeek> {
+  const params = new URLSearchParams({ week_start: weekStart });
+  if (filters.locationId) params.append('location_id', filters.locationId.toString());
+  if (filters.userId) params.append('user_id', filters.userId.toString());
+
+  const response = await api.get(`/schedule/week?${params.toString()}`);
+  return resolveScheduleWeek(response.data as ScheduleWeek);
+}
@@ -51,10 +51,28 @@ export interface Assignment {
   title?: string;
 }
 
+// Assignment as listed by GET /api/schedule/week: references only
+export interface AssignmentRef {
+  id: number;
+  user_id: number;
+  location_id: number;
+  time_slot_id: number;
+  assigned_by?: number | null; // admins only
+}
+
+// Normalized payload of GET /api/schedule/week
+export interface ScheduleWeek {
+  week_start: string; // YYYY-MM-DD
+  time_slots: TimeSlot[];
+  locations: Location[];
+  users: User[];
+  assignments: AssignmentRef[];
+}
+
 export interface UserAvailability {
   id?: number;
   user_id: number;
-  location_id: number;
+  location_id: number | null; // null = any location
   time_slot_id: number;
   week_start_date: string;
   preference_level: number; // 1 = neutral, 2 = preferred